@@ -8,4 +8,17 @@ s += "#      Send any bug reports or comments to quant@financepy.com     #" + cr
 s += "####################################################################"
 s += cr
 
-print(s)
+###############################################################################
+# Nothing is printed and no subpackage is imported when financepy is imported
+# so that short lived processes start quickly. Subpackages are imported when
+# they are first accessed as attributes.
+###############################################################################
+
+from .finutils.FinLazyImport import makeLazyPackage
+
+makeLazyPackage(__name__, [], ["finutils", "market", "models", "products"])
+
+
+def printBanner():
+    ''' Print the version and build banner. '''
+    print(s)
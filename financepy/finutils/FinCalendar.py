@@ -7,9 +7,10 @@
 # TODO: Do some timings and tidy up logic in adjustment function
 ###############################################################################
 
-import datetime
+import numpy as np
 from enum import Enum
-from .FinDate import FinDate
+from .FinDate import FinDate, dateLookupArrays
+from .FinDateArray import FinDateArray
 from .FinError import FinError
 
 # from numba import njit, jit, int64, boolean
@@ -77,6 +78,13 @@ class FinDateGenRuleTypes(Enum):
     BACKWARD = 2
 
 ###############################################################################
+# Business day arrays are cached per calendar type and date range so that they
+# are only built once per process.
+###############################################################################
+
+gBusinessDayArrays = {}
+
+###############################################################################
 
 
 class FinCalendar(object):
@@ -84,26 +92,53 @@ class FinCalendar(object):
     a regional or country-specific calendar convention specified by the user.
     It also supplies an adjustment method which takes in an adjustment
     convention and then applies that to any date that falls on a holiday in the
-    specified calendar. '''
+    specified calendar. A list of calendar types can be passed in to create a
+    joint calendar in which a date is a business day only if it is a business
+    day in all of the calendars.
+
+    Business days are looked up in a boolean array covering every date in the
+    FinDate range which is built once per calendar type and shared by all
+    calendar objects in the process. Date adjustments and business day
+    additions are then array lookups and can be applied to a FinDateArray. '''
 
     def __init__(self,
-                 calendarType: FinCalendarTypes):
-        ''' Create a calendar based on a specified calendar type. '''
+                 calendarType: (FinCalendarTypes, list)):
+        ''' Create a calendar based on a specified calendar type or a list of
+        calendar types for a joint calendar. '''
+
+        if isinstance(calendarType, (list, tuple)):
+
+            if len(calendarType) == 0:
+                raise FinError("Joint calendar needs at least one type")
 
-        if calendarType not in FinCalendarTypes:
+            for calType in calendarType:
+                if calType not in FinCalendarTypes:
+                    raise FinError("Need to pass FinCalendarType and not " +
+                                   str(calType))
+
+            calendarType = tuple(calendarType)
+
+            if len(calendarType) == 1:
+                calendarType = calendarType[0]
+
+        elif calendarType not in FinCalendarTypes:
             raise FinError(
                 "Need to pass FinCalendarType and not " +
                 str(calendarType))
 
         self._type = calendarType
+        self._lookupArrays = None
+        self._busDayArrays = None
+        self._firstExcel = None
 
     ###########################################################################
 
     def adjust(self,
-               dt: FinDate,
+               dt: (FinDate, FinDateArray),
                busDayConventionType: FinBusDayAdjustTypes):
         ''' Adjust a payment date if it falls on a holiday according to the
-        specified business day convention. '''
+        specified business day convention. If a FinDateArray is passed in then
+        all of the dates are adjusted and a FinDateArray is returned. '''
 
         if type(busDayConventionType) != FinBusDayAdjustTypes:
             raise FinError("Invalid type passed. Need FinBusDayConventionType")
@@ -111,122 +146,298 @@ class FinCalendar(object):
         if busDayConventionType == FinBusDayAdjustTypes.NONE:
             return dt
 
-        elif busDayConventionType == FinBusDayAdjustTypes.FOLLOWING:
+        if isinstance(dt, FinDateArray):
+            offsets = self._dateOffsets(dt)
+            newOffsets = self._adjustOffsets(offsets, busDayConventionType)
+            return FinDateArray(newOffsets + self._firstExcelDate())
 
-            # step forward until we find a business day
-            while self.isBusinessDay(dt) is False:
-                dt = dt.addDays(1)
+        offset = self._dateOffset(dt)
+        isBusDay = self._businessDayArrays()[0]
 
+        # Most dates are business days so this is the fast path
+        if isBusDay[offset]:
             return dt
 
-        elif busDayConventionType == FinBusDayAdjustTypes.MODIFIED_FOLLOWING:
+        newOffset = self._adjustOffsets(offset, busDayConventionType)
+        return self._dateFromOffset(newOffset)
+
+###############################################################################
 
-            d_start = dt._d
-            m_start = dt._m
-            y_start = dt._y
+    def addBusinessDays(self,
+                        startDate: (FinDate, FinDateArray),
+                        numDays: int):
+        ''' Returns a new date that is numDays business days after FinDate.
+        All holidays in the chosen calendar are assumed not business days. If
+        a FinDateArray is passed in then a FinDateArray is returned. '''
 
-            # step forward until we find a business day
-            while self.isBusinessDay(dt) is False:
-                dt = dt.addDays(1)
+        if isinstance(numDays, int) is False:
+            raise FinError("Num days must be an integer")
 
-            # if the business day is in a different month look back
-            # for previous first business day one day at a time
-            # TODO: I could speed this up by starting it at initial date
-            if dt._m != m_start:
-                dt = FinDate(d_start, m_start, y_start)
-                while self.isBusinessDay(dt) is False:
-                    dt = dt.addDays(-1)
+        if numDays == 0:
+            if isinstance(startDate, FinDateArray):
+                return FinDateArray(startDate)
+            return FinDate(startDate._d, startDate._m, startDate._y)
 
-            return dt
+        isBusDay, cumBusDays, busDays = self._businessDayArrays()
 
-        elif busDayConventionType == FinBusDayAdjustTypes.PRECEDING:
+        if isinstance(startDate, FinDateArray):
+            offsets = self._dateOffsets(startDate)
+        else:
+            offsets = self._dateOffset(startDate)
 
-            # if the business day is in the next month look back
-            # for previous first business day one day at a time
-            while self.isBusinessDay(dt) is False:
-                dt = dt.addDays(-1)
+        # The rank of the last business day on or before the date when moving
+        # forward and of the first business day on or after it moving back
+        if numDays > 0:
+            ranks = cumBusDays[offsets] - 1 + numDays
+        else:
+            ranks = cumBusDays[offsets] - isBusDay[offsets] + numDays
 
-            return dt
+        if (ranks < 0).any() or (ranks >= len(busDays)).any():
+            raise FinError("Business day is outside the calendar date range")
 
-        elif busDayConventionType == FinBusDayAdjustTypes.MODIFIED_PRECEDING:
+        newOffsets = busDays[ranks]
 
-            d_start = dt._d
-            m_start = dt._m
-            y_start = dt._y
+        if isinstance(startDate, FinDateArray):
+            return FinDateArray(newOffsets + self._firstExcelDate())
 
-            # step backward until we find a business day
-            while self.isBusinessDay(dt) is False:
-                dt = dt.addDays(-1)
+        return self._dateFromOffset(newOffsets)
+
+###############################################################################
+
+    def isBusinessDay(self,
+                      dt: (FinDate, FinDateArray)):
+        ''' Determines if a date is a business day according to the specified
+        calendar. If it is it returns True, otherwise False. If a FinDateArray
+        is passed in then a boolean array is returned. '''
+
+        isBusDay = self._businessDayArrays()[0]
+
+        if isinstance(dt, FinDateArray):
+            return isBusDay[self._dateOffsets(dt)]
+
+        return bool(isBusDay[self._dateOffset(dt)])
+
+###############################################################################
+
+    def _adjustOffsets(self,
+                       offsets: (int, np.ndarray),
+                       busDayConventionType: FinBusDayAdjustTypes):
+        ''' Apply a business day convention to a date offset or an array of
+        date offsets from the first date in the date range and return the
+        adjusted offsets. '''
+
+        if busDayConventionType == FinBusDayAdjustTypes.NONE:
+            return offsets
+
+        elif busDayConventionType == FinBusDayAdjustTypes.FOLLOWING:
+
+            return self._followingOffsets(offsets)
+
+        elif busDayConventionType == FinBusDayAdjustTypes.MODIFIED_FOLLOWING:
+
+            # if the business day is in a different month look back
+            # for previous first business day from the original date
+            adjusted = self._followingOffsets(offsets)
+            moved = self._monthIndex(adjusted) != self._monthIndex(offsets)
+
+            if isinstance(offsets, np.ndarray):
+                adjusted[moved] = self._precedingOffsets(offsets[moved])
+            elif moved:
+                adjusted = self._precedingOffsets(offsets)
+
+            return adjusted
+
+        elif busDayConventionType == FinBusDayAdjustTypes.PRECEDING:
+
+            return self._precedingOffsets(offsets)
+
+        elif busDayConventionType == FinBusDayAdjustTypes.MODIFIED_PRECEDING:
 
             # if the business day is in a different month look forward
-            # for previous first business day one day at a time
-            # I could speed this up by starting it at initial date
-            if dt._m != m_start:
-                dt = FinDate(d_start, m_start, y_start)
-                while self.isBusinessDay(dt) is False:
-                    dt = dt.addDays(+1)
+            # for next first business day from the original date
+            adjusted = self._precedingOffsets(offsets)
+            moved = self._monthIndex(adjusted) != self._monthIndex(offsets)
 
-            return dt
+            if isinstance(offsets, np.ndarray):
+                adjusted[moved] = self._followingOffsets(offsets[moved])
+            elif moved:
+                adjusted = self._followingOffsets(offsets)
+
+            return adjusted
 
         else:
 
             raise FinError("Unknown adjustment convention" +
                            str(busDayConventionType))
 
-        return dt
+###############################################################################
+
+    def _followingOffsets(self,
+                          offsets: (int, np.ndarray)):
+        ''' The first business day on or after each date offset. '''
+
+        isBusDay, cumBusDays, busDays = self._businessDayArrays()
+        ranks = cumBusDays[offsets] - isBusDay[offsets]
+
+        if (ranks >= len(busDays)).any():
+            raise FinError("Business day is outside the calendar date range")
+
+        return busDays[ranks]
 
 ###############################################################################
 
-    def addBusinessDays(self,
-                        startDate: FinDate,
-                        numDays: int):
-        ''' Returns a new date that is numDays business days after FinDate. 
-        All holidays in the chosen calendar are assumed not business days. '''
+    def _precedingOffsets(self,
+                          offsets: (int, np.ndarray)):
+        ''' The last business day on or before each date offset. '''
 
-        # TODO: REMOVE DATETIME DEPENDENCE HERE ???
+        _, cumBusDays, busDays = self._businessDayArrays()
+        ranks = cumBusDays[offsets] - 1
 
-        if isinstance(numDays, int) is False:
-            raise FinError("Num days must be an integer")
+        if (ranks < 0).any():
+            raise FinError("Business day is outside the calendar date range")
+
+        return busDays[ranks]
 
-        dt = datetime.date(startDate._y, startDate._m, startDate._d)
-        d = dt.day
-        m = dt.month
-        y = dt.year
-        newDt = FinDate(d, m, y)
+###############################################################################
 
-        s = +1
-        if numDays < 0:
-            numDays = -1 * numDays
-            s = -1
+    def _monthIndex(self,
+                    offsets: (int, np.ndarray)):
+        ''' Returns a number that is unique to the month and year of each
+        date offset. This uses the 31 day padding of the date index. '''
 
-        while numDays > 0:
-            dt = dt + s * datetime.timedelta(days=1)
-            d = dt.day
-            m = dt.month
-            y = dt.year
-            newDt = FinDate(d, m, y)
+        _, excelDateToIndex, _ = dateLookupArrays()
+        return excelDateToIndex[offsets] // 31
 
-            if self.isBusinessDay(newDt) is True:
-                numDays -= 1
+###############################################################################
 
-        return newDt
+    def _firstExcelDate(self):
+        ''' The excel date of the first date in the FinDate date range. '''
+
+        self._businessDayArrays()
+        return self._firstExcel
 
 ###############################################################################
 
-    def isBusinessDay(self,
-                      dt: FinDate):
-        ''' Determines if a date is a business day according to the specified
-        calendar. If it is it returns True, otherwise False. '''
+    def _dateOffsets(self,
+                     dates: FinDateArray):
+        ''' Convert a FinDateArray to an array of offsets from the first date
+        in the date range. '''
 
-        # For all calendars so far, SAT and SUN are not business days
-        # If this ever changes I will need to add a filter here.
-        if dt.isWeekend():
-            return False
+        return dates._excelDate - self._firstExcelDate()
 
-        if self.isHoliday(dt) is True:
-            return False
+###############################################################################
+
+    def _dateOffset(self,
+                    dt: FinDate):
+        ''' Convert a FinDate to its offset from the first date in the date
+        range. Intraday times are ignored. '''
+
+        return int(dt._excelDate) - self._firstExcelDate()
+
+###############################################################################
+
+    def _dateFromOffset(self,
+                        offset: int):
+        ''' Create the FinDate which is offset days after the first date in
+        the date range. '''
+
+        _, excelDateToIndex, startYear = dateLookupArrays()
+        idx = int(excelDateToIndex[offset])
+        y = startYear + idx // 372
+        m = 1 + (idx % 372) // 31
+        d = 1 + idx % 31
+        return FinDate(d, m, y)
+
+###############################################################################
+
+    def _businessDayArrays(self):
+        ''' Returns the cached business day arrays for this calendar. These
+        are a boolean array which is True if the date at each offset is a
+        business day, the cumulative number of business days up to and
+        including each offset and the offsets of all of the business days. A
+        joint calendar combines its calendars' boolean arrays with an AND. '''
+
+        lookupArrays = dateLookupArrays()
+
+        # The date lookup arrays are replaced if the date range changes
+        if lookupArrays is self._lookupArrays:
+            return self._busDayArrays
+
+        indexToExcelDate, excelDateToIndex, startYear = lookupArrays
+        key = (self._type, startYear, len(excelDateToIndex))
+
+        self._lookupArrays = lookupArrays
+        self._firstExcel = int(indexToExcelDate[excelDateToIndex[0]])
+
+        if key in gBusinessDayArrays:
+            self._busDayArrays = gBusinessDayArrays[key]
+            return self._busDayArrays
+
+        if isinstance(self._type, tuple):
+            isBusDay = np.ones(len(excelDateToIndex), dtype=np.bool_)
+            for calendarType in self._type:
+                calendar = FinCalendar(calendarType)
+                isBusDay &= calendar._businessDayArrays()[0]
         else:
-            return True
+            isBusDay = self._buildBusinessDays()
+
+        cumBusDays = np.cumsum(isBusDay, dtype=np.int32)
+        busDays = np.flatnonzero(isBusDay).astype(np.int32)
+
+        gBusinessDayArrays[key] = (isBusDay, cumBusDays, busDays)
+        self._busDayArrays = gBusinessDayArrays[key]
+        return self._busDayArrays
+
+###############################################################################
+
+    def _buildBusinessDays(self):
+        ''' Evaluate the holiday rules of a single calendar type for every
+        weekday in the date range and return a boolean array of business days.
+        This avoids creating a FinDate for each date. '''
+
+        indexToExcelDate, excelDateToIndex, startYear = dateLookupArrays()
+        numDays = len(excelDateToIndex)
+        firstExcelDate = indexToExcelDate[excelDateToIndex[0]]
+
+        excelDates = np.arange(firstExcelDate, firstExcelDate + numDays)
+        weekdays = (excelDates + 5) % 7
+        isBusDay = weekdays < FinDate.SAT
+
+        # Weekends are never business days and these two calendars have no
+        # other holidays so there is nothing more to do
+        if self._type == FinCalendarTypes.NONE or \
+           self._type == FinCalendarTypes.WEEKEND:
+            return isBusDay
+
+        holidayFn = getattr(self, "HOLIDAY_" + self._type.name)
+        startOfYear = firstExcelDate
+
+        # Python lists are much faster than numpy arrays for scalar access
+        indices = excelDateToIndex.tolist()
+        weekdayList = weekdays.tolist()
+
+        for i in range(0, numDays):
+
+            idx = indices[i]
+            d = 1 + idx % 31
+            m = 1 + (idx % 372) // 31
+
+            if d == 1 and m == 1:
+                startOfYear = firstExcelDate + i
+
+            if weekdayList[i] >= FinDate.SAT:
+                continue
+
+            self._y = startYear + idx // 372
+            self._m = m
+            self._d = d
+            self._dayInYear = firstExcelDate + i - startOfYear + 1
+            self._weekday = weekdayList[i]
+
+            if holidayFn() is True:
+                isBusDay[i] = False
+
+        return isBusDay
 
 ###############################################################################
 
@@ -234,7 +445,14 @@ class FinCalendar(object):
                       dt: FinDate):
         ''' Determines if a date is a Holiday according to the specified
         calendar. Weekends are not holidays unless the holiday falls on a 
-        weekend date. '''
+        weekend date. For a joint calendar a date is a holiday if it is a
+        holiday in any of the calendars. '''
+
+        if isinstance(self._type, tuple):
+            for calendarType in self._type:
+                if FinCalendar(calendarType).isHoliday(dt) is True:
+                    return True
+            return False
 
         startDate = FinDate(1, 1, dt._y)
         dayInYear = dt._excelDate - startDate._excelDate + 1
@@ -1068,7 +1286,10 @@ class FinCalendar(object):
 ###############################################################################
 
     def __str__(self):
-        s = self._type.name
+        if isinstance(self._type, tuple):
+            s = "+".join([calendarType.name for calendarType in self._type])
+        else:
+            s = self._type.name
         return s
 
 ###############################################################################
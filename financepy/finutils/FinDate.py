@@ -99,6 +99,7 @@ def parse_date(dateStr, dateFormat):
 
 
 gDateCounterList = None
+gDateLookupArrays = None
 gStartYear = 1900
 gEndYear = 2100
 
@@ -114,9 +115,13 @@ def calculateList():
     maxDays = 0
     
     global gDateCounterList
+    global gDateLookupArrays
     global gStartYear
     global gEndYear
 
+    # Any numpy lookup arrays built off the old list are now stale
+    gDateLookupArrays = None
+
 #    print("Calculating list between", gStartYear, "and", gEndYear)
 
     gDateCounterList = []
@@ -151,6 +156,30 @@ def calculateList():
                     gDateCounterList.append(-999)
 
 ###############################################################################
+
+
+def dateLookupArrays():
+    ''' Return numpy versions of the date counter list used for vectorised
+    date calculations. The first array maps a padded date index to its excel
+    date (or -999 for padding) and the second maps an excel date, offset by
+    the first excel date in the list, back to its padded date index. The
+    start year of the padded index is also returned. These are rebuilt
+    lazily whenever the date counter list is recalculated. '''
+
+    global gDateLookupArrays
+
+    if gDateCounterList is None:
+        calculateList()
+
+    if gDateLookupArrays is None:
+        indexToExcelDate = np.array(gDateCounterList, dtype=np.int32)
+        validIndices = np.where(indexToExcelDate > 0)[0]
+        excelDateToIndex = validIndices.astype(np.int32)
+        gDateLookupArrays = (indexToExcelDate, excelDateToIndex, gStartYear)
+
+    return gDateLookupArrays
+
+###############################################################################
 # The index in these functions is not the excel date index used as the 
 # internal representation of the date but the index of that date in the
 # padded date object used to store the dates in a way that allows for a
@@ -0,0 +1,415 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+
+from .FinDate import FinDate, dateLookupArrays
+from .FinError import FinError
+
+###############################################################################
+# These kernels work on int32 excel dates and use the lookup arrays returned
+# by dateLookupArrays to move between excel dates and the padded date index.
+# The start year of the padded index is passed in explicitly rather than read
+# from the global as numba freezes globals at compile time.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _isLeapYear(y):
+    return ((y % 4 == 0) and (y % 100 != 0) or (y % 400 == 0))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _daysInMonth(m, y):
+    if m == 2:
+        if _isLeapYear(y):
+            return 29
+        return 28
+    elif m == 4 or m == 6 or m == 9 or m == 11:
+        return 30
+    return 31
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _excelDatesToDMY(excelDates, indexToExcelDate, excelDateToIndex,
+                     startYear):
+    ''' Convert a vector of excel dates to vectors of day, month and year. '''
+
+    n = len(excelDates)
+    firstExcelDate = indexToExcelDate[excelDateToIndex[0]]
+    ds = np.empty(n, dtype=np.int32)
+    ms = np.empty(n, dtype=np.int32)
+    ys = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        idx = excelDateToIndex[excelDates[i] - firstExcelDate]
+        ys[i] = startYear + idx // 372
+        ms[i] = 1 + (idx % 372) // 31
+        ds[i] = 1 + idx % 31
+
+    return ds, ms, ys
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _dmyToExcelDates(ds, ms, ys, indexToExcelDate, startYear):
+    ''' Convert vectors of day, month and year to a vector of excel dates. The
+    dates are assumed to be valid. '''
+
+    n = len(ds)
+    excelDates = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        idx = (ys[i] - startYear) * 372 + (ms[i] - 1) * 31 + (ds[i] - 1)
+        excelDates[i] = indexToExcelDate[idx]
+
+    return excelDates
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _addMonths(ds, ms, ys, numMonths):
+    ''' Shift vectors of day, month and year by a number of months, capping
+    the day at the end of the new month. '''
+
+    n = len(ds)
+    newDs = np.empty(n, dtype=np.int32)
+    newMs = np.empty(n, dtype=np.int32)
+    newYs = np.empty(n, dtype=np.int32)
+
+    for i in range(0, n):
+        mm = ms[i] - 1 + numMonths[i]
+        y = ys[i] + mm // 12
+        m = 1 + mm % 12
+        d = min(ds[i], _daysInMonth(m, y))
+        newDs[i] = d
+        newMs[i] = m
+        newYs[i] = y
+
+    return newDs, newMs, newYs
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _endOfMonth(ms, ys):
+    ''' Return a vector of the last day of each month. '''
+
+    n = len(ms)
+    ds = np.empty(n, dtype=np.int32)
+    for i in range(0, n):
+        ds[i] = _daysInMonth(ms[i], ys[i])
+    return ds
+
+###############################################################################
+
+
+class FinDateArray():
+    ''' A compact vector of dates held as a numpy array of int32 excel dates.
+    It supports the common date arithmetic of FinDate but applies it to all
+    of the dates in one vectorised call without creating FinDate objects. As
+    it stores its excel dates in _excelDate, FinDate subtraction and
+    comparison against a FinDateArray return numpy arrays. Intraday times are
+    not supported. '''
+
+    ###########################################################################
+
+    def __init__(self,
+                 dates: (list, np.ndarray)):
+        ''' Create a date array from a list of FinDates, another FinDateArray
+        or a numpy array of integer excel dates. '''
+
+        if isinstance(dates, FinDateArray):
+            excelDates = dates._excelDate.copy()
+        elif isinstance(dates, np.ndarray):
+            if np.issubdtype(dates.dtype, np.integer) is False:
+                raise FinError("Excel dates must be integers")
+            excelDates = dates.astype(np.int32)
+        elif isinstance(dates, list):
+            excelDates = np.empty(len(dates), dtype=np.int32)
+            for i in range(0, len(dates)):
+                if isinstance(dates[i], FinDate) is False:
+                    raise FinError("List must only contain FinDates")
+                excelDates[i] = int(dates[i]._excelDate)
+        else:
+            raise FinError("FinDateArray needs a list of FinDates or an array")
+
+        indexToExcelDate, excelDateToIndex, _ = dateLookupArrays()
+        firstExcelDate = indexToExcelDate[excelDateToIndex[0]]
+        lastExcelDate = firstExcelDate + len(excelDateToIndex) - 1
+
+        if len(excelDates) > 0:
+            if excelDates.min() < firstExcelDate or \
+               excelDates.max() > lastExcelDate:
+                raise FinError("Excel dates outside supported date range")
+
+        self._excelDate = excelDates
+        self._dmy = None
+
+    ###########################################################################
+
+    @classmethod
+    def fromDMY(cls,
+                d: (list, np.ndarray),
+                m: (list, np.ndarray),
+                y: (list, np.ndarray)):
+        ''' Create a date array from vectors of day, month and year. '''
+
+        ds = np.asarray(d, dtype=np.int32)
+        ms = np.asarray(m, dtype=np.int32)
+        ys = np.asarray(y, dtype=np.int32)
+
+        if len(ds) != len(ms) or len(ds) != len(ys):
+            raise FinError("Day, month and year vectors not the same length")
+
+        _checkYears(ys)
+
+        if np.any(ms < 1) or np.any(ms > 12):
+            raise FinError("Month must be 1-12")
+
+        if np.any(ds < 1) or np.any(ds > _endOfMonth(ms, ys)):
+            raise FinError("Day not valid for month")
+
+        indexToExcelDate, _, startYear = dateLookupArrays()
+        excelDates = _dmyToExcelDates(ds, ms, ys, indexToExcelDate, startYear)
+        return cls(excelDates)
+
+    ###########################################################################
+
+    def _dayMonthYear(self):
+        ''' Lazily calculate and cache the day, month and year vectors. '''
+
+        if self._dmy is None:
+            indexToExcelDate, excelDateToIndex, startYear = dateLookupArrays()
+            self._dmy = _excelDatesToDMY(self._excelDate,
+                                         indexToExcelDate,
+                                         excelDateToIndex,
+                                         startYear)
+        return self._dmy
+
+    ###########################################################################
+
+    def _fromDayMonthYear(self, ds, ms, ys):
+        ''' Build a new date array from valid day, month and year vectors. '''
+
+        _checkYears(ys)
+        indexToExcelDate, _, startYear = dateLookupArrays()
+        excelDates = _dmyToExcelDates(ds, ms, ys, indexToExcelDate, startYear)
+        newDates = FinDateArray(excelDates)
+        newDates._dmy = (ds, ms, ys)
+        return newDates
+
+    ###########################################################################
+
+    def days(self):
+        ''' Returns the day of month of each date. '''
+        return self._dayMonthYear()[0]
+
+    ###########################################################################
+
+    def months(self):
+        ''' Returns the month number of each date. '''
+        return self._dayMonthYear()[1]
+
+    ###########################################################################
+
+    def years(self):
+        ''' Returns the year of each date. '''
+        return self._dayMonthYear()[2]
+
+    ###########################################################################
+
+    def weekday(self):
+        ''' Returns the weekday of each date where MON is 0 and SUN is 6. '''
+        return (self._excelDate + 5) % 7
+
+    ###########################################################################
+
+    def isWeekend(self):
+        ''' Returns a boolean array which is True if the date is a weekend. '''
+        return self.weekday() >= FinDate.SAT
+
+    ###########################################################################
+
+    def isEOM(self):
+        ''' Returns a boolean array which is True if the date is a month end.'''
+        ds, ms, ys = self._dayMonthYear()
+        return ds == _endOfMonth(ms, ys)
+
+    ###########################################################################
+
+    def EOM(self):
+        ''' Returns a date array with the last date of month of each date. '''
+        _, ms, ys = self._dayMonthYear()
+        return self._fromDayMonthYear(_endOfMonth(ms, ys), ms, ys)
+
+    ###########################################################################
+
+    def addDays(self,
+                numDays: (int, np.ndarray) = 1):
+        ''' Returns a new date array with each date moved forward by numDays
+        calendar days. This can be an integer or an array of integers. '''
+
+        numDays = np.asarray(numDays)
+        if np.issubdtype(numDays.dtype, np.integer) is False:
+            raise FinError("Number of days must be an integer")
+
+        return FinDateArray(self._excelDate + numDays.astype(np.int32))
+
+    ###########################################################################
+
+    def addMonths(self,
+                  numMonths: (int, np.ndarray)):
+        ''' Returns a new date array with each date moved forward by numMonths
+        months. The day is capped at the end of the new month. The number of
+        months can be an integer or an array of integers. '''
+
+        numMonths = np.asarray(numMonths)
+        if np.issubdtype(numMonths.dtype, np.integer) is False:
+            raise FinError("Number of months must be an integer")
+
+        numMonths = np.broadcast_to(numMonths, self._excelDate.shape)
+        ds, ms, ys = self._dayMonthYear()
+        ds, ms, ys = _addMonths(ds, ms, ys, numMonths.astype(np.int32))
+        return self._fromDayMonthYear(ds, ms, ys)
+
+    ###########################################################################
+
+    def addTenor(self,
+                 tenor: str):
+        ''' Return the dates following each date by a tenor which is a string
+        consisting of a number and a letter, the letter being d, w, m , y for
+        day, week, month or year. To agree with FinDate.addTenor, month and
+        year tenors step forward one period at a time. The dates are NOT
+        weekend or holiday adjusted. '''
+
+        if isinstance(tenor, str) is False:
+            raise FinError("Tenor must be a string e.g. '5Y'")
+
+        tenStr = tenor.upper()
+
+        if tenStr == "ON" or tenStr == "TN":
+            return self.addDays(1)
+        elif tenStr[-1] == "D":
+            return self.addDays(int(tenStr[0:-1]))
+        elif tenStr[-1] == "W":
+            return self.addDays(7 * int(tenStr[0:-1]))
+        elif tenStr[-1] == "M":
+            monthsPerPeriod = 1
+        elif tenStr[-1] == "Y":
+            monthsPerPeriod = 12
+        else:
+            raise FinError("Unknown tenor type in " + tenor)
+
+        numPeriods = int(tenStr[0:-1])
+
+        newDates = FinDateArray(self)
+        for _ in range(0, numPeriods):
+            newDates = newDates.addMonths(monthsPerPeriod)
+
+        return newDates
+
+    ###########################################################################
+
+    def toDates(self):
+        ''' Returns a list of FinDates. This materialises every date so should
+        only be used where FinDate objects are really needed. '''
+
+        ds, ms, ys = self._dayMonthYear()
+        return [FinDate(int(ds[i]), int(ms[i]), int(ys[i]))
+                for i in range(0, len(ds))]
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._excelDate)
+
+    ###########################################################################
+
+    def __getitem__(self, key):
+        ''' An integer key returns a FinDate and a slice or mask returns a new
+        FinDateArray. '''
+
+        if isinstance(key, (int, np.integer)):
+            ds, ms, ys = self._dayMonthYear()
+            return FinDate(int(ds[key]), int(ms[key]), int(ys[key]))
+
+        return FinDateArray(self._excelDate[key])
+
+    ###########################################################################
+
+    def __lt__(self, other):
+        return self._excelDate < other._excelDate
+
+    ###########################################################################
+
+    def __gt__(self, other):
+        return self._excelDate > other._excelDate
+
+    ###########################################################################
+
+    def __le__(self, other):
+        return self._excelDate <= other._excelDate
+
+    ###########################################################################
+
+    def __ge__(self, other):
+        return self._excelDate >= other._excelDate
+
+    ###########################################################################
+
+    def __eq__(self, other):
+        return self._excelDate == other._excelDate
+
+    ###########################################################################
+
+    def __ne__(self, other):
+        return self._excelDate != other._excelDate
+
+    ###########################################################################
+
+    def __sub__(self, other):
+        return self._excelDate - other._excelDate
+
+    ###########################################################################
+
+    def __repr__(self):
+        ''' Returns the dates in the current FinDate format. '''
+        return "FinDateArray(" + str(self.toDates()) + ")"
+
+    ###########################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
+
+
+def _checkYears(ys):
+    ''' Ensure that all years fall inside the padded date list, extending it
+    by creating a FinDate at the new boundary year as FinDate does. '''
+
+    if len(ys) == 0:
+        return
+
+    indexToExcelDate, _, startYear = dateLookupArrays()
+    endYear = startYear + len(indexToExcelDate) // 372 - 1
+
+    minYear = int(ys.min())
+    maxYear = int(ys.max())
+
+    if minYear < startYear:
+        FinDate(1, 1, minYear)
+
+    if maxYear > endYear:
+        FinDate(1, 1, maxYear)
+
+###############################################################################
@@ -3,11 +3,14 @@
 ##############################################################################
 
 from .FinDate import FinDate, monthDaysLeapYear, monthDaysNotLeapYear, datediff
-from .FinDate import isLeapYear
+from .FinDate import isLeapYear, dateLookupArrays
+from .FinDateArray import FinDateArray
 from .FinError import FinError
 from .FinFrequency import FinFrequencyTypes, FinFrequency
 from .FinGlobalVariables import gDaysInYear
 
+import numpy as np
+from numba import njit
 from enum import Enum
 
 # A useful source for these definitions can be found at
@@ -102,8 +105,17 @@ class FinDayCount(object):
         https://en.wikipedia.org/wiki/Day_count_convention
         and
         http://data.cbonds.info/files/cbondscalc/Calculator.pdf
+
+        If any of the dates is a FinDateArray then the calculation is
+        vectorised and numpy arrays of accrual factors, numerators and
+        denominators are returned.
         '''
 
+        if isinstance(dt1, FinDateArray) or isinstance(dt2, FinDateArray) \
+           or isinstance(dt3, FinDateArray):
+            return self._yearFracArray(dt1, dt2, dt3, freqType,
+                                       isTerminationDate)
+
         d1 = dt1._d
         m1 = dt1._m
         y1 = dt1._y
@@ -285,6 +297,86 @@ class FinDayCount(object):
             raise FinError(str(self._type) +
                            " is not one of FinDayCountTypes")
 
+###############################################################################
+
+    def _yearFracArray(self,
+                       dt1: (FinDate, FinDateArray),
+                       dt2: (FinDate, FinDateArray),
+                       dt3: (FinDate, FinDateArray) = None,
+                       freqType: FinFrequencyTypes = FinFrequencyTypes.ANNUAL,
+                       isTerminationDate: bool = False):
+        ''' Vectorised version of yearFrac where one or more of the dates is
+        a FinDateArray. Returns arrays of the accrual factor, the numerator
+        and the denominator. '''
+
+        if dt3 is None:
+            excelDates3 = None
+        else:
+            excelDates3 = _excelDateArray(dt3)
+
+        return self.yearFracSerials(_excelDateArray(dt1),
+                                    _excelDateArray(dt2),
+                                    excelDates3,
+                                    freqType,
+                                    isTerminationDate)
+
+###############################################################################
+
+    def yearFracSerials(self,
+                        excelDates1: (int, np.ndarray),
+                        excelDates2: (int, np.ndarray),
+                        excelDates3: (int, np.ndarray) = None,
+                        freqs: (FinFrequencyTypes, np.ndarray) = FinFrequencyTypes.ANNUAL,
+                        isTerminationDate: bool = False):
+        ''' Calculate year fractions for arrays of integer excel date serials
+        using a compiled loop. The dates have the same meaning as in yearFrac
+        so excelDates3 holds the next coupon dates needed by ACT_ACT_ICMA and
+        ACT_365L. The frequency can be a single FinFrequencyTypes or an array
+        of the number of payments per year of each period. Scalars are
+        broadcast against the arrays. Returns arrays of the accrual factor,
+        the numerator and the denominator which agree exactly with yearFrac.
+        '''
+
+        if self._type == FinDayCountTypes.ACT_ACT_ICMA and excelDates3 is None:
+            raise FinError("ACT_ACT_ICMA requires three dates and a freq")
+
+        # ACT_365L uses the period end date if there is no next coupon date
+        if excelDates3 is None:
+            excelDates3 = excelDates2
+
+        if isinstance(freqs, FinFrequencyTypes):
+            freqs = FinFrequency(freqs)
+
+        values = [np.asarray(excelDates1), np.asarray(excelDates2),
+                  np.asarray(excelDates3), np.asarray(freqs)]
+
+        for value in values:
+            if value.dtype.kind not in "iu":
+                raise FinError("Excel dates and frequencies must be integers")
+
+        shape = np.broadcast_shapes(*[value.shape for value in values])
+
+        for i in range(0, len(values)):
+            if values[i].shape != shape:
+                values[i] = np.broadcast_to(values[i], shape)
+            values[i] = np.ascontiguousarray(values[i],
+                                             dtype=np.int64).reshape(-1)
+
+        e1, e2, e3, freqs = values
+
+        indexToExcelDate, excelDateToIndex, startYear = dateLookupArrays()
+
+        accFactors, nums, dens = _yearFracKernel(self._type.value,
+                                                 e1, e2, e3, freqs,
+                                                 isTerminationDate,
+                                                 gDaysInYear,
+                                                 indexToExcelDate,
+                                                 excelDateToIndex,
+                                                 startYear)
+
+        return (accFactors.reshape(shape), nums.reshape(shape),
+                dens.reshape(shape))
+
 ###############################################################################
 
     def __repr__(self):
@@ -292,3 +384,210 @@ class FinDayCount(object):
         return str(self._type)
 
 ###############################################################################
+
+
+def _excelDateArray(dt: (FinDate, FinDateArray)):
+    ''' Return the excel dates of a FinDateArray or the excel date of a
+    FinDate as integers. '''
+
+    if isinstance(dt, FinDateArray):
+        return dt._excelDate
+    elif isinstance(dt, FinDate):
+        return int(dt._excelDate)
+    else:
+        raise FinError("Dates must be FinDates or a FinDateArray")
+
+###############################################################################
+
+
+@njit(cache=True)
+def _yearFracKernel(dccType, excelDates1, excelDates2, excelDates3, freqs,
+                    isTerminationDate, daysInYear, indexToExcelDate,
+                    excelDateToIndex, startYear):
+    ''' Loop over the periods applying the day count convention with the
+    integer value dccType. This follows FinDayCount.yearFrac line by line so
+    that the results are identical. Fastmath is not used for this reason. '''
+
+    n = len(excelDates1)
+    firstExcelDate = indexToExcelDate[excelDateToIndex[0]]
+    lastExcelDate = firstExcelDate + len(excelDateToIndex) - 1
+
+    accFactors = np.empty(n)
+    nums = np.empty(n, dtype=np.int64)
+    dens = np.empty(n)
+
+    for i in range(0, n):
+
+        e1 = excelDates1[i]
+        e2 = excelDates2[i]
+        e3 = excelDates3[i]
+        freq = freqs[i]
+
+        for e in (e1, e2, e3):
+            if e < firstExcelDate or e > lastExcelDate:
+                raise FinError("Excel dates outside supported date range")
+
+        idx1 = excelDateToIndex[e1 - firstExcelDate]
+        y1 = startYear + idx1 // 372
+        m1 = 1 + (idx1 % 372) // 31
+        d1 = 1 + idx1 % 31
+
+        idx2 = excelDateToIndex[e2 - firstExcelDate]
+        y2 = startYear + idx2 // 372
+        m2 = 1 + (idx2 % 372) // 31
+        d2 = 1 + idx2 % 31
+
+        idx3 = excelDateToIndex[e3 - firstExcelDate]
+        y3 = startYear + idx3 // 372
+
+        num = 0
+        den = 0.0
+        accFactor = 0.0
+
+        if dccType == 1:  # THIRTY_360_BOND
+
+            if d1 == 31:
+                d1 = 30
+
+            if d2 == 31 and d1 == 30:
+                d2 = 30
+
+            num = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+            den = 360
+            accFactor = num / den
+
+        elif dccType == 2:  # THIRTY_E_360
+
+            if d1 == 31:
+                d1 = 30
+
+            if d2 == 31:
+                d2 = 30
+
+            num = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+            den = 360
+            accFactor = num / den
+
+        elif dccType == 3:  # THIRTY_E_360_ISDA
+
+            if d1 == 31:
+                d1 = 30
+
+            if m1 == 2 and d1 == _daysInFeb(y1):
+                d1 = 30
+
+            if d2 == 31:
+                d2 = 30
+
+            if m2 == 2 and d2 == _daysInFeb(y2) and not isTerminationDate:
+                d2 = 30
+
+            num = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+            den = 360
+            accFactor = num / den
+
+        elif dccType == 4:  # THIRTY_E_PLUS_360
+
+            if d1 == 31:
+                d1 = 30
+
+            if d2 == 31:
+                m2 = m2 + 1
+                d2 = 1
+
+            num = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+            den = 360
+            accFactor = num / den
+
+        elif dccType == 5:  # ACT_ACT_ISDA
+
+            denom1 = 365
+            if _daysInFeb(y1) == 29:
+                denom1 = 366
+
+            denom2 = 365
+            if _daysInFeb(y2) == 29:
+                denom2 = 366
+
+            if y1 == y2:
+                num = e2 - e1
+                den = denom1
+                accFactor = (e2 - e1) / denom1
+            else:
+                # This is the day after 31 Dec so it is always in range
+                jan1Year1 = indexToExcelDate[(y1 - startYear) * 372 + 371] + 1
+                jan1Year2 = indexToExcelDate[(y2 - startYear) * 372]
+                daysYear1 = jan1Year1 - e1
+                daysYear2 = e2 - jan1Year2
+                accFactor1 = daysYear1 / denom1
+                accFactor2 = daysYear2 / denom2
+                yearDiff = y2 - y1 - 1.0
+                num = daysYear1 + daysYear2
+                den = denom1 + denom2
+                accFactor = accFactor1 + accFactor2 + yearDiff
+
+        elif dccType == 6:  # ACT_ACT_ICMA
+
+            num = e2 - e1
+            den = freq * (e3 - e1)
+            accFactor = num / den
+
+        elif dccType == 7:  # ACT_365F
+
+            num = e2 - e1
+            den = 365
+            accFactor = num / den
+
+        elif dccType == 8:  # ACT_360
+
+            num = e2 - e1
+            den = 360
+            accFactor = num / den
+
+        elif dccType == 9:  # ACT_365L
+
+            num = e2 - e1
+            den = 365
+
+            # 1 Jan 1900 is excel date 1 and is used if there is no 29 Feb
+            if _daysInFeb(y1) == 29:
+                feb29 = indexToExcelDate[(y1 - startYear) * 372 + 59]
+            elif _daysInFeb(y3) == 29:
+                feb29 = indexToExcelDate[(y3 - startYear) * 372 + 59]
+            else:
+                feb29 = 1
+
+            if freq == 1:
+                if feb29 > e1 and feb29 <= e3:
+                    den = 366
+            else:
+                if _daysInFeb(y3) == 29:
+                    den = 366
+
+            accFactor = num / den
+
+        elif dccType == 10:  # SIMPLE
+
+            num = e2 - e1
+            den = daysInYear
+            accFactor = num / den
+
+        accFactors[i] = accFactor
+        nums[i] = num
+        dens[i] = den
+
+    return accFactors, nums, dens
+
+###############################################################################
+
+
+@njit(cache=True)
+def _daysInFeb(y):
+    ''' Number of days in February of year y. '''
+
+    if (y % 4 == 0 and y % 100 != 0) or y % 400 == 0:
+        return 29
+
+    return 28
+
+###############################################################################
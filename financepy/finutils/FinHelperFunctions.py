@@ -2,11 +2,13 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import os
 import sys
 import numpy as np
 from numba import njit, float64
 from typing import Union
 from .FinDate import FinDate
+from .FinDateArray import FinDateArray
 from .FinGlobalVariables import gDaysInYear, gSmall
 from .FinError import FinError
 from .FinDayCount import FinDayCountTypes, FinDayCount
@@ -72,13 +74,14 @@ def pv01Times(t: float,
 ###############################################################################
 
 
-def timesFromDates(dt: FinDate,
+def timesFromDates(dt: (FinDate, list, FinDateArray),
                    valuationDate: FinDate,
                    dayCountType: FinDayCountTypes = None):
     ''' If a single date is passed in then return the year from valuation date
     but if a whole vector of dates is passed in then convert to a vector of
     times from the valuation date. The output is always a numpy vector of times
-    which has only one element if the input is only one date. '''
+    which has only one element if the input is only one date. A FinDateArray
+    is converted in one vectorised step. '''
 
     if isinstance(valuationDate, FinDate) is False:
         raise FinError("Valuation date is not a FinDate")
@@ -98,6 +101,14 @@ def timesFromDates(dt: FinDate,
 
         return times[0]
 
+    elif isinstance(dt, FinDateArray):
+        if dcCounter is None:
+            times = (dt._excelDate - valuationDate._excelDate) / gDaysInYear
+        else:
+            times = dcCounter.yearFrac(valuationDate, dt)[0]
+
+        return times
+
     elif isinstance(dt, list) and isinstance(dt[0], FinDate):
         numDates = len(dt)
         times = []
@@ -452,13 +463,46 @@ def accruedTree(gridTimes: np.ndarray,
 ###############################################################################
 
 
+# Argument type checking can be switched off for speed by setting the
+# environment variable FINANCEPY_FAST_MODE to 1 before importing financepy or
+# by calling setArgumentTypeChecking(False).
+gCheckArgumentTypes = os.environ.get("FINANCEPY_FAST_MODE", "0") != "1"
+
+# The usable types of each function's annotations are resolved once only
+gUsableTypes = {}
+
+
+def setArgumentTypeChecking(flag: bool):
+    ''' Turn the checking of argument types against function annotations on
+    or off. Turning it off removes the checking overhead when objects are
+    created many times but bad inputs will no longer be caught early. '''
+
+    global gCheckArgumentTypes
+    gCheckArgumentTypes = bool(flag)
+
+###############################################################################
+
+
 def checkArgumentTypes(func, values):
     ''' Check that all values passed into a function are of the same type
     as the function annotations. If a value has not been annotated, it
-    will not be checked. '''
-    for valueName, annotationType in func.__annotations__.items():
+    will not be checked. Nothing is checked if type checking is off. '''
+
+    if gCheckArgumentTypes is False:
+        return
+
+    # Bound methods are created on each access so key on the function
+    key = getattr(func, "__func__", func)
+    usableTypes = gUsableTypes.get(key)
+
+    if usableTypes is None:
+        usableTypes = [(valueName, toUsableType(annotationType))
+                       for valueName, annotationType
+                       in func.__annotations__.items()]
+        gUsableTypes[key] = usableTypes
+
+    for valueName, usableType in usableTypes:
         value = values[valueName]
-        usableType = toUsableType(annotationType)
         if(not isinstance(value, usableType)):
 
             print("ERROR with function arguments for", func.__name__)
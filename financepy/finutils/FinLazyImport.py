@@ -0,0 +1,160 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import os
+import re
+import sys
+import importlib
+from types import ModuleType
+
+###############################################################################
+# Each package used to import all of its modules with "from .X import *" so
+# importing one class pulled in every module in the package, and with them
+# any numba kernels that are compiled when they are defined. A lazy package
+# only imports a module when one of its names is first used.
+###############################################################################
+
+
+class FinLazyPackage(ModuleType):
+    ''' A package whose modules are imported on first use. When a module is
+    imported its public names are added to the package exactly as if the
+    package had done "from .module import *" so that the package namespace
+    looks the same as before. '''
+
+    def __getattr__(self, name):
+        ''' This is only called if the name is not yet in the package. The
+        module of the same name is tried first and then the module which
+        defines the name at its top level. Only names found in neither, such
+        as names that a module imports, need the modules to be imported in
+        order until one provides the name. '''
+
+        if name.startswith("__") and name != "__all__":
+            raise AttributeError(name)
+
+        # Subpackages are imported but their names are not added
+        if name in self.__dict__.get("_lazySubpackages", ()):
+            return importlib.import_module("." + name, self.__name__)
+
+        lazyModules = self.__dict__.get("_lazyModules", ())
+
+        if name == "__all__":
+            for moduleName in lazyModules:
+                self._loadModule(moduleName)
+            return [n for n in self.__dict__ if not n.startswith("_")]
+
+        moduleNames = []
+
+        if name in lazyModules:
+            moduleNames.append(name)
+
+        if name in self._nameMap():
+            moduleNames.append(self._nameMap()[name])
+
+        for moduleName in moduleNames + list(lazyModules):
+            self._loadModule(moduleName)
+            if name in self.__dict__:
+                return self.__dict__[name]
+
+        raise AttributeError("module " + self.__name__ +
+                             " has no attribute " + name)
+
+    ###########################################################################
+
+    def __setattr__(self, name, value):
+        ''' The import system binds a module to its package when it has been
+        imported. At this point we add the module's names to the package. '''
+
+        super().__setattr__(name, value)
+
+        if name in self.__dict__.get("_lazyModules", ()) and \
+           isinstance(value, ModuleType) and \
+           value.__name__ == self.__name__ + "." + name:
+            self._publishModule(value)
+
+    ###########################################################################
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(self._lazyModules) |
+                      set(self._lazySubpackages))
+
+    ###########################################################################
+
+    def _nameMap(self):
+        ''' Return a map from the names of the classes, functions and
+        variables defined at the top level of each module to the module. It
+        is found once by reading the module sources and without importing
+        them. A name defined in two modules maps to the first of them. '''
+
+        nameMap = self.__dict__.get("_lazyNameMap")
+
+        if nameMap is not None:
+            return nameMap
+
+        nameMap = {}
+        pattern = re.compile(r"^(?:class|def)\s+(\w+)|^(\w+)\s*=", re.M)
+
+        for moduleName in self._lazyModules:
+            for path in getattr(self, "__path__", []):
+                fileName = os.path.join(path, moduleName + ".py")
+                if not os.path.isfile(fileName):
+                    continue
+                with open(fileName, encoding="utf-8") as f:
+                    source = f.read()
+                for match in pattern.finditer(source):
+                    nameMap.setdefault(match.group(1) or match.group(2),
+                                       moduleName)
+                break
+
+        self._lazyNameMap = nameMap
+        return nameMap
+
+    ###########################################################################
+
+    def _loadModule(self, moduleName):
+        ''' Import a module of the package if it has not yet been loaded and
+        make sure that its names have been added to the package. '''
+
+        if moduleName in self._loadedModules:
+            return
+
+        module = importlib.import_module("." + moduleName, self.__name__)
+
+        # The module may have been imported before the package became lazy
+        if moduleName not in self._loadedModules:
+            self._publishModule(module)
+
+    ###########################################################################
+
+    def _publishModule(self, module):
+        ''' Add the public names of a module to the package namespace. '''
+
+        moduleName = module.__name__.rsplit(".", 1)[-1]
+        self._loadedModules.add(moduleName)
+
+        if hasattr(module, "__all__"):
+            names = module.__all__
+        else:
+            names = [n for n in module.__dict__ if not n.startswith("_")]
+
+        for name in names:
+            self.__dict__[name] = getattr(module, name)
+
+###############################################################################
+
+
+def makeLazyPackage(packageName: str,
+                    moduleNames: list,
+                    subpackageNames: list = []):
+    ''' Turn the package with name packageName into a lazy package which
+    imports the modules in moduleNames on first use. The subpackages in
+    subpackageNames are imported when they are first used as attributes of
+    the package. This is called at the end of the package's __init__. '''
+
+    package = sys.modules[packageName]
+    package._lazyModules = tuple(moduleNames)
+    package._lazySubpackages = tuple(subpackageNames)
+    package._loadedModules = set()
+    package.__class__ = FinLazyPackage
+
+###############################################################################
@@ -3,14 +3,61 @@
 ##############################################################################
 
 
+import numpy as np
+from collections import OrderedDict
+
 from .FinError import FinError
 from .FinDate import FinDate
+from .FinDateArray import FinDateArray
 from .FinCalendar import (FinCalendar, FinCalendarTypes)
 from .FinCalendar import (FinBusDayAdjustTypes, FinDateGenRuleTypes)
 from .FinFrequency import (FinFrequency, FinFrequencyTypes)
 from .FinHelperFunctions import labelToString
 from .FinHelperFunctions import checkArgumentTypes
 
+###############################################################################
+# Generated schedules are cached so that products which share the same dates
+# and conventions do not regenerate them. The cache is a bounded LRU keyed on
+# all of the inputs that determine the schedule.
+###############################################################################
+
+gScheduleCache = OrderedDict()
+gScheduleCacheSize = 10000
+gScheduleCacheHits = 0
+gScheduleCacheMisses = 0
+
+
+def setScheduleCacheSize(cacheSize: int):
+    ''' Set the maximum number of schedules held in the schedule cache. The
+    least recently used schedules are evicted first. A size of zero turns the
+    cache off. '''
+
+    global gScheduleCacheSize
+
+    if cacheSize < 0:
+        raise FinError("Schedule cache size cannot be negative")
+
+    gScheduleCacheSize = cacheSize
+
+    while len(gScheduleCache) > gScheduleCacheSize:
+        gScheduleCache.popitem(last=False)
+
+
+def clearScheduleCache():
+    ''' Empty the schedule cache and reset the hit and miss counters. '''
+
+    global gScheduleCacheHits
+    global gScheduleCacheMisses
+
+    gScheduleCache.clear()
+    gScheduleCacheHits = 0
+    gScheduleCacheMisses = 0
+
+
+def scheduleCacheStats():
+    ''' Returns the number of cache hits, misses and cached schedules. '''
+    return (gScheduleCacheHits, gScheduleCacheMisses, len(gScheduleCache))
+
 ###############################################################################
 # TODO: Start and end date to allow for long stubs
 ###############################################################################
@@ -125,7 +172,54 @@ class FinSchedule(object):
     def _generate(self):
         ''' Generate schedule of dates according to specified date generation
         rules and also adjust these dates for holidays according to the
-        specified business day convention and the specified calendar. '''
+        specified business day convention and the specified calendar. The
+        schedule is taken from the schedule cache if it has been generated
+        before with the same inputs. '''
+
+        global gScheduleCacheHits
+        global gScheduleCacheMisses
+
+        if gScheduleCacheSize == 0:
+            return self._generateDates()
+
+        # A joint calendar may be given as a list which cannot be hashed
+        calendarType = self._calendarType
+        if isinstance(calendarType, list):
+            calendarType = tuple(calendarType)
+
+        key = (int(self._effectiveDate._excelDate),
+               int(self._terminationDate._excelDate),
+               self._freqType,
+               calendarType,
+               self._busDayAdjustType,
+               self._dateGenRuleType,
+               self._adjustTerminationDate,
+               self._endOfMonthFlag)
+
+        if key in gScheduleCache:
+            gScheduleCacheHits += 1
+            gScheduleCache.move_to_end(key)
+            adjustedDates, terminationDate = gScheduleCache[key]
+            # Copy the list as some callers overwrite its elements
+            self._adjustedDates = list(adjustedDates)
+            self._terminationDate = terminationDate
+            return self._adjustedDates
+
+        gScheduleCacheMisses += 1
+        self._generateDates()
+
+        gScheduleCache[key] = (list(self._adjustedDates),
+                               self._terminationDate)
+
+        if len(gScheduleCache) > gScheduleCacheSize:
+            gScheduleCache.popitem(last=False)
+
+        return self._adjustedDates
+
+###############################################################################
+
+    def _generateDates(self):
+        ''' Generate the schedule dates without using the schedule cache. '''
 
         calendar = FinCalendar(self._calendarType)
         frequency = FinFrequency(self._freqType)
@@ -265,3 +359,142 @@ class FinSchedule(object):
         print(self)
 
 ###############################################################################
+
+
+def generateSchedules(effectiveDates: (list, FinDateArray),
+                      terminationDates: (list, FinDateArray),
+                      freqType: FinFrequencyTypes = FinFrequencyTypes.ANNUAL,
+                      calendarType: (FinCalendarTypes, list, tuple) = FinCalendarTypes.WEEKEND,
+                      busDayAdjustType: FinBusDayAdjustTypes = FinBusDayAdjustTypes.FOLLOWING,
+                      dateGenRuleType: FinDateGenRuleTypes = FinDateGenRuleTypes.BACKWARD,
+                      adjustTerminationDate: bool = True,
+                      endOfMonthFlag: bool = False):
+    ''' Generate the schedules for many pairs of effective and termination
+    dates which share the same conventions. The dates follow exactly the same
+    rules as FinSchedule but are all generated and holiday adjusted together
+    using date arrays. This avoids creating FinDate objects for each flow.
+
+    Returns a FinDateArray holding all of the schedule dates one schedule
+    after another and an array of offsets so that schedule i is given by
+    dates[offsets[i]:offsets[i+1]]. '''
+
+    checkArgumentTypes(generateSchedules, locals())
+
+    effectiveDates = FinDateArray(effectiveDates)
+    terminationDates = FinDateArray(terminationDates)
+
+    numSchedules = len(effectiveDates)
+
+    if len(terminationDates) != numSchedules:
+        raise FinError("Effective and termination dates not the same length")
+
+    if np.any(effectiveDates >= terminationDates):
+        raise FinError("Effective date must be before termination date.")
+
+    calendar = FinCalendar(calendarType)
+    frequency = FinFrequency(freqType)
+    numMonths = int(12 / frequency)
+
+    effectiveExcel = effectiveDates._excelDate
+    terminationExcel = terminationDates._excelDate
+
+    # Each step moves all of the schedules which have not yet finished by one
+    # period. Schedules which have finished keep their last date in the grid.
+    # The count includes the termination date which is not on the grid.
+    if dateGenRuleType == FinDateGenRuleTypes.BACKWARD:
+
+        nextDates = terminationDates
+        nextExcel = terminationExcel.copy()
+        numDates = np.ones(numSchedules, dtype=np.int64)
+        active = np.arange(0, numSchedules)
+        steps = []
+
+        while len(active) > 0:
+
+            nextDates = nextDates.addMonths(-numMonths)
+
+            if endOfMonthFlag is True:
+                nextDates = nextDates.EOM()
+
+            nextExcel[active] = nextDates._excelDate
+            steps.append(nextExcel.copy())
+            numDates[active] += 1
+
+            keep = nextDates._excelDate > effectiveExcel[active]
+            nextDates = nextDates[keep]
+            active = active[keep]
+
+        # The unadjusted dates run backwards from the previous coupon date
+        grid = np.stack(steps, axis=1)
+        numSteps = numDates - 1
+
+    elif dateGenRuleType == FinDateGenRuleTypes.FORWARD:
+
+        nextDates = effectiveDates
+        nextExcel = effectiveExcel.copy()
+        numSteps = np.ones(numSchedules, dtype=np.int64)
+        active = np.arange(0, numSchedules)
+        steps = [nextExcel.copy()]
+
+        while len(active) > 0:
+
+            nextDates = nextDates.addMonths(numMonths)
+
+            keep = nextDates._excelDate < terminationExcel[active]
+            nextDates = nextDates[keep]
+            active = active[keep]
+
+            nextExcel[active] = nextDates._excelDate
+            steps.append(nextExcel.copy())
+            numSteps[active] += 1
+
+        grid = np.stack(steps, axis=1)
+        numDates = numSteps + 1
+
+    else:
+        raise FinError("Unknown date generation rule type")
+
+    offsets = np.zeros(numSchedules + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(numDates)
+    firsts = offsets[:-1]
+    lasts = offsets[1:] - 1
+
+    schedules = np.repeat(np.arange(0, numSchedules), numDates)
+    positions = np.arange(0, offsets[-1]) - offsets[schedules]
+
+    # The last column is a placeholder for the termination date
+    if dateGenRuleType == FinDateGenRuleTypes.BACKWARD:
+        columns = np.maximum(numSteps[schedules] - 1 - positions, 0)
+    else:
+        columns = np.minimum(positions, numSteps[schedules] - 1)
+
+    unadjustedDates = FinDateArray(grid[schedules, columns])
+    excelDates = calendar.adjust(unadjustedDates, busDayAdjustType)._excelDate
+
+    # The previous coupon date is not adjusted but is moved to the effective
+    # date. If the adjusted first date is before this it is also moved.
+    if dateGenRuleType == FinDateGenRuleTypes.BACKWARD:
+        excelDates[firsts] = np.maximum(unadjustedDates._excelDate[firsts],
+                                        effectiveExcel)
+    else:
+        excelDates[firsts] = np.maximum(excelDates[firsts], effectiveExcel)
+
+    if adjustTerminationDate is True:
+        terminationDates = calendar.adjust(terminationDates, busDayAdjustType)
+
+    excelDates[lasts] = terminationDates._excelDate
+
+    # Check that no two dates in a schedule are the same and that they are
+    # monotonic in the same way as FinSchedule
+    sameSchedule = schedules[1:] == schedules[:-1]
+    dateSteps = np.diff(excelDates)[sameSchedule]
+
+    if np.any(dateSteps == 0):
+        raise FinError("Two matching dates in schedule")
+
+    if np.any(dateSteps < 0):
+        raise FinError("Dates are not monotonic")
+
+    return FinDateArray(excelDates), offsets
+
+###############################################################################
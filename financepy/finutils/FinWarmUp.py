@@ -0,0 +1,64 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import importlib
+
+from .FinError import FinError
+
+###############################################################################
+# Numba compiles a kernel either when it is defined, if it has an explicit
+# signature, or on its first call. Kernels with cache=True are then written to
+# numba's on-disk cache and later processes load them instead of compiling.
+# Running warmUp once when building a container image, with NUMBA_CACHE_DIR
+# pointing at a directory inside the image, means that pricing processes
+# started from the image do not compile anything.
+###############################################################################
+
+
+def warmUp(kernels: list,
+           workload=None):
+    ''' Compile the chosen numba kernels ahead of their first use so that
+    they are saved in the numba cache. Each entry of kernels is either the
+    name of a module, such as "financepy.models.FinModelRatesHW", whose
+    kernels with explicit signatures are compiled when it is imported, or a
+    tuple of a kernel and a signature string such as
+    (FinDayCount._yearFracKernel, "(int64, int64[:], ...)") which compiles the
+    kernel for that signature. Kernels without a signature are compiled
+    when they are first called so the optional workload function is called
+    at the end to run a representative calculation. Returns a dictionary of
+    the number of compiled signatures of each kernel that was touched. '''
+
+    modules = []
+
+    for kernel in kernels:
+
+        if isinstance(kernel, str):
+            modules.append(importlib.import_module(kernel))
+        elif isinstance(kernel, tuple) and len(kernel) == 2:
+            dispatcher, signature = kernel
+            if hasattr(dispatcher, "compile") is False:
+                raise FinError("Kernel " + str(dispatcher) +
+                               " is not a numba function")
+            dispatcher.compile(signature)
+            modules.append(importlib.import_module(dispatcher.__module__))
+        else:
+            raise FinError("Kernels must be module names or (kernel, " +
+                           "signature) tuples")
+
+    if workload is not None:
+        workload()
+
+    numSignatures = {}
+
+    for module in modules:
+        for name, value in module.__dict__.items():
+            # Only count the kernels defined in this module
+            if hasattr(value, "signatures") and hasattr(value, "py_func") \
+               and value.py_func.__module__ == module.__name__:
+                key = module.__name__ + "." + name
+                numSignatures[key] = len(value.signatures)
+
+    return numSignatures
+
+###############################################################################
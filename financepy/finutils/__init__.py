@@ -1,15 +1,19 @@
-from .FinCalendar import *
-from .FinCurrency import *
-from .FinDate import *
-from .FinDayCount import *
-from .FinFrequency import *
-from .FinGlobalVariables import *
-from .FinGlobalTypes import *
-from .FinHelperFunctions import *
-from .FinMath import *
-from .FinStatistics import *
-from .FinSchedule import *
-from .FinError import *
-from .FinCurrency import *
-from .FinAmount import *
-from .FinDistribution import *
+from .FinLazyImport import makeLazyPackage
+
+# Modules are only imported when one of their names is first used
+makeLazyPackage(__name__, ["FinCalendar",
+                           "FinCurrency",
+                           "FinDate",
+                           "FinDateArray",
+                           "FinDayCount",
+                           "FinFrequency",
+                           "FinGlobalVariables",
+                           "FinGlobalTypes",
+                           "FinHelperFunctions",
+                           "FinMath",
+                           "FinStatistics",
+                           "FinSchedule",
+                           "FinError",
+                           "FinAmount",
+                           "FinDistribution",
+                           "FinWarmUp"])
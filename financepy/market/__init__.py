@@ -1 +1,4 @@
+from ..finutils.FinLazyImport import makeLazyPackage
 
+# Subpackages are only imported when they are first used
+makeLazyPackage(__name__, [], ["curves", "prices", "volatility"])
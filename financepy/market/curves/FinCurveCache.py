@@ -0,0 +1,259 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import time
+import types
+import hashlib
+from enum import Enum
+from collections import OrderedDict
+
+import numpy as np
+
+from ...finutils.FinError import FinError
+from ...finutils.FinDate import FinDate
+
+###############################################################################
+# Bootstrapped curves such as FinIborSingleCurve, FinOISCurve and FinCDSCurve
+# are built in their constructors. When many pricing tasks build the same
+# curve from the same inputs they can share one curve from this cache. The
+# cache is a bounded LRU keyed on a hash of the curve class and the contents
+# of all of the build inputs, so a curve built from the same valuation date,
+# instruments, quotes and interpolation scheme is a hit. A change to any quote
+# changes the key. The cached curves are shared and must not be changed.
+###############################################################################
+
+gCurveCache = OrderedDict()
+gCurveCacheSize = 100
+gCurveCacheHits = 0
+gCurveCacheMisses = 0
+gCurveCacheTimeSaved = 0.0
+
+
+def setCurveCacheSize(cacheSize: int):
+    ''' Set the maximum number of curves held in the curve cache. The least
+    recently used curves are evicted first. A size of zero turns the cache
+    off. '''
+
+    global gCurveCacheSize
+
+    if cacheSize < 0:
+        raise FinError("Curve cache size cannot be negative")
+
+    gCurveCacheSize = cacheSize
+
+    while len(gCurveCache) > gCurveCacheSize:
+        gCurveCache.popitem(last=False)
+
+
+def clearCurveCache():
+    ''' Empty the curve cache and reset the hit and miss counters. '''
+
+    global gCurveCacheHits
+    global gCurveCacheMisses
+    global gCurveCacheTimeSaved
+
+    gCurveCache.clear()
+    gCurveCacheHits = 0
+    gCurveCacheMisses = 0
+    gCurveCacheTimeSaved = 0.0
+
+
+def invalidateCurve(curve):
+    ''' Remove a curve returned by cachedCurve from the curve cache so that
+    the next request with the same inputs builds it again. Returns True if
+    the curve was in the cache. '''
+
+    key = getattr(curve, "_cacheKey", None)
+
+    if key is not None and key in gCurveCache:
+        del gCurveCache[key]
+        return True
+
+    return False
+
+
+def invalidateCurves(curveClass=None):
+    ''' Remove all of the curves of the given class from the curve cache, or
+    all of the curves if no class is given. This can be used when market
+    quotes tick and the old curves will not be requested again. Returns the
+    number of curves removed. '''
+
+    if curveClass is None:
+        numCurves = len(gCurveCache)
+        gCurveCache.clear()
+        return numCurves
+
+    keys = [key for key, entry in gCurveCache.items()
+            if type(entry[0]) is curveClass]
+
+    for key in keys:
+        del gCurveCache[key]
+
+    return len(keys)
+
+
+def curveCacheStats():
+    ''' Returns the number of cache hits, misses and cached curves and the
+    total build time in seconds saved by the hits. '''
+    return (gCurveCacheHits, gCurveCacheMisses, len(gCurveCache),
+            gCurveCacheTimeSaved)
+
+###############################################################################
+
+_numberTypes = (float, int, np.float64, np.int64)
+
+
+def _hashParts(value, parts, seen):
+    ''' Add strings describing the contents of a value to the list parts.
+    Objects are described by their class and attributes except those that
+    their class lists in the tuple _derivedAttributes as these are generated
+    from the other attributes or by valuations. '''
+
+    valueType = type(value)
+
+    # The most common types are tested first as this is called very often
+    if valueType is float or valueType is int or valueType is bool or \
+       value is None:
+        parts.append(repr(value))
+    elif valueType is str:
+        parts.append("S" + value)
+    elif valueType is FinDate:
+        parts.append("D" + repr(value._excelDate))
+    elif isinstance(value, Enum):
+        parts.append("E" + valueType.__name__ + "." + value._name_)
+    elif valueType is list or valueType is tuple:
+        parts.append("L" + str(len(value)))
+        # Swap legs and schedules hold long lists of dates and numbers
+        if len(value) > 0 and type(value[0]) is FinDate:
+            try:
+                parts.append(repr([item._excelDate for item in value]))
+                return
+            except AttributeError:
+                pass
+        elif len(value) > 0 and type(value[0]) in _numberTypes:
+            values = np.array(value)
+            if values.ndim == 1 and values.dtype.kind in "biuf":
+                parts.append(values.dtype.str + values.tobytes().hex())
+                return
+        for item in value:
+            _hashParts(item, parts, seen)
+    elif isinstance(value, (np.integer, np.floating, np.bool_)):
+        parts.append(repr(value.item()))
+    elif isinstance(value, np.ndarray):
+        parts.append("A" + value.dtype.str + str(value.shape))
+        parts.append(np.ascontiguousarray(value).tobytes().hex())
+    elif isinstance(value, dict):
+        parts.append("M" + str(len(value)))
+        for key in sorted(value, key=str):
+            _hashParts(key, parts, seen)
+            _hashParts(value[key], parts, seen)
+    elif isinstance(value, (types.FunctionType, types.BuiltinFunctionType,
+                            type)):
+        parts.append("C" + value.__module__ + "." + value.__qualname__)
+    elif hasattr(value, "__dict__"):
+        attributes = value.__dict__
+        # A curve from the cache is identified by its key
+        if "_cacheKey" in attributes:
+            parts.append("K" + attributes["_cacheKey"])
+            return
+        if id(value) in seen:
+            parts.append("R")
+            return
+        seen.add(id(value))
+        parts.append("O" + valueType.__module__ + "." +
+                     valueType.__qualname__)
+        excluded = getattr(valueType, "_derivedAttributes", ())
+        for name in sorted(attributes):
+            if name not in excluded:
+                parts.append(name)
+                _hashParts(attributes[name], parts, seen)
+    else:
+        raise FinError("Cannot hash curve input of type " +
+                       valueType.__name__)
+
+###############################################################################
+
+
+def curveHash(curveClass, *args, **kwargs):
+    ''' Return a hash of the class of a curve and the contents of the inputs
+    to its constructor. Inputs with the same contents have the same hash in
+    every process so it can also be used as a key in a shared store. '''
+
+    parts = []
+    seen = set()
+    _hashParts(curveClass, parts, seen)
+    _hashParts(args, parts, seen)
+    _hashParts(kwargs, parts, seen)
+    return hashlib.sha1("\x1f".join(parts).encode()).hexdigest()
+
+###############################################################################
+
+
+def _curveChecksum(curve):
+    ''' Return a checksum of the arrays held by a curve. These are not made
+    read only as the numba kernels that use them have explicit signatures for
+    writeable arrays. Instead the cache checks that a shared curve has not
+    been changed before it hands it out again. '''
+
+    h = hashlib.sha1()
+
+    for name in sorted(curve.__dict__):
+        value = curve.__dict__[name]
+        if isinstance(value, np.ndarray):
+            h.update(name.encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+
+    return h.hexdigest()
+
+###############################################################################
+
+
+def cachedCurve(curveClass, *args, **kwargs):
+    ''' Return the curve built by curveClass(*args, **kwargs) from the curve
+    cache or build it and add it to the cache if it is not there. The curve
+    is shared by everyone who requests it and must not be modified. For
+    example
+
+        curve = cachedCurve(FinIborSingleCurve, valuationDate, depos, fras,
+                            swaps, FinInterpTypes.FLAT_FWD_RATES)
+
+    '''
+
+    global gCurveCacheHits
+    global gCurveCacheMisses
+    global gCurveCacheTimeSaved
+
+    if gCurveCacheSize == 0:
+        return curveClass(*args, **kwargs)
+
+    key = curveHash(curveClass, *args, **kwargs)
+
+    entry = gCurveCache.get(key)
+
+    if entry is not None:
+        curve, buildTime, checksum = entry
+        # A curve that has been changed by a user is built again
+        if _curveChecksum(curve) == checksum:
+            gCurveCache.move_to_end(key)
+            gCurveCacheHits += 1
+            gCurveCacheTimeSaved += buildTime
+            return curve
+        del gCurveCache[key]
+
+    gCurveCacheMisses += 1
+
+    start = time.time()
+    curve = curveClass(*args, **kwargs)
+    end = time.time()
+
+    curve._cacheKey = key
+
+    gCurveCache[key] = (curve, end - start, _curveChecksum(curve))
+
+    while len(gCurveCache) > gCurveCacheSize:
+        gCurveCache.popitem(last=False)
+
+    return curve
+
+###############################################################################
@@ -2,12 +2,13 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-
 import numpy as np
 
 from .FinInterpolator import FinInterpolator, FinInterpTypes, interpolate
+from .FinInterpolator import _vinterpolateInto
 
 from ...finutils.FinDate import FinDate
+from ...finutils.FinDateArray import FinDateArray
 from ...finutils.FinError import FinError
 from ...finutils.FinGlobalVariables import gDaysInYear, gSmall
 from ...finutils.FinFrequency import FinFrequency, FinFrequencyTypes
@@ -279,9 +280,10 @@ class FinDiscountCurve():
 ###############################################################################
 
     def df(self,
-           dt: (list, FinDate)):
+           dt: (list, FinDate, FinDateArray)):
         ''' Function to calculate a discount factor from a date or a
-        vector of dates. '''
+        vector of dates. A FinDateArray is handled in a single vectorised
+        call without creating individual FinDates. '''
 
         times = timesFromDates(dt, self._valuationDate, self._dayCountType)
         dfs = self._df(times)
@@ -313,6 +315,83 @@ class FinDiscountCurve():
 
         return df
 
+###############################################################################
+
+    def dfTimes(self,
+                times: np.ndarray,
+                out: np.ndarray = None):
+        ''' Fast calculation of the discount factors at a float64 array of
+        times using one compiled call. The values are the same as those of
+        _df. If a float64 output array is supplied the discount factors are
+        written into it, and it can be the times array itself, so that nothing
+        is allocated. Curves which have their own _df fall back to it. '''
+
+        if isinstance(times, np.ndarray) is False or \
+                times.dtype != np.float64:
+            raise FinError("Times must be a numpy array of float64.")
+
+        if out is None:
+            out = np.empty(len(times))
+        elif isinstance(out, np.ndarray) is False or \
+                out.dtype != np.float64 or out.shape != times.shape:
+            raise FinError("Out must be a float64 array shaped like times.")
+
+        if type(self)._df is not FinDiscountCurve._df:
+            out[:] = self._df(times)
+            return out
+
+        if self._interpType is FinInterpTypes.FLAT_FWD_RATES or\
+            self._interpType is FinInterpTypes.LINEAR_ZERO_RATES or\
+                self._interpType is FinInterpTypes.LINEAR_FWD_RATES:
+
+            _vinterpolateInto(times, self._times, self._dfs,
+                              self._interpType.value, out)
+
+        else:
+
+            self._interpolator.interpolateInto(times, out)
+
+        return out
+
+###############################################################################
+
+    def dfSerials(self,
+                  excelDates: np.ndarray,
+                  out: np.ndarray = None):
+        ''' Fast calculation of the discount factors at a numpy array of integer
+        excel dates such as the _excelDate of a FinDateArray. The values are
+        the same as those of df. The times are calculated in the output array
+        so if one is supplied nothing is allocated unless the curve has a day
+        count convention. Curves which have their own df fall back to it. '''
+
+        if isinstance(excelDates, np.ndarray) is False or \
+                excelDates.dtype.kind not in "iu":
+            raise FinError("Excel dates must be a numpy array of integers.")
+
+        if out is None:
+            out = np.empty(len(excelDates))
+        elif isinstance(out, np.ndarray) is False or \
+                out.dtype != np.float64 or out.shape != excelDates.shape:
+            raise FinError("Out must be a float64 array shaped like dates.")
+
+        # The df of a subclass may only take a single FinDate
+        if type(self).df is not FinDiscountCurve.df:
+            dates = FinDateArray(excelDates).toDates()
+            for i, dt in enumerate(dates):
+                out[i] = self.df(dt)
+            return out
+
+        if self._dayCountType is None:
+            np.subtract(excelDates, self._valuationDate._excelDate, out=out)
+            np.divide(out, gDaysInYear, out=out)
+        else:
+            dayCount = FinDayCount(self._dayCountType)
+            out[:] = dayCount.yearFracSerials(
+                int(self._valuationDate._excelDate),
+                excelDates.astype(np.int64))[0]
+
+        return self.dfTimes(out, out)
+
 ###############################################################################
 
     def survProb(self,
@@ -378,22 +457,17 @@ class FinDiscountCurve():
              bumpSize: float):
         ''' Adjust the continuously compounded forward rates by a perturbation
         upward equal to the bump size and return a curve objet with this bumped
-        curve. This is used for interest rate risk. '''
-
-        times = self._times.copy()
-        values = self._dfs.copy()
+        curve. This is used for interest rate risk. The bumped curve is a
+        plain FinDiscountCurve with new discount factors at the same times. To
+        value under many bumps use a FinDiscountCurveScenarios. '''
 
-        n = len(self._times)
-        for i in range(0, n):
-            t = times[i]
-            values[i] = values[i] * np.exp(-bumpSize*t)
+        if type(self).df is not FinDiscountCurve.df or \
+                type(self)._df is not FinDiscountCurve._df:
+            raise FinError("Curve is not defined by its discount factors.")
 
-        discCurve = FinDiscountCurve(self._valuationDate,
-                                     times,
-                                     values,
-                                     self._interpType)
+        values = self._dfs * np.exp(-bumpSize * self._times)
 
-        return discCurve
+        return _curveFromTimes(self, values)
 
 ###############################################################################
 
@@ -459,3 +533,43 @@ class FinDiscountCurve():
         print(self)
 
 ###############################################################################
+
+
+def _dfSerials(curve, excelDates):
+    ''' Discount factors at a numpy array of integer excel dates on any curve.
+    Curves without a dfSerials method are given one FinDate at a time. '''
+
+    if hasattr(curve, "dfSerials"):
+        return curve.dfSerials(excelDates)
+
+    dates = FinDateArray(excelDates).toDates()
+    return np.array([curve.df(dt) for dt in dates], dtype=np.float64)
+
+###############################################################################
+
+
+def _curveFromTimes(curve, dfs):
+    ''' Return a plain FinDiscountCurve with the valuation date, times, day
+    count and interpolation of a curve and new discount factors at its times.
+    Nothing else is carried over, such as the instruments used to build the
+    curve or its curve cache key. '''
+
+    valuationDate = curve._valuationDate
+
+    discCurve = FinDiscountCurve(valuationDate, [valuationDate],
+                                 np.array([1.0]), curve._interpType)
+
+    times = np.array(curve._times, dtype=np.float64)
+
+    discCurve._times = times
+    discCurve._dfs = np.array(dfs, dtype=np.float64)
+    excelDates = int(valuationDate._excelDate) + \
+        np.round(times * gDaysInYear).astype(np.int64)
+    discCurve._dfDates = FinDateArray(excelDates).toDates()
+    discCurve._dayCountType = curve._dayCountType
+    discCurve._interpolator = FinInterpolator(discCurve._interpType)
+    discCurve._interpolator.fit(discCurve._times, discCurve._dfs)
+
+    return discCurve
+
+###############################################################################
@@ -0,0 +1,270 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+from .FinInterpolator import FinInterpTypes, _minterpolate
+from .FinDiscountCurve import FinDiscountCurve, _curveFromTimes
+
+from ...finutils.FinDate import FinDate
+from ...finutils.FinDateArray import FinDateArray
+from ...finutils.FinError import FinError
+from ...finutils.FinGlobalVariables import gDaysInYear, gSmall
+from ...finutils.FinFrequency import FinFrequency, FinFrequencyTypes
+from ...finutils.FinDayCount import FinDayCount, FinDayCountTypes
+from ...finutils.FinHelperFunctions import timesFromDates
+from ...finutils.FinHelperFunctions import labelToString
+
+###############################################################################
+# Interest rate risk is usually found by valuing a product on a set of moved
+# curves such as parallel shifts, key rate bumps or historical moves. Building
+# a curve object for each one is slow. Here the scenarios share the times of a
+# base curve and hold a matrix of discount factors with one row per scenario.
+# The discount factors of all of the scenarios are interpolated in one call.
+# Scenario i gives the same values as the curve that bump would return.
+###############################################################################
+
+_scenarioInterpTypes = (FinInterpTypes.FLAT_FWD_RATES,
+                        FinInterpTypes.LINEAR_ZERO_RATES,
+                        FinInterpTypes.LINEAR_FWD_RATES)
+
+###############################################################################
+
+
+def keyRateShifts(baseCurve: FinDiscountCurve,
+                  bumpSize: float = 0.0001):
+    ''' Return the matrix of zero rate shifts with one scenario for each point
+    of the base curve after time zero. Scenario i moves the continuously
+    compounded zero rate of point i + 1 by the bump size. '''
+
+    numPoints = len(baseCurve._times)
+    shifts = np.zeros((numPoints - 1, numPoints))
+
+    for i in range(1, numPoints):
+        shifts[i - 1, i] = bumpSize
+
+    return shifts
+
+###############################################################################
+
+
+class FinDiscountCurveScenarios():
+    ''' Class to hold many scenarios of a discount curve which share the times
+    of a base curve and its interpolation scheme. The scenario discount
+    factors are the base discount factors times exp(-shift * t) where the
+    continuously compounded zero rate shifts can be the same at all times, as
+    in a parallel shift, or can be different at each point of the curve. The
+    df, zeroRate, fwd and fwdRate methods return one row for each scenario. '''
+
+    def __init__(self,
+                 baseCurve: FinDiscountCurve,
+                 zeroShifts: (list, np.ndarray)):
+        ''' Create the scenarios from a base curve that is defined by its
+        discount factors, such as a FinDiscountCurve, a FinIborSingleCurve or
+        a FinDiscountCurveZeros with a local interpolation scheme. The zero
+        shifts are a vector with a parallel shift for each scenario or a
+        matrix with a row for each scenario and a column for each point of
+        the base curve. '''
+
+        if type(baseCurve).df is not FinDiscountCurve.df or \
+                type(baseCurve)._df is not FinDiscountCurve._df:
+            raise FinError("Curve is not defined by its discount factors.")
+
+        if baseCurve._interpType not in _scenarioInterpTypes:
+            raise FinError("Interpolation scheme not supported.")
+
+        times = baseCurve._times
+        shifts = np.array(zeroShifts, dtype=np.float64)
+
+        if shifts.ndim == 1:
+            dfs = baseCurve._dfs * np.exp(-np.outer(shifts, times))
+        elif shifts.ndim == 2:
+            if shifts.shape[1] != len(times):
+                raise FinError("Need one shift for each point of the curve.")
+            dfs = baseCurve._dfs * np.exp(-shifts * times)
+        else:
+            raise FinError("Zero shifts must be a vector or a matrix.")
+
+        if len(dfs) == 0:
+            raise FinError("No scenarios.")
+
+        self._baseCurve = baseCurve
+        self._valuationDate = baseCurve._valuationDate
+        self._times = times
+        self._dfs = dfs
+        self._interpType = baseCurve._interpType
+        self._dayCountType = baseCurve._dayCountType
+
+###############################################################################
+
+    def numScenarios(self):
+        ''' The number of scenarios. '''
+        return self._dfs.shape[0]
+
+###############################################################################
+
+    def curve(self,
+              iScenario: int):
+        ''' Return a curve for one of the scenarios. This is a plain
+        FinDiscountCurve with the times of the base curve and the discount
+        factors of the scenario. '''
+
+        return _curveFromTimes(self._baseCurve, self._dfs[iScenario])
+
+###############################################################################
+
+    def df(self,
+           dt: (list, FinDate, FinDateArray)):
+        ''' Return the discount factors of all of the scenarios at a date or
+        at a list of dates. A single date gives a vector with one value for
+        each scenario and a list of dates gives a matrix with a row for each
+        scenario and a column for each date. '''
+
+        times = timesFromDates(dt, self._valuationDate, self._dayCountType)
+        return self._df(times)
+
+###############################################################################
+
+    def _df(self,
+            t: (float, np.ndarray)):
+        ''' Hidden function to calculate the scenario discount factors at a
+        time or a vector of times. '''
+
+        if isinstance(t, np.ndarray):
+            times = np.array(t, dtype=np.float64)
+            return _minterpolate(times, self._times, self._dfs,
+                                 self._interpType.value)
+
+        times = np.array([t], dtype=np.float64)
+        return _minterpolate(times, self._times, self._dfs,
+                             self._interpType.value)[:, 0]
+
+###############################################################################
+
+    def dfSerials(self,
+                  excelDates: np.ndarray):
+        ''' Return the matrix of the scenario discount factors at a numpy
+        array of integer excel dates such as the _excelDate of a
+        FinDateArray. '''
+
+        if isinstance(excelDates, np.ndarray) is False or \
+                excelDates.dtype.kind not in "iu":
+            raise FinError("Excel dates must be a numpy array of integers.")
+
+        valueSerial = self._valuationDate._excelDate
+
+        if self._dayCountType is None:
+            times = (excelDates - valueSerial) / gDaysInYear
+        else:
+            dayCount = FinDayCount(self._dayCountType)
+            times = dayCount.yearFracSerials(int(valueSerial),
+                                             excelDates.astype(np.int64))[0]
+
+        return self._df(np.array(times, dtype=np.float64))
+
+###############################################################################
+
+    def zeroRate(self,
+                 dts: (list, FinDate),
+                 freqType: FinFrequencyTypes = FinFrequencyTypes.CONTINUOUS,
+                 dayCountType: FinDayCountTypes = FinDayCountTypes.ACT_360):
+        ''' Calculation of the scenario zero rates with a specified frequency
+        and day count. The shape of the result is the same as that of df. '''
+
+        if isinstance(freqType, FinFrequencyTypes) is False:
+            raise FinError("Invalid Frequency type.")
+
+        if isinstance(dayCountType, FinDayCountTypes) is False:
+            raise FinError("Invalid Day Count type.")
+
+        dfs = self.df(dts)
+        times = timesFromDates(dts, self._valuationDate, dayCountType)
+        t = np.maximum(times, gSmall)
+
+        if freqType == FinFrequencyTypes.CONTINUOUS:
+            zeroRates = -np.log(dfs) / t
+        elif freqType == FinFrequencyTypes.SIMPLE:
+            zeroRates = (1.0 / dfs - 1.0) / t
+        else:
+            f = FinFrequency(freqType)
+            zeroRates = (np.power(dfs, -1.0 / (t * f)) - 1.0) * f
+
+        return zeroRates
+
+###############################################################################
+
+    def fwd(self,
+            dts: (list, FinDate)):
+        ''' Calculate the scenario continuously compounded forward rates over
+        one day from each date. The shape of the result is the same as that
+        of df. '''
+
+        if isinstance(dts, FinDate):
+            dtsPlusOneDay = dts.addDays(1)
+        else:
+            dtsPlusOneDay = [dt.addDays(1) for dt in dts]
+
+        df1 = self.df(dts)
+        df2 = self.df(dtsPlusOneDay)
+        dt = 1.0 / gDaysInYear
+        fwd = np.log(df1 / df2) / (1.0 * dt)
+        return fwd
+
+###############################################################################
+
+    def fwdRate(self,
+                startDate: (list, FinDate),
+                dateOrTenor: (FinDate, str),
+                dayCountType: FinDayCountTypes = FinDayCountTypes.ACT_360):
+        ''' Calculate the scenario forward rates between two dates according
+        to the day count convention. The first date is specified and the
+        second is given as a date or as a tenor which is added to the first
+        date. The shape of the result is the same as that of df. '''
+
+        if isinstance(startDate, FinDate):
+            startDates = [startDate]
+        elif isinstance(startDate, list):
+            startDates = startDate
+        else:
+            raise FinError("Start date and end date must be same types.")
+
+        if isinstance(dateOrTenor, str):
+            endDates = [dt.addTenor(dateOrTenor) for dt in startDates]
+        elif isinstance(dateOrTenor, FinDate):
+            endDates = [dateOrTenor] * len(startDates)
+        elif isinstance(dateOrTenor, list):
+            endDates = dateOrTenor
+        else:
+            raise FinError("Second date must be a date, tenor or list.")
+
+        dayCount = FinDayCount(dayCountType)
+        yearFracs = np.array([dayCount.yearFrac(dt1, dt2)[0]
+                              for dt1, dt2 in zip(startDates, endDates)])
+
+        df1 = self.df(startDates)
+        df2 = self.df(endDates)
+        fwdRates = (df1 / df2 - 1.0) / yearFracs
+
+        if isinstance(startDate, FinDate):
+            return fwdRates[:, 0]
+
+        return fwdRates
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("VALUATION DATE", self._valuationDate)
+        s += labelToString("NUM SCENARIOS", self._dfs.shape[0])
+        s += labelToString("NUM POINTS", len(self._times))
+        s += labelToString("INTERP TYPE", self._interpType)
+        return s
+
+###############################################################################
+
+    def _print(self):
+        ''' Simple print function for backward compatibility. '''
+        print(self)
+
+###############################################################################
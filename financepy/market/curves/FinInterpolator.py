@@ -2,7 +2,7 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from numba import njit, float64, int64
+from numba import njit, float64, int64, boolean
 import numpy as np
 from ...finutils.FinError import FinError
 from ...finutils.FinGlobalVariables import gSmall
@@ -189,6 +189,197 @@ def _vinterpolate(xValues,
 ###############################################################################
 
 
+@njit(float64[:](float64[:], float64[:], float64[:], int64, float64[:]),
+      fastmath=True, cache=True, nogil=True)
+def _vinterpolateInto(xValues,
+                      xvector,
+                      dfs,
+                      method,
+                      out):
+    ''' Same as _vinterpolate but the interpolated values are written into
+    the array out, which may be xValues itself, so nothing is allocated. '''
+
+    n = xValues.size
+    for i in range(0, n):
+        if xValues[i] < 0.0:
+            raise FinError("Interpolate times must all be >= 0")
+        out[i] = _uinterpolate(xValues[i], xvector, dfs, method)
+
+    return out
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:], float64[:], float64[:, :], int64),
+      fastmath=True, cache=True, nogil=True)
+def _minterpolate(xValues,
+                  xvector,
+                  dfs,
+                  method):
+    ''' Return the interpolated values of y given x and a matrix of y values
+    with one row for each scenario on the same vector of x. The result has a
+    row for each scenario and a column for each x. For flat forwards and
+    linear zero rates the log of the discount factor is a weighted sum of the
+    values at the two grid points either side of x. The grid points and the
+    weights are found once for each x and the logs once for each scenario so
+    each value needs one exponential. The values agree with _uinterpolate to
+    rounding. '''
+
+    n = xValues.size
+    numPoints = xvector.size
+    numScenarios = dfs.shape[0]
+    yvalues = np.empty((numScenarios, n))
+
+    for k in range(0, n):
+        if xValues[k] < 0.0:
+            raise FinError("Interpolate times must all be >= 0")
+
+    if method != FinInterpTypes.FLAT_FWD_RATES.value and \
+            method != FinInterpTypes.LINEAR_ZERO_RATES.value:
+
+        for s in range(0, numScenarios):
+            scenarioDfs = dfs[s]
+            for k in range(0, n):
+                yvalues[s, k] = _uinterpolate(xValues[k], xvector,
+                                              scenarioDfs, method)
+
+        return yvalues
+
+    isZero = method == FinInterpTypes.LINEAR_ZERO_RATES.value
+
+    ###########################################################################
+    # The grid points and weights of each x in the same cases as _uinterpolate
+    ###########################################################################
+
+    j1 = np.zeros(n, dtype=np.int64)
+    j2 = np.zeros(n, dtype=np.int64)
+    w1 = np.zeros(n)
+    w2 = np.zeros(n)
+    scale = np.ones(n)
+
+    for k in range(0, n):
+
+        t = xValues[k]
+
+        # The first discount factor is returned as it is
+        if t == xvector[0]:
+            j1[k] = -1
+            continue
+
+        i = 0
+        while xvector[i] < t and i < numPoints - 1:
+            i = i + 1
+
+        if t > xvector[i]:
+            i = numPoints
+
+        if i < numPoints:
+            a = i - 1
+            b = i
+        else:
+            a = i - 2
+            b = i - 1
+
+        dt = xvector[b] - xvector[a]
+
+        if isZero:
+            scale[k] = t
+            if i == 1:
+                j1[k] = i
+                j2[k] = i
+                w1[k] = 1.0
+            elif i < numPoints:
+                j1[k] = a
+                j2[k] = b
+                w1[k] = (xvector[b] - t) / dt
+                w2[k] = (t - xvector[a]) / dt
+            else:
+                j1[k] = i - 1
+                j2[k] = i - 1
+                w1[k] = 1.0
+        else:
+            j1[k] = a
+            j2[k] = b
+            w1[k] = (xvector[b] - t) / dt
+            w2[k] = (t - xvector[a]) / dt
+
+    ###########################################################################
+    # The minus log discount factors or the zero rates at the grid points
+    ###########################################################################
+
+    logDfs = -np.log(dfs)
+
+    if isZero:
+        values = np.zeros((numScenarios, numPoints))
+        for s in range(0, numScenarios):
+            for p in range(1, numPoints):
+                values[s, p] = logDfs[s, p] / xvector[p]
+    else:
+        values = logDfs
+
+    for s in range(0, numScenarios):
+        for k in range(0, n):
+            if j1[k] < 0:
+                yvalues[s, k] = dfs[s, 0]
+            else:
+                y = w1[k] * values[s, j1[k]] + w2[k] * values[s, j2[k]]
+                yvalues[s, k] = np.exp(-y * scale[k])
+
+    return yvalues
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:], float64[:, :], boolean, float64[:]),
+      fastmath=True, cache=True, nogil=True)
+def _ppolyDfsInto(xValues,
+                  breaks,
+                  coeffs,
+                  isLogDiscount,
+                  out):
+    ''' Evaluate the piecewise polynomial with break points breaks and the
+    coefficients coeffs that are held by a scipy CubicSpline or Pchip
+    interpolator and convert the values to discount factors which are written
+    into the array out. The polynomial is either the log of the discount
+    factor or the zero rate. Times outside the break points are extrapolated
+    using the end polynomials in the same way as scipy. '''
+
+    n = xValues.size
+    numIntervals = breaks.size - 1
+    order = coeffs.shape[0]
+
+    for i in range(0, n):
+
+        x = xValues[i]
+
+        if x < 0.0:
+            raise FinError("Interpolate times must all be >= 0")
+
+        # Find the last break point which is less than or equal to x
+        lo = 0
+        hi = numIntervals
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if breaks[mid] <= x:
+                lo = mid
+            else:
+                hi = mid
+
+        dx = x - breaks[lo]
+        y = coeffs[0, lo]
+        for k in range(1, order):
+            y = y * dx + coeffs[k, lo]
+
+        if isLogDiscount is True:
+            out[i] = np.exp(y)
+        else:
+            out[i] = np.exp(-x * y)
+
+    return out
+
+###############################################################################
+
+
 class FinInterpolator():
 
     def __init__(self,
@@ -345,4 +536,38 @@ class FinInterpolator():
         else:
             return out
 
+    ###########################################################################
+
+    def interpolateInto(self,
+                        t: np.ndarray,
+                        out: np.ndarray):
+        ''' Vectorised interpolation of discount factors at a float64 array of
+        times t which are written into the float64 array out. This can be the
+        array t itself. It makes one compiled call and allocates nothing. The
+        values agree with those returned by interpolate. '''
+
+        if self._dfs is None:
+            raise FinError("Dfs have not been set.")
+
+        if self._interpType == FinInterpTypes.FLAT_FWD_RATES or \
+            self._interpType == FinInterpTypes.LINEAR_ZERO_RATES or \
+                self._interpType == FinInterpTypes.LINEAR_FWD_RATES:
+
+            _vinterpolateInto(t, self._times, self._dfs,
+                              self._interpType.value, out)
+
+        else:
+
+            if self._interpFn is None:
+                raise FinError("Interpolator needs at least two points.")
+
+            isLogDiscount = \
+                self._interpType == FinInterpTypes.PCHIP_LOG_DISCOUNT or \
+                self._interpType == FinInterpTypes.NATCUBIC_LOG_DISCOUNT
+
+            _ppolyDfsInto(t, self._interpFn.x, self._interpFn.c,
+                          isLogDiscount, out)
+
+        return out
+
 ###############################################################################
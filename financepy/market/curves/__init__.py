@@ -1,8 +1,13 @@
-from .FinInterpolator import *
-from .FinDiscountCurve import *
-from .FinDiscountCurveFlat import *
-from .FinDiscountCurveNS import *
-from .FinDiscountCurvePWF import *
-from .FinDiscountCurvePWL import *
-from .FinDiscountCurvePoly import *
-from .FinDiscountCurveZeros import *
\ No newline at end of file
+from ...finutils.FinLazyImport import makeLazyPackage
+
+# Modules are only imported when one of their names is first used
+makeLazyPackage(__name__, ["FinInterpolator",
+                           "FinDiscountCurve",
+                           "FinDiscountCurveFlat",
+                           "FinDiscountCurveNS",
+                           "FinDiscountCurvePWF",
+                           "FinDiscountCurvePWL",
+                           "FinDiscountCurvePoly",
+                           "FinDiscountCurveZeros",
+                           "FinDiscountCurveScenarios",
+                           "FinCurveCache"])
@@ -1,7 +1,8 @@
-from .FinEquityVolCurve import *
-from .FinEquityVolSurface import *
-from .FinFXVolSurface import *
-from .FinFXVolSurfacePlus import *
-from .FinIborCapVolCurve import *
-
+from ...finutils.FinLazyImport import makeLazyPackage
 
+# Modules are only imported when one of their names is first used
+makeLazyPackage(__name__, ["FinEquityVolCurve",
+                           "FinEquityVolSurface",
+                           "FinFXVolSurface",
+                           "FinFXVolSurfacePlus",
+                           "FinIborCapVolCurve"])
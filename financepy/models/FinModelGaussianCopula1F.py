@@ -130,7 +130,7 @@ def homogeneousBasketLossDbn(survivalProbabilities,
 
 
 @njit(float64(float64, float64, int64, float64[:], float64[:], float64[:],
-              int64), fastmath=True)
+              int64), fastmath=True, cache=True)
 def trSurvProbRecursion(k1,
                         k2,
                         numCredits,
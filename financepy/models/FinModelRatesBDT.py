@@ -11,6 +11,12 @@ from ..market.curves.FinInterpolator import FinInterpTypes, _uinterpolate
 from ..finutils.FinHelperFunctions import labelToString
 from ..finutils.FinGlobalTypes import FinExerciseTypes
 from ..finutils.FinGlobalVariables import gSmall
+from .FinModelRatesTreeCache import cachedTree, numTreeRows
+from .FinModelRatesTreeGrid import FinTreeGridTypes, eventTreeTimes
+from .FinModelRatesTreeGrid import treeDiscountFactors
+from .FinModelRatesTreeGrid import binomialGrid_Fast, fitLognormalGrid_Fast
+from .FinModelRatesTreeGrid import bermudanSwaption_Grid_Fast
+from .FinModelRatesTreeGrid import callablePuttableBond_Grid_Fast
 
 interp = FinInterpTypes.FLAT_FWD_RATES.value
 
@@ -95,25 +101,16 @@ def searchRoot(x0, m, Q, rt, dfEnd, dt, sigma):
 
 
 @njit(fastmath=True, cache=True)
-def bermudanSwaption_Tree_Fast(texp, tmat,
-                               strikePrice, faceAmount,
-                               couponTimes, couponFlows,
-                               exerciseTypeInt,
-                               _dfTimes, _dfValues,
-                               _treeTimes,
-                               _Q, _rt, _dt):
-    ''' Option to enter into a swap that can be exercised on coupon payment
-    dates after the start of the exercise period. Due to non-analytical bond
-    price we need to extend tree out to bond maturity and take into account
-    cash flows through time. '''
-
-    pu = 0.50
-    pd = 0.50
-
-    ###########################################################################
-
-    numTimeSteps, numNodes = _Q.shape
-    expiryStep = int(texp/_dt + 0.50)
+def bermudanSwaptionFlows_Tree_Fast(texp, tmat,
+                                    strikePrice, faceAmount,
+                                    couponTimes, couponFlows,
+                                    _dfTimes, _dfValues,
+                                    _treeTimes, _dt):
+    ''' Map the fixed leg coupons of the swap underlying a Bermudan swaption
+    onto the tree. Returns the fixed leg flows, the floating leg values and
+    the fixed leg accrued at each tree time step. '''
+
+    numTimeSteps = len(_treeTimes)
     maturityStep = int(tmat/_dt + 0.50)
 
     ###########################################################################
@@ -164,6 +161,42 @@ def bermudanSwaption_Tree_Fast(texp, tmat,
         if fixedLegFlows[m] > gSmall:
             accrued[m] = fixedLegFlows[m] * faceAmount
 
+    return fixedLegFlows, floatLegValues, accrued
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudanSwaption_Tree_Fast(texp, tmat,
+                               strikePrice, faceAmount,
+                               couponTimes, couponFlows,
+                               exerciseTypeInt,
+                               _dfTimes, _dfValues,
+                               _treeTimes,
+                               _Q, _rt, _dt):
+    ''' Option to enter into a swap that can be exercised on coupon payment
+    dates after the start of the exercise period. Due to non-analytical bond
+    price we need to extend tree out to bond maturity and take into account
+    cash flows through time. '''
+
+    pu = 0.50
+    pd = 0.50
+
+    ###########################################################################
+
+    numTimeSteps, numNodes = _Q.shape
+    expiryStep = int(texp/_dt + 0.50)
+    maturityStep = int(tmat/_dt + 0.50)
+
+    ###########################################################################
+
+    fixedLegFlows, floatLegValues, accrued \
+        = bermudanSwaptionFlows_Tree_Fast(texp, tmat,
+                                          strikePrice, faceAmount,
+                                          couponTimes, couponFlows,
+                                          _dfTimes, _dfValues,
+                                          _treeTimes, _dt)
+
     #######################################################################
 
     # The value of the swap at each time and node. Principal is exchanged.
@@ -241,6 +274,99 @@ def bermudanSwaption_Tree_Fast(texp, tmat,
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def bermudanSwaptionMany_Tree_Fast(expirySteps, maturitySteps,
+                                   exerciseTypeInts, faceAmount,
+                                   fixedLegFlows, floatLegValues, accrued,
+                                   _Q, _rt, _dt):
+    ''' Value many Bermudan swaptions in one backward sweep of the tree. The
+    fixed leg flows, floating leg values and accrued of each trade are in the
+    columns of arrays with one row per tree time step. The values at each
+    node are held for all of the trades together so each step of the sweep
+    is one pass over contiguous memory. Each trade joins the sweep at its
+    maturity step. Returns the payer and receiver values of each trade. '''
+
+    pu = 0.50
+    pd = 0.50
+
+    numTimeSteps, numNodes = _Q.shape
+    numTrades = len(expirySteps)
+
+    # Only the values at the next time step are needed to step back
+    fixedLegValues = np.zeros(shape=(numNodes, numTrades))
+    payValues = np.zeros(shape=(numNodes, numTrades))
+    recValues = np.zeros(shape=(numNodes, numTrades))
+
+    nextFixedLegValues = np.zeros(shape=(numNodes, numTrades))
+    nextPayValues = np.zeros(shape=(numNodes, numTrades))
+    nextRecValues = np.zeros(shape=(numNodes, numTrades))
+
+    lastStep = 0
+    for j in range(0, numTrades):
+        lastStep = max(lastStep, maturitySteps[j])
+
+    for m in range(lastStep, -1, -1):
+
+        for k in range(0, m+1):
+            rt = _rt[m, k]
+            df = np.exp(- rt * _dt)
+
+            for j in range(0, numTrades):
+
+                maturityStep = maturitySteps[j]
+
+                if m > maturityStep:
+                    continue
+
+                flow = fixedLegFlows[m, j] * faceAmount
+
+                # Start with the value of the fixed leg at maturity
+                if m == maturityStep:
+                    fixedLegValues[k, j] = faceAmount + flow
+                    payValues[k, j] = 0.0
+                    recValues[k, j] = 0.0
+                    continue
+
+                vu = nextFixedLegValues[k+1, j]
+                vd = nextFixedLegValues[k, j]
+                fixedLegValue = (pu*vu + pd*vd) * df + flow
+
+                vu = nextPayValues[k+1, j]
+                vd = nextPayValues[k, j]
+                holdPay = (pu*vu + pd*vd) * df
+
+                vu = nextRecValues[k+1, j]
+                vd = nextRecValues[k, j]
+                holdRec = (pu*vu + pd*vd) * df
+
+                fixedLegValues[k, j] = fixedLegValue
+                payValues[k, j] = holdPay
+                recValues[k, j] = holdRec
+
+                expiryStep = expirySteps[j]
+
+                if m == expiryStep or (exerciseTypeInts[j] == 2 and
+                                       flow > gSmall and m > expiryStep):
+
+                    # The floating value is clean and so must be the fixed
+                    cleanValue = fixedLegValue - accrued[m, j]
+                    floatLegValue = floatLegValues[m, j]
+
+                    payExercise = max(floatLegValue - cleanValue, 0.0)
+                    recExercise = max(cleanValue - floatLegValue, 0.0)
+
+                    payValues[k, j] = max(payExercise, holdPay)
+                    recValues[k, j] = max(recExercise, holdRec)
+
+        fixedLegValues, nextFixedLegValues = nextFixedLegValues, fixedLegValues
+        payValues, nextPayValues = nextPayValues, payValues
+        recValues, nextRecValues = nextRecValues, recValues
+
+    return nextPayValues[0, :].copy(), nextRecValues[0, :].copy()
+
+###############################################################################
+
+
 @njit(fastmath=True, cache=True)
 def americanBondOption_Tree_Fast(texp, tmat,
                                  strikePrice, faceAmount,
@@ -574,27 +700,20 @@ def callablePuttableBond_Tree_Fast(couponTimes, couponFlows,
 
 
 @njit(cache=True, fastmath=True)
-def buildTreeFast(sigma, treeTimes, numTimeSteps, discountFactors):
-    # Unlike the BK and HW Trinomial trees, this Tree is packed into the lower
-    # diagonal of a square matrix because of its binomial nature. This means
-    # that the indexing of the arrays is different.
-
-    treeMaturity = treeTimes[-1]
-    dt = treeMaturity / (numTimeSteps+1)
-
-    # The short rate goes out one step extra to have the final short rate
-    # as it follows HW code but I am not sure this is needed. EXAMINE
-    # NOTE HW code uses this to have short rate at expiry so it can use
-    # analytical solutions for the zero coupon bond price
-    # This is the BDT model so x = log(r)
+def fitTreeDrift_Fast(Q, rt, sigma, dt, numTimeSteps, discountFactors,
+                      warmStart):
+    ''' Fit the drift of the binomial tree to the discount factors at the
+    tree times. The Arrow-Debreu prices and the short rates are written into
+    the arrays Q and rt which are overwritten so that a tree can be fitted
+    again to a new curve without allocating memory. If warmStart is True the
+    search for the middle short rate at each time step starts at the value
+    already in rt rather than at the first short rate. Each row of the tree is
+    written in full so the arrays do not need to be cleared. '''
 
     # Some implementations use continuous compounding. Does not affect results.
     # Useful if you want to make direct comparisons of the tree.
     CONT_COMPOUNDED = True
 
-    Q = np.zeros(shape=(numTimeSteps+2, numTimeSteps+2))
-    rt = np.zeros(shape=(numTimeSteps+2, numTimeSteps+2))
-
     if CONT_COMPOUNDED:
         r0 = -np.log(discountFactors[1])/dt
     else:
@@ -615,7 +734,12 @@ def buildTreeFast(sigma, treeTimes, numTimeSteps, discountFactors):
     for m in range(1, numTimeSteps+1):
 
         dfEnd = discountFactors[m+1]
-        searchRoot(r0, m, Q, rt, dfEnd, dt, sigma)
+
+        x0 = r0
+        if warmStart:
+            x0 = rt[m, int(m/2)]
+
+        searchRoot(x0, m, Q, rt, dfEnd, dt, sigma)
 
         if CONT_COMPOUNDED:
             Q[m+1, 0] = 0.50 * Q[m, 0] * np.exp(-rt[m, 0] * dt)
@@ -636,6 +760,31 @@ def buildTreeFast(sigma, treeTimes, numTimeSteps, discountFactors):
         else:
             Q[m+1, m+1] = 0.50 * Q[m, m] / ((1.0 + rt[m, m])**dt)
 
+    return
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def buildTreeFast(sigma, treeTimes, numTimeSteps, discountFactors):
+    # Unlike the BK and HW Trinomial trees, this Tree is packed into the lower
+    # diagonal of a square matrix because of its binomial nature. This means
+    # that the indexing of the arrays is different.
+
+    treeMaturity = treeTimes[-1]
+    dt = treeMaturity / (numTimeSteps+1)
+
+    # The short rate goes out one step extra to have the final short rate
+    # as it follows HW code but I am not sure this is needed. EXAMINE
+    # NOTE HW code uses this to have short rate at expiry so it can use
+    # analytical solutions for the zero coupon bond price
+    # This is the BDT model so x = log(r)
+
+    Q = np.zeros(shape=(numTimeSteps+2, numTimeSteps+2))
+    rt = np.zeros(shape=(numTimeSteps+2, numTimeSteps+2))
+
+    fitTreeDrift_Fast(Q, rt, sigma, dt, numTimeSteps, discountFactors, False)
+
     return (Q, rt, dt)
 
 ###############################################################################
@@ -645,20 +794,35 @@ class FinModelRatesBDT():
 
     def __init__(self, 
                  sigma: float, 
-                 numTimeSteps:int=100):
+                 numTimeSteps:int=100,
+                 treeHorizon:float=None,
+                 treeGridType=FinTreeGridTypes.UNIFORM):
         ''' Constructs the Black-Derman-Toy rate model in the case when the
         volatility is assumed to be constant. The short rate process simplifies
-        and is given by d(log(r)) = theta(t) * dt + sigma * dW. Althopugh '''
+        and is given by d(log(r)) = theta(t) * dt + sigma * dW. Althopugh. If
+        a tree horizon in years is given then the tree out to this horizon is
+        shared by all trades that mature before it using the tree cache. If
+        the tree grid type is EVENT_ALIGNED then the tree has a time on each
+        coupon and exercise date of the trade. '''
 
         if sigma < 0.0:
             raise FinError("Negative volatility not allowed.")
 
+        if treeHorizon is not None and treeHorizon <= 0.0:
+            raise FinError("Tree horizon must be positive.")
+
+        if treeHorizon is not None \
+           and treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Event aligned trees cannot be shared.")
+
         self._sigma = sigma
 
         if numTimeSteps < 3:
             raise FinError("Drift fitting requires at least 3 time steps.")
 
         self._numTimeSteps = numTimeSteps
+        self._treeHorizon = treeHorizon
+        self._treeGridType = treeGridType
 
         self._Q = None
         self._rt = None
@@ -667,9 +831,20 @@ class FinModelRatesBDT():
         self._pd = 0.50
         self._discountCurve = None
 
+        # The arrays of the last tree built by the model and not the cache
+        self._workKey = None
+        self._work = None
+
 ###############################################################################
 
-    def buildTree(self, treeMat, dfTimes, dfValues):
+    def buildTree(self, treeMat, dfTimes, dfValues, eventTimes=None):
+        ''' Build the binomial tree. If the model has a tree horizon after
+        treeMat then the tree out to the horizon is taken from the tree cache
+        and only its steps out to treeMat are used. If the model has an event
+        aligned tree grid then the tree has a time on each of the eventTimes
+        which are the coupon and exercise times of the trade. Otherwise the
+        model keeps the arrays of its tree and, if the next tree has the same
+        maturity, only fits its drift again into these arrays. '''
 
         if isinstance(dfTimes, np.ndarray) is False:
             raise FinError("DF TIMES must be a numpy vector")
@@ -677,11 +852,127 @@ class FinModelRatesBDT():
         if isinstance(dfValues, np.ndarray) is False:
             raise FinError("DF VALUES must be a numpy vector")
 
-        interp = FinInterpTypes.FLAT_FWD_RATES.value
+        self._dfTimes = dfTimes
+        self._dfs = dfValues
+
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+
+            if eventTimes is None:
+                eventTimes = []
+
+            treeTimes = eventTreeTimes(treeMat, eventTimes, self._numTimeSteps)
+            dfTree = treeDiscountFactors(treeTimes, dfTimes, dfValues)
+
+            x, self._lo, self._hi, self._child, \
+                self._pu, self._pm, self._pd \
+                = binomialGrid_Fast(self._sigma, treeTimes)
+
+            self._Q, self._rt = fitLognormalGrid_Fast(x, self._lo, self._hi,
+                                                      self._child, self._pu,
+                                                      self._pm, self._pd,
+                                                      treeTimes, dfTree)
+            self._treeTimes = treeTimes
+            self._dt = None
+
+        elif self._treeHorizon is None or treeMat > self._treeHorizon:
+
+            if self._workKey != self._treeWorkKey(treeMat):
+                self._allocateTree(treeMat)
+
+            self._fitTree(dfTimes, dfValues, False)
+
+        else:
+
+            treeTimes, Q, rt, self._dt = cachedTree(self, dfTimes, dfValues)
+
+            # The tree is packed into a square matrix whose size sets the
+            # number of nodes used by the valuation kernels
+            numRows = numTreeRows(treeTimes, self._dt, treeMat)
+            self._treeTimes = treeTimes[0:numRows]
+            self._Q = np.ascontiguousarray(Q[0:numRows, 0:numRows])
+            self._rt = np.ascontiguousarray(rt[0:numRows, 0:numRows])
+
+        return
+
+###############################################################################
+
+    def refitTree(self, dfTimes, dfValues):
+        ''' Fit the drift of the last tree built by the model to a new discount
+        curve. As sigma is fixed the tree times do not change and the arrays
+        of the tree are reused. The search for the short rates at each time
+        starts at the short rates of the last fit which are close to the
+        solution when the curve has changed a little. Trees built on an event
+        aligned grid or taken from the tree cache cannot be refitted. '''
+
+        if isinstance(dfTimes, np.ndarray) is False:
+            raise FinError("DF TIMES must be a numpy vector")
+
+        if isinstance(dfValues, np.ndarray) is False:
+            raise FinError("DF VALUES must be a numpy vector")
+
+        if self._work is None or self._Q is not self._work[1]:
+            raise FinError("No tree built by the model to refit.")
+
+        self._dfTimes = dfTimes
+        self._dfs = dfValues
+        self._fitTree(dfTimes, dfValues, True)
+
+###############################################################################
+
+    def _allocateTree(self, treeMat):
+        ''' Set up the times and the arrays of a binomial tree out to treeMat
+        which are kept by the model. '''
+
+        treeTimes = self._uniformTreeTimes(treeMat)
+
+        treeMaturity = treeTimes[-1]
+        dt = treeMaturity / (self._numTimeSteps+1)
+
+        Q = np.zeros(shape=(self._numTimeSteps+2, self._numTimeSteps+2))
+        rt = np.zeros(shape=(self._numTimeSteps+2, self._numTimeSteps+2))
+
+        self._work = (treeTimes, Q, rt, dt)
+        self._workKey = self._treeWorkKey(treeMat)
+
+###############################################################################
+
+    def _treeWorkKey(self, treeMat):
+        ''' The arrays kept by the model can be reused by a tree with the same
+        maturity, number of time steps and sigma. '''
+        return (treeMat, self._numTimeSteps, self._sigma)
+
+###############################################################################
+
+    def _fitTree(self, dfTimes, dfValues, warmStart):
+        ''' Fit the drift of the tree kept by the model to a discount curve and
+        make it the tree used for valuation. '''
+
+        treeTimes, Q, rt, dt = self._work
+
+        dfTree = self._uniformTreeDfs(treeTimes, dfTimes, dfValues)
+
+        fitTreeDrift_Fast(Q, rt, self._sigma, dt, self._numTimeSteps, dfTree,
+                          warmStart)
 
-        treeMaturity = treeMat * (self._numTimeSteps+1)/self._numTimeSteps
-        treeTimes = np.linspace(0.0, treeMaturity, self._numTimeSteps + 2)
         self._treeTimes = treeTimes
+        self._Q = Q
+        self._rt = rt
+        self._dt = dt
+
+###############################################################################
+
+    def _uniformTreeTimes(self, treeMat):
+        ''' The times of a uniform tree out to one step after treeMat. '''
+
+        treeMaturity = treeMat * (self._numTimeSteps+1)/self._numTimeSteps
+        return np.linspace(0.0, treeMaturity, self._numTimeSteps + 2)
+
+###############################################################################
+
+    def _uniformTreeDfs(self, treeTimes, dfTimes, dfValues):
+        ''' The discount factors at the times of a uniform tree. '''
+
+        interp = FinInterpTypes.FLAT_FWD_RATES.value
 
         dfTree = np.zeros(shape=(self._numTimeSteps+2))
         dfTree[0] = 1.0
@@ -690,14 +981,20 @@ class FinModelRatesBDT():
             t = treeTimes[i]
             dfTree[i] = _uinterpolate(t, dfTimes, dfValues, interp)
 
-        self._dfTimes = dfTimes
-        self._dfs = dfValues
+        return dfTree
+
+###############################################################################
 
-        self._Q, self._rt, self._dt \
-            = buildTreeFast(self._sigma,
-                            treeTimes, self._numTimeSteps, dfTree)
+    def _buildTree(self, treeMat, dfTimes, dfValues):
+        ''' Build the binomial tree out to treeMat and return its arrays. '''
 
-        return
+        treeTimes = self._uniformTreeTimes(treeMat)
+        dfTree = self._uniformTreeDfs(treeTimes, dfTimes, dfValues)
+
+        Q, rt, dt = buildTreeFast(self._sigma, treeTimes, self._numTimeSteps,
+                                  dfTree)
+
+        return (treeTimes, Q, rt, dt)
 
 ###############################################################################
 
@@ -716,6 +1013,9 @@ class FinModelRatesBDT():
         if texp < 0.0:
             raise FinError("Option expiry time negative.")
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Bond options need a uniform tree grid.")
+
         #######################################################################
 
         callValue, putValue \
@@ -750,6 +1050,19 @@ class FinModelRatesBDT():
 
         #######################################################################
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+
+            payValue, recValue \
+                = bermudanSwaption_Grid_Fast(texp, tmat, strike, faceAmount,
+                                             couponTimes, couponFlows,
+                                             exerciseTypeInt,
+                                             self._dfTimes, self._dfs,
+                                             self._treeTimes, self._rt,
+                                             self._lo, self._hi, self._child,
+                                             self._pu, self._pm, self._pd)
+
+            return {'pay': payValue, 'rec': recValue}
+
         payValue, recValue \
             = bermudanSwaption_Tree_Fast(texp, tmat,
                                          strike, faceAmount,
@@ -762,6 +1075,74 @@ class FinModelRatesBDT():
 
         return {'pay': payValue, 'rec': recValue}
 
+###############################################################################
+
+    def bermudanSwaptionMany(self, texps, strikes, face,
+                             couponTimesList, couponFlowsList, exerciseTypes):
+        ''' Value many swaptions that can be exercised on specific dates over
+        their exercise periods in one backward sweep of the tree. The tree
+        must extend out to the last swap maturity. Each swaption has its own
+        expiry, strike, coupon times and flows and exercise type. Returns
+        arrays of the payer and receiver values. '''
+
+        numTrades = len(texps)
+
+        if len(strikes) != numTrades or len(couponTimesList) != numTrades \
+           or len(couponFlowsList) != numTrades \
+           or len(exerciseTypes) != numTrades:
+            raise FinError("Swaption inputs must all have the same length.")
+
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Swaption batches need a uniform tree grid.")
+
+        numTimeSteps = len(self._treeTimes)
+
+        expirySteps = np.zeros(numTrades, dtype=np.int64)
+        maturitySteps = np.zeros(numTrades, dtype=np.int64)
+        exerciseTypeInts = np.zeros(numTrades, dtype=np.int64)
+        fixedLegFlows = np.zeros(shape=(numTimeSteps, numTrades))
+        floatLegValues = np.zeros(shape=(numTimeSteps, numTrades))
+        accrued = np.zeros(shape=(numTimeSteps, numTrades))
+
+        for j in range(0, numTrades):
+
+            texp = texps[j]
+            couponTimes = couponTimesList[j]
+            tmat = couponTimes[-1]
+
+            if texp > tmat:
+                raise FinError("Option expiry after bond matures.")
+
+            if texp < 0.0:
+                raise FinError("Option expiry time negative.")
+
+            exerciseTypeInts[j] = optionExerciseTypesToInt(exerciseTypes[j])
+
+            if exerciseTypeInts[j] == 3:
+                raise FinError("American optionality not supported.")
+
+            expirySteps[j] = int(texp/self._dt + 0.50)
+            maturitySteps[j] = int(tmat/self._dt + 0.50)
+
+            if maturitySteps[j] > numTimeSteps - 1:
+                raise FinError("Tree does not extend to swap maturity.")
+
+            fixedLegFlows[:, j], floatLegValues[:, j], accrued[:, j] \
+                = bermudanSwaptionFlows_Tree_Fast(texp, tmat, strikes[j],
+                                                  face, couponTimes,
+                                                  couponFlowsList[j],
+                                                  self._dfTimes, self._dfs,
+                                                  self._treeTimes, self._dt)
+
+        payValues, recValues \
+            = bermudanSwaptionMany_Tree_Fast(expirySteps, maturitySteps,
+                                             exerciseTypeInts, face,
+                                             fixedLegFlows, floatLegValues,
+                                             accrued, self._Q,
+                                             self._rt, self._dt)
+
+        return {'pay': payValues, 'rec': recValues}
+
 ###############################################################################
 
     def callablePuttableBond_Tree(self,
@@ -779,6 +1160,18 @@ class FinModelRatesBDT():
         callPrices = np.array(callPrices)
         putPrices = np.array(putPrices)
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+
+            return callablePuttableBond_Grid_Fast(couponTimes, couponFlows,
+                                                  callTimes, callPrices,
+                                                  putTimes, putPrices, faceAmount,
+                                                  self._dfTimes, self._dfs,
+                                                  self._treeTimes, self._rt,
+                                                  self._lo, self._hi,
+                                                  self._child,
+                                                  self._pu, self._pm,
+                                                  self._pd)
+
         v = callablePuttableBond_Tree_Fast(couponTimes, couponFlows,
                                            callTimes, callPrices,
                                            putTimes, putPrices, faceAmount,
@@ -799,6 +1192,8 @@ class FinModelRatesBDT():
         s = "Black-Derman-Toy Model\n"
         s += labelToString("Sigma", self._sigma)
         s += labelToString("numTimeSteps", self._numTimeSteps)
+        s += labelToString("treeHorizon", self._treeHorizon)
+        s += labelToString("treeGridType", self._treeGridType)
         return s
 
 ###############################################################################
@@ -12,6 +12,12 @@ from ..market.curves.FinInterpolator import FinInterpTypes, _uinterpolate
 from ..finutils.FinHelperFunctions import labelToString
 from ..finutils.FinGlobalTypes import FinExerciseTypes
 from ..finutils.FinGlobalVariables import gSmall
+from .FinModelRatesTreeCache import cachedTree, numTreeRows
+from .FinModelRatesTreeGrid import FinTreeGridTypes, eventTreeTimes
+from .FinModelRatesTreeGrid import treeDiscountFactors
+from .FinModelRatesTreeGrid import trinomialGrid_Fast, fitLognormalGrid_Fast
+from .FinModelRatesTreeGrid import bermudanSwaption_Grid_Fast
+from .FinModelRatesTreeGrid import callablePuttableBond_Grid_Fast
 
 interp = FinInterpTypes.FLAT_FWD_RATES.value
 
@@ -140,22 +146,16 @@ def searchRootDeriv(x0, nm, Q, P, dX, dt, N):
 
 
 @njit(fastmath=True, cache=True)
-def bermudanSwaption_Tree_Fast(texp, tmat,
-                               strikePrice, faceAmount,
-                               couponTimes, couponFlows,
-                               exerciseTypeInt,
-                               _dfTimes, _dfValues,
-                               _treeTimes, _Q,
-                               _pu, _pm, _pd,
-                               _rt, _dt, _a):
-    ''' Option to enter into a swap that can be exercised on coupon payment
-    dates after the start of the exercise period. Due to multiple exercise
-    times we need to extend tree out to bond maturity and take into account
-    cash flows through time. '''
-
-    numTimeSteps, numNodes = _Q.shape
-    jmax = ceil(0.1835/(_a * _dt))
-    expiryStep = int(texp/_dt + 0.50)
+def bermudanSwaptionFlows_Tree_Fast(texp, tmat,
+                                    strikePrice, faceAmount,
+                                    couponTimes, couponFlows,
+                                    _dfTimes, _dfValues,
+                                    _treeTimes, _dt):
+    ''' Map the fixed leg coupons of the swap underlying a Bermudan swaption
+    onto the tree. Returns the fixed leg flows, the floating leg values and
+    the fixed leg accrued at each tree time step. '''
+
+    numTimeSteps = len(_treeTimes)
     maturityStep = int(tmat/_dt + 0.50)
 
     ###########################################################################
@@ -243,6 +243,37 @@ def bermudanSwaption_Tree_Fast(texp, tmat,
         if fixedLegFlows[m] > gSmall:
             accrued[m] = fixedLegFlows[m] * faceAmount
 
+    return fixedLegFlows, floatLegValues, accrued
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudanSwaption_Tree_Fast(texp, tmat,
+                               strikePrice, faceAmount,
+                               couponTimes, couponFlows,
+                               exerciseTypeInt,
+                               _dfTimes, _dfValues,
+                               _treeTimes, _Q,
+                               _pu, _pm, _pd,
+                               _rt, _dt, _a):
+    ''' Option to enter into a swap that can be exercised on coupon payment
+    dates after the start of the exercise period. Due to multiple exercise
+    times we need to extend tree out to bond maturity and take into account
+    cash flows through time. '''
+
+    numTimeSteps, numNodes = _Q.shape
+    jmax = ceil(0.1835/(_a * _dt))
+    expiryStep = int(texp/_dt + 0.50)
+    maturityStep = int(tmat/_dt + 0.50)
+
+    fixedLegFlows, floatLegValues, accrued \
+        = bermudanSwaptionFlows_Tree_Fast(texp, tmat,
+                                          strikePrice, faceAmount,
+                                          couponTimes, couponFlows,
+                                          _dfTimes, _dfValues,
+                                          _treeTimes, _dt)
+
     #######################################################################
 
     # The value of the swap at each time and node. Principal is exchanged.
@@ -365,6 +396,121 @@ def bermudanSwaption_Tree_Fast(texp, tmat,
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def bermudanSwaptionMany_Tree_Fast(expirySteps, maturitySteps,
+                                   exerciseTypeInts, faceAmount,
+                                   fixedLegFlows, floatLegValues, accrued,
+                                   _Q, _pu, _pm, _pd, _rt, _dt, _a):
+    ''' Value many Bermudan swaptions in one backward sweep of the tree. The
+    fixed leg flows, floating leg values and accrued of each trade are in the
+    columns of arrays with one row per tree time step. The values at each
+    node are held for all of the trades together so each step of the sweep
+    is one pass over contiguous memory. Each trade joins the sweep at its
+    maturity step. Returns the payer and receiver values of each trade. '''
+
+    numTimeSteps, numNodes = _Q.shape
+    numTrades = len(expirySteps)
+    jmax = ceil(0.1835/(_a * _dt))
+    N = jmax
+
+    # Only the values at the next time step are needed to step back
+    fixedLegValues = np.zeros(shape=(numNodes, numTrades))
+    payValues = np.zeros(shape=(numNodes, numTrades))
+    recValues = np.zeros(shape=(numNodes, numTrades))
+
+    nextFixedLegValues = np.zeros(shape=(numNodes, numTrades))
+    nextPayValues = np.zeros(shape=(numNodes, numTrades))
+    nextRecValues = np.zeros(shape=(numNodes, numTrades))
+
+    lastStep = 0
+    for j in range(0, numTrades):
+        lastStep = max(lastStep, maturitySteps[j])
+
+    for m in range(lastStep, -1, -1):
+
+        nm = min(m, jmax)
+
+        for k in range(-nm, nm+1):
+            kN = k + N
+
+            if k == jmax:
+                iu = kN
+                im = kN - 1
+                id = kN - 2
+            elif k == -jmax:
+                iu = kN + 2
+                im = kN + 1
+                id = kN
+            else:
+                iu = kN + 1
+                im = kN
+                id = kN - 1
+
+            rt = _rt[m, kN]
+            df = np.exp(-rt * _dt)
+            pu = _pu[kN]
+            pm = _pm[kN]
+            pd = _pd[kN]
+
+            for j in range(0, numTrades):
+
+                maturityStep = maturitySteps[j]
+
+                if m > maturityStep:
+                    continue
+
+                flow = fixedLegFlows[m, j] * faceAmount
+
+                # Start with the value of the bond at maturity
+                if m == maturityStep:
+                    fixedLegValues[kN, j] = faceAmount + flow
+                    payValues[kN, j] = 0.0
+                    recValues[kN, j] = 0.0
+                    continue
+
+                vu = nextFixedLegValues[iu, j]
+                vm = nextFixedLegValues[im, j]
+                vd = nextFixedLegValues[id, j]
+                fixedLegValue = (pu*vu + pm*vm + pd*vd) * df + flow
+
+                vu = nextPayValues[iu, j]
+                vm = nextPayValues[im, j]
+                vd = nextPayValues[id, j]
+                holdPay = (pu*vu + pm*vm + pd*vd) * df
+
+                vu = nextRecValues[iu, j]
+                vm = nextRecValues[im, j]
+                vd = nextRecValues[id, j]
+                holdRec = (pu*vu + pm*vm + pd*vd) * df
+
+                fixedLegValues[kN, j] = fixedLegValue
+                payValues[kN, j] = holdPay
+                recValues[kN, j] = holdRec
+
+                expiryStep = expirySteps[j]
+
+                if m == expiryStep or (exerciseTypeInts[j] == 2 and
+                                       flow > gSmall and m > expiryStep):
+
+                    # The floating value is clean and so must be the fixed
+                    cleanValue = fixedLegValue - accrued[m, j]
+                    floatLegValue = floatLegValues[m, j]
+
+                    payExercise = max(floatLegValue - cleanValue, 0.0)
+                    recExercise = max(cleanValue - floatLegValue, 0.0)
+
+                    payValues[kN, j] = max(payExercise, holdPay)
+                    recValues[kN, j] = max(recExercise, holdRec)
+
+        fixedLegValues, nextFixedLegValues = nextFixedLegValues, fixedLegValues
+        payValues, nextPayValues = nextPayValues, payValues
+        recValues, nextRecValues = nextRecValues, recValues
+
+    return nextPayValues[jmax, :].copy(), nextRecValues[jmax, :].copy()
+
+###############################################################################
+
+
 @njit(fastmath=True, cache=True)
 def americanBondOption_Tree_Fast(texp, tmat,
                                  strikePrice, faceAmount,
@@ -759,27 +905,15 @@ def callablePuttableBond_Tree_Fast(couponTimes, couponFlows,
 ###############################################################################
 
 
-@njit(fastmath=True)
-def buildTreeFast(a, sigma, treeTimes, numTimeSteps, discountFactors):
-    ''' Calibrate the tree to a term structure of interest rates. '''
-
-    treeMaturity = treeTimes[-1]
-    dt = treeMaturity / (numTimeSteps+1)
-    dX = sigma * np.sqrt(3.0 * dt)
-    jmax = ceil(0.1835/(a * dt))
-
-    if jmax > 1000:
-        raise FinError("Jmax > 1000. Increase a or dt.")
+@njit(fastmath=True, cache=True)
+def treeProbabilities_Fast(a, dt, jmax):
+    ''' The branching probabilities of the trinomial tree which only depend on
+    the node index j. '''
 
     pu = np.zeros(shape=(2*jmax+1))
     pm = np.zeros(shape=(2*jmax+1))
     pd = np.zeros(shape=(2*jmax+1))
 
-    # The short rate goes out one step extra to have the final short rate
-    # This is the BK model so x = log(r)
-    X = np.zeros(shape=(numTimeSteps+2, 2*jmax+1))
-    rt = np.zeros(shape=(numTimeSteps+2, 2*jmax+1))
-
     # probabilities start at time 0 and go out to one step before T
     # Branching is simple trinomial out to time step m=1 after which
     # the top node and bottom node connect internally to two lower nodes
@@ -803,11 +937,26 @@ def buildTreeFast(a, sigma, treeTimes, numTimeSteps, discountFactors):
             pm[jN] = 2.0/3.0 - ajdt * ajdt
             pd[jN] = 1.0/6.0 + 0.50 * (ajdt * ajdt + ajdt)
 
-    # Arrow-Debreu array
-    Q = np.zeros(shape=(numTimeSteps+2, 2*jmax+1))
+    return (pu, pm, pd)
 
-    # This is the drift adjustment to ensure no arbitrage at each time
-    alpha = np.zeros(numTimeSteps+1)
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def fitTreeDrift_Fast(Q, rt, alpha, pu, pm, pd, dX, dt, jmax, treeTimes,
+                      numTimeSteps, discountFactors, warmStart):
+    ''' Fit the drift of the trinomial tree to the discount factors at the
+    tree times. The Arrow-Debreu prices, the short rates and the drifts are
+    written into the arrays Q, rt and alpha which are overwritten so that a
+    tree can be fitted again to a new curve without allocating memory. If
+    warmStart is True the Newton search at each time step starts at the drift
+    already in alpha rather than at the drift of the previous time step. '''
+
+    max_iter = 50
+    max_error = 1e-8
+
+    Q[:, :] = 0.0
+    rt[:, :] = 0.0
 
     # Time zero is trivial for the Arrow-Debreu price
     Q[0, jmax] = 1.0
@@ -822,25 +971,57 @@ def buildTreeFast(a, sigma, treeTimes, numTimeSteps, discountFactors):
     for m in range(0, numTimeSteps + 1):
 
         nm = min(m, jmax)
+        P = discountFactors[m+1]
+
+        if warmStart:
+            x0 = alpha[m]
 
         # Need to do drift adjustment which is non-linear and so requires
         # a root search algorithm to find value of x0.
 
-        alpha[m] = searchRootDeriv(x0, nm, Q[m], discountFactors[m+1],
-                                   dX, dt, jmax)
+        converged = False
+
+        for _ in range(0, max_iter):
+
+            sumQZ = 0.0
+            for j in range(-nm, nm+1):
+                x = x0 + j*dX
+                rdt = np.exp(x)*dt
+                sumQZ += Q[m, j+jmax] * np.exp(-rdt)
+
+            fval = sumQZ - P
+
+            if abs(fval) <= max_error:
+                converged = True
+                break
 
-        x0 = alpha[m]
+            sumQZdZ = 0.0
+            for j in range(-nm, nm+1):
+                x = x0 + j*dX
+                rdt = np.exp(x)*dt
+                sumQZdZ += Q[m, j+jmax] * np.exp(-rdt) * np.exp(x)
+
+            fderiv = -sumQZdZ*dt
+
+            if abs(fderiv) == 0.0:
+                raise FinError("Function derivative is zero.")
+
+            x0 = x0 - fval/fderiv
+
+        if not converged:
+            raise FinError("Search root deriv FAILED to find alpha.")
+
+        alpha[m] = x0
 
         for j in range(-nm, nm+1):
             jN = j + jmax
-            X[m, jN] = alpha[m] + j*dX
-            rt[m, jN] = np.exp(X[m, jN])
+            rt[m, jN] = np.exp(alpha[m] + j*dX)
 
         # Loop over all nodes at time m to calculate next values of Q
         for j in range(-nm, nm+1):
 
             jN = j + jmax
-            rdt = np.exp(X[m, jN]) * dt
+            rdt = rt[m, jN] * dt
             z = np.exp(-rdt)
 
             if j == jmax:
@@ -856,6 +1037,38 @@ def buildTreeFast(a, sigma, treeTimes, numTimeSteps, discountFactors):
                 Q[m+1, jN] += Q[m, jN] * pm[jN] * z
                 Q[m+1, jN-1] += Q[m, jN] * pd[jN] * z
 
+    return
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def buildTreeFast(a, sigma, treeTimes, numTimeSteps, discountFactors):
+    ''' Calibrate the tree to a term structure of interest rates. '''
+
+    treeMaturity = treeTimes[-1]
+    dt = treeMaturity / (numTimeSteps+1)
+    dX = sigma * np.sqrt(3.0 * dt)
+    jmax = ceil(0.1835/(a * dt))
+
+    if jmax > 1000:
+        raise FinError("Jmax > 1000. Increase a or dt.")
+
+    pu, pm, pd = treeProbabilities_Fast(a, dt, jmax)
+
+    # The short rate goes out one step extra to have the final short rate
+    # This is the BK model so x = log(r)
+    rt = np.zeros(shape=(numTimeSteps+2, 2*jmax+1))
+
+    # Arrow-Debreu array
+    Q = np.zeros(shape=(numTimeSteps+2, 2*jmax+1))
+
+    # This is the drift adjustment to ensure no arbitrage at each time
+    alpha = np.zeros(numTimeSteps+1)
+
+    fitTreeDrift_Fast(Q, rt, alpha, pu, pm, pd, dX, dt, jmax, treeTimes,
+                      numTimeSteps, discountFactors, False)
+
     return (Q, pu, pm, pd, rt, dt)
 
 ##########################################################################
@@ -866,14 +1079,27 @@ class FinModelRatesBK():
     def __init__(self, 
                  sigma: float, 
                  a: float, 
-                 numTimeSteps:int=100):
+                 numTimeSteps:int=100,
+                 treeHorizon:float=None,
+                 treeGridType=FinTreeGridTypes.UNIFORM):
         ''' Constructs the Black Karasinski rate model. The speed of mean
         reversion a and volatility are passed in. The short rate process
-        is given by d(log(r)) = (theta(t) - a*log(r)) * dt  + sigma * dW '''
+        is given by d(log(r)) = (theta(t) - a*log(r)) * dt  + sigma * dW. If
+        a tree horizon in years is given then the tree out to this horizon is
+        shared by all trades that mature before it using the tree cache. If
+        the tree grid type is EVENT_ALIGNED then the tree has a time on each
+        coupon and exercise date of the trade. '''
 
         if sigma < 0.0:
             raise FinError("Negative volatility not allowed.")
 
+        if treeHorizon is not None and treeHorizon <= 0.0:
+            raise FinError("Tree horizon must be positive.")
+
+        if treeHorizon is not None \
+           and treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Event aligned trees cannot be shared.")
+
         if a < 0.0:
             raise FinError("Mean reversion speed parameter should be >= 0.")
 
@@ -887,6 +1113,8 @@ class FinModelRatesBK():
             raise FinError("Drift fitting requires at least 3 time steps")
 
         self._numTimeSteps = numTimeSteps
+        self._treeHorizon = treeHorizon
+        self._treeGridType = treeGridType
 
         self._Q = None
         self._rt = None
@@ -896,9 +1124,20 @@ class FinModelRatesBK():
         self._pd = None
         self._discountCurve = None
 
+        # The arrays of the last tree built by the model and not the cache
+        self._workKey = None
+        self._work = None
+
 ###############################################################################
 
-    def buildTree(self, tmat, dfTimes, dfValues):
+    def buildTree(self, tmat, dfTimes, dfValues, eventTimes=None):
+        ''' Build the trinomial tree. If the model has a tree horizon after
+        tmat then the tree out to the horizon is taken from the tree cache and
+        only its steps out to tmat are used. If the model has an event aligned
+        tree grid then the tree has a time on each of the eventTimes which are
+        the coupon and exercise times of the trade. Otherwise the model keeps
+        the arrays of its tree and, if the next tree has the same maturity,
+        only fits its drift again into these arrays. '''
 
         if isinstance(dfTimes, np.ndarray) is False:
             raise FinError("DF TIMES must be a numpy vector")
@@ -906,11 +1145,138 @@ class FinModelRatesBK():
         if isinstance(dfValues, np.ndarray) is False:
             raise FinError("DF VALUES must be a numpy vector")
 
-        interp = FinInterpTypes.FLAT_FWD_RATES.value
+        self._dfTimes = dfTimes
+        self._dfs = dfValues
+
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+
+            if eventTimes is None:
+                eventTimes = []
+
+            treeTimes = eventTreeTimes(tmat, eventTimes, self._numTimeSteps)
+            dfTree = treeDiscountFactors(treeTimes, dfTimes, dfValues)
+
+            x, self._lo, self._hi, self._child, \
+                self._pu, self._pm, self._pd \
+                = trinomialGrid_Fast(self._a, self._sigma, treeTimes)
+
+            self._Q, self._rt = fitLognormalGrid_Fast(x, self._lo, self._hi,
+                                                      self._child, self._pu,
+                                                      self._pm, self._pd,
+                                                      treeTimes, dfTree)
+            self._treeTimes = treeTimes
+            self._dt = None
+
+        elif self._treeHorizon is None or tmat > self._treeHorizon:
+
+            if self._workKey != self._treeWorkKey(tmat):
+                self._allocateTree(tmat)
+
+            self._fitTree(dfTimes, dfValues, False)
+
+        else:
+
+            treeTimes, Q, self._pu, self._pm, self._pd, rt, self._dt \
+                = cachedTree(self, dfTimes, dfValues)
+
+            numRows = numTreeRows(treeTimes, self._dt, tmat)
+            self._treeTimes = treeTimes[0:numRows]
+            self._Q = Q[0:numRows]
+            self._rt = rt[0:numRows]
+
+        return
+
+###############################################################################
+
+    def refitTree(self, dfTimes, dfValues):
+        ''' Fit the drift of the last tree built by the model to a new discount
+        curve. As sigma and a are fixed the tree times and the branching
+        probabilities do not change and the arrays of the tree are reused. The
+        search for the drift at each time starts at the drift of the last fit
+        which is close to the solution when the curve has changed a little.
+        Trees built on an event aligned grid or taken from the tree cache
+        cannot be refitted. '''
+
+        if isinstance(dfTimes, np.ndarray) is False:
+            raise FinError("DF TIMES must be a numpy vector")
+
+        if isinstance(dfValues, np.ndarray) is False:
+            raise FinError("DF VALUES must be a numpy vector")
+
+        if self._work is None or self._Q is not self._work[1]:
+            raise FinError("No tree built by the model to refit.")
+
+        self._dfTimes = dfTimes
+        self._dfs = dfValues
+        self._fitTree(dfTimes, dfValues, True)
+
+###############################################################################
+
+    def _allocateTree(self, tmat):
+        ''' Set up the times, branching probabilities and the arrays of a
+        trinomial tree out to tmat which are kept by the model. '''
+
+        treeTimes = self._uniformTreeTimes(tmat)
+
+        treeMaturity = treeTimes[-1]
+        dt = treeMaturity / (self._numTimeSteps+1)
+        dX = self._sigma * np.sqrt(3.0 * dt)
+        jmax = ceil(0.1835/(self._a * dt))
+
+        if jmax > 1000:
+            raise FinError("Jmax > 1000. Increase a or dt.")
+
+        pu, pm, pd = treeProbabilities_Fast(self._a, dt, jmax)
+
+        Q = np.zeros(shape=(self._numTimeSteps+2, 2*jmax+1))
+        rt = np.zeros(shape=(self._numTimeSteps+2, 2*jmax+1))
+        alpha = np.zeros(self._numTimeSteps+1)
+
+        self._work = (treeTimes, Q, pu, pm, pd, rt, dt, alpha, dX, jmax)
+        self._workKey = self._treeWorkKey(tmat)
+
+###############################################################################
+
+    def _treeWorkKey(self, tmat):
+        ''' The arrays kept by the model can be reused by a tree with the same
+        maturity, number of time steps and sigma and a. '''
+        return (tmat, self._numTimeSteps, self._sigma, self._a)
+
+###############################################################################
+
+    def _fitTree(self, dfTimes, dfValues, warmStart):
+        ''' Fit the drift of the tree kept by the model to a discount curve and
+        make it the tree used for valuation. '''
+
+        treeTimes, Q, pu, pm, pd, rt, dt, alpha, dX, jmax = self._work
+
+        dfTree = self._uniformTreeDfs(treeTimes, dfTimes, dfValues)
+
+        fitTreeDrift_Fast(Q, rt, alpha, pu, pm, pd, dX, dt, jmax, treeTimes,
+                          self._numTimeSteps, dfTree, warmStart)
 
-        treeMaturity = tmat * (self._numTimeSteps+1)/self._numTimeSteps
-        treeTimes = np.linspace(0.0, treeMaturity, self._numTimeSteps + 2)
         self._treeTimes = treeTimes
+        self._Q = Q
+        self._pu = pu
+        self._pm = pm
+        self._pd = pd
+        self._rt = rt
+        self._dt = dt
+
+###############################################################################
+
+    def _uniformTreeTimes(self, tmat):
+        ''' The times of a uniform tree out to one step after tmat. '''
+
+        treeMaturity = tmat * (self._numTimeSteps+1)/self._numTimeSteps
+        return np.linspace(0.0, treeMaturity, self._numTimeSteps + 2)
+
+###############################################################################
+
+    def _uniformTreeDfs(self, treeTimes, dfTimes, dfValues):
+        ''' The discount factors at the times of a uniform tree. '''
+
+        interp = FinInterpTypes.FLAT_FWD_RATES.value
 
         dfTree = np.zeros(shape=(self._numTimeSteps+2))
         dfTree[0] = 1.0
@@ -919,14 +1285,21 @@ class FinModelRatesBK():
             t = treeTimes[i]
             dfTree[i] = _uinterpolate(t, dfTimes, dfValues, interp)
 
-        self._dfTimes = dfTimes
-        self._dfs = dfValues
-        
-        self._Q, self._pu, self._pm, self._pd, self._rt, self._dt \
-            = buildTreeFast(self._a, self._sigma,
-                            treeTimes, self._numTimeSteps, dfTree)
+        return dfTree
 
-        return
+###############################################################################
+
+    def _buildTree(self, tmat, dfTimes, dfValues):
+        ''' Build the trinomial tree out to tmat and return its arrays. '''
+
+        treeTimes = self._uniformTreeTimes(tmat)
+        dfTree = self._uniformTreeDfs(treeTimes, dfTimes, dfValues)
+
+        Q, pu, pm, pd, rt, dt = buildTreeFast(self._a, self._sigma,
+                                              treeTimes, self._numTimeSteps,
+                                              dfTree)
+
+        return (treeTimes, Q, pu, pm, pd, rt, dt)
 
 ###############################################################################
 
@@ -945,6 +1318,9 @@ class FinModelRatesBK():
         if texp < 0.0:
             raise FinError("Option expiry time negative.")
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Bond options need a uniform tree grid.")
+
         #######################################################################
 
         callValue, putValue \
@@ -980,6 +1356,19 @@ class FinModelRatesBK():
 
         #######################################################################
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+
+            payValue, recValue \
+                = bermudanSwaption_Grid_Fast(texp, tmat, strikePrice, faceAmount,
+                                             couponTimes, couponFlows,
+                                             exerciseTypeInt,
+                                             self._dfTimes, self._dfs,
+                                             self._treeTimes, self._rt,
+                                             self._lo, self._hi, self._child,
+                                             self._pu, self._pm, self._pd)
+
+            return {'pay': payValue, 'rec': recValue}
+
         payValue, recValue \
             = bermudanSwaption_Tree_Fast(texp, tmat,
                                          strikePrice, faceAmount,
@@ -993,6 +1382,75 @@ class FinModelRatesBK():
 
         return {'pay': payValue, 'rec': recValue}
 
+###############################################################################
+
+    def bermudanSwaptionMany(self, texps, strikes, face,
+                             couponTimesList, couponFlowsList, exerciseTypes):
+        ''' Value many swaptions that can be exercised on specific dates over
+        their exercise periods in one backward sweep of the tree. The tree
+        must extend out to the last swap maturity. Each swaption has its own
+        expiry, strike, coupon times and flows and exercise type. Returns
+        arrays of the payer and receiver values. '''
+
+        numTrades = len(texps)
+
+        if len(strikes) != numTrades or len(couponTimesList) != numTrades \
+           or len(couponFlowsList) != numTrades \
+           or len(exerciseTypes) != numTrades:
+            raise FinError("Swaption inputs must all have the same length.")
+
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Swaption batches need a uniform tree grid.")
+
+        numTimeSteps = len(self._treeTimes)
+
+        expirySteps = np.zeros(numTrades, dtype=np.int64)
+        maturitySteps = np.zeros(numTrades, dtype=np.int64)
+        exerciseTypeInts = np.zeros(numTrades, dtype=np.int64)
+        fixedLegFlows = np.zeros(shape=(numTimeSteps, numTrades))
+        floatLegValues = np.zeros(shape=(numTimeSteps, numTrades))
+        accrued = np.zeros(shape=(numTimeSteps, numTrades))
+
+        for j in range(0, numTrades):
+
+            texp = texps[j]
+            couponTimes = couponTimesList[j]
+            tmat = couponTimes[-1]
+
+            if texp > tmat:
+                raise FinError("Option expiry after bond matures.")
+
+            if texp < 0.0:
+                raise FinError("Option expiry time negative.")
+
+            exerciseTypeInts[j] = optionExerciseTypesToInt(exerciseTypes[j])
+
+            if exerciseTypeInts[j] == 3:
+                raise FinError("American optionality not supported.")
+
+            expirySteps[j] = int(texp/self._dt + 0.50)
+            maturitySteps[j] = int(tmat/self._dt + 0.50)
+
+            if maturitySteps[j] > numTimeSteps - 1:
+                raise FinError("Tree does not extend to swap maturity.")
+
+            fixedLegFlows[:, j], floatLegValues[:, j], accrued[:, j] \
+                = bermudanSwaptionFlows_Tree_Fast(texp, tmat, strikes[j],
+                                                  face, couponTimes,
+                                                  couponFlowsList[j],
+                                                  self._dfTimes, self._dfs,
+                                                  self._treeTimes, self._dt)
+
+        payValues, recValues \
+            = bermudanSwaptionMany_Tree_Fast(expirySteps, maturitySteps,
+                                             exerciseTypeInts, face,
+                                             fixedLegFlows, floatLegValues,
+                                             accrued, self._Q,
+                                             self._pu, self._pm, self._pd,
+                                             self._rt, self._dt, self._a)
+
+        return {'pay': payValues, 'rec': recValues}
+
 ###############################################################################
 
     def callablePuttableBond_Tree(self,
@@ -1010,6 +1468,18 @@ class FinModelRatesBK():
         callPrices = np.array(callPrices)
         putPrices = np.array(putPrices)
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+
+            return callablePuttableBond_Grid_Fast(couponTimes, couponFlows,
+                                                  callTimes, callPrices,
+                                                  putTimes, putPrices, face,
+                                                  self._dfTimes, self._dfs,
+                                                  self._treeTimes, self._rt,
+                                                  self._lo, self._hi,
+                                                  self._child,
+                                                  self._pu, self._pm,
+                                                  self._pd)
+
         v = callablePuttableBond_Tree_Fast(couponTimes, couponFlows,
                                            callTimes, callPrices,
                                            putTimes, putPrices, face,
@@ -1032,6 +1502,8 @@ class FinModelRatesBK():
         s += labelToString("Sigma", self._sigma)
         s += labelToString("a", self._a)
         s += labelToString("numTimeSteps", self._numTimeSteps)
+        s += labelToString("treeHorizon", self._treeHorizon)
+        s += labelToString("treeGridType", self._treeGridType)
         return s
 
 ###############################################################################
@@ -132,7 +132,7 @@ def draw(rt, a, b, sigma, dt):
         float64,
         float64,
         int64,
-        int64))
+        int64), cache=True)
 def ratePath_MC(r0, a, b, sigma, t, dt, seed, scheme):
     ''' Generate a path of CIR rates using a number of numerical schemes. '''
 
@@ -231,7 +231,7 @@ def ratePath_MC(r0, a, b, sigma, t, dt, seed, scheme):
         float64,
         int64,
         int64,
-        int64))
+        int64), cache=True)
 def zeroPrice_MC(r0, a, b, sigma, t, dt, numPaths, seed, scheme):
     ' Determine the CIR zero price using Monte Carlo. '''
 
@@ -8,11 +8,17 @@ from numba import njit
 from math import ceil
 
 from ..finutils.FinError import FinError
-from ..finutils.FinMath import N, accruedInterpolator
+from ..finutils.FinMath import N, nprime, accruedInterpolator
 from ..market.curves.FinInterpolator import FinInterpTypes, _uinterpolate
 from ..finutils.FinHelperFunctions import labelToString
 from ..finutils.FinGlobalTypes import FinExerciseTypes
 from ..finutils.FinGlobalVariables import gSmall
+from .FinModelRatesTreeCache import cachedTree, numTreeRows
+from .FinModelRatesTreeGrid import FinTreeGridTypes, eventTreeTimes
+from .FinModelRatesTreeGrid import treeDiscountFactors
+from .FinModelRatesTreeGrid import trinomialGrid_Fast, fitNormalGrid_Fast
+from .FinModelRatesTreeGrid import bermudanSwaption_Grid_Fast
+from .FinModelRatesTreeGrid import callablePuttableBond_Grid_Fast
 
 interp = FinInterpTypes.FLAT_FWD_RATES.value
 
@@ -413,19 +419,14 @@ def americanBondOption_Tree_Fast(texp,
 
 
 @njit(fastmath=True, cache=True)
-def bermudanSwaption_Tree_Fast(texp, tmat, strikePrice, faceAmount,
-                               couponTimes, couponFlows,
-                               exerciseTypeInt,
-                               _dfTimes, _dfValues,
-                               _treeTimes, _Q, _pu, _pm, _pd, _rt, _dt, _a):
-    ''' Option to enter into a swap that can be exercised on coupon payment
-    dates after the start of the exercise period. Due to multiple exercise
-    times we need to extend tree out to bond maturity and take into account
-    cash flows through time. '''
-
-    numTimeSteps, numNodes = _Q.shape
-    jmax = ceil(0.1835/(_a * _dt))
-    expiryStep = int(texp/_dt + 0.50)
+def bermudanSwaptionFlows_Tree_Fast(texp, tmat, strikePrice, faceAmount,
+                                    couponTimes, couponFlows,
+                                    _dfTimes, _dfValues, _treeTimes, _dt):
+    ''' Map the fixed leg coupons of the swap underlying a Bermudan swaption
+    onto the tree. Returns the fixed leg flows, the floating leg values and
+    the fixed leg accrued at each tree time step. '''
+
+    numTimeSteps = len(_treeTimes)
     maturityStep = int(tmat/_dt + 0.50)
 
     ###########################################################################
@@ -477,6 +478,33 @@ def bermudanSwaption_Tree_Fast(texp, tmat, strikePrice, faceAmount,
         if fixedLegFlows[m] > gSmall:
             accrued[m] = fixedLegFlows[m] * faceAmount
 
+    return fixedLegFlows, floatLegValues, accrued
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudanSwaption_Tree_Fast(texp, tmat, strikePrice, faceAmount,
+                               couponTimes, couponFlows,
+                               exerciseTypeInt,
+                               _dfTimes, _dfValues,
+                               _treeTimes, _Q, _pu, _pm, _pd, _rt, _dt, _a):
+    ''' Option to enter into a swap that can be exercised on coupon payment
+    dates after the start of the exercise period. Due to multiple exercise
+    times we need to extend tree out to bond maturity and take into account
+    cash flows through time. '''
+
+    numTimeSteps, numNodes = _Q.shape
+    jmax = ceil(0.1835/(_a * _dt))
+    expiryStep = int(texp/_dt + 0.50)
+    maturityStep = int(tmat/_dt + 0.50)
+
+    fixedLegFlows, floatLegValues, accrued \
+        = bermudanSwaptionFlows_Tree_Fast(texp, tmat, strikePrice,
+                                          faceAmount, couponTimes,
+                                          couponFlows, _dfTimes, _dfValues,
+                                          _treeTimes, _dt)
+
     ###########################################################################
 
     # The value of the swap at each time and node. Principal is exchanged.
@@ -597,6 +625,121 @@ def bermudanSwaption_Tree_Fast(texp, tmat, strikePrice, faceAmount,
     return payValues[0, jmax], recValues[0, jmax]
 
 ###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudanSwaptionMany_Tree_Fast(expirySteps, maturitySteps,
+                                   exerciseTypeInts, faceAmount,
+                                   fixedLegFlows, floatLegValues, accrued,
+                                   _Q, _pu, _pm, _pd, _rt, _dt, _a):
+    ''' Value many Bermudan swaptions in one backward sweep of the tree. The
+    fixed leg flows, floating leg values and accrued of each trade are in the
+    columns of arrays with one row per tree time step. The values at each
+    node are held for all of the trades together so each step of the sweep
+    is one pass over contiguous memory. Each trade joins the sweep at its
+    maturity step. Returns the payer and receiver values of each trade. '''
+
+    numTimeSteps, numNodes = _Q.shape
+    numTrades = len(expirySteps)
+    jmax = ceil(0.1835/(_a * _dt))
+    N = jmax
+
+    # Only the values at the next time step are needed to step back
+    fixedLegValues = np.zeros(shape=(numNodes, numTrades))
+    payValues = np.zeros(shape=(numNodes, numTrades))
+    recValues = np.zeros(shape=(numNodes, numTrades))
+
+    nextFixedLegValues = np.zeros(shape=(numNodes, numTrades))
+    nextPayValues = np.zeros(shape=(numNodes, numTrades))
+    nextRecValues = np.zeros(shape=(numNodes, numTrades))
+
+    lastStep = 0
+    for j in range(0, numTrades):
+        lastStep = max(lastStep, maturitySteps[j])
+
+    for m in range(lastStep, -1, -1):
+
+        nm = min(m, jmax)
+
+        for k in range(-nm, nm+1):
+            kN = k + N
+
+            if k == jmax:
+                iu = kN
+                im = kN - 1
+                id = kN - 2
+            elif k == -jmax:
+                iu = kN + 2
+                im = kN + 1
+                id = kN
+            else:
+                iu = kN + 1
+                im = kN
+                id = kN - 1
+
+            rt = _rt[m, kN]
+            df = np.exp(-rt * _dt)
+            pu = _pu[kN]
+            pm = _pm[kN]
+            pd = _pd[kN]
+
+            for j in range(0, numTrades):
+
+                maturityStep = maturitySteps[j]
+
+                if m > maturityStep:
+                    continue
+
+                flow = fixedLegFlows[m, j] * faceAmount
+
+                # Start with the value of the bond at maturity
+                if m == maturityStep:
+                    fixedLegValues[kN, j] = faceAmount + flow
+                    payValues[kN, j] = 0.0
+                    recValues[kN, j] = 0.0
+                    continue
+
+                vu = nextFixedLegValues[iu, j]
+                vm = nextFixedLegValues[im, j]
+                vd = nextFixedLegValues[id, j]
+                fixedLegValue = (pu*vu + pm*vm + pd*vd) * df + flow
+
+                vu = nextPayValues[iu, j]
+                vm = nextPayValues[im, j]
+                vd = nextPayValues[id, j]
+                holdPay = (pu*vu + pm*vm + pd*vd) * df
+
+                vu = nextRecValues[iu, j]
+                vm = nextRecValues[im, j]
+                vd = nextRecValues[id, j]
+                holdRec = (pu*vu + pm*vm + pd*vd) * df
+
+                fixedLegValues[kN, j] = fixedLegValue
+                payValues[kN, j] = holdPay
+                recValues[kN, j] = holdRec
+
+                expiryStep = expirySteps[j]
+
+                if m == expiryStep or (exerciseTypeInts[j] == 2 and
+                                       flow > gSmall and m > expiryStep):
+
+                    # The floating value is clean and so must be the fixed
+                    cleanValue = fixedLegValue - accrued[m, j]
+                    floatLegValue = floatLegValues[m, j]
+
+                    payExercise = max(floatLegValue - cleanValue, 0.0)
+                    recExercise = max(cleanValue - floatLegValue, 0.0)
+
+                    payValues[kN, j] = max(payExercise, holdPay)
+                    recValues[kN, j] = max(recExercise, holdRec)
+
+        fixedLegValues, nextFixedLegValues = nextFixedLegValues, fixedLegValues
+        payValues, nextPayValues = nextPayValues, payValues
+        recValues, nextRecValues = nextRecValues, recValues
+
+    return nextPayValues[jmax, :].copy(), nextRecValues[jmax, :].copy()
+
+###############################################################################
 # TODO: CHECK ACCRUED AND COUPONS TO SEE IF IT WORKS FOR LOW TREE STEPS
 ###############################################################################
 
@@ -838,6 +981,178 @@ def fwdFullBondPrice(rt, *args):
     return obj
 
 ###############################################################################
+# The Hull-White model with a piecewise constant volatility sigma(t) and a
+# constant mean reversion a. The value at time t of a zero coupon bond paying
+# at T is P(0,T)/P(0,t) * exp(-B(t,T) * x - B(t,T)^2 * y(t) / 2) where x is
+# the Gaussian state, B(t,T) = (1 - exp(-a(T-t))) / a and y(t) is the
+# integral of sigma(u)^2 * exp(-2a(t-u)) from 0 to t. The volatility of the
+# zero coupon bond price at t is B(t,T) * sqrt(y(t)). The sigmaValues apply
+# between the sigmaTimes which are the times at which sigma changes.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _B_Fast(a, tau):
+    ''' The function B(t,T) with T - t = tau and its derivative with respect
+    to the mean reversion a. '''
+
+    if a * tau < 1e-4:
+        B = tau * (1.0 - 0.50 * a * tau + a * a * tau * tau / 6.0)
+        dBda = -tau * tau / 2.0 + a * tau**3 / 3.0
+    else:
+        B = -np.expm1(-a * tau) / a
+        dBda = (tau * np.exp(-a * tau) - B) / a
+
+    return B, dBda
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _variance_Fast(a, sigmaTimes, sigmaValues, t):
+    ''' Return y(t) and its derivatives with respect to each sigma value and
+    to the mean reversion a. '''
+
+    numSigmas = len(sigmaValues)
+    c = 2.0 * a
+
+    y = 0.0
+    dyda = 0.0
+    dydSigma = np.zeros(numSigmas)
+
+    u0 = 0.0
+
+    for k in range(0, numSigmas):
+
+        if k < numSigmas - 1:
+            u1 = min(sigmaTimes[k], t)
+        else:
+            u1 = t
+
+        if u1 > u0:
+
+            # The integrals of exp(-cs) and s * exp(-cs) from s1 to s0
+            s0 = t - u0
+            s1 = t - u1
+
+            g = -np.exp(-c * s1) * np.expm1(-c * (s0 - s1)) / c
+
+            if c * s0 < 1e-4:
+                h = (s0**2 - s1**2) / 2.0 - c * (s0**3 - s1**3) / 3.0 \
+                    + c * c * (s0**4 - s1**4) / 8.0
+            else:
+                h = (s1 / c + 1.0 / c / c) * np.exp(-c * s1) \
+                    - (s0 / c + 1.0 / c / c) * np.exp(-c * s0)
+
+            sigma2 = sigmaValues[k] * sigmaValues[k]
+            y += sigma2 * g
+            dyda -= 2.0 * sigma2 * h
+            dydSigma[k] = 2.0 * sigmaValues[k] * g
+
+        u0 = max(u0, u1)
+
+    return y, dydSigma, dyda
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def europeanSwaptionsJamshidian_Fast(a, sigmaTimes, sigmaValues,
+                                     texps, ptexps,
+                                     cpnTimes, cpnFlows, ptcpns, numCpns):
+    ''' Value a set of European swaptions in the Hull-White model with a
+    piecewise constant volatility using Jamshidian's decomposition. Each
+    swaption is an option on a bond with face and strike of one. Row j of
+    cpnTimes, cpnFlows and ptcpns holds the numCpns[j] coupon times after the
+    expiry texps[j], the coupons and their discount factors and ptexps[j] is
+    the expiry discount factor. The principal is added to the last coupon.
+    Returns the payer (bond put) and the receiver (bond call) values and
+    their derivatives with respect to the sigma values and to a. These are
+    the same for payers and receivers by put-call parity. '''
+
+    if a < small:
+        a = small
+
+    numSwaptions = len(texps)
+    numSigmas = len(sigmaValues)
+
+    payValues = np.zeros(numSwaptions)
+    recValues = np.zeros(numSwaptions)
+    dValuedSigma = np.zeros(shape=(numSwaptions, numSigmas))
+    dValueda = np.zeros(numSwaptions)
+
+    for j in range(0, numSwaptions):
+
+        texp = texps[j]
+        ptexp = ptexps[j]
+        n = numCpns[j]
+
+        y, dydSigma, dyda = _variance_Fast(a, sigmaTimes, sigmaValues, texp)
+        sqrty = np.sqrt(y)
+
+        flows = cpnFlows[j, 0:n].copy()
+        flows[n-1] += 1.0
+
+        Bs = np.zeros(n)
+        dBdas = np.zeros(n)
+        fwds = np.zeros(n)
+
+        for i in range(0, n):
+            Bs[i], dBdas[i] = _B_Fast(a, cpnTimes[j, i] - texp)
+            fwds[i] = ptcpns[j, i] / ptexp * np.exp(-0.50 * Bs[i]**2 * y)
+
+        # The bond price at expiry falls as x rises and is convex so Newton's
+        # method converges to the x at which it equals the strike
+        x = 0.0
+        for _ in range(0, 100):
+
+            f = -1.0
+            fprime = 0.0
+
+            for i in range(0, n):
+                p = flows[i] * fwds[i] * np.exp(-Bs[i] * x)
+                f += p
+                fprime -= Bs[i] * p
+
+            if abs(f) < 1e-15:
+                break
+
+            x -= f / fprime
+
+        # The zero coupon bond options are all exercised on the same side of
+        # this x and so share the same probability of exercise
+        d = x / sqrty
+        payValue = 0.0
+        recValue = 0.0
+
+        for i in range(0, n):
+
+            sigmap = Bs[i] * sqrty
+            strike = fwds[i] * np.exp(-Bs[i] * x)
+            h = d + sigmap
+
+            call = ptcpns[j, i] * N(h) - strike * ptexp * N(d)
+            put = strike * ptexp * N(-d) - ptcpns[j, i] * N(-h)
+
+            recValue += flows[i] * call
+            payValue += flows[i] * put
+
+            # The strikes move together to keep the bond at its strike so
+            # only the option vegas contribute to the derivatives
+            vega = flows[i] * ptcpns[j, i] * nprime(h)
+
+            for k in range(0, numSigmas):
+                dValuedSigma[j, k] += vega * Bs[i] * dydSigma[k] / 2.0 / sqrty
+
+            dValueda[j] += vega * (dBdas[i] * sqrty
+                                   + Bs[i] * dyda / 2.0 / sqrty)
+
+        payValues[j] = payValue
+        recValues[j] = recValue
+
+    return payValues, recValues, dValuedSigma, dValueda
+
+###############################################################################
 
 
 class FinModelRatesHW():
@@ -846,16 +1161,31 @@ class FinModelRatesHW():
                  sigma,
                  a,
                  numTimeSteps=100,
-                 europeanCalcType=FinHWEuropeanCalcType.EXPIRY_TREE):
+                 europeanCalcType=FinHWEuropeanCalcType.EXPIRY_TREE,
+                 treeHorizon=None,
+                 treeGridType=FinTreeGridTypes.UNIFORM):
         ''' Constructs the Hull-White rate model. The speed of mean reversion
         a and volatility are passed in. The short rate process is given by
         dr = (theta(t) - ar) * dt  + sigma * dW. The model will switch to use
         Jamshidian's approach where possible unless the useJamshidian flag is
-        set to false in which case it uses the trinomial Tree. '''
+        set to false in which case it uses the trinomial Tree. If a tree
+        horizon in years is given then one tree with numTimeSteps steps is
+        built out to this horizon for each discount curve and is shared by all
+        trades that mature before it using the tree cache. If the tree grid
+        type is EVENT_ALIGNED then the tree has a time on each coupon and
+        exercise date of the trade and the time steps between them are close
+        to the uniform time step. '''
 
         if sigma < 0.0:
             raise FinError("Negative volatility not allowed.")
 
+        if treeHorizon is not None and treeHorizon <= 0.0:
+            raise FinError("Tree horizon must be positive.")
+
+        if treeHorizon is not None \
+           and treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Event aligned trees cannot be shared.")
+
         if a < 0.0:
             raise FinError("Mean reversion speed parameter should be >= 0.")
 
@@ -863,6 +1193,8 @@ class FinModelRatesHW():
         self._a = a
         self._numTimeSteps = numTimeSteps
         self._europeanCalcType = europeanCalcType
+        self._treeHorizon = treeHorizon
+        self._treeGridType = treeGridType
 
         self._Q = None
         self._r = None
@@ -986,6 +1318,9 @@ class FinModelRatesHW():
         corresponding bond price. User provides bond object and option details.
         '''
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Bond options need a uniform tree grid.")
+
         dt = self._dt
         tdelta = texp + dt
 
@@ -1066,6 +1401,9 @@ class FinModelRatesHW():
         if self._treeTimes[-1] < texp:
             raise FinError("Tree expiry must be >= option expiry date.")
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Bond options need a uniform tree grid.")
+
         dt = self._dt
         tdelta = texp + dt
 
@@ -1115,6 +1453,19 @@ class FinModelRatesHW():
 
         #######################################################################
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+
+            payValue, recValue \
+                = bermudanSwaption_Grid_Fast(texp, tmat, strike, face,
+                                             couponTimes, couponFlows,
+                                             exerciseTypeInt,
+                                             self._dfTimes, self._dfs,
+                                             self._treeTimes, self._rt,
+                                             self._lo, self._hi, self._child,
+                                             self._pu, self._pm, self._pd)
+
+            return {'pay': payValue, 'rec': recValue}
+
         payValue, recValue \
             = bermudanSwaption_Tree_Fast(texp, tmat, strike, face,
                                          couponTimes, couponFlows,
@@ -1127,6 +1478,75 @@ class FinModelRatesHW():
 
         return {'pay': payValue, 'rec': recValue}
 
+###############################################################################
+
+    def bermudanSwaptionMany(self, texps, strikes, face,
+                             couponTimesList, couponFlowsList, exerciseTypes):
+        ''' Value many swaptions that can be exercised on specific dates over
+        their exercise periods in one backward sweep of the tree. The tree
+        must extend out to the last swap maturity. Each swaption has its own
+        expiry, strike, coupon times and flows and exercise type. Returns
+        arrays of the payer and receiver values. '''
+
+        numTrades = len(texps)
+
+        if len(strikes) != numTrades or len(couponTimesList) != numTrades \
+           or len(couponFlowsList) != numTrades \
+           or len(exerciseTypes) != numTrades:
+            raise FinError("Swaption inputs must all have the same length.")
+
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Swaption batches need a uniform tree grid.")
+
+        numTimeSteps = len(self._treeTimes)
+
+        expirySteps = np.zeros(numTrades, dtype=np.int64)
+        maturitySteps = np.zeros(numTrades, dtype=np.int64)
+        exerciseTypeInts = np.zeros(numTrades, dtype=np.int64)
+        fixedLegFlows = np.zeros(shape=(numTimeSteps, numTrades))
+        floatLegValues = np.zeros(shape=(numTimeSteps, numTrades))
+        accrued = np.zeros(shape=(numTimeSteps, numTrades))
+
+        for j in range(0, numTrades):
+
+            texp = texps[j]
+            couponTimes = couponTimesList[j]
+            tmat = couponTimes[-1]
+
+            if texp > tmat:
+                raise FinError("Option expiry after bond matures.")
+
+            if texp < 0.0:
+                raise FinError("Option expiry time negative.")
+
+            exerciseTypeInts[j] = optionExerciseTypesToInt(exerciseTypes[j])
+
+            if exerciseTypeInts[j] == 3:
+                raise FinError("American optionality not supported.")
+
+            expirySteps[j] = int(texp/self._dt + 0.50)
+            maturitySteps[j] = int(tmat/self._dt + 0.50)
+
+            if maturitySteps[j] > numTimeSteps - 1:
+                raise FinError("Tree does not extend to swap maturity.")
+
+            fixedLegFlows[:, j], floatLegValues[:, j], accrued[:, j] \
+                = bermudanSwaptionFlows_Tree_Fast(texp, tmat, strikes[j],
+                                                  face, couponTimes,
+                                                  couponFlowsList[j],
+                                                  self._dfTimes, self._dfs,
+                                                  self._treeTimes, self._dt)
+
+        payValues, recValues \
+            = bermudanSwaptionMany_Tree_Fast(expirySteps, maturitySteps,
+                                             exerciseTypeInts, face,
+                                             fixedLegFlows, floatLegValues,
+                                             accrued, self._Q,
+                                             self._pu, self._pm, self._pd,
+                                             self._rt, self._dt, self._a)
+
+        return {'pay': payValues, 'rec': recValues}
+
 ###############################################################################
 
     def bondOption(self, texp, strikePrice, faceAmount, 
@@ -1138,6 +1558,11 @@ class FinModelRatesHW():
 
         exerciseTypeInt = optionExerciseTypesToInt(exerciseType)
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            if exerciseTypeInt != 1 or \
+               self._europeanCalcType != FinHWEuropeanCalcType.JAMSHIDIAN:
+                raise FinError("Bond options need a uniform tree grid.")
+
         if exerciseTypeInt == 1:
             
             if self._europeanCalcType == FinHWEuropeanCalcType.JAMSHIDIAN:
@@ -1222,6 +1647,19 @@ class FinModelRatesHW():
         callPrices = np.array(callPrices)
         putPrices = np.array(putPrices)
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+
+            return callablePuttableBond_Grid_Fast(couponTimes, couponFlows,
+                                                  callTimes, callPrices,
+                                                  putTimes, putPrices,
+                                                  faceAmount,
+                                                  self._dfTimes, self._dfs,
+                                                  self._treeTimes, self._rt,
+                                                  self._lo, self._hi,
+                                                  self._child,
+                                                  self._pu, self._pm,
+                                                  self._pd)
+
         v = callablePuttableBond_Tree_Fast(couponTimes, couponFlows,
                                            callTimes, callPrices,
                                            putTimes, putPrices,
@@ -1245,6 +1683,9 @@ class FinModelRatesHW():
         if tmat == 0.0:
             return 1.0
 
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+            raise FinError("Time not on tree time grid")
+
         _, numNodes = self._Q.shape
         fn1 = tmat/self._dt
         fn2 = float(int(tmat/self._dt))
@@ -1262,8 +1703,12 @@ class FinModelRatesHW():
 
 ###############################################################################
 
-    def buildTree(self, treeMat, dfTimes, dfValues):
-        ''' Build the trinomial tree. '''
+    def buildTree(self, treeMat, dfTimes, dfValues, eventTimes=None):
+        ''' Build the trinomial tree. If the model has a tree horizon after
+        treeMat then the tree out to the horizon is taken from the tree cache
+        and only its steps out to treeMat are used. If the model has an event
+        aligned tree grid then the tree has a time on each of the eventTimes
+        which are the coupon and exercise times of the trade. '''
 
         if isinstance(dfTimes, np.ndarray) is False:
             raise FinError("DF TIMES must be a numpy vector")
@@ -1271,6 +1716,51 @@ class FinModelRatesHW():
         if isinstance(dfValues, np.ndarray) is False:
             raise FinError("DF VALUES must be a numpy vector")
 
+        self._dfTimes = dfTimes
+        self._dfs = dfValues
+
+        if self._treeGridType == FinTreeGridTypes.EVENT_ALIGNED:
+
+            if eventTimes is None:
+                eventTimes = []
+
+            treeTimes = eventTreeTimes(treeMat, eventTimes,
+                                       self._numTimeSteps)
+            dfTree = treeDiscountFactors(treeTimes, dfTimes, dfValues)
+
+            x, self._lo, self._hi, self._child, \
+                self._pu, self._pm, self._pd \
+                = trinomialGrid_Fast(self._a, self._sigma, treeTimes)
+
+            self._Q, self._rt = fitNormalGrid_Fast(x, self._lo, self._hi,
+                                                   self._child, self._pu,
+                                                   self._pm, self._pd,
+                                                   treeTimes, dfTree)
+            self._treeTimes = treeTimes
+            self._dt = None
+
+        elif self._treeHorizon is None or treeMat > self._treeHorizon:
+
+            self._treeTimes, self._Q, self._pu, self._pm, self._pd, \
+                self._rt, self._dt = self._buildTree(treeMat, dfTimes,
+                                                     dfValues)
+        else:
+
+            treeTimes, Q, self._pu, self._pm, self._pd, rt, self._dt \
+                = cachedTree(self, dfTimes, dfValues)
+
+            numRows = numTreeRows(treeTimes, self._dt, treeMat)
+            self._treeTimes = treeTimes[0:numRows]
+            self._Q = Q[0:numRows]
+            self._rt = rt[0:numRows]
+
+        return
+
+###############################################################################
+
+    def _buildTree(self, treeMat, dfTimes, dfValues):
+        ''' Build the trinomial tree out to treeMat and return its arrays. '''
+
         # I wish to add on an additional time to the tree so that the second
         # last time corresponds to a maturity treeMat. For this reason I scale
         # up the maturity date of the tree as follows
@@ -1278,7 +1768,6 @@ class FinModelRatesHW():
 
         # The vector of times goes out to this maturity
         treeTimes = np.linspace(0.0, treeMaturity, self._numTimeSteps + 2)
-        self._treeTimes = treeTimes
 
         dfTree = np.zeros(shape=(self._numTimeSteps+2))
         dfTree[0] = 1.0
@@ -1287,14 +1776,11 @@ class FinModelRatesHW():
             t = treeTimes[i]
             dfTree[i] = _uinterpolate(t, dfTimes, dfValues, interp)
 
-        self._dfTimes = dfTimes
-        self._dfs = dfValues
+        Q, pu, pm, pd, rt, dt = buildTree_Fast(self._a, self._sigma,
+                                               treeTimes, self._numTimeSteps,
+                                               dfTree)
 
-        self._Q, self._pu, self._pm, self._pd, self._rt, self._dt \
-            = buildTree_Fast(self._a, self._sigma,
-                             treeTimes, self._numTimeSteps, dfTree)
-
-        return
+        return (treeTimes, Q, pu, pm, pd, rt, dt)
 
 ###############################################################################
 
@@ -1306,6 +1792,8 @@ class FinModelRatesHW():
         s += labelToString("a", self._a)
         s += labelToString("numTimeSteps", self._numTimeSteps)
         s += labelToString("EuropeanCalcTypes", self._europeanCalcType)
+        s += labelToString("treeHorizon", self._treeHorizon)
+        s += labelToString("treeGridType", self._treeGridType)
         return s
 
 ###############################################################################
@@ -0,0 +1,657 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+
+from ..finutils.FinError import FinError
+from ..finutils.FinDate import FinDate
+from ..finutils.FinGlobalVariables import gDaysInYear
+from ..finutils.FinGlobalTypes import FinSwapTypes
+from ..finutils.FinHelperFunctions import labelToString
+from .FinSobol import getGaussianSobolBlock, sArr
+
+###############################################################################
+# Monte Carlo simulation of the Hull-White model fitted to a discount curve.
+# The short rate is r(t) = x(t) + alpha(t) where x is an Ornstein-Uhlenbeck
+# process that starts at zero and alpha(t) fits the model to the curve. The
+# process x and its integral are jointly Gaussian so that each step of the
+# simulation is exact whatever its length and the dates can be far apart.
+# On each path the zero coupon bond price from time t to T is analytic
+#
+#   P(t,T) = P(0,T)/P(0,t) exp(0.5*(V(t,T) - V(0,T) + V(0,t)) - B(t,T) x(t))
+#
+# where V(t,T) is the variance of the integral of x from t to T. This lets a
+# swap be revalued on every path and date without a nested simulation. The
+# numeraire is the bank account whose discount factor to time t on a path is
+# D(0,t) = P(0,t) exp(-0.5*V(0,t) - int_0^t x(s) ds). The paths are created
+# in chunks so that the memory used is bounded for any number of paths.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _bFn(a, tau):
+    ''' The function B(tau) = (1 - exp(-a tau)) / a with its limit for small
+    mean reversion. '''
+
+    if a * tau < 1e-6:
+        return tau * (1.0 - 0.5 * a * tau)
+
+    return -np.expm1(-a * tau) / a
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _xVariance(a, sigma, tau):
+    ''' The variance of x after a time tau starting from a known value. '''
+
+    if a * tau < 1e-6:
+        return sigma * sigma * tau * (1.0 - a * tau)
+
+    return -sigma * sigma * np.expm1(-2.0 * a * tau) / (2.0 * a)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _intVariance(a, sigma, tau):
+    ''' The variance V of the integral of x over a period of length tau which
+    starts from a known value of x. This is sigma^2 times the integral of
+    B(s)^2 from 0 to tau. A series is used when a * tau is small as the
+    closed form then loses its precision. '''
+
+    at = a * tau
+
+    if at < 1e-3:
+        return sigma * sigma * tau**3 * (1.0/3.0 - at/4.0 + 7.0*at*at/60.0)
+
+    b = -np.expm1(-at) / a
+    b2 = -np.expm1(-2.0 * at) / (2.0 * a)
+    return sigma * sigma * (tau - 2.0 * b + b2) / (a * a)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def simulateHW_Fast(a, sigma, times, g):
+    ''' Simulate x and its integral y at the times which start at zero. Each
+    step uses two columns of the matrix of standard normal draws g which has
+    a row for each path. The transition is exact for any step length. '''
+
+    numPaths = g.shape[0]
+    numTimes = len(times)
+
+    x = np.zeros(shape=(numPaths, numTimes))
+    y = np.zeros(shape=(numPaths, numTimes))
+
+    for k in range(1, numTimes):
+
+        dt = times[k] - times[k-1]
+        e = np.exp(-a * dt)
+        b = _bFn(a, dt)
+        varX = _xVariance(a, sigma, dt)
+        varY = _intVariance(a, sigma, dt)
+        covXY = 0.5 * sigma * sigma * b * b
+
+        sx = np.sqrt(varX)
+
+        # Cholesky decomposition of the covariance of the two increments
+        if sx > 0.0:
+            cy = covXY / sx
+        else:
+            cy = 0.0
+
+        sy = np.sqrt(max(varY - cy * cy, 0.0))
+
+        for p in range(0, numPaths):
+            g1 = g[p, 2*k-2]
+            g2 = g[p, 2*k-1]
+            x[p, k] = x[p, k-1] * e + sx * g1
+            y[p, k] = y[p, k-1] + x[p, k-1] * b + cy * g1 + sy * g2
+
+    return x, y
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _zcbFactors(a, sigma, t, pt, T, pT):
+    ''' The deterministic factor A and the loading B of the zero coupon bond
+    price P(t,T) = A exp(-B x(t)) on a path. '''
+
+    if T <= t:
+        return 1.0, 0.0
+
+    b = _bFn(a, T - t)
+    v = _intVariance(a, sigma, T - t) - _intVariance(a, sigma, T) \
+        + _intVariance(a, sigma, t)
+    return (pT / pt) * np.exp(0.5 * v), b
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def swapValues_Fast(a, sigma, gridTimes, gridDfs, x, dateIndices,
+                    fixedPayTimes, fixedPayDfs, fixedAmounts,
+                    fltStartTimes, fltStartDfs, fltEndTimes, fltEndDfs,
+                    fltPayTimes, fltPayDfs, fltAlphas, fltFixIndices,
+                    fltKnown, fltKnownRates, fltNotional, fltSpread):
+    ''' Value a fixed versus floating swap on every path at the grid times
+    given by dateIndices. The simulated x is on the grid times which include
+    the start date of each floating period that fixes on a path. The fixed
+    amounts and the floating notional carry the sign of each leg. Floating
+    periods with a known rate are flagged by fltKnown. The factors of each
+    bond price are found once for each date and then used on all paths. '''
+
+    numPaths = x.shape[0]
+    numDates = len(dateIndices)
+    numFixed = len(fixedPayTimes)
+    numFloat = len(fltPayTimes)
+
+    values = np.zeros(shape=(numPaths, numDates))
+
+    # The bond from the fixing date to the end of each floating period
+    fixA = np.zeros(numFloat)
+    fixB = np.zeros(numFloat)
+
+    for j in range(0, numFloat):
+        k = fltFixIndices[j]
+        if k >= 0:
+            fixA[j], fixB[j] = _zcbFactors(a, sigma, gridTimes[k], gridDfs[k],
+                                           fltEndTimes[j], fltEndDfs[j])
+
+    fixedA = np.zeros(numFixed)
+    fixedB = np.zeros(numFixed)
+    payA = np.zeros(numFloat)
+    payB = np.zeros(numFloat)
+    startA = np.zeros(numFloat)
+    startB = np.zeros(numFloat)
+    endA = np.zeros(numFloat)
+    endB = np.zeros(numFloat)
+
+    for i in range(0, numDates):
+
+        k = dateIndices[i]
+        t = gridTimes[k]
+        pt = gridDfs[k]
+
+        for j in range(0, numFixed):
+            fixedA[j], fixedB[j] = _zcbFactors(a, sigma, t, pt,
+                                               fixedPayTimes[j],
+                                               fixedPayDfs[j])
+
+        for j in range(0, numFloat):
+            payA[j], payB[j] = _zcbFactors(a, sigma, t, pt, fltPayTimes[j],
+                                           fltPayDfs[j])
+            startA[j], startB[j] = _zcbFactors(a, sigma, t, pt,
+                                               fltStartTimes[j],
+                                               fltStartDfs[j])
+            endA[j], endB[j] = _zcbFactors(a, sigma, t, pt, fltEndTimes[j],
+                                           fltEndDfs[j])
+
+        for p in range(0, numPaths):
+
+            xt = x[p, k]
+            v = 0.0
+
+            for j in range(0, numFixed):
+                if fixedPayTimes[j] > t:
+                    v += fixedAmounts[j] * fixedA[j] * np.exp(-fixedB[j] * xt)
+
+            for j in range(0, numFloat):
+
+                if fltPayTimes[j] <= t:
+                    continue
+
+                alpha = fltAlphas[j]
+                dfPay = payA[j] * np.exp(-payB[j] * xt)
+
+                if fltKnown[j] == 1:
+                    rate = fltKnownRates[j]
+                elif fltStartTimes[j] > t:
+                    dfStart = startA[j] * np.exp(-startB[j] * xt)
+                    dfEnd = endA[j] * np.exp(-endB[j] * xt)
+                    rate = (dfStart / dfEnd - 1.0) / alpha
+                else:
+                    xs = x[p, fltFixIndices[j]]
+                    dfEnd = fixA[j] * np.exp(-fixB[j] * xs)
+                    rate = (1.0 / dfEnd - 1.0) / alpha
+
+                v += fltNotional * (rate + fltSpread) * alpha * dfPay
+
+            values[p, i] = v
+
+    return values
+
+###############################################################################
+
+
+def _curveDfs(discountCurve, valuationDate, dates):
+    ''' The discount factors from the valuation date to a list of dates. '''
+
+    if len(dates) == 0:
+        return np.zeros(0)
+
+    dfs = np.array(discountCurve.df(list(dates)), dtype=np.float64)
+    dfValue = np.array(discountCurve.df([valuationDate]))[0]
+    return dfs.reshape(-1) / dfValue
+
+###############################################################################
+
+
+class FinModelRatesHWSimulator():
+    ''' Monte Carlo simulation of the Hull-White short rate model fitted to a
+    discount curve. The short rate and the discount factor of the bank account
+    are simulated on a grid of dates with exact transitions. The draws can be
+    pseudo random or Sobol and antithetic. The paths are generated in chunks
+    to bound the memory used. Swaps can be revalued on every path and date
+    using the analytic zero coupon bond price of the model. '''
+
+    def __init__(self,
+                 sigma: float,
+                 a: float,
+                 numPaths: int = 10000,
+                 seed: int = 42,
+                 useSobol: bool = False,
+                 useAntithetics: bool = True,
+                 chunkSize: int = None):
+        ''' Create the simulator with the Hull-White volatility sigma and mean
+        reversion a. The short rate process is dr = (theta(t) - ar) * dt +
+        sigma * dW. The paths are generated chunkSize at a time, or all at
+        once if chunkSize is None. With antithetic variates each path is
+        followed by its mirror image so the number of paths and the chunk size
+        must be even. '''
+
+        if sigma < 0.0:
+            raise FinError("Negative volatility not allowed.")
+
+        if a < 0.0:
+            raise FinError("Mean reversion speed parameter should be >= 0.")
+
+        if numPaths < 1:
+            raise FinError("Number of paths must be positive.")
+
+        if chunkSize is None:
+            chunkSize = numPaths
+
+        if chunkSize < 1:
+            raise FinError("Chunk size must be positive.")
+
+        if useAntithetics is True:
+            if numPaths % 2 == 1 or chunkSize % 2 == 1:
+                raise FinError("Antithetics need an even number of paths.")
+
+        self._sigma = sigma
+        self._a = a
+        self._numPaths = numPaths
+        self._seed = seed
+        self._useSobol = useSobol
+        self._useAntithetics = useAntithetics
+        self._chunkSize = chunkSize
+
+###############################################################################
+
+    def simulate(self,
+                 valuationDate: FinDate,
+                 discountCurve,
+                 simDates: list):
+        ''' Simulate all of the paths on the simulation dates. Returns the
+        times of the dates in years, the matrix of short rates and the matrix
+        of bank account discount factors with a row for each path. '''
+
+        numDates = len(simDates)
+        rt = np.zeros(shape=(self._numPaths, numDates))
+        dfs = np.zeros(shape=(self._numPaths, numDates))
+
+        for firstPath, chunkRt, chunkDfs in self.simulateChunks(valuationDate,
+                                                                discountCurve,
+                                                                simDates):
+            lastPath = firstPath + chunkRt.shape[0]
+            rt[firstPath:lastPath] = chunkRt
+            dfs[firstPath:lastPath] = chunkDfs
+
+        times = self._times(valuationDate, simDates)
+        return times, rt, dfs
+
+###############################################################################
+
+    def simulateChunks(self,
+                       valuationDate: FinDate,
+                       discountCurve,
+                       simDates: list):
+        ''' Generator which yields the index of the first path of each chunk
+        of paths with the matrices of the short rates and bank account
+        discount factors of the chunk on the simulation dates. '''
+
+        times = self._times(valuationDate, simDates)
+
+        dfs0 = _curveDfs(discountCurve, valuationDate, simDates)
+        fwds = np.array([discountCurve.fwd(dt) for dt in simDates])
+
+        a = self._a
+        sigma = self._sigma
+
+        # The drift which fits the model to the curve is alpha(t) and the
+        # variance of the integral of x sets the convexity of the numeraire
+        alpha = np.zeros(len(times))
+        intVar = np.zeros(len(times))
+        for i in range(0, len(times)):
+            b = _bFn(a, times[i])
+            alpha[i] = fwds[i] + 0.5 * sigma * sigma * b * b
+            intVar[i] = _intVariance(a, sigma, times[i])
+
+        # The simulation starts at time zero
+        if times[0] > 0.0:
+            gridTimes = np.concatenate((np.zeros(1), times))
+        else:
+            gridTimes = times
+
+        n = len(gridTimes) - len(times)
+
+        for firstPath, g in self._normalChunks(2 * (len(gridTimes) - 1)):
+            x, y = simulateHW_Fast(a, sigma, gridTimes, g)
+            rt = x[:, n:] + alpha
+            dfs = dfs0 * np.exp(-0.5 * intVar - y[:, n:])
+            yield firstPath, rt, dfs
+
+###############################################################################
+
+    def swapValues(self,
+                   swap,
+                   valuationDate: FinDate,
+                   discountCurve,
+                   simDates: list,
+                   firstFixingRate: float = None):
+        ''' Value a FinIborSwap on every path on each of the simulation dates.
+        The floating rate of each period is fixed on its start date on the
+        path. The fixing of a period which starts before the valuation date is
+        firstFixingRate if it is given or the forward rate on the curve as in
+        the swap value method. Returns a matrix with a row for each path. '''
+
+        values = np.zeros(shape=(self._numPaths, len(simDates)))
+
+        for firstPath, chunkValues, _ in self._swapChunks(swap,
+                                                          valuationDate,
+                                                          discountCurve,
+                                                          simDates,
+                                                          firstFixingRate):
+            lastPath = firstPath + chunkValues.shape[0]
+            values[firstPath:lastPath] = chunkValues
+
+        return values
+
+###############################################################################
+
+    def swapExposures(self,
+                      swap,
+                      valuationDate: FinDate,
+                      discountCurve,
+                      simDates: list,
+                      firstFixingRate: float = None):
+        ''' Calculate the exposure profile of a FinIborSwap on the simulation
+        dates. The statistics are accumulated one chunk of paths at a time so
+        the pathwise values are never all held in memory. Returns a dictionary
+        of the expected value, the expected positive and negative exposures
+        and the expected value and positive exposure discounted with the bank
+        account on each date. '''
+
+        numDates = len(simDates)
+        sumValue = np.zeros(numDates)
+        sumPositive = np.zeros(numDates)
+        sumNegative = np.zeros(numDates)
+        sumDiscountedValue = np.zeros(numDates)
+        sumDiscountedPositive = np.zeros(numDates)
+
+        for _, values, dfs in self._swapChunks(swap, valuationDate,
+                                               discountCurve, simDates,
+                                               firstFixingRate):
+            positive = np.maximum(values, 0.0)
+            sumValue += np.sum(values, axis=0)
+            sumPositive += np.sum(positive, axis=0)
+            sumNegative += np.sum(np.minimum(values, 0.0), axis=0)
+            sumDiscountedValue += np.sum(values * dfs, axis=0)
+            sumDiscountedPositive += np.sum(positive * dfs, axis=0)
+
+        numPaths = self._numPaths
+
+        return {'ee': sumValue / numPaths,
+                'epe': sumPositive / numPaths,
+                'ene': sumNegative / numPaths,
+                'discountedEE': sumDiscountedValue / numPaths,
+                'discountedEPE': sumDiscountedPositive / numPaths}
+
+###############################################################################
+
+    def _swapChunks(self, swap, valuationDate, discountCurve, simDates,
+                    firstFixingRate):
+        ''' Generator which yields the index of the first path of each chunk
+        with the matrices of the swap values and the bank account discount
+        factors of the chunk on the simulation dates. '''
+
+        simTimes = self._times(valuationDate, simDates)
+
+        def timesAndDfs(dates):
+            times = np.array([(dt - valuationDate) / gDaysInYear
+                              for dt in dates])
+            return times, _curveDfs(discountCurve, valuationDate, dates)
+
+        #######################################################################
+        # Fixed leg flows after the valuation date
+        #######################################################################
+
+        fixedLeg = swap._fixedLeg
+
+        fixedSign = 1.0
+        if fixedLeg._legType == FinSwapTypes.PAY:
+            fixedSign = -1.0
+
+        fixedPayDates = []
+        fixedAmounts = []
+
+        for pmntDate, pmnt in zip(fixedLeg._paymentDates, fixedLeg._payments):
+            if pmntDate > valuationDate:
+                fixedPayDates.append(pmntDate)
+                fixedAmounts.append(fixedSign * pmnt)
+
+        fixedPayTimes, fixedPayDfs = timesAndDfs(fixedPayDates)
+        fixedAmounts = np.array(fixedAmounts)
+
+        #######################################################################
+        # Floating leg periods after the valuation date
+        #######################################################################
+
+        floatLeg = swap._floatLeg
+
+        fltSign = 1.0
+        if floatLeg._legType == FinSwapTypes.PAY:
+            fltSign = -1.0
+
+        lastSimTime = simTimes[-1]
+
+        fltPeriods = []
+        fixingDates = []
+        firstPayment = True
+
+        for iPmnt in range(0, len(floatLeg._paymentDates)):
+
+            pmntDate = floatLeg._paymentDates[iPmnt]
+
+            if pmntDate <= valuationDate:
+                continue
+
+            startDate = floatLeg._startAccruedDates[iPmnt]
+            endDate = floatLeg._endAccruedDates[iPmnt]
+            alpha = floatLeg._yearFracs[iPmnt]
+            tStart = (startDate - valuationDate) / gDaysInYear
+
+            # The known rates follow the value method of the floating leg
+            known = 0
+            knownRate = 0.0
+
+            if firstPayment is True and firstFixingRate is not None:
+                known = 1
+                knownRate = firstFixingRate
+            elif startDate <= valuationDate:
+                known = 1
+                dfStart, dfEnd = _curveDfs(discountCurve, valuationDate,
+                                           [startDate, endDate])
+                knownRate = (dfStart / dfEnd - 1.0) / alpha
+            elif tStart <= lastSimTime:
+                fixingDates.append(startDate)
+
+            firstPayment = False
+
+            fltPeriods.append((startDate, endDate, pmntDate, alpha, known,
+                               knownRate))
+
+        #######################################################################
+        # The grid has the simulation dates and the fixing dates before the
+        # last simulation date
+        #######################################################################
+
+        gridDates = {}
+        for dt in list(simDates) + fixingDates:
+            gridDates[dt._excelDate] = dt
+
+        gridDates = [gridDates[k] for k in sorted(gridDates.keys())]
+
+        if gridDates[0] > valuationDate:
+            gridDates.insert(0, valuationDate)
+
+        gridTimes, gridDfs = timesAndDfs(gridDates)
+        dateIndices = np.searchsorted(gridTimes, simTimes)
+
+        numFloat = len(fltPeriods)
+
+        # The start of a period with a known rate is not used and can be
+        # before the valuation date where the curve may not be defined
+        fltStartTimes, fltStartDfs \
+            = timesAndDfs([max(p[0], valuationDate) for p in fltPeriods])
+        fltEndTimes, fltEndDfs = timesAndDfs([p[1] for p in fltPeriods])
+        fltPayTimes, fltPayDfs = timesAndDfs([p[2] for p in fltPeriods])
+        fltAlphas = np.array([p[3] for p in fltPeriods])
+        fltKnown = np.array([p[4] for p in fltPeriods], dtype=np.int64)
+        fltKnownRates = np.array([p[5] for p in fltPeriods])
+        fltFixIndices = np.zeros(numFloat, dtype=np.int64)
+
+        for j in range(0, numFloat):
+            fltFixIndices[j] = -1
+            if fltKnown[j] == 0 and fltStartTimes[j] <= lastSimTime:
+                fltFixIndices[j] = np.searchsorted(gridTimes,
+                                                   fltStartTimes[j])
+
+        fltNotional = fltSign * floatLeg._notional
+        fltSpread = floatLeg._spread
+
+        #######################################################################
+
+        a = self._a
+        sigma = self._sigma
+
+        # Bank account discount factors on the simulation dates
+        intVar = np.array([_intVariance(a, sigma, t) for t in gridTimes])
+
+        # The grid starts at time zero which is not a step of the simulation
+        for firstPath, g in self._normalChunks(2 * (len(gridTimes) - 1)):
+
+            x, y = simulateHW_Fast(a, sigma, gridTimes, g)
+
+            values = swapValues_Fast(a, sigma, gridTimes, gridDfs, x,
+                                     dateIndices, fixedPayTimes, fixedPayDfs,
+                                     fixedAmounts,
+                                     fltStartTimes, fltStartDfs,
+                                     fltEndTimes, fltEndDfs,
+                                     fltPayTimes, fltPayDfs, fltAlphas,
+                                     fltFixIndices, fltKnown, fltKnownRates,
+                                     fltNotional, fltSpread)
+
+            dfs = gridDfs[dateIndices] * np.exp(-0.5 * intVar[dateIndices]
+                                                - y[:, dateIndices])
+
+            yield firstPath, values, dfs
+
+###############################################################################
+
+    def _times(self, valuationDate, simDates):
+        ''' The times in years of the simulation dates which must not be
+        before the valuation date and must be increasing. '''
+
+        if len(simDates) == 0:
+            raise FinError("No simulation dates.")
+
+        times = np.array([(dt - valuationDate) / gDaysInYear
+                          for dt in simDates])
+
+        if times[0] < 0.0:
+            raise FinError("Simulation dates before valuation date.")
+
+        if np.any(np.diff(times) <= 0.0):
+            raise FinError("Simulation dates must be increasing.")
+
+        return times
+
+###############################################################################
+
+    def _normalChunks(self, dimension):
+        ''' Generator which yields the index of the first path of each chunk
+        of paths with a matrix of standard normal draws with a row for each
+        path of the chunk. The draws do not depend on the chunk size. '''
+
+        if self._useSobol is True and dimension > len(sArr) + 1:
+            raise FinError("Too many time steps for the Sobol generator.")
+
+        rng = np.random.default_rng(self._seed)
+
+        numPaths = self._numPaths
+        firstPath = 0
+
+        while firstPath < numPaths:
+
+            numChunkPaths = min(self._chunkSize, numPaths - firstPath)
+
+            if self._useAntithetics is True:
+                numDraws = numChunkPaths // 2
+                firstDraw = firstPath // 2
+            else:
+                numDraws = numChunkPaths
+                firstDraw = firstPath
+
+            if self._useSobol is True:
+                z = getGaussianSobolBlock(firstDraw, numDraws, dimension)
+            else:
+                z = rng.standard_normal((numDraws, dimension))
+
+            if self._useAntithetics is True:
+                g = np.empty(shape=(numChunkPaths, dimension))
+                g[0::2] = z
+                g[1::2] = -z
+            else:
+                g = z
+
+            yield firstPath, g
+
+            firstPath += numChunkPaths
+
+###############################################################################
+
+    def __repr__(self):
+        ''' Return string with class details. '''
+
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("Sigma", self._sigma)
+        s += labelToString("a", self._a)
+        s += labelToString("numPaths", self._numPaths)
+        s += labelToString("seed", self._seed)
+        s += labelToString("useSobol", self._useSobol)
+        s += labelToString("useAntithetics", self._useAntithetics)
+        s += labelToString("chunkSize", self._chunkSize)
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
@@ -3,12 +3,13 @@
 ##############################################################################
 
 import numpy as np
-from numba import jit, njit, float64, int64 # , prange DOES NOT WORK ON GITHUB
+from numba import jit, njit, float64, int64, uint64, prange
 
 from ..finutils.FinError import FinError
 from ..finutils.FinMath import N
 from ..finutils.FinMath import norminvcdf
 from ..models.FinSobol import getUniformSobol
+from ..models.FinSobol import getUniformSobolBlock
 
 # TO DO: SHIFTED LOGNORMAL
 # TO DO: TERMINAL MEASURE
@@ -297,6 +298,244 @@ def CholeskyNP(rho):
     return chol
 
 ###############################################################################
+# The paths of the parallel simulations are split into chunks of a fixed size
+# which are simulated on different threads. Pseudo random draws come from a
+# counter-based generator in which draw d of path p is a hash of the seed, p
+# and d. So a path does not depend on which thread simulates it or on how many
+# threads there are. Prices are summed over the paths of each chunk and then
+# over the chunks in a fixed order so they do not depend on the threads either.
+###############################################################################
+
+PATH_CHUNK_SIZE = 256
+
+SPLITMIX_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+###############################################################################
+
+
+@njit(uint64(uint64), cache=True)
+def _splitMix64(z):
+    ''' The SplitMix64 finaliser which maps a 64 bit counter to a 64 bit
+    integer that looks random. '''
+
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+###############################################################################
+
+
+@njit(uint64(int64, int64), cache=True)
+def _pathKey(seed, iPath):
+    ''' The key of the random stream of a path. '''
+
+    z = _splitMix64(np.uint64(seed) * SPLITMIX_GAMMA + SPLITMIX_GAMMA)
+    return _splitMix64(z + np.uint64(iPath) * SPLITMIX_GAMMA)
+
+###############################################################################
+
+
+@njit(float64(uint64, int64), cache=True, fastmath=True)
+def _counterNormal(pathKey, iDraw):
+    ''' Gaussian draw number iDraw of the stream of a path. The uniform is
+    built from the top 53 bits of the hash so it lies strictly inside (0,1).
+    '''
+
+    z = _splitMix64(pathKey + np.uint64(iDraw + 1) * SPLITMIX_GAMMA)
+    u = (float64(z >> np.uint64(11)) + 0.5) / 9007199254740992.0
+    return norminvcdf(u)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _pathNormals(g, rands, iRand, useSobol, seed, iPath):
+    ''' Fill the vector g with the Gaussian draws of path iPath. These are
+    taken from row iRand of the Sobol uniforms or from the counter-based
+    stream of the path. '''
+
+    if useSobol == 1:
+        for d in range(0, len(g)):
+            g[d] = norminvcdf(rands[iRand, d])
+    else:
+        pathKey = _pathKey(seed, iPath)
+        for d in range(0, len(g)):
+            g[d] = _counterNormal(pathKey, d)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _correlationFactors(correl, numForwards):
+    ''' The correlation matrix of the forwards that have not fixed at each
+    time step and its Cholesky factor. Entry j of each holds the matrix of
+    the numForwards - j forwards that are alive at time step j. '''
+
+    corrs = np.zeros((numForwards, numForwards, numForwards))
+    factors = np.zeros((numForwards, numForwards, numForwards))
+
+    for ix in range(1, numForwards):  # from 1 to p-1
+        matrix = subMatrix(correl, ix - 1)
+        chol = CholeskyNP(matrix)
+        size = len(matrix)
+        corrs[ix, :size, :size] = matrix
+        factors[ix, :size, :size] = chol
+
+    return corrs, factors
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _evolvePathNF(fwd, iPath, g, numForwards, fwd0, zetas, corrs, factors,
+                  taus, fwdB):
+    ''' Evolve the forward curve of one path in the full N-factor model. Row
+    j of g holds the independent Gaussian draws for time step j. '''
+
+    # Initial value of forward curve at time 0
+    for iFwd in range(0, numForwards):
+        fwd[iPath, 0, iFwd] = fwd0[iFwd]
+
+    for j in range(1, numForwards):  # TIME LOOP
+
+        dt = taus[j]
+        sqrtdt = np.sqrt(dt)
+
+        for i in range(j, numForwards):  # FORWARDS LOOP
+
+            zi = zetas[i]
+
+            muA = 0.0
+            for k in range(j, i+1):
+                rho = corrs[j, k-j, i-j]
+                fk = fwd[iPath, j-1, k]
+                zk = zetas[k]
+                tk = taus[k]
+                muA += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+
+            w = 0.0
+            for k in range(0, numForwards-j):
+                f = factors[j, i-j, k]
+                w = w + f * g[j, k]
+
+            fwdB[i] = fwd[iPath, j-1, i] \
+                * np.exp(muA * dt - 0.5 * (zi**2) * dt + zi * w * sqrtdt)
+
+            muB = 0.0
+            for k in range(j, i+1):
+                rho = corrs[j, k-j, i-j]
+                fk = fwdB[k]
+                zk = zetas[k]
+                tk = taus[k]
+                muB += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+
+            muAvg = 0.5*(muA + muB)
+            x = np.exp(muAvg * dt - 0.5 * (zi**2) * dt + zi * w * sqrtdt)
+            fwd[iPath, j, i] = fwd[iPath, j-1, i] * x
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _evolvePath1F(fwd, iPath, g, numForwards, fwd0, gammas, taus, fwdB):
+    ''' Evolve the forward curve of one path in the one factor model. Entry
+    j of g is the Gaussian draw for time step j. '''
+
+    # Initial value of forward curve at time 0
+    for iFwd in range(0, numForwards):
+        fwd[iPath, 0, iFwd] = fwd0[iFwd]
+
+    for j in range(0, numForwards-1):  # TIME LOOP
+        dtj = taus[j]
+        sqrtdtj = np.sqrt(dtj)
+        w = g[j]
+
+        for k in range(j, numForwards):  # FORWARDS LOOP
+            zkj = gammas[k-j]
+            muA = 0.0
+
+            for i in range(j+1, k+1):
+                fi = fwd[iPath, j, i]
+                zij = gammas[i-j]
+                ti = taus[i]
+                muA += zkj * fi * ti * zij / (1.0 + fi * ti)
+
+            # predictor corrector
+            x = np.exp(muA * dtj - 0.5*(zkj**2) * dtj + zkj * w * sqrtdtj)
+            fwdB[k] = fwd[iPath, j, k] * x
+
+            muB = 0.0
+            for i in range(j+1, k+1):
+                fi = fwdB[k]
+                zij = gammas[i-j]
+                ti = taus[i]
+                muB += zkj * fi * ti * zij / (1.0 + fi * ti)
+
+            muC = 0.5*(muA+muB)
+
+            x = np.exp(muC*dtj - 0.5 * (zkj**2) * dtj + zkj * w * sqrtdtj)
+            fwd[iPath, j+1, k] = fwd[iPath, j, k] * x
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _evolvePathMF(fwd, iPath, g, numForwards, numFactors, fwd0, lambdas,
+                  taus, fwdB):
+    ''' Evolve the forward curve of one path in the multi-factor model. Row j
+    of g holds the Gaussian draw of each factor for time step j. '''
+
+    # Initial value of forward curve at time 0
+    for iFwd in range(0, numForwards):
+        fwd[iPath, 0, iFwd] = fwd0[iFwd]
+
+    for j in range(0, numForwards-1):  # TIME LOOP
+        dtj = taus[j]
+        sqrtdtj = np.sqrt(dtj)
+
+        for k in range(j, numForwards):  # FORWARDS LOOP
+
+            muA = 0.0
+            for i in range(j+1, k+1):
+                fi = fwd[iPath, j, i]
+                ti = taus[i]
+                zz = 0.0
+                for q in range(0, numFactors):
+                    zij = lambdas[q][i-j]
+                    zkj = lambdas[q][k-j]
+                    zz += zij * zkj
+                muA += fi * ti * zz / (1.0 + fi * ti)
+
+            itoTerm = 0.0
+            for q in range(0, numFactors):
+                itoTerm += lambdas[q][k-j] * lambdas[q][k-j]
+
+            randomTerm = 0.0
+            for q in range(0, numFactors):
+                wq = g[j, q]
+                randomTerm += lambdas[q][k-j] * wq
+            randomTerm *= sqrtdtj
+
+            x = np.exp(muA * dtj - 0.5 * itoTerm * dtj + randomTerm)
+            fwdB[k] = fwd[iPath, j, k] * x
+
+            muB = 0.0
+            for i in range(j+1, k+1):
+                fi = fwdB[k]
+                ti = taus[i]
+                zz = 0.0
+                for q in range(0, numFactors):
+                    zij = lambdas[q][i-j]
+                    zkj = lambdas[q][k-j]
+                    zz += zij * zkj
+                muB += fi * ti * zz / (1.0 + fi * ti)
+
+            muC = 0.5 * (muA + muB)
+
+            x = np.exp(muC * dtj - 0.5 * itoTerm * dtj + randomTerm)
+            fwd[iPath, j+1, k] = fwd[iPath, j, k] * x
+
+###############################################################################
 
 
 @jit(float64[:, :, :](int64, int64, float64[:], float64[:], float64[:, :],
@@ -320,85 +559,105 @@ def LMMSimulateFwdsNF(numForwards, numPaths, fwd0, zetas, correl, taus, seed):
     fwd = np.empty((numPaths, numForwards, numForwards))
     fwdB = np.zeros(numForwards)
 
-    discFwd = np.zeros(numForwards)
-
-    # Set up initial term structure
-    discFwd[0] = 1.0 / (1.0 + fwd0[0] * taus[0])
-    for ix in range(1, numForwards):
-        discFwd[ix] = discFwd[ix-1] / (1.0 + fwd0[ix] * taus[ix])
-
-    corr = [None]  # from 0 to p-1
-    factors = [None]  # from 0 to p-1
-
-    for ix in range(1, numForwards):  # from 1 to p-1
-        matrix = subMatrix(correl, ix - 1)
-        corr.append(matrix)
-        chol = CholeskyNP(matrix)
-        factors.append(chol)
+    corrs, factors = _correlationFactors(correl, numForwards)
 
     ###########################################################################
     # I HAVE PROBLEMS AS THE PARALLELISATION CHANGES THE OUTPUT IF RANDS ARE
     # CALCULATED INSIDE THE MAIN LOOP SO I CALCULATE THEM NOW
     ###########################################################################
 
-    if 1 == 1:
-        gMatrix = np.empty((numPaths, numForwards, numForwards))
-        for iPath in range(0, halfNumPaths):
+    gMatrix = np.empty((numPaths, numForwards, numForwards))
+    for iPath in range(0, halfNumPaths):
+        for j in range(1, numForwards):
+            for k in range(0, numForwards-j):
+                g = np.random.normal()
+                # ANTITHETICS
+                gMatrix[iPath, j, k] = g
+                gMatrix[iPath + halfNumPaths, j, k] = -g
+
+    for iPath in range(0, numPaths):
+        _evolvePathNF(fwd, iPath, gMatrix[iPath], numForwards, fwd0, zetas,
+                      corrs, factors, taus, fwdB)
+
+    return fwd
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _simulateFwdsNFPaths(fwd, firstPath, numHalfPaths, numForwards, fwd0,
+                         zetas, corrs, factors, taus, seed):
+    ''' Simulate the N-factor paths numbered firstPath to firstPath +
+    numHalfPaths - 1 into rows 0 to numHalfPaths - 1 of fwd and their
+    antithetic paths into the rows that follow them. '''
+
+    numChunks = (numHalfPaths + PATH_CHUNK_SIZE - 1) // PATH_CHUNK_SIZE
+
+    for iChunk in prange(0, numChunks):
+
+        fwdB = np.zeros(numForwards)
+        g = np.zeros((numForwards, numForwards))
+        gAnti = np.zeros((numForwards, numForwards))
+
+        firstRow = iChunk * PATH_CHUNK_SIZE
+        lastRow = min(firstRow + PATH_CHUNK_SIZE, numHalfPaths)
+
+        for iRow in range(firstRow, lastRow):
+
+            pathKey = _pathKey(seed, firstPath + iRow)
+
             for j in range(1, numForwards):
                 for k in range(0, numForwards-j):
-                    g = np.random.normal()
-                    # ANTITHETICS
-                    gMatrix[iPath, j, k] = g
-                    gMatrix[iPath + halfNumPaths, j, k] = -g
+                    g[j, k] = _counterNormal(pathKey, j * numForwards + k)
+                    gAnti[j, k] = -g[j, k]
 
-    avgg = 0.0
-    stdg = 0.0
+            _evolvePathNF(fwd, iRow, g, numForwards, fwd0, zetas,
+                          corrs, factors, taus, fwdB)
 
-    for iPath in range(0, numPaths):
+            _evolvePathNF(fwd, iRow + numHalfPaths, gAnti, numForwards,
+                          fwd0, zetas, corrs, factors, taus, fwdB)
 
-        # Initial value of forward curve at time 0
-        for iFwd in range(0, numForwards):
-            fwd[iPath, 0, iFwd] = fwd0[iFwd]
+###############################################################################
 
-        for j in range(1, numForwards):  # TIME LOOP
 
-            dt = taus[j]
-            sqrtdt = np.sqrt(dt)
+def LMMSimulateFwdsNF_Parallel(numForwards, numPaths, fwd0, zetas, correl,
+                               taus, seed):
+    ''' Parallel version of LMMSimulateFwdsNF. The paths are simulated in
+    chunks on all of the threads set by numba.set_num_threads. The draws of
+    each path come from its own counter-based stream so the forwards are the
+    same for any number of threads. They are not the same as those of the
+    serial function which uses the global numpy generator. '''
 
-            for i in range(j, numForwards):  # FORWARDS LOOP
+    # Even number of paths for antithetics
+    numPaths = 2 * int(numPaths/2)
+    halfNumPaths = int(numPaths/2)
+
+    fwd = np.empty((numPaths, numForwards, numForwards))
 
-                zi = zetas[i]
+    corrs, factors = _correlationFactors(correl, numForwards)
 
-                muA = 0.0
-                for k in range(j, i+1):
-                    rho = corr[j][k-j, i-j]
-                    fk = fwd[iPath, j-1, k]
-                    zk = zetas[k]
-                    tk = taus[k]
-                    muA += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+    _simulateFwdsNFPaths(fwd, 0, halfNumPaths, numForwards, fwd0, zetas,
+                         corrs, factors, taus, int(seed))
 
-                w = 0.0
-                for k in range(0, numForwards-j):
-                    f = factors[j][i-j, k]
-                    w = w + f * gMatrix[iPath, j, k]
+    return fwd
+
+###############################################################################
 
-                avgg += w
-                stdg += w*w
 
-                fwdB[i] = fwd[iPath, j-1, i] \
-                    * np.exp(muA * dt - 0.5 * (zi**2) * dt + zi * w * sqrtdt)
+def LMMSimulateFwdsNF_Block(numForwards, firstPath, numHalfPaths, fwd0, zetas,
+                            correl, taus, seed):
+    ''' Simulate a block of the paths of LMMSimulateFwdsNF_Parallel without
+    the rest. Rows 0 to numHalfPaths - 1 hold paths firstPath onwards and the
+    rows after them hold their antithetic paths. So the paths of the full
+    simulation can be generated a block at a time in a fixed amount of
+    memory. '''
 
-                muB = 0.0
-                for k in range(j, i+1):
-                    rho = corr[j][k-j, i-j]
-                    fk = fwdB[k]
-                    zk = zetas[k]
-                    tk = taus[k]
-                    muB += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+    fwd = np.empty((2 * numHalfPaths, numForwards, numForwards))
 
-                muAvg = 0.5*(muA + muB)
-                x = np.exp(muAvg * dt - 0.5 * (zi**2) * dt + zi * w * sqrtdt)
-                fwd[iPath, j, i] = fwd[iPath, j-1, i] * x
+    corrs, factors = _correlationFactors(correl, numForwards)
+
+    _simulateFwdsNFPaths(fwd, firstPath, numHalfPaths, numForwards, fwd0,
+                         zetas, corrs, factors, taus, int(seed))
 
     return fwd
 
@@ -467,40 +726,116 @@ def LMMSimulateFwds1F(numForwards, numPaths, numeraireIndex, fwd0, gammas,
         raise FinError("Use Sobol must be 0 or 1")
 
     for iPath in range(0, numPaths): # changed from prange
-        # Initial value of forward curve at time 0
-        for iFwd in range(0, numForwards):
-            fwd[iPath, 0, iFwd] = fwd0[iFwd]
+        _evolvePath1F(fwd, iPath, gMatrix[iPath], numForwards, fwd0, gammas,
+                      taus, fwdB)
+
+    return fwd
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _simulateFwds1FPaths(fwd, firstPath, numHalfPaths, numForwards, fwd0,
+                         gammas, taus, rands, useSobol, seed):
+    ''' Simulate the one factor paths numbered firstPath to firstPath +
+    numHalfPaths - 1 into rows 0 to numHalfPaths - 1 of fwd and their
+    antithetic paths into the rows that follow them. Row i of rands holds the
+    Sobol uniforms of path firstPath + i. '''
+
+    numTimes = numForwards
+    numChunks = (numHalfPaths + PATH_CHUNK_SIZE - 1) // PATH_CHUNK_SIZE
+
+    for iChunk in prange(0, numChunks):
+
+        fwdB = np.zeros(numForwards)
+        g = np.zeros(numTimes)
+        gAnti = np.zeros(numTimes)
+
+        firstRow = iChunk * PATH_CHUNK_SIZE
+        lastRow = min(firstRow + PATH_CHUNK_SIZE, numHalfPaths)
+
+        for iRow in range(firstRow, lastRow):
+
+            _pathNormals(g, rands, iRow, useSobol, seed, firstPath + iRow)
+
+            for j in range(0, numTimes):
+                gAnti[j] = -g[j]
+
+            _evolvePath1F(fwd, iRow, g, numForwards, fwd0, gammas,
+                          taus, fwdB)
+
+            _evolvePath1F(fwd, iRow + numHalfPaths, gAnti, numForwards,
+                          fwd0, gammas, taus, fwdB)
+
+###############################################################################
+
+
+def LMMSimulateFwds1F_Parallel(numForwards, numPaths, numeraireIndex, fwd0,
+                               gammas, taus, useSobol, seed):
+    ''' Parallel version of LMMSimulateFwds1F. The paths are simulated in
+    chunks on all of the threads set by numba.set_num_threads. With Sobol the
+    forwards agree with those of the serial function up to rounding. Otherwise
+    the draws of each path come from its own counter-based stream so the
+    forwards are the same for any number of threads but differ from the
+    serial ones. '''
+
+    if len(gammas) != numForwards:
+        raise FinError("Gamma vector does not have right number of forwards")
+
+    if len(fwd0) != numForwards:
+        raise FinError("The length of fwd0 is not equal to numForwards")
+
+    if len(taus) != numForwards:
+        raise FinError("The length of Taus is not equal to numForwards")
+
+    # Even number of paths for antithetics
+    numPaths = 2 * int(numPaths/2)
+    halfNumPaths = int(numPaths/2)
+    fwd = np.empty((numPaths, numForwards, numForwards))
 
-        for j in range(0, numForwards-1):  # TIME LOOP
-            dtj = taus[j]
-            sqrtdtj = np.sqrt(dtj)
-            w = gMatrix[iPath, j]
+    if useSobol == 1:
+        rands = getUniformSobol(halfNumPaths, numForwards)
+    elif useSobol == 0:
+        rands = np.zeros((0, 0))
+    else:
+        raise FinError("Use Sobol must be 0 or 1")
+
+    _simulateFwds1FPaths(fwd, 0, halfNumPaths, numForwards, fwd0, gammas,
+                         taus, rands, int(useSobol), int(seed))
 
-            for k in range(j, numForwards):  # FORWARDS LOOP
-                zkj = gammas[k-j]
-                muA = 0.0
+    return fwd
+
+###############################################################################
+
+
+def LMMSimulateFwds1F_Block(numForwards, firstPath, numHalfPaths, fwd0,
+                            gammas, taus, useSobol, seed):
+    ''' Simulate a block of the paths of LMMSimulateFwds1F_Parallel without
+    the rest. Rows 0 to numHalfPaths - 1 hold paths firstPath onwards and the
+    rows after them hold their antithetic paths. So the paths of the full
+    simulation can be generated a block at a time in a fixed amount of
+    memory. '''
+
+    if len(gammas) != numForwards:
+        raise FinError("Gamma vector does not have right number of forwards")
 
-                for i in range(j+1, k+1):
-                    fi = fwd[iPath, j, i]
-                    zij = gammas[i-j]
-                    ti = taus[i]
-                    muA += zkj * fi * ti * zij / (1.0 + fi * ti)
+    if len(fwd0) != numForwards:
+        raise FinError("The length of fwd0 is not equal to numForwards")
 
-                # predictor corrector
-                x = np.exp(muA * dtj - 0.5*(zkj**2) * dtj + zkj * w * sqrtdtj)
-                fwdB[k] = fwd[iPath, j, k] * x
+    if len(taus) != numForwards:
+        raise FinError("The length of Taus is not equal to numForwards")
 
-                muB = 0.0
-                for i in range(j+1, k+1):
-                    fi = fwdB[k]
-                    zij = gammas[i-j]
-                    ti = taus[i]
-                    muB += zkj * fi * ti * zij / (1.0 + fi * ti)
+    fwd = np.empty((2 * numHalfPaths, numForwards, numForwards))
 
-                muC = 0.5*(muA+muB)
+    if useSobol == 1:
+        rands = getUniformSobolBlock(firstPath, numHalfPaths, numForwards)
+    elif useSobol == 0:
+        rands = np.zeros((0, 0))
+    else:
+        raise FinError("Use Sobol must be 0 or 1")
 
-                x = np.exp(muC*dtj - 0.5 * (zkj**2) * dtj + zkj * w * sqrtdtj)
-                fwd[iPath, j+1, k] = fwd[iPath, j, k] * x
+    _simulateFwds1FPaths(fwd, firstPath, numHalfPaths, numForwards, fwd0,
+                         gammas, taus, rands, int(useSobol), int(seed))
 
     return fwd
 
@@ -557,67 +892,157 @@ def LMMSimulateFwdsMF(numForwards, numFactors, numPaths, numeraireIndex, fwd0,
         raise FinError("Use Sobol must be 0 or 1.")
 
     for iPath in range(0, numPaths):
-        # Initial value of forward curve at time 0
-        for iFwd in range(0, numForwards):
-            fwd[iPath, 0, iFwd] = fwd0[iFwd]
-
-        for j in range(0, numForwards-1):  # TIME LOOP
-            dtj = taus[j]
-            sqrtdtj = np.sqrt(dtj)
-
-            for k in range(j, numForwards):  # FORWARDS LOOP
-
-                muA = 0.0
-                for i in range(j+1, k+1):
-                    fi = fwd[iPath, j, i]
-                    ti = taus[i]
-                    zz = 0.0
-                    for q in range(0, numFactors):
-                        zij = lambdas[q][i-j]
-                        zkj = lambdas[q][k-j]
-                        zz += zij * zkj
-                    muA += fi * ti * zz / (1.0 + fi * ti)
-
-                itoTerm = 0.0
-                for q in range(0, numFactors):
-                    itoTerm += lambdas[q][k-j] * lambdas[q][k-j]
+        _evolvePathMF(fwd, iPath, gMatrix[iPath], numForwards, numFactors,
+                      fwd0, lambdas, taus, fwdB)
 
-                randomTerm = 0.0
-                for q in range(0, numFactors):
-                    wq = gMatrix[iPath, j, q]
-                    randomTerm += lambdas[q][k-j] * wq
-                randomTerm *= sqrtdtj
+    return fwd
 
-                x = np.exp(muA * dtj - 0.5 * itoTerm * dtj + randomTerm)
-                fwdB[k] = fwd[iPath, j, k] * x
+###############################################################################
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _simulateFwdsMFPaths(fwd, firstPath, numHalfPaths, numForwards,
+                         numFactors, fwd0, lambdas, taus, rands, useSobol,
+                         seed):
+    ''' Simulate the multi-factor paths numbered firstPath to firstPath +
+    numHalfPaths - 1 into rows 0 to numHalfPaths - 1 of fwd and their
+    antithetic paths into the rows that follow them. Row i of rands holds the
+    Sobol uniforms of path firstPath + i. '''
+
+    numTimes = numForwards
+    numDimensions = numTimes * numFactors
+    numChunks = (numHalfPaths + PATH_CHUNK_SIZE - 1) // PATH_CHUNK_SIZE
+
+    for iChunk in prange(0, numChunks):
+
+        fwdB = np.zeros(numForwards)
+        g = np.zeros(numDimensions)
+        gAnti = np.zeros(numDimensions)
 
-                muB = 0.0
-                for i in range(j+1, k+1):
-                    fi = fwdB[k]
-                    ti = taus[i]
-                    zz = 0.0
-                    for q in range(0, numFactors):
-                        zij = lambdas[q][i-j]
-                        zkj = lambdas[q][k-j]
-                        zz += zij * zkj
-                    muB += fi * ti * zz / (1.0 + fi * ti)
+        # Draw j * numFactors + q is for factor q at time step j
+        g2D = g.reshape((numTimes, numFactors))
+        gAnti2D = gAnti.reshape((numTimes, numFactors))
 
-                muC = 0.5 * (muA + muB)
+        firstRow = iChunk * PATH_CHUNK_SIZE
+        lastRow = min(firstRow + PATH_CHUNK_SIZE, numHalfPaths)
 
-                x = np.exp(muC * dtj - 0.5 * itoTerm * dtj + randomTerm)
-                fwd[iPath, j+1, k] = fwd[iPath, j, k] * x
+        for iRow in range(firstRow, lastRow):
+
+            _pathNormals(g, rands, iRow, useSobol, seed, firstPath + iRow)
+
+            for d in range(0, numDimensions):
+                gAnti[d] = -g[d]
+
+            _evolvePathMF(fwd, iRow, g2D, numForwards, numFactors,
+                          fwd0, lambdas, taus, fwdB)
+
+            _evolvePathMF(fwd, iRow + numHalfPaths, gAnti2D, numForwards,
+                          numFactors, fwd0, lambdas, taus, fwdB)
+
+###############################################################################
+
+
+def LMMSimulateFwdsMF_Parallel(numForwards, numFactors, numPaths,
+                               numeraireIndex, fwd0, lambdas, taus, useSobol,
+                               seed):
+    ''' Parallel version of LMMSimulateFwdsMF. The paths are simulated in
+    chunks on all of the threads set by numba.set_num_threads. With Sobol the
+    forwards agree with those of the serial function up to rounding. Otherwise
+    the draws of each path come from its own counter-based stream so the
+    forwards are the same for any number of threads but differ from the
+    serial ones. '''
+
+    if len(lambdas) != numFactors:
+        raise FinError("Lambda does not have the right number of factors")
+
+    if len(lambdas[0]) != numForwards:
+        raise FinError("Lambda does not have the right number of forwards")
+
+    # Even number of paths for antithetics
+    numPaths = 2 * int(numPaths/2)
+    halfNumPaths = int(numPaths/2)
+    fwd = np.empty((numPaths, numForwards, numForwards))
+
+    if useSobol == 1:
+        rands = getUniformSobol(halfNumPaths, numForwards * numFactors)
+    elif useSobol == 0:
+        rands = np.zeros((0, 0))
+    else:
+        raise FinError("Use Sobol must be 0 or 1.")
+
+    _simulateFwdsMFPaths(fwd, 0, halfNumPaths, numForwards, numFactors, fwd0,
+                         lambdas, taus, rands, int(useSobol), int(seed))
+
+    return fwd
+
+###############################################################################
+
+
+def LMMSimulateFwdsMF_Block(numForwards, numFactors, firstPath, numHalfPaths,
+                            fwd0, lambdas, taus, useSobol, seed):
+    ''' Simulate a block of the paths of LMMSimulateFwdsMF_Parallel without
+    the rest. Rows 0 to numHalfPaths - 1 hold paths firstPath onwards and the
+    rows after them hold their antithetic paths. So the paths of the full
+    simulation can be generated a block at a time in a fixed amount of
+    memory. '''
+
+    if len(lambdas) != numFactors:
+        raise FinError("Lambda does not have the right number of factors")
+
+    if len(lambdas[0]) != numForwards:
+        raise FinError("Lambda does not have the right number of forwards")
+
+    fwd = np.empty((2 * numHalfPaths, numForwards, numForwards))
+
+    if useSobol == 1:
+        rands = getUniformSobolBlock(firstPath, numHalfPaths,
+                                     numForwards * numFactors)
+    elif useSobol == 0:
+        rands = np.zeros((0, 0))
+    else:
+        raise FinError("Use Sobol must be 0 or 1.")
+
+    _simulateFwdsMFPaths(fwd, firstPath, numHalfPaths, numForwards,
+                         numFactors, fwd0, lambdas, taus, rands,
+                         int(useSobol), int(seed))
 
     return fwd
 
 ###############################################################################
 
 
+@njit(cache=True, fastmath=True)
+def _capFlrLetPathValues(capFlrLetValues, fwds, iPath, numForwards, K, taus,
+                         isCap):
+    ''' Add the discounted cap or floorlet payoffs of one path. Caplet j
+    fixes at time step j and pays at step j + 1 where it is divided by the
+    spot numeraire which rolls over at each of the fixings up to step j. '''
+
+    numeraire = 1.0
+
+    for j in range(0, numForwards):
+
+        libor = fwds[iPath, j, j]
+
+        if isCap == 1:
+            capFlrLet = max(libor - K, 0.0) * taus[j]
+        else:
+            capFlrLet = max(K - libor, 0.0) * taus[j]
+
+        numeraire *= (1.0 + libor * taus[j])
+        capFlrLetValues[j] += capFlrLet / numeraire
+
+###############################################################################
+
+
 @njit(float64[:](int64, int64, float64, float64[:], float64[:, :, :],
                  float64[:], int64),
       cache=True, fastmath=True, parallel=useParallel)
 def LMMCapFlrPricer(numForwards, numPaths, K, fwd0, fwds, taus, isCap):
     ''' Function to price a strip of cap or floorlets in accordance with the
-    simulated forward curve dynamics. '''
+    simulated forward curve dynamics. The value of each of the numForwards
+    cap or floorlets is returned. The first fixes today and so has only its
+    intrinsic value. '''
 
     maxPaths = len(fwds)
     maxForwards = len(fwds[0])
@@ -628,43 +1053,61 @@ def LMMCapFlrPricer(numForwards, numPaths, K, fwd0, fwds, taus, isCap):
     if numPaths > maxPaths:
         raise FinError("NumPaths > MaxPaths")
 
-    discFactor = np.zeros(numForwards)
-    capFlrLets = np.zeros(numForwards-1)
-    capFlrLetValues = np.zeros(numForwards-1)
-    numeraire = np.zeros(numForwards)
+    if isCap != 0 and isCap != 1:
+        raise FinError("isCap should be 0 or 1")
+
+    capFlrLetValues = np.zeros(numForwards)
 
     for iPath in range(0, numPaths):
+        _capFlrLetPathValues(capFlrLetValues, fwds, iPath, numForwards, K,
+                             taus, isCap)
 
-        periodRoll = 1.0
-        libor = fwds[iPath, 0, 0]
-        capFlrLets[0] = max(K - libor, 0.0) * taus[0]
+    for iFwd in range(0, numForwards):
+        capFlrLetValues[iFwd] /= numPaths
 
-        # Now loop over the caplets starting with one that fixes immediately
-        # but which may have intrinsic value that cannot be ignored.
-        for j in range(0, numForwards):
+    return capFlrLetValues
 
-            libor = fwds[iPath, j, j]
-            if j == 1:
-                if isCap == 0:
-                    capFlrLets[j] = max(K - libor, 0.0) * taus[j]
-                else:
-                    capFlrLets[j] = max(libor - K, 0.0) * taus[j]
+###############################################################################
 
-                numeraire[0] = 1.0 / discFactor[0]
-            else:
-                if isCap == 1:
-                    capFlrLets[j] = max(libor - K, 0.0) * taus[j]
-                elif isCap == 0:
-                    capFlrLets[j] = max(K - libor, 0.0) * taus[j]
-                else:
-                    raise FinError("isCap should be 0 or 1")
 
-            periodRoll = (1.0 + libor * taus[j])
-            numeraire[j] = numeraire[j - 1] * periodRoll
+@njit(float64[:](int64, int64, float64, float64[:], float64[:, :, :],
+                 float64[:], int64),
+      cache=True, fastmath=True, parallel=True)
+def LMMCapFlrPricer_Parallel(numForwards, numPaths, K, fwd0, fwds, taus,
+                             isCap):
+    ''' Parallel version of LMMCapFlrPricer. The payoffs are summed over each
+    chunk of paths on its own thread and then over the chunks in order so the
+    values are the same for any number of threads. '''
+
+    maxPaths = len(fwds)
+    maxForwards = len(fwds[0])
+
+    if numForwards > maxForwards:
+        raise FinError("NumForwards > maxForwards")
+
+    if numPaths > maxPaths:
+        raise FinError("NumPaths > MaxPaths")
+
+    if isCap != 0 and isCap != 1:
+        raise FinError("isCap should be 0 or 1")
+
+    numChunks = (numPaths + PATH_CHUNK_SIZE - 1) // PATH_CHUNK_SIZE
+    chunkValues = np.zeros((numChunks, numForwards))
+
+    for iChunk in prange(0, numChunks):
+
+        firstPath = iChunk * PATH_CHUNK_SIZE
+        lastPath = min(firstPath + PATH_CHUNK_SIZE, numPaths)
+
+        for iPath in range(firstPath, lastPath):
+            _capFlrLetPathValues(chunkValues[iChunk], fwds, iPath,
+                                 numForwards, K, taus, isCap)
 
+    capFlrLetValues = np.zeros(numForwards)
+
+    for iChunk in range(0, numChunks):
         for iFwd in range(0, numForwards):
-            denom = abs(numeraire[iFwd]) + 1e-12
-            capFlrLetValues[iFwd] += capFlrLets[iFwd] / denom
+            capFlrLetValues[iFwd] += chunkValues[iChunk, iFwd]
 
     for iFwd in range(0, numForwards):
         capFlrLetValues[iFwd] /= numPaths
@@ -741,6 +1184,37 @@ def LMMSwapPricer(cpn, numPeriods, numPaths, fwd0, fwds, taus):
 ###############################################################################
 
 
+@njit(cache=True, fastmath=True)
+def _swaptionPathValue(strike, a, b, fwds, iPath, taus, isPayer):
+    ''' The payoff of a European swaption on one path divided by the spot
+    numeraire at its expiry time step a. '''
+
+    numeraire = 1.0
+    for k in range(0, a):
+        numeraire *= (1.0 + taus[k] * fwds[iPath, k, k])
+
+    pv01 = 0.0
+    df = 1.0
+
+    # Value the swap as if we were at time a with forward curve known
+    for k in range(a, b):
+        f = fwds[iPath, a, k]
+        tau = taus[k]
+        df = df / (1.0 + tau * f)
+        pv01 = pv01 + tau * df
+
+    fwdSwapRate = (1.0 - df) / pv01
+
+    if isPayer == 1:
+        payRecSwaption = max(fwdSwapRate - strike, 0.0) * pv01
+    else:
+        payRecSwaption = max(strike - fwdSwapRate, 0.0) * pv01
+
+    return payRecSwaption / (abs(numeraire) + 1e-10)
+
+###############################################################################
+
+
 @njit(float64(float64, int64, int64, int64, float64[:], float64[:, :, :],
               float64[:], int64), cache=True, fastmath=True, parallel=useParallel)
 def LMMSwaptionPricer(strike, a, b, numPaths, fwd0, fwds, taus, isPayer):
@@ -759,42 +1233,62 @@ def LMMSwaptionPricer(strike, a, b, numPaths, fwd0, fwds, taus, isPayer):
     if numPaths > maxPaths:
         raise FinError("NumPaths > MaxPaths")
 
-    discFactor = np.zeros(maxForwards)
-#    pv01 = np.zeros(maxForwards)
-
-    # Set up initial term structure
-    discFactor[0] = 1.0 / (1.0 + fwd0[0] * taus[0])
-    for ix in range(1, b):
-        discFactor[ix] = discFactor[ix-1] / (1.0 + fwd0[ix] * taus[ix])
+    if isPayer != 0 and isPayer != 1:
+        raise FinError("Unknown payRecSwaption value - must be 0 or 1")
 
     sumPayRecSwaption = 0.0
 
     for iPath in range(0, numPaths):
+        sumPayRecSwaption += _swaptionPathValue(strike, a, b, fwds, iPath,
+                                                taus, isPayer)
 
-        numeraire = 1.0
-        for k in range(0, a):
-            numeraire *= (1.0 + taus[k] * fwds[iPath, k, k])
+    payRecPrice = sumPayRecSwaption / numPaths
+    return payRecPrice
 
-        pv01 = 0.0
-        df = 1.0
+###############################################################################
 
-        # Value the swap as if we were at time a with forward curve known
-        for k in range(a, b):
-            f = fwds[iPath, a, k]
-            tau = taus[k]
-            df = df / (1.0 + tau * f)
-            pv01 = pv01 + tau * df
 
-        fwdSwapRate = (1.0 - df) / pv01
+@njit(float64(float64, int64, int64, int64, float64[:], float64[:, :, :],
+              float64[:], int64), cache=True, fastmath=True, parallel=True)
+def LMMSwaptionPricer_Parallel(strike, a, b, numPaths, fwd0, fwds, taus,
+                               isPayer):
+    ''' Parallel version of LMMSwaptionPricer. The payoffs are summed over
+    each chunk of paths on its own thread and then over the chunks in order so
+    the price is the same for any number of threads. '''
 
-        if isPayer == 1:
-            payRecSwaption = max(fwdSwapRate - strike, 0.0) * pv01
-        elif isPayer == 0:
-            payRecSwaption = max(strike - fwdSwapRate, 0.0) * pv01
-        else:
-            raise FinError("Unknown payRecSwaption value - must be 0 or 1")
+    maxPaths = len(fwds)
+    maxForwards = len(fwds[0])
 
-        sumPayRecSwaption += payRecSwaption / (abs(numeraire) + 1e-10)
+    if a > maxForwards:
+        raise FinError("NumPeriods > numForwards")
+
+    if a >= b:
+        raise FinError("Swap maturity is before expiry date")
+
+    if numPaths > maxPaths:
+        raise FinError("NumPaths > MaxPaths")
+
+    if isPayer != 0 and isPayer != 1:
+        raise FinError("Unknown payRecSwaption value - must be 0 or 1")
+
+    numChunks = (numPaths + PATH_CHUNK_SIZE - 1) // PATH_CHUNK_SIZE
+    chunkSums = np.zeros(numChunks)
+
+    for iChunk in prange(0, numChunks):
+
+        firstPath = iChunk * PATH_CHUNK_SIZE
+        lastPath = min(firstPath + PATH_CHUNK_SIZE, numPaths)
+
+        chunkSum = 0.0
+        for iPath in range(firstPath, lastPath):
+            chunkSum += _swaptionPathValue(strike, a, b, fwds, iPath,
+                                           taus, isPayer)
+
+        chunkSums[iChunk] = chunkSum
+
+    sumPayRecSwaption = 0.0
+    for iChunk in range(0, numChunks):
+        sumPayRecSwaption += chunkSums[iChunk]
 
     payRecPrice = sumPayRecSwaption / numPaths
     return payRecPrice
@@ -802,6 +1296,84 @@ def LMMSwaptionPricer(strike, a, b, numPaths, fwd0, fwds, taus, isPayer):
 ###############################################################################
 
 
+@njit(cache=True, fastmath=True)
+def _ratchetCapletPathValues(ratchetCapletValues, fwds, iPath, numPeriods,
+                             spread, taus, df0):
+    ''' Add the discounted ratchet caplet payoffs of one path. The strike of
+    each caplet is the previous Ibor plus the spread. The discount factor to
+    the end of the first period is df0. '''
+
+    numeraire = 1.0 / df0
+    libor = fwds[iPath, 0, 0]
+
+    for j in range(1, numPeriods):  # TIME LOOP
+
+        prevIbor = libor
+        K = prevIbor + spread
+        libor = fwds[iPath, j, j]
+
+        ratchetCaplet = max(libor - K, 0.0) * taus[j]
+
+        periodRoll = (1.0 + libor * taus[j])
+        numeraire = numeraire * periodRoll
+        ratchetCapletValues[j] += ratchetCaplet / numeraire
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _stickyCapletPathValues(stickyCapletValues, fwds, iPath, numPeriods,
+                            spread, taus, df0):
+    ''' Add the discounted sticky caplet payoffs of one path. The strike of
+    each caplet is the lower of the previous Ibor and the previous strike
+    plus the spread. The discount factor to the end of the first period is
+    df0. '''
+
+    numeraire = 1.0 / df0
+    libor = fwds[iPath, 0, 0]
+    K = libor
+
+    for j in range(1, numPeriods):  # TIME LOOP
+
+        prevIbor = libor
+        K = min(prevIbor, K) + spread
+        libor = fwds[iPath, j, j]
+
+        stickyCaplet = max(libor - K, 0.0) * taus[j]
+
+        periodRoll = (1.0 + libor * taus[j])
+        numeraire = numeraire * periodRoll
+        stickyCapletValues[j] += stickyCaplet / numeraire
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _flexiCapletPathValues(flexiCapletValues, fwds, iPath, maxCaplets, K,
+                           numPeriods, taus, df0):
+    ''' Add the discounted flexicap caplet payoffs of one path. Only the
+    first maxCaplets caplets that are in the money are paid. The discount
+    factor to the end of the first period is df0. '''
+
+    numeraire = 1.0 / df0
+    numCapletsLeft = maxCaplets
+
+    for j in range(1, numPeriods):  # TIME LOOP
+
+        libor = fwds[iPath, j, j]
+
+        flexiCaplet = 0.0
+        if libor > K and numCapletsLeft > 0:
+            flexiCaplet = max(libor - K, 0.0) * taus[j]
+            numCapletsLeft -= 1
+
+        periodRoll = (1.0 + libor * taus[j])
+        numeraire = numeraire * periodRoll
+        flexiCapletValues[j] += flexiCaplet / numeraire
+
+###############################################################################
+
+
 @njit(float64[:](float64, int64, int64, float64[:], float64[:, :, :],
                  float64[:]), cache=True, fastmath=True, parallel=useParallel)
 def LMMRatchetCapletPricer(spread, numPeriods, numPaths, fwd0, fwds, taus):
@@ -816,39 +1388,14 @@ def LMMRatchetCapletPricer(spread, numPeriods, numPaths, fwd0, fwds, taus):
     if numPaths > maxPaths:
         raise FinError("NumPaths > MaxPaths")
 
-    discFactor = np.zeros(maxForwards)
-    numeraire = np.zeros(maxForwards)
-    ratchetCaplets = np.zeros(maxForwards)
     ratchetCapletValues = np.zeros(maxForwards)
 
     # Set up initial term structure
-    discFactor[0] = 1.0 / (1.0 + fwd0[0] * taus[0])
-    for ix in range(1, maxForwards):
-        discFactor[ix] = discFactor[ix-1] / (1.0 + fwd0[ix] * taus[ix])
+    df0 = 1.0 / (1.0 + fwd0[0] * taus[0])
 
     for iPath in range(0, numPaths):
-
-        periodRoll = 1.0
-        libor = fwds[iPath, 0, 0]
-        ratchetCaplets[0] = 0.0
-
-        for j in range(1, numPeriods):  # TIME LOOP
-
-            prevIbor = libor
-            K = prevIbor + spread
-            libor = fwds[iPath, j, j]
-
-            if j == 1:
-                ratchetCaplets[j] = max(libor - K, 0.0) * taus[j]
-                numeraire[0] = 1.0 / discFactor[0]
-            else:
-                ratchetCaplets[j] = max(libor - K, 0.0) * taus[j]
-
-            periodRoll = (1.0 + libor * taus[j])
-            numeraire[j] = numeraire[j - 1] * periodRoll
-
-        for iFwd in range(0, numPeriods):
-            ratchetCapletValues[iFwd] += ratchetCaplets[iFwd] / numeraire[iFwd]
+        _ratchetCapletPathValues(ratchetCapletValues, fwds, iPath, numPeriods,
+                                 spread, taus, df0)
 
     for iFwd in range(0, numPeriods):
         ratchetCapletValues[iFwd] /= numPaths
@@ -872,43 +1419,14 @@ def LMMFlexiCapPricer(maxCaplets, K, numPeriods, numPaths, fwd0, fwds, taus):
     if numPaths > maxPaths:
         raise FinError("NumPaths > MaxPaths")
 
-    discFactor = np.zeros(maxForwards)
-    numeraire = np.zeros(maxForwards)
-    flexiCaplets = np.zeros(maxForwards)
     flexiCapletValues = np.zeros(maxForwards)
 
     # Set up initial term structure
-    discFactor[0] = 1.0 / (1.0 + fwd0[0] * taus[0])
-    for ix in range(1, maxForwards):
-        discFactor[ix] = discFactor[ix-1] / (1.0 + fwd0[ix] * taus[ix])
+    df0 = 1.0 / (1.0 + fwd0[0] * taus[0])
 
     for iPath in range(0, numPaths):
-
-        periodRoll = 1.0
-        libor = fwds[iPath, 0, 0]
-        flexiCaplets[0] = 0.0
-
-        numCapletsLeft = maxCaplets
-
-        for j in range(1, numPeriods):  # TIME LOOP
-
-            libor = fwds[iPath, j, j]
-
-            if j == 1:
-                if libor > K and numCapletsLeft > 0:
-                    flexiCaplets[j] = max(libor - K, 0.0) * taus[j]
-                    numCapletsLeft -= 1
-                numeraire[0] = 1.0 / discFactor[0]
-            else:
-                if libor > K and numCapletsLeft > 0:
-                    flexiCaplets[j] = max(libor - K, 0.0) * taus[j]
-                    numCapletsLeft -= 1
-
-            periodRoll = (1.0 + libor * taus[j])
-            numeraire[j] = numeraire[j - 1] * periodRoll
-
-        for iFwd in range(0, numPeriods):
-            flexiCapletValues[iFwd] += flexiCaplets[iFwd] / numeraire[iFwd]
+        _flexiCapletPathValues(flexiCapletValues, fwds, iPath, maxCaplets, K,
+                               numPeriods, taus, df0)
 
     for iFwd in range(0, numPeriods):
         flexiCapletValues[iFwd] /= numPaths
@@ -935,40 +1453,14 @@ def LMMStickyCapletPricer(spread, numPeriods, numPaths, fwd0, fwds, taus):
     if numPaths > maxPaths:
         raise FinError("NumPaths > MaxPaths")
 
-    discFactor = np.zeros(maxForwards)
-    numeraire = np.zeros(maxForwards)
-    stickyCaplets = np.zeros(maxForwards)
     stickyCapletValues = np.zeros(maxForwards)
 
     # Set up initial term structure
-    discFactor[0] = 1.0 / (1.0 + fwd0[0] * taus[0])
-    for ix in range(1, maxForwards):
-        discFactor[ix] = discFactor[ix-1] / (1.0 + fwd0[ix] * taus[ix])
+    df0 = 1.0 / (1.0 + fwd0[0] * taus[0])
 
     for iPath in range(0, numPaths):
-
-        periodRoll = 1.0
-        libor = fwds[iPath, 0, 0]
-        stickyCaplets[0] = 0.0
-        K = libor
-
-        for j in range(1, numPeriods):  # TIME LOOP
-
-            prevIbor = libor
-            K = min(prevIbor, K) + spread
-            libor = fwds[iPath, j, j]
-
-            if j == 1:
-                stickyCaplets[j] = max(libor-K, 0.0) * taus[j]
-                numeraire[0] = 1.0 / discFactor[0]
-            else:
-                stickyCaplets[j] = max(libor - K, 0.0) * taus[j]
-
-            periodRoll = (1.0 + libor * taus[j])
-            numeraire[j] = numeraire[j - 1] * periodRoll
-
-        for iFwd in range(0, numPeriods):
-            stickyCapletValues[iFwd] += stickyCaplets[iFwd] / numeraire[iFwd]
+        _stickyCapletPathValues(stickyCapletValues, fwds, iPath, numPeriods,
+                                spread, taus, df0)
 
     for iFwd in range(0, numPeriods):
         stickyCapletValues[iFwd] /= numPaths
@@ -0,0 +1,73 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import time
+
+import numpy as np
+import numba
+
+from .FinModelRatesLMM import LMMSimulateFwds1F
+from .FinModelRatesLMM import LMMSimulateFwds1F_Parallel
+from .FinModelRatesLMM import LMMSwaptionPricer
+from .FinModelRatesLMM import LMMSwaptionPricer_Parallel
+
+###############################################################################
+# The Hull book example of an 11 forward annual curve
+
+numFwds = 11
+taus = np.ones(numFwds)
+fwd0 = np.full(numFwds, 0.05127)
+
+gammas1F = np.array([0.00, 0.1550, 0.2063674, 0.1720986, 0.1721993,
+                     0.1524579, 0.1414779, 0.1297711, 0.1381053, 0.135955,
+                     0.1339842])
+
+###############################################################################
+
+
+def timeLMMParallelScaling(numPaths=200000, seed=42):
+    ''' Time the serial and the parallel one factor simulation and swaption
+    pricing for 1 up to the number of threads and print the speed up of each
+    over the serial code. '''
+
+    maxThreads = numba.config.NUMBA_NUM_THREADS
+
+    # Compile first
+    fwds = LMMSimulateFwds1F(numFwds, 1000, 0, fwd0, gammas1F, taus, 0, seed)
+    LMMSwaptionPricer(0.05, 3, 8, 1000, fwd0, fwds, taus, 1)
+    fwds = LMMSimulateFwds1F_Parallel(numFwds, 1000, 0, fwd0, gammas1F, taus,
+                                      0, seed)
+    LMMSwaptionPricer_Parallel(0.05, 3, 8, 1000, fwd0, fwds, taus, 1)
+
+    start = time.time()
+    fwds = LMMSimulateFwds1F(numFwds, numPaths, 0, fwd0, gammas1F, taus,
+                             0, seed)
+    LMMSwaptionPricer(0.05, 3, 8, numPaths, fwd0, fwds, taus, 1)
+    end = time.time()
+    serialTime = end - start
+
+    print("%8s %10s %10s" % ("THREADS", "TIME", "SPEEDUP"))
+    print("%8s %10.6f %10.3f" % ("SERIAL", serialTime, 1.0))
+
+    for numThreads in range(1, maxThreads + 1):
+
+        numba.set_num_threads(numThreads)
+
+        start = time.time()
+        fwds = LMMSimulateFwds1F_Parallel(numFwds, numPaths, 0, fwd0,
+                                          gammas1F, taus, 0, seed)
+        LMMSwaptionPricer_Parallel(0.05, 3, 8, numPaths, fwd0, fwds, taus, 1)
+        end = time.time()
+        parallelTime = end - start
+
+        print("%8d %10.6f %10.3f" % (numThreads, parallelTime,
+                                     serialTime / parallelTime))
+
+    numba.set_num_threads(maxThreads)
+
+###############################################################################
+
+
+if __name__ == '__main__':
+    timeLMMParallelScaling()
@@ -0,0 +1,500 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, float64, int64, prange
+
+from ..finutils.FinError import FinError
+from ..finutils.FinHelperFunctions import labelToString
+
+from .FinModelRatesLMM import LMMSimulateFwds1F_Block
+from .FinModelRatesLMM import LMMSimulateFwdsMF_Block
+from .FinModelRatesLMM import LMMSimulateFwdsNF_Block
+from .FinModelRatesLMM import _swaptionPathValue
+from .FinModelRatesLMM import _capFlrLetPathValues
+from .FinModelRatesLMM import _ratchetCapletPathValues
+from .FinModelRatesLMM import _stickyCapletPathValues
+from .FinModelRatesLMM import _flexiCapletPathValues
+
+###############################################################################
+# The LMM pricers in FinModelRatesLMM take the matrix of forwards of all of
+# the paths which has numPaths x numForwards x numForwards elements. With 100k
+# paths and 40 forwards this is over a gigabyte. Here the paths are simulated
+# a chunk at a time and passed to a list of payoff accumulators which only
+# keep the running sums of the discounted payoffs and the running mean and
+# sum of squared deviations of the averages over each path and its
+# antithetic path. So the memory used does not grow with the number of paths
+# and the products share one simulation. The paths are those of the parallel
+# simulations.
+###############################################################################
+
+
+def _chanUpdate(numPairs, mean, m2, pairValues):
+    ''' Add a chunk of pair averages to a running count, mean and sum of
+    squared deviations from the mean. The chunk is combined with the running
+    values using the update of Chan, Golub and LeVeque which does not lose
+    accuracy when the values are large relative to their spread. '''
+
+    numChunk = len(pairValues)
+    chunkMean = np.mean(pairValues, axis=0)
+    chunkM2 = np.sum((pairValues - chunkMean) ** 2, axis=0)
+
+    n = numPairs + numChunk
+    delta = chunkMean - mean
+    mean = mean + delta * numChunk / n
+    m2 = m2 + chunkM2 + delta * delta * numPairs * numChunk / n
+
+    return n, mean, m2
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:, :, :], float64, int64, int64, float64[:],
+                    int64), cache=True, fastmath=True, parallel=True)
+def _swaptionPayoffs(fwds, strike, a, b, taus, isPayer):
+    ''' The discounted payoff of a European swaption on each path. '''
+
+    numPaths = len(fwds)
+    payoffs = np.zeros((numPaths, 1))
+
+    for iPath in prange(0, numPaths):
+        payoffs[iPath, 0] = _swaptionPathValue(strike, a, b, fwds, iPath,
+                                               taus, isPayer)
+
+    return payoffs
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:, :, :], int64, float64, float64[:], int64),
+      cache=True, fastmath=True, parallel=True)
+def _capFlrLetPayoffs(fwds, numForwards, K, taus, isCap):
+    ''' The discounted payoff of each cap or floorlet on each path. '''
+
+    numPaths = len(fwds)
+    payoffs = np.zeros((numPaths, numForwards))
+
+    for iPath in prange(0, numPaths):
+        _capFlrLetPathValues(payoffs[iPath], fwds, iPath, numForwards, K,
+                             taus, isCap)
+
+    return payoffs
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:, :, :], int64, float64, float64[:], float64),
+      cache=True, fastmath=True, parallel=True)
+def _ratchetCapletPayoffs(fwds, numPeriods, spread, taus, df0):
+    ''' The discounted payoff of each ratchet caplet on each path. '''
+
+    numPaths = len(fwds)
+    payoffs = np.zeros((numPaths, numPeriods))
+
+    for iPath in prange(0, numPaths):
+        _ratchetCapletPathValues(payoffs[iPath], fwds, iPath, numPeriods,
+                                 spread, taus, df0)
+
+    return payoffs
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:, :, :], int64, float64, float64[:], float64),
+      cache=True, fastmath=True, parallel=True)
+def _stickyCapletPayoffs(fwds, numPeriods, spread, taus, df0):
+    ''' The discounted payoff of each sticky caplet on each path. '''
+
+    numPaths = len(fwds)
+    payoffs = np.zeros((numPaths, numPeriods))
+
+    for iPath in prange(0, numPaths):
+        _stickyCapletPathValues(payoffs[iPath], fwds, iPath, numPeriods,
+                                spread, taus, df0)
+
+    return payoffs
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:, :, :], int64, float64, int64, float64[:],
+                    float64), cache=True, fastmath=True, parallel=True)
+def _flexiCapletPayoffs(fwds, maxCaplets, K, numPeriods, taus, df0):
+    ''' The discounted payoff of each flexicap caplet on each path. '''
+
+    numPaths = len(fwds)
+    payoffs = np.zeros((numPaths, numPeriods))
+
+    for iPath in prange(0, numPaths):
+        _flexiCapletPathValues(payoffs[iPath], fwds, iPath, maxCaplets, K,
+                               numPeriods, taus, df0)
+
+    return payoffs
+
+###############################################################################
+
+
+class FinLMMPayoffAccumulator():
+    ''' Base class of the accumulators of the discounted payoffs of a product
+    over the paths of an LMM simulation. A product can have several payments,
+    such as the caplets of a cap. The sums of each payment and of the total
+    payoff are kept so that the values can be found without holding the
+    paths. As each path comes with its antithetic path they are not
+    independent, so the standard errors are found from the mean and the sum
+    of squared deviations of the average of each path and its antithetic
+    path. The subclasses define the payoffs. '''
+
+    def __init__(self, numValues: int):
+        ''' Create the sums for a product with numValues payments. '''
+
+        self._numValues = numValues
+        self.reset()
+
+###############################################################################
+
+    def reset(self):
+        ''' Set all of the sums to zero. '''
+
+        self._numPaths = 0
+        self._sums = np.zeros(self._numValues)
+        self._totalSum = 0.0
+        self._numPairs = 0
+        self._pairMeans = np.zeros(self._numValues)
+        self._pairM2s = np.zeros(self._numValues)
+        self._totalPairMean = 0.0
+        self._totalPairM2 = 0.0
+
+###############################################################################
+
+    def accumulate(self,
+                   fwds: np.ndarray,
+                   fwd0: np.ndarray,
+                   taus: np.ndarray):
+        ''' Add the discounted payoffs on a chunk of paths of the forwards to
+        the sums. The first half of the rows of the chunk are paths and the
+        second half are their antithetic paths in the same order. '''
+
+        payoffs = self._payoffs(fwds, fwd0, taus)
+        totals = np.sum(payoffs, axis=1)
+
+        self._numPaths += len(payoffs)
+        self._sums += np.sum(payoffs, axis=0)
+        self._totalSum += np.sum(totals)
+
+        numHalfPaths = len(payoffs) // 2
+        pairs = (payoffs[:numHalfPaths] + payoffs[numHalfPaths:]) / 2.0
+        pairTotals = (totals[:numHalfPaths] + totals[numHalfPaths:]) / 2.0
+
+        _, self._totalPairMean, self._totalPairM2 = \
+            _chanUpdate(self._numPairs, self._totalPairMean,
+                        self._totalPairM2, pairTotals)
+
+        self._numPairs, self._pairMeans, self._pairM2s = \
+            _chanUpdate(self._numPairs, self._pairMeans, self._pairM2s,
+                        pairs)
+
+###############################################################################
+
+    def _payoffs(self, fwds, fwd0, taus):
+        ''' Return the matrix of the discounted payments on each path. '''
+        raise FinError("Payoffs must be defined by the product accumulator.")
+
+###############################################################################
+
+    def numPaths(self):
+        ''' The number of paths that have been accumulated. '''
+        return self._numPaths
+
+###############################################################################
+
+    def values(self):
+        ''' The value of each of the payments. '''
+
+        if self._numPaths == 0:
+            raise FinError("No paths have been accumulated.")
+
+        return self._sums / self._numPaths
+
+###############################################################################
+
+    def standardErrors(self):
+        ''' The standard error of the value of each of the payments. The
+        averages of each path and its antithetic path are the independent
+        samples. '''
+
+        if self._numPaths == 0:
+            raise FinError("No paths have been accumulated.")
+
+        n = self._numPairs
+        return np.sqrt(self._pairM2s / n / n)
+
+###############################################################################
+
+    def value(self):
+        ''' The value of the product which is the sum of its payments. '''
+
+        if self._numPaths == 0:
+            raise FinError("No paths have been accumulated.")
+
+        return self._totalSum / self._numPaths
+
+###############################################################################
+
+    def standardError(self):
+        ''' The standard error of the value of the product. The averages of
+        each path and its antithetic path are the independent samples. '''
+
+        if self._numPaths == 0:
+            raise FinError("No paths have been accumulated.")
+
+        n = self._numPairs
+        return np.sqrt(self._totalPairM2 / n / n)
+
+###############################################################################
+
+    def _checkForwards(self, fwds, numForwards):
+        ''' Check that the simulation has enough forwards for the product. '''
+
+        if numForwards > fwds.shape[2]:
+            raise FinError("Product needs more forwards than are simulated.")
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("NUM VALUES", self._numValues)
+        s += labelToString("NUM PATHS", self._numPaths)
+        return s
+
+###############################################################################
+
+    def _print(self):
+        ''' Simple print function for backward compatibility. '''
+        print(self)
+
+###############################################################################
+
+
+class FinLMMSwaptionAccumulator(FinLMMPayoffAccumulator):
+    ''' Accumulator for a European swaption which expires at grid index a on
+    a swap which ends at grid index b. This is the payoff of
+    LMMSwaptionPricer. '''
+
+    def __init__(self,
+                 strike: float,
+                 a: int,
+                 b: int,
+                 isPayer: int):
+
+        if a >= b:
+            raise FinError("Swap maturity is before expiry date")
+
+        if isPayer != 0 and isPayer != 1:
+            raise FinError("Unknown payRecSwaption value - must be 0 or 1")
+
+        self._strike = strike
+        self._a = a
+        self._b = b
+        self._isPayer = isPayer
+        super().__init__(1)
+
+    def _payoffs(self, fwds, fwd0, taus):
+        self._checkForwards(fwds, self._b)
+        return _swaptionPayoffs(fwds, self._strike, self._a, self._b, taus,
+                                self._isPayer)
+
+###############################################################################
+
+
+class FinLMMCapFloorAccumulator(FinLMMPayoffAccumulator):
+    ''' Accumulator for a strip of numForwards caplets or floorlets. The
+    values are those of LMMCapFlrPricer. '''
+
+    def __init__(self,
+                 numForwards: int,
+                 K: float,
+                 isCap: int):
+
+        if isCap != 0 and isCap != 1:
+            raise FinError("isCap should be 0 or 1")
+
+        self._numForwards = numForwards
+        self._K = K
+        self._isCap = isCap
+        super().__init__(numForwards)
+
+    def _payoffs(self, fwds, fwd0, taus):
+        self._checkForwards(fwds, self._numForwards)
+        return _capFlrLetPayoffs(fwds, self._numForwards, self._K, taus,
+                                 self._isCap)
+
+###############################################################################
+
+
+class FinLMMRatchetAccumulator(FinLMMPayoffAccumulator):
+    ''' Accumulator for the ratchet caplets of LMMRatchetCapletPricer. '''
+
+    def __init__(self,
+                 numPeriods: int,
+                 spread: float):
+
+        self._numPeriods = numPeriods
+        self._spread = spread
+        super().__init__(numPeriods)
+
+    def _payoffs(self, fwds, fwd0, taus):
+        self._checkForwards(fwds, self._numPeriods)
+        df0 = 1.0 / (1.0 + fwd0[0] * taus[0])
+        return _ratchetCapletPayoffs(fwds, self._numPeriods, self._spread,
+                                     taus, df0)
+
+###############################################################################
+
+
+class FinLMMStickyAccumulator(FinLMMPayoffAccumulator):
+    ''' Accumulator for the sticky caplets of LMMStickyCapletPricer. '''
+
+    def __init__(self,
+                 numPeriods: int,
+                 spread: float):
+
+        self._numPeriods = numPeriods
+        self._spread = spread
+        super().__init__(numPeriods)
+
+    def _payoffs(self, fwds, fwd0, taus):
+        self._checkForwards(fwds, self._numPeriods)
+        df0 = 1.0 / (1.0 + fwd0[0] * taus[0])
+        return _stickyCapletPayoffs(fwds, self._numPeriods, self._spread,
+                                    taus, df0)
+
+###############################################################################
+
+
+class FinLMMFlexiCapAccumulator(FinLMMPayoffAccumulator):
+    ''' Accumulator for the flexicap of LMMFlexiCapPricer which pays the
+    first maxCaplets caplets that are in the money. '''
+
+    def __init__(self,
+                 maxCaplets: int,
+                 K: float,
+                 numPeriods: int):
+
+        self._maxCaplets = maxCaplets
+        self._K = K
+        self._numPeriods = numPeriods
+        super().__init__(numPeriods)
+
+    def _payoffs(self, fwds, fwd0, taus):
+        self._checkForwards(fwds, self._numPeriods)
+        df0 = 1.0 / (1.0 + fwd0[0] * taus[0])
+        return _flexiCapletPayoffs(fwds, self._maxCaplets, self._K,
+                                   self._numPeriods, taus, df0)
+
+###############################################################################
+
+
+def _streamPaths(accumulators, numPaths, chunkSize, fwd0, taus,
+                 simulateBlock):
+    ''' Simulate the paths a chunk at a time and pass each chunk to all of
+    the accumulators. The function simulateBlock returns the forwards of the
+    paths starting at a path number and their antithetic paths. '''
+
+    if chunkSize < 2:
+        raise FinError("Chunk size must be at least 2.")
+
+    for accumulator in accumulators:
+        if isinstance(accumulator, FinLMMPayoffAccumulator) is False:
+            raise FinError("Accumulators must be FinLMMPayoffAccumulators.")
+        accumulator.reset()
+
+    # Even number of paths for antithetics
+    halfNumPaths = int(numPaths/2)
+    halfChunkSize = int(chunkSize/2)
+
+    for firstPath in range(0, halfNumPaths, halfChunkSize):
+
+        numHalfPaths = min(halfChunkSize, halfNumPaths - firstPath)
+        fwds = simulateBlock(firstPath, numHalfPaths)
+
+        for accumulator in accumulators:
+            accumulator.accumulate(fwds, fwd0, taus)
+
+    return 2 * halfNumPaths
+
+###############################################################################
+
+
+def LMMStreamFwds1F(accumulators: list,
+                    numForwards: int,
+                    numPaths: int,
+                    fwd0: np.ndarray,
+                    gammas: np.ndarray,
+                    taus: np.ndarray,
+                    useSobol: int = 1,
+                    seed: int = 42,
+                    chunkSize: int = 10000):
+    ''' Run the one factor simulation of LMMSimulateFwds1F_Parallel chunkSize
+    paths at a time and accumulate the payoffs of all of the accumulators.
+    Only one chunk of forwards is held in memory. The sums in the
+    accumulators are reset first. Returns the number of paths. '''
+
+    def simulateBlock(firstPath, numHalfPaths):
+        return LMMSimulateFwds1F_Block(numForwards, firstPath, numHalfPaths,
+                                       fwd0, gammas, taus, useSobol, seed)
+
+    return _streamPaths(accumulators, numPaths, chunkSize, fwd0, taus,
+                        simulateBlock)
+
+###############################################################################
+
+
+def LMMStreamFwdsMF(accumulators: list,
+                    numForwards: int,
+                    numFactors: int,
+                    numPaths: int,
+                    fwd0: np.ndarray,
+                    lambdas: np.ndarray,
+                    taus: np.ndarray,
+                    useSobol: int = 1,
+                    seed: int = 42,
+                    chunkSize: int = 10000):
+    ''' Run the multi-factor simulation of LMMSimulateFwdsMF_Parallel
+    chunkSize paths at a time and accumulate the payoffs of all of the
+    accumulators. Only one chunk of forwards is held in memory. The sums in
+    the accumulators are reset first. Returns the number of paths. '''
+
+    def simulateBlock(firstPath, numHalfPaths):
+        return LMMSimulateFwdsMF_Block(numForwards, numFactors, firstPath,
+                                       numHalfPaths, fwd0, lambdas, taus,
+                                       useSobol, seed)
+
+    return _streamPaths(accumulators, numPaths, chunkSize, fwd0, taus,
+                        simulateBlock)
+
+###############################################################################
+
+
+def LMMStreamFwdsNF(accumulators: list,
+                    numForwards: int,
+                    numPaths: int,
+                    fwd0: np.ndarray,
+                    zetas: np.ndarray,
+                    correl: np.ndarray,
+                    taus: np.ndarray,
+                    seed: int = 42,
+                    chunkSize: int = 10000):
+    ''' Run the full N-factor simulation of LMMSimulateFwdsNF_Parallel
+    chunkSize paths at a time and accumulate the payoffs of all of the
+    accumulators. Only one chunk of forwards is held in memory. The sums in
+    the accumulators are reset first. Returns the number of paths. '''
+
+    def simulateBlock(firstPath, numHalfPaths):
+        return LMMSimulateFwdsNF_Block(numForwards, firstPath, numHalfPaths,
+                                       fwd0, zetas, correl, taus, seed)
+
+    return _streamPaths(accumulators, numPaths, chunkSize, fwd0, taus,
+                        simulateBlock)
+
+###############################################################################
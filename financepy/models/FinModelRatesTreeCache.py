@@ -0,0 +1,119 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from ..finutils.FinError import FinError
+
+###############################################################################
+# The Hull-White, Black-Karasinski and Black-Derman-Toy models build a tree
+# out to the maturity of each trade they value. When a model is given a tree
+# horizon it instead builds one tree out to this horizon for each discount
+# curve and shares it between all of the trades which mature before it. Each
+# trade then runs on the part of the tree up to its maturity. The trees are
+# held in a bounded LRU cache keyed on the model type and parameters, the
+# tree horizon and the contents of the discount curve.
+###############################################################################
+
+gTreeCache = OrderedDict()
+gTreeCacheSize = 20
+gTreeCacheHits = 0
+gTreeCacheMisses = 0
+
+
+def setTreeCacheSize(cacheSize: int):
+    ''' Set the maximum number of trees held in the tree cache. The least
+    recently used trees are evicted first. A size of zero turns the cache
+    off. '''
+
+    global gTreeCacheSize
+
+    if cacheSize < 0:
+        raise FinError("Tree cache size cannot be negative")
+
+    gTreeCacheSize = cacheSize
+
+    while len(gTreeCache) > gTreeCacheSize:
+        gTreeCache.popitem(last=False)
+
+
+def clearTreeCache():
+    ''' Empty the tree cache and reset the hit and miss counters. '''
+
+    global gTreeCacheHits
+    global gTreeCacheMisses
+
+    gTreeCache.clear()
+    gTreeCacheHits = 0
+    gTreeCacheMisses = 0
+
+
+def treeCacheStats():
+    ''' Returns the number of cache hits, misses and cached trees. '''
+    return (gTreeCacheHits, gTreeCacheMisses, len(gTreeCache))
+
+###############################################################################
+
+
+def _treeKey(model, dfTimes, dfValues):
+    ''' The key of the tree of a model built on a discount curve. '''
+
+    params = (type(model).__name__,
+              getattr(model, "_sigma", None),
+              getattr(model, "_a", None),
+              model._numTimeSteps,
+              model._treeHorizon)
+
+    h = hashlib.sha1(repr(params).encode())
+    h.update(np.ascontiguousarray(dfTimes, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(dfValues, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+###############################################################################
+
+
+def cachedTree(model, dfTimes, dfValues):
+    ''' Return the tuple of tree arrays built by the _buildTree method of a
+    short rate model out to its tree horizon on the discount curve given by
+    dfTimes and dfValues. The tree is taken from the tree cache if it has
+    already been built. The arrays are shared and must not be changed. '''
+
+    global gTreeCacheHits
+    global gTreeCacheMisses
+
+    if gTreeCacheSize == 0:
+        return model._buildTree(model._treeHorizon, dfTimes, dfValues)
+
+    key = _treeKey(model, dfTimes, dfValues)
+
+    tree = gTreeCache.get(key)
+
+    if tree is not None:
+        gTreeCache.move_to_end(key)
+        gTreeCacheHits += 1
+        return tree
+
+    gTreeCacheMisses += 1
+
+    tree = model._buildTree(model._treeHorizon, dfTimes, dfValues)
+    gTreeCache[key] = tree
+
+    while len(gTreeCache) > gTreeCacheSize:
+        gTreeCache.popitem(last=False)
+
+    return tree
+
+###############################################################################
+
+
+def numTreeRows(treeTimes, dt, treeMat):
+    ''' The number of time steps of a shared tree that a trade which matures
+    at treeMat needs. This includes the extra step after maturity. '''
+
+    return min(int(treeMat / dt + 0.50) + 2, len(treeTimes))
+
+###############################################################################
@@ -0,0 +1,646 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from enum import Enum
+
+import numpy as np
+from numba import njit
+
+from ..finutils.FinError import FinError
+from ..finutils.FinMath import accruedInterpolator
+from ..finutils.FinGlobalVariables import gSmall
+from ..market.curves.FinInterpolator import FinInterpTypes, _uinterpolate
+
+interp = FinInterpTypes.FLAT_FWD_RATES.value
+
+###############################################################################
+# The short rate trees of the Hull-White, Black-Karasinski and Black-Derman-
+# Toy models normally use a uniform time grid so coupon and exercise dates
+# fall between the tree times and have to be mapped onto the nearest one.
+# This introduces an error which oscillates as the number of time steps is
+# changed and so many time steps are needed to get stable prices. With an
+# event aligned grid the tree has a time exactly on each coupon and exercise
+# date and the time steps between them are as close as possible to the size
+# of the uniform time step. The time steps are then not all equal and so the
+# spacing of the tree nodes changes from one tree time to the next. Each node
+# branches to the three nodes of the next tree time closest to its expected
+# value as in Hull and White (1994) and the branch probabilities match the
+# mean and variance of the Ornstein-Uhlenbeck process over the time step.
+#
+# Aligning the tree times only removes the error from mapping the dates. The
+# exercise boundary of a Bermudan still falls between the nodes and gives an
+# error that changes irregularly with the number of time steps. So at each
+# exercise date the gain from exercise at a node is averaged over the cell of
+# the node which makes the error fall more steadily with more time steps.
+#
+# The tree is stored in arrays with one row per tree time. For each tree time
+# lo and hi give the first and last columns used and for each node child is
+# the column of its middle branch at the next tree time. The binomial tree of
+# the BDT model is stored in the same way with a zero down branch so all of
+# the valuation functions below work for all three models.
+###############################################################################
+
+
+class FinTreeGridTypes(Enum):
+    UNIFORM = 1
+    EVENT_ALIGNED = 2
+
+###############################################################################
+
+
+def eventTreeTimes(treeMat, eventTimes, numTimeSteps):
+    ''' Return the tree times of an event aligned tree out to treeMat. There
+    is a tree time on each event time before treeMat and the gaps between
+    events are split into equal time steps as close as possible to treeMat
+    divided by numTimeSteps. As for the uniform trees there is one extra time
+    step after treeMat. '''
+
+    if treeMat <= 0.0:
+        raise FinError("Tree maturity must be positive.")
+
+    if numTimeSteps < 1:
+        raise FinError("Number of time steps must be positive.")
+
+    targetDt = treeMat / numTimeSteps
+    tolerance = 1e-8
+
+    gridTimes = [treeMat]
+    for t in eventTimes:
+        if t > tolerance and t < treeMat - tolerance:
+            gridTimes.append(t)
+
+    gridTimes = np.unique(np.array(gridTimes))
+
+    treeTimes = [0.0]
+    tprev = 0.0
+
+    for t in gridTimes:
+
+        if t - tprev < tolerance:
+            continue
+
+        numSteps = max(1, int(round((t - tprev) / targetDt)))
+
+        for i in range(1, numSteps):
+            treeTimes.append(tprev + (t - tprev) * i / numSteps)
+
+        treeTimes.append(t)
+        tprev = t
+
+    treeTimes.append(treeMat + treeTimes[-1] - treeTimes[-2])
+
+    return np.array(treeTimes)
+
+###############################################################################
+
+
+def treeDiscountFactors(treeTimes, dfTimes, dfValues):
+    ''' Discount factors at the tree times interpolated from the curve. '''
+
+    dfTree = np.zeros(len(treeTimes))
+    dfTree[0] = 1.0
+
+    for i in range(1, len(treeTimes)):
+        dfTree[i] = _uinterpolate(treeTimes[i], dfTimes, dfValues, interp)
+
+    return dfTree
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _gridStep(treeTimes, t):
+    ''' Index of the tree time closest to t. '''
+
+    numTimes = len(treeTimes)
+    i = np.searchsorted(treeTimes, t)
+
+    if i >= numTimes:
+        return numTimes - 1
+
+    if i > 0 and t - treeTimes[i-1] < treeTimes[i] - t:
+        return i - 1
+
+    return i
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def trinomialGrid_Fast(a, sigma, treeTimes):
+    ''' Build the nodes and branches of a trinomial tree for the process
+    dx = -a * x * dt + sigma * dW with x(0) = 0 on a grid of tree times that
+    can have unequal time steps. The node spacing at each tree time is set by
+    the variance of x over the time step before it. Returns the value of x at
+    each node, the first and last columns of each tree time, the column of
+    the middle branch of each node and the branch probabilities. '''
+
+    numTimes = len(treeTimes)
+    numSteps = numTimes - 1
+
+    decays = np.zeros(numSteps)
+    variances = np.zeros(numSteps)
+    dX = np.zeros(numTimes)
+
+    for i in range(0, numSteps):
+        dt = treeTimes[i+1] - treeTimes[i]
+
+        if a > 1e-10:
+            decays[i] = np.exp(-a * dt)
+            variances[i] = sigma * sigma * (1.0 - decays[i]**2) / (2.0 * a)
+        else:
+            decays[i] = 1.0
+            variances[i] = sigma * sigma * dt
+
+        dX[i+1] = np.sqrt(3.0 * variances[i])
+
+    # The top node of the next tree time is one above the middle branch of
+    # the top node. Once mean reversion is strong enough the tree stops
+    # growing and the top node branches down as in the Hull-White tree. The
+    # top node is then just high enough for the probabilities to be positive
+    if a > 1e-10:
+        jCap = int(np.ceil(0.1835 * numSteps / (a * treeTimes[-1])))
+    else:
+        jCap = numTimes
+
+    jTop = np.zeros(numTimes, dtype=np.int64)
+    for i in range(0, numSteps):
+        y = jTop[i] * dX[i] * decays[i] / dX[i+1]
+        jGrow = int(np.floor(y + 0.50)) + 1
+        jLimit = max(jCap, int(np.ceil(y + 0.1835)))
+        jTop[i+1] = min(jGrow, jLimit)
+
+    N = np.max(jTop)
+    numNodes = 2 * N + 1
+
+    x = np.zeros(shape=(numTimes, numNodes))
+    lo = np.zeros(numTimes, dtype=np.int64)
+    hi = np.zeros(numTimes, dtype=np.int64)
+    child = np.zeros(shape=(numSteps, numNodes), dtype=np.int64)
+    pu = np.zeros(shape=(numSteps, numNodes))
+    pm = np.zeros(shape=(numSteps, numNodes))
+    pd = np.zeros(shape=(numSteps, numNodes))
+
+    for i in range(0, numTimes):
+
+        lo[i] = N - jTop[i]
+        hi[i] = N + jTop[i]
+
+        for j in range(-jTop[i], jTop[i]+1):
+            x[i, j+N] = j * dX[i]
+
+    for i in range(0, numSteps):
+
+        dx = dX[i+1]
+        v = variances[i] / (dx * dx)
+
+        for j in range(-jTop[i], jTop[i]+1):
+            jN = j + N
+            mean = x[i, jN] * decays[i]
+            k = int(np.floor(mean / dx + 0.50))
+            k = min(max(k, 1 - jTop[i+1]), jTop[i+1] - 1)
+            eta = (mean - k * dx) / dx
+
+            child[i, jN] = k + N
+            pu[i, jN] = 0.50 * (v + eta * eta + eta)
+            pm[i, jN] = 1.0 - v - eta * eta
+            pd[i, jN] = 0.50 * (v + eta * eta - eta)
+
+    return x, lo, hi, child, pu, pm, pd
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def binomialGrid_Fast(sigma, treeTimes):
+    ''' Build the nodes and branches of the recombining binomial tree of the
+    log of the short rate in the Black-Derman-Toy model on a grid of tree
+    times that can have unequal time steps. The log rates at each tree time
+    are spaced by 2 * sigma * sqrt(dt) where dt is the average time step up
+    to it so that their variance is sigma^2 times the tree time. The branch
+    probabilities are one half. The first column is left empty so
+    that the unused down branch of the lowest node is inside the arrays. '''
+
+    numTimes = len(treeTimes)
+    numSteps = numTimes - 1
+    numNodes = numTimes + 1
+
+    x = np.zeros(shape=(numTimes, numNodes))
+    lo = np.zeros(numTimes, dtype=np.int64)
+    hi = np.zeros(numTimes, dtype=np.int64)
+    child = np.zeros(shape=(numSteps, numNodes), dtype=np.int64)
+    pu = np.zeros(shape=(numSteps, numNodes))
+    pm = np.zeros(shape=(numSteps, numNodes))
+    pd = np.zeros(shape=(numSteps, numNodes))
+
+    for i in range(0, numTimes):
+
+        # Over i steps of the average size the variance is sigma^2 * t
+        if i > 0:
+            dt = treeTimes[i] / i
+        else:
+            dt = 0.0
+
+        lo[i] = 1
+        hi[i] = i + 1
+
+        for k in range(0, i+1):
+            x[i, k+1] = sigma * np.sqrt(dt) * (2.0 * k - i)
+
+            if i < numSteps:
+                child[i, k+1] = k + 1
+                pu[i, k+1] = 0.50
+                pm[i, k+1] = 0.50
+
+    return x, lo, hi, child, pu, pm, pd
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def fitNormalGrid_Fast(x, lo, hi, child, pu, pm, pd, treeTimes,
+                       discountFactors):
+    ''' Set the short rate at each node to alpha + x where alpha at each tree
+    time makes the tree reprice the discount factor to the next tree time.
+    This is the Hull-White model. Returns the Arrow-Debreu prices and the
+    short rates. '''
+
+    numTimes, numNodes = x.shape
+    Q = np.zeros(shape=(numTimes, numNodes))
+    rt = np.zeros(shape=(numTimes, numNodes))
+
+    Q[0, lo[0]] = 1.0
+
+    for i in range(0, numTimes-1):
+
+        dt = treeTimes[i+1] - treeTimes[i]
+
+        sumQZ = 0.0
+        for s in range(lo[i], hi[i]+1):
+            sumQZ += Q[i, s] * np.exp(-x[i, s] * dt)
+
+        alpha = np.log(sumQZ / discountFactors[i+1]) / dt
+
+        for s in range(lo[i], hi[i]+1):
+            rt[i, s] = alpha + x[i, s]
+            z = Q[i, s] * np.exp(-rt[i, s] * dt)
+            c = child[i, s]
+            Q[i+1, c+1] += pu[i, s] * z
+            Q[i+1, c] += pm[i, s] * z
+            Q[i+1, c-1] += pd[i, s] * z
+
+    return Q, rt
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def fitLognormalGrid_Fast(x, lo, hi, child, pu, pm, pd, treeTimes,
+                          discountFactors):
+    ''' Set the short rate at each node to exp(alpha + x) where alpha at each
+    tree time makes the tree reprice the discount factor to the next tree
+    time. This is the Black-Karasinski and Black-Derman-Toy model. The alpha
+    are found using Newton's method. Returns the Arrow-Debreu prices and the
+    short rates. '''
+
+    numTimes, numNodes = x.shape
+    Q = np.zeros(shape=(numTimes, numNodes))
+    rt = np.zeros(shape=(numTimes, numNodes))
+
+    Q[0, lo[0]] = 1.0
+
+    for i in range(0, numTimes-1):
+
+        dt = treeTimes[i+1] - treeTimes[i]
+        dfEnd = discountFactors[i+1]
+
+        # Start the search from the forward rate over the time step
+        fwdRate = np.log(discountFactors[i] / dfEnd) / dt
+        alpha = np.log(max(fwdRate, 1e-6))
+
+        converged = False
+
+        for _ in range(0, 50):
+
+            f = -dfEnd
+            fprime = 0.0
+
+            for s in range(lo[i], hi[i]+1):
+                rdt = np.exp(alpha + x[i, s]) * dt
+                z = Q[i, s] * np.exp(-rdt)
+                f += z
+                fprime -= z * rdt
+
+            if abs(f) <= 1e-14:
+                converged = True
+                break
+
+            if fprime == 0.0:
+                break
+
+            alpha -= f / fprime
+
+        if not converged:
+            raise FinError("Search for the tree drift failed to converge.")
+
+        for s in range(lo[i], hi[i]+1):
+            rt[i, s] = np.exp(alpha + x[i, s])
+            z = Q[i, s] * np.exp(-rt[i, s] * dt)
+            c = child[i, s]
+            Q[i+1, c+1] += pu[i, s] * z
+            Q[i+1, c] += pm[i, s] * z
+            Q[i+1, c-1] += pd[i, s] * z
+
+    return Q, rt
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _positivePartMean(y0, y1):
+    ''' Average of max(y, 0) over a unit interval where y moves linearly
+    from y0 to y1. '''
+
+    if y0 >= 0.0 and y1 >= 0.0:
+        return 0.50 * (y0 + y1)
+
+    if y0 <= 0.0 and y1 <= 0.0:
+        return 0.0
+
+    p = max(y0, y1)
+    return p * p / (2.0 * (abs(y0) + abs(y1)))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _smoothExerciseGain(gains, lo, hi):
+    ''' Replace the gain max(y, 0) from exercise at each node of a tree time
+    by its average over the cell of the node, which reaches half way to each
+    of its neighbours. Between the nodes y is linearly interpolated. The
+    nodes at a tree time are equally spaced in the tree variable. Without this
+    the error in the value from the exercise boundary falling between nodes
+    changes with the number of time steps in an irregular way. '''
+
+    smoothed = np.zeros(len(gains))
+
+    for s in range(lo, hi+1):
+
+        y = gains[s]
+
+        if s > lo:
+            left = _positivePartMean(y, 0.50 * (y + gains[s-1]))
+        else:
+            left = max(y, 0.0)
+
+        if s < hi:
+            right = _positivePartMean(y, 0.50 * (y + gains[s+1]))
+        else:
+            right = max(y, 0.0)
+
+        smoothed[s] = 0.50 * (left + right)
+
+    return smoothed
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudanSwaption_Grid_Fast(texp, tmat, strikePrice, faceAmount,
+                               couponTimes, couponFlows,
+                               exerciseTypeInt,
+                               _dfTimes, _dfValues,
+                               _treeTimes, _rt, _lo, _hi, _child,
+                               _pu, _pm, _pd):
+    ''' Option to enter into a swap that can be exercised on coupon payment
+    dates after the start of the exercise period valued on an event aligned
+    tree. This follows the valuation on the uniform trees but the coupons
+    and exercise dates are on the tree times. '''
+
+    numTimes, numNodes = _rt.shape
+    expiryStep = _gridStep(_treeTimes, texp)
+    maturityStep = _gridStep(_treeTimes, tmat)
+
+    ###########################################################################
+
+    fixedLegFlows = np.zeros(numTimes)
+    floatLegValues = np.zeros(numTimes)
+    numCoupons = len(couponTimes)
+
+    # The flows are on the tree times unless they are after the tree
+    for i in range(0, numCoupons):
+        tcpn = couponTimes[i]
+        n = _gridStep(_treeTimes, tcpn)
+        ttree = _treeTimes[n]
+        df_flow = _uinterpolate(tcpn, _dfTimes, _dfValues, interp)
+        df_tree = _uinterpolate(ttree, _dfTimes, _dfValues, interp)
+        fixedLegFlows[n] += couponFlows[i] * 1.0 * df_flow / df_tree
+        floatLegValues[n] = strikePrice * df_flow / df_tree
+
+    mappedTimes = np.array([0.0])
+    mappedAmounts = np.array([0.0])
+
+    for n in range(1, numTimes):
+
+        accdAtExpiry = 0.0
+        if _treeTimes[n-1] < texp and _treeTimes[n] >= texp:
+            mappedTimes = np.append(mappedTimes, texp)
+            mappedAmounts = np.append(mappedAmounts, accdAtExpiry)
+
+        if fixedLegFlows[n] > 0.0:
+            mappedTimes = np.append(mappedTimes, _treeTimes[n])
+            mappedAmounts = np.append(mappedAmounts, fixedLegFlows[n])
+
+    accrued = np.zeros(numTimes)
+    for m in range(0, maturityStep+1):
+        ttree = _treeTimes[m]
+        accrued[m] = accruedInterpolator(ttree, mappedTimes, mappedAmounts)
+        accrued[m] *= faceAmount
+
+        if fixedLegFlows[m] > gSmall:
+            accrued[m] = fixedLegFlows[m] * faceAmount
+
+    ###########################################################################
+
+    fixedLegValues = np.zeros(shape=(numTimes, numNodes))
+    payValues = np.zeros(shape=(numTimes, numNodes))
+    recValues = np.zeros(shape=(numTimes, numNodes))
+
+    # Start with the value of the bond at maturity
+    for s in range(_lo[maturityStep], _hi[maturityStep]+1):
+        flow = 1.0 + fixedLegFlows[maturityStep]
+        fixedLegValues[maturityStep, s] = flow * faceAmount
+
+    # Now step back to today considering early exercise
+    for m in range(maturityStep-1, -1, -1):
+
+        dt = _treeTimes[m+1] - _treeTimes[m]
+        flow = fixedLegFlows[m] * faceAmount
+
+        for s in range(_lo[m], _hi[m]+1):
+
+            df = np.exp(-_rt[m, s] * dt)
+            c = _child[m, s]
+            pu = _pu[m, s]
+            pm = _pm[m, s]
+            pd = _pd[m, s]
+
+            vu = fixedLegValues[m+1, c+1]
+            vm = fixedLegValues[m+1, c]
+            vd = fixedLegValues[m+1, c-1]
+            fixedLegValues[m, s] = (pu*vu + pm*vm + pd*vd) * df + flow
+
+            vu = payValues[m+1, c+1]
+            vm = payValues[m+1, c]
+            vd = payValues[m+1, c-1]
+            holdPay = (pu*vu + pm*vm + pd*vd) * df
+
+            vu = recValues[m+1, c+1]
+            vm = recValues[m+1, c]
+            vd = recValues[m+1, c-1]
+            holdRec = (pu*vu + pm*vm + pd*vd) * df
+
+            payValues[m, s] = holdPay
+            recValues[m, s] = holdRec
+
+        if m == expiryStep or (exerciseTypeInt == 2 and flow > gSmall
+                               and m > expiryStep):
+
+            # The floating value is clean and so must be the fixed value.
+            # The hold values are not negative so the value is the hold
+            # value plus the gain from exercising instead of holding.
+            payGains = np.zeros(numNodes)
+            recGains = np.zeros(numNodes)
+
+            for s in range(_lo[m], _hi[m]+1):
+                fixedLegValue = fixedLegValues[m, s] - accrued[m]
+                floatLegValue = floatLegValues[m]
+                payGains[s] = floatLegValue - fixedLegValue - payValues[m, s]
+                recGains[s] = fixedLegValue - floatLegValue - recValues[m, s]
+
+            payGains = _smoothExerciseGain(payGains, _lo[m], _hi[m])
+            recGains = _smoothExerciseGain(recGains, _lo[m], _hi[m])
+
+            for s in range(_lo[m], _hi[m]+1):
+                payValues[m, s] += payGains[s]
+                recValues[m, s] += recGains[s]
+
+        elif exerciseTypeInt == 3 and m > expiryStep:
+
+            raise FinError("American optionality not supported.")
+
+    return payValues[0, _lo[0]], recValues[0, _lo[0]]
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def callablePuttableBond_Grid_Fast(couponTimes, couponFlows,
+                                   callTimes, callPrices,
+                                   putTimes, putPrices, face,
+                                   _dfTimes, _dfValues,
+                                   _treeTimes, _rt, _lo, _hi, _child,
+                                   _pu, _pm, _pd):
+    ''' Value a bond with call and put dates on an event aligned tree. The
+    bond can be called or put at the call and put prices which are clean.
+    This follows the valuation on the uniform trees but the coupons and the
+    call and put dates are on the tree times. '''
+
+    if np.any(couponTimes < 0.0):
+        raise FinError("No coupon times can be before the value date.")
+
+    numTimes, numNodes = _rt.shape
+    tmat = couponTimes[-1]
+    maturityStep = _gridStep(_treeTimes, tmat)
+
+    ###########################################################################
+
+    treeFlows = np.zeros(numTimes)
+
+    numCoupons = len(couponTimes)
+    for i in range(0, numCoupons):
+        tcpn = couponTimes[i]
+        n = _gridStep(_treeTimes, tcpn)
+        ttree = _treeTimes[n]
+        df_flow = _uinterpolate(tcpn, _dfTimes, _dfValues, interp)
+        df_tree = _uinterpolate(ttree, _dfTimes, _dfValues, interp)
+        treeFlows[n] += couponFlows[i] * 1.0 * df_flow / df_tree
+
+    mappedTimes = np.array([0.0])
+    mappedAmounts = np.array([0.0])
+
+    for n in range(1, numTimes):
+        if treeFlows[n] > 0.0:
+            mappedTimes = np.append(mappedTimes, _treeTimes[n])
+            mappedAmounts = np.append(mappedAmounts, treeFlows[n])
+
+    accrued = np.zeros(numTimes)
+    for m in range(0, numTimes):
+        ttree = _treeTimes[m]
+        accrued[m] = accruedInterpolator(ttree, mappedTimes, mappedAmounts)
+        accrued[m] *= face
+
+        if treeFlows[m] > 0.0:
+            accrued[m] = treeFlows[m] * face
+
+    # There must be no call at a high value where there is no call date
+    treeCallValue = np.ones(numTimes) * face * 1000.0
+    for i in range(0, len(callTimes)):
+        n = _gridStep(_treeTimes, callTimes[i])
+        treeCallValue[n] = callPrices[i]
+
+    treePutValue = np.zeros(numTimes)
+    for i in range(0, len(putTimes)):
+        n = _gridStep(_treeTimes, putTimes[i])
+        treePutValue[n] = putPrices[i]
+
+    ###########################################################################
+
+    callPutBondValues = np.zeros(shape=(numTimes, numNodes))
+    bondValues = np.zeros(shape=(numTimes, numNodes))
+
+    m = maturityStep
+    vcall = treeCallValue[m]
+    vput = treePutValue[m]
+    vhold = (1.0 + treeFlows[m]) * face
+    vclean = vhold - accrued[m]
+    value = min(max(vclean, vput), vcall) + accrued[m]
+
+    for s in range(_lo[m], _hi[m]+1):
+        bondValues[m, s] = (1.0 + treeFlows[m]) * face
+        callPutBondValues[m, s] = value
+
+    # Now step back to today considering early put and call
+    for m in range(maturityStep-1, -1, -1):
+
+        dt = _treeTimes[m+1] - _treeTimes[m]
+        flow = treeFlows[m] * face
+        vcall = treeCallValue[m]
+        vput = treePutValue[m]
+
+        for s in range(_lo[m], _hi[m]+1):
+
+            df = np.exp(-_rt[m, s] * dt)
+            c = _child[m, s]
+            pu = _pu[m, s]
+            pm = _pm[m, s]
+            pd = _pd[m, s]
+
+            vu = bondValues[m+1, c+1]
+            vm = bondValues[m+1, c]
+            vd = bondValues[m+1, c-1]
+            bondValues[m, s] = (pu*vu + pm*vm + pd*vd) * df + flow
+
+            vu = callPutBondValues[m+1, c+1]
+            vm = callPutBondValues[m+1, c]
+            vd = callPutBondValues[m+1, c-1]
+            vhold = (pu*vu + pm*vm + pd*vd) * df + flow
+
+            value = min(max(vhold - accrued[m], vput), vcall) + accrued[m]
+            callPutBondValues[m, s] = value
+
+    return {'bondwithoption': callPutBondValues[0, _lo[0]],
+            'bondpure': bondValues[0, _lo[0]]}
+
+###############################################################################
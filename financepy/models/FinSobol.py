@@ -141,3 +141,90 @@ def getUniformSobol(numPoints, dimension):
     return points
 
 ###############################################################################
+
+
+@njit(cache=True)
+def getGaussianSobolBlock(firstPoint, numPoints, dimension):
+    ''' Sobol Gaussian quasi random points numbered firstPoint onwards in the
+    sequence generated by getGaussianSobol. '''
+    points = getUniformSobolBlock(firstPoint, numPoints, dimension)
+
+    for i in range(numPoints):
+        for j in range(dimension):
+            points[i, j] = norminvcdf(points[i, j])
+    return points
+
+###############################################################################
+
+
+@njit(cache=True)
+def getUniformSobolBlock(firstPoint, numPoints, dimension):
+    ''' Sobol uniform quasi random points numbered firstPoint to firstPoint +
+    numPoints - 1 in the sequence generated by getUniformSobol. The point
+    before the block is found directly from the Gray code of its number so a
+    long sequence can be generated in blocks without holding all of it in
+    memory. '''
+
+    global sArr
+    global aArr
+    global m_i
+
+    lastPoint = firstPoint + numPoints
+
+    # ll = number of bits needed
+    ll = int(np.ceil(np.log(lastPoint+1)/np.log(2.0)))
+
+    points = np.zeros((numPoints, dimension))
+
+    for j in range(0, dimension):
+
+        # Compute direction numbers v[1] to v[L], scaled by 2**32
+        v = np.zeros(ll+1, dtype=np.int64)
+
+        if j == 0:
+            for i in range(1, ll+1):
+                v[i] = 1 << (32-i)
+        else:
+            s = sArr[j-1]
+            a = aArr[j-1]
+            mm = m_i[j-1]
+            m = np.concatenate((np.zeros(1), mm))
+
+            if ll <= s:
+                for i in range(1, ll+1):
+                    v[i] = int(m[i]) << (32-i)
+            else:
+                for i in range(1, s+1):
+                    v[i] = int(m[i]) << (32-i)
+
+                for i in range(s+1, ll+1):
+                    v[i] = v[i-s] ^ (v[i-s] >> s)
+                    for k in range(1, s):
+                        v[i] = v[i] ^ (((int(a) >> int(s-1-k)) & 1) * v[i-k])
+
+        # The point before the block is the XOR of the direction numbers of
+        # the bits set in the Gray code of its number
+        gray = firstPoint ^ (firstPoint >> 1)
+        x = 0
+        k = 1
+        while gray > 0:
+            if gray & 1:
+                x = x ^ v[k]
+            gray >>= 1
+            k += 1
+
+        for i in range(0, numPoints):
+
+            # c = index from the right of the first zero bit of the number
+            value = firstPoint + i
+            c = 1
+            while value & 1:
+                value >>= 1
+                c += 1
+
+            x = x ^ v[c]
+            points[i, j] = x/(2**32)
+
+    return points
+
+###############################################################################
@@ -16,7 +16,11 @@
 # from .FinModelRatesCIR import *
 # from .FinModelRatesHL import *
 # from .FinModelRatesHW import *
+# from .FinModelRatesHWSimulator import *
 # from .FinModelRatesLMM import *
+# from .FinModelRatesLMMStreaming import *
+# from .FinModelRatesTreeCache import *
+# from .FinModelRatesTreeGrid import *
 # from .FinModelRatesVasicek import *
 # from .FinModelSABR import *
 # from .FinModelSABRShifted import *
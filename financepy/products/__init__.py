@@ -0,0 +1,4 @@
+from ..finutils.FinLazyImport import makeLazyPackage
+
+# Subpackages are only imported when they are first used
+makeLazyPackage(__name__, [], ["bonds", "credit", "equity", "fx", "inflation", "rates"])
@@ -170,19 +170,22 @@ class FinBondEmbeddedOption(object):
 
         faceAmount = self._bond._faceAmount
 
+        # Event aligned trees have a time on each coupon, call and put date
+        eventTimes = np.concatenate((cpnTimes, callTimes, putTimes))
+
         if isinstance(model, FinModelRatesHW):
 
             ''' We need to build the tree out to the bond maturity date. To be
             more precise we only need to go out the the last option date but
             we can do that refinement at a later date. '''
 
-            model.buildTree(tmat, dfTimes, dfValues)
+            model.buildTree(tmat, dfTimes, dfValues, eventTimes)
             v1 = model.callablePuttableBond_Tree(cpnTimes, cpnAmounts,
                                                  callTimes, callPrices,
                                                  putTimes, putPrices,
                                                  faceAmount)
             model._numTimeSteps += 1
-            model.buildTree(tmat, dfTimes, dfValues)
+            model.buildTree(tmat, dfTimes, dfValues, eventTimes)
             v2 = model.callablePuttableBond_Tree(cpnTimes, cpnAmounts,
                                                  callTimes, callPrices,
                                                  putTimes, putPrices,
@@ -199,13 +202,13 @@ class FinBondEmbeddedOption(object):
             ''' Because we not have a closed form bond price we need to build
             the tree out to the bond maturity which is after option expiry. '''
 
-            model.buildTree(tmat, dfTimes, dfValues)
+            model.buildTree(tmat, dfTimes, dfValues, eventTimes)
             v1 = model.callablePuttableBond_Tree(cpnTimes, cpnAmounts,
                                                  callTimes, callPrices,
                                                  putTimes, putPrices,
                                                  faceAmount)
             model._numTimeSteps += 1
-            model.buildTree(tmat, dfTimes, dfValues)
+            model.buildTree(tmat, dfTimes, dfValues, eventTimes)
             v2 = model.callablePuttableBond_Tree(cpnTimes, cpnAmounts,
                                                  callTimes, callPrices,
                                                  putTimes, putPrices,
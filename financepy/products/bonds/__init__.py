@@ -1,12 +1,15 @@
-from .FinBond import *
-from .FinBondAnnuity import *
-from .FinBondZeroCurve import *
-from .FinBondConvertible import *
-from .FinBondEmbeddedOption import *
-from .FinBondFRN import *
-from .FinBondFuture import *
-from .FinBondMarket import *
-from .FinBondOption import *
-from .FinBondYieldCurve import *
-from .FinBondYieldCurveModel import *
-from .FinBondMortgage import *
+from ...finutils.FinLazyImport import makeLazyPackage
+
+# Modules are only imported when one of their names is first used
+makeLazyPackage(__name__, ["FinBond",
+                           "FinBondAnnuity",
+                           "FinBondZeroCurve",
+                           "FinBondConvertible",
+                           "FinBondEmbeddedOption",
+                           "FinBondFRN",
+                           "FinBondFuture",
+                           "FinBondMarket",
+                           "FinBondOption",
+                           "FinBondYieldCurve",
+                           "FinBondYieldCurveModel",
+                           "FinBondMortgage"])
@@ -187,6 +187,9 @@ class FinCDS(object):
     ''' A class which manages a Credit Default Swap. It performs schedule
     generation and the valuation and risk management of CDS. '''
 
+    # These are generated from the contract terms
+    _derivedAttributes = ("_adjustedDates", "_accrualFactors", "_flows")
+
     def __init__(self,
                  stepInDate: FinDate,  # Date protection starts
                  maturityDateOrTenor: (FinDate, str),  # FinDate or tenor
@@ -434,6 +437,7 @@ class FinCDS(object):
             fra._fraRate += bump
         for swap in newIssuerCurve._liborCurve._usedSwaps:
             swap._fixedLeg._coupon += bump
+            swap._fixedLeg.generatePayments()
 
         newIssuerCurve._liborCurve._buildCurve()
 
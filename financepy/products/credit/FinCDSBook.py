@@ -0,0 +1,587 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange
+
+from ...finutils.FinDate import FinDate
+from ...finutils.FinError import FinError
+from ...finutils.FinDayCount import FinDayCount
+from ...finutils.FinGlobalVariables import gDaysInYear
+from ...finutils.FinHelperFunctions import labelToString
+
+from .FinCDS import _riskyPV01_NUMBA, _protectionLegPV_NUMBA
+from .FinCDS import standardRecovery
+from .FinCDSCurveSet import FinCDSCurveSet
+from .FinCDSRisk import hazardJacobians, _iborArrays, _iborQuoteJacobian
+from .FinCDSRisk import _cdsBookRisk, _cdsBookRiskParallel, ONE_BP
+
+###############################################################################
+# The value methods of FinCDS build the payment times of the premium leg and
+# the accrued to the step-in date every time that a contract is valued. Here
+# the payment dates and accrual factors of all of the contracts of a book are
+# put once into flat arrays with an offset array marking where each contract
+# starts. The survival curves of the issuers are held in the same way. A
+# valuation converts the dates to times in one step and then makes one call
+# to a Numba function which runs the FinCDS leg kernels for every contract so
+# that the values are those of FinCDS.value.
+###############################################################################
+
+
+@njit(cache=True)
+def _cdsLegs(iCDS,
+             teffs,
+             tmats,
+             accruedToNow,
+             payOffsets,
+             payTimes,
+             yearFracs,
+             iborTimes,
+             iborDfs,
+             curveRows,
+             curveOffsets,
+             curveTimes,
+             curveValues,
+             recoveries,
+             numStepsPerYear):
+    ''' The full and the clean risky PV01 and the protection leg value per
+    unit notional of one contract of the book. '''
+
+    start = payOffsets[iCDS]
+    end = payOffsets[iCDS + 1]
+
+    row = curveRows[iCDS]
+    survTimes = curveTimes[curveOffsets[row]:curveOffsets[row + 1]]
+    survValues = curveValues[curveOffsets[row]:curveOffsets[row + 1]]
+
+    rpv01 = _riskyPV01_NUMBA(teffs[iCDS],
+                             accruedToNow[iCDS],
+                             payTimes[start:end],
+                             yearFracs[start:end],
+                             iborTimes,
+                             iborDfs,
+                             survTimes,
+                             survValues,
+                             0)
+
+    protPV = _protectionLegPV_NUMBA(teffs[iCDS],
+                                    tmats[iCDS],
+                                    iborTimes,
+                                    iborDfs,
+                                    survTimes,
+                                    survValues,
+                                    recoveries[iCDS],
+                                    numStepsPerYear,
+                                    0)
+
+    return rpv01[0], rpv01[1], protPV
+
+###############################################################################
+
+
+@njit(cache=True)
+def _cdsBookLegs(teffs,
+                 tmats,
+                 accruedToNow,
+                 payOffsets,
+                 payTimes,
+                 yearFracs,
+                 iborTimes,
+                 iborDfs,
+                 curveRows,
+                 curveOffsets,
+                 curveTimes,
+                 curveValues,
+                 recoveries,
+                 numStepsPerYear):
+    ''' The legs of all of the contracts of the book on one thread. The
+    output has a row for each contract holding the full and the clean risky
+    PV01 and the protection leg value per unit notional. '''
+
+    numCDS = len(teffs)
+    legs = np.zeros((numCDS, 3))
+
+    for iCDS in range(0, numCDS):
+        legs[iCDS, 0], legs[iCDS, 1], legs[iCDS, 2] = \
+            _cdsLegs(iCDS, teffs, tmats, accruedToNow, payOffsets, payTimes,
+                     yearFracs, iborTimes, iborDfs, curveRows, curveOffsets,
+                     curveTimes, curveValues, recoveries, numStepsPerYear)
+
+    return legs
+
+###############################################################################
+
+
+@njit(cache=True, parallel=True)
+def _cdsBookLegsParallel(teffs,
+                         tmats,
+                         accruedToNow,
+                         payOffsets,
+                         payTimes,
+                         yearFracs,
+                         iborTimes,
+                         iborDfs,
+                         curveRows,
+                         curveOffsets,
+                         curveTimes,
+                         curveValues,
+                         recoveries,
+                         numStepsPerYear):
+    ''' The legs of all of the contracts of the book with the contracts
+    shared out between the threads. Each contract is valued on its own so the
+    values do not depend on the number of threads. '''
+
+    numCDS = len(teffs)
+    legs = np.zeros((numCDS, 3))
+
+    for iCDS in prange(0, numCDS):
+        legs[iCDS, 0], legs[iCDS, 1], legs[iCDS, 2] = \
+            _cdsLegs(iCDS, teffs, tmats, accruedToNow, payOffsets, payTimes,
+                     yearFracs, iborTimes, iborDfs, curveRows, curveOffsets,
+                     curveTimes, curveValues, recoveries, numStepsPerYear)
+
+    return legs
+
+###############################################################################
+
+
+class FinCDSBook():
+    ''' Class for valuing a book of CDS contracts against the survival curves
+    of their issuers in one batched call. The payment dates and accrual
+    factors of the contracts are compiled into arrays once when the book is
+    created. The values, risky PV01s and par spreads are returned as arrays
+    with one entry for each contract and are the same as those of the FinCDS
+    methods. The credit and interest rate DV01s of the contracts are found
+    from the derivatives of the curves without rebuilding them. '''
+
+    def __init__(self,
+                 cdsContracts: list,
+                 issuers: list = None):
+        ''' Create the book from a list of CDS contracts and the issuer of
+        each contract. The issuer is the index of its curve in the list of
+        issuer curves or its name or index in a FinCDSCurveSet. If the issuers
+        are not given then contract i is valued on issuer curve i. The
+        contracts should not be changed after they are added to the book. '''
+
+        numCDS = len(cdsContracts)
+
+        if numCDS == 0:
+            raise FinError("No CDS contracts in the book.")
+
+        if issuers is None:
+            issuers = list(range(0, numCDS))
+        elif len(issuers) != numCDS:
+            raise FinError("Need one issuer for each CDS contract.")
+
+        payOffsets = np.zeros(numCDS + 1, dtype=np.int64)
+        paySerials = []
+        yearFracs = []
+
+        self._stepInSerials = np.zeros(numCDS)
+        self._maturitySerials = np.zeros(numCDS)
+        self._accruedToNow = np.zeros(numCDS)
+        self._coupons = np.zeros(numCDS)
+        self._notionals = np.zeros(numCDS)
+        self._signs = np.zeros(numCDS)
+
+        for iCDS, cds in enumerate(cdsContracts):
+
+            dates = cds._adjustedDates
+            paySerials.append([dt._excelDate for dt in dates])
+            yearFracs.append(cds._accrualFactors)
+            payOffsets[iCDS + 1] = payOffsets[iCDS] + len(dates)
+
+            # The part of the coupon accrued from the previous coupon date
+            dayCount = FinDayCount(cds._dayCountType)
+            self._accruedToNow[iCDS] = \
+                dayCount.yearFrac(dates[0], cds._stepInDate)[0]
+
+            self._stepInSerials[iCDS] = cds._stepInDate._excelDate
+            self._maturitySerials[iCDS] = cds._maturityDate._excelDate
+            self._coupons[iCDS] = cds._runningCoupon
+            self._notionals[iCDS] = cds._notional
+
+            if cds._longProtection:
+                self._signs[iCDS] = 1.0
+            else:
+                self._signs[iCDS] = -1.0
+
+        self._cdsContracts = cdsContracts
+        self._issuers = list(issuers)
+        self._payOffsets = payOffsets
+        self._paySerials = np.array(np.concatenate(paySerials),
+                                    dtype=np.float64)
+        self._yearFracs = np.array(np.concatenate(yearFracs),
+                                   dtype=np.float64)
+
+###############################################################################
+
+    def numContracts(self):
+        ''' The number of CDS contracts in the book. '''
+        return len(self._cdsContracts)
+
+###############################################################################
+
+    def _curveArrays(self, issuerCurves):
+        ''' Return the Ibor curve and the survival curves of the issuers as
+        flat arrays with the row of each contract in them. All of the issuer
+        curves must discount on the same Ibor curve. '''
+
+        if isinstance(issuerCurves, FinCDSCurveSet):
+
+            numCurves = issuerCurves.numNames()
+            numTimes = len(issuerCurves._times)
+            curveOffsets = np.arange(0, numCurves + 1) * numTimes
+            curveTimes = np.tile(issuerCurves._times, numCurves)
+            curveValues = issuerCurves._values.ravel().copy()
+            curveRows = np.array([issuerCurves._index(issuer)
+                                  for issuer in self._issuers],
+                                 dtype=np.int64)
+            liborCurve = issuerCurves._liborCurve
+
+        else:
+
+            numCurves = len(issuerCurves)
+
+            if numCurves == 0:
+                raise FinError("No issuer curves have been supplied.")
+
+            liborCurve = issuerCurves[0]._liborCurve
+
+            for issuerCurve in issuerCurves[1:]:
+                if issuerCurve._liborCurve is not liborCurve:
+                    raise FinError("Issuer curves must share one Ibor curve.")
+
+            curveOffsets = np.zeros(numCurves + 1, dtype=np.int64)
+            for i, issuerCurve in enumerate(issuerCurves):
+                curveOffsets[i + 1] = curveOffsets[i] + \
+                    len(issuerCurve._times)
+
+            curveTimes = np.concatenate([np.array(c._times, dtype=np.float64)
+                                         for c in issuerCurves])
+            curveValues = np.concatenate([np.array(c._values,
+                                                   dtype=np.float64)
+                                          for c in issuerCurves])
+
+            curveRows = np.zeros(self.numContracts(), dtype=np.int64)
+            for iCDS, issuer in enumerate(self._issuers):
+                if not isinstance(issuer, (int, np.integer)):
+                    raise FinError("Issuer must be the index of its curve.")
+                if issuer < 0 or issuer >= numCurves:
+                    raise FinError("Issuer index out of range.")
+                curveRows[iCDS] = issuer
+
+        return liborCurve, curveRows, curveOffsets.astype(np.int64), \
+            curveTimes, curveValues
+
+###############################################################################
+
+    def _recoveries(self, contractRecovery):
+        ''' The contract recovery rates as an array with one for each contract.
+        '''
+
+        numCDS = self.numContracts()
+
+        recoveries = np.array(contractRecovery, dtype=np.float64)
+        if recoveries.ndim == 0:
+            recoveries = np.full(numCDS, float(recoveries))
+        elif recoveries.shape != (numCDS,):
+            raise FinError("Need one recovery rate for each CDS contract.")
+
+        return recoveries
+
+###############################################################################
+
+    def _times(self, valuationDate, liborCurve):
+        ''' The step-in, maturity and payment times of all of the contracts
+        from the valuation date. '''
+
+        if isinstance(valuationDate, FinDate) is False:
+            raise FinError("Valuation date must be a FinDate.")
+
+        if liborCurve._valuationDate != valuationDate:
+            raise FinError("Ibor curve does not have same valuation date.")
+
+        valueSerial = valuationDate._excelDate
+        teffs = (self._stepInSerials - valueSerial) / gDaysInYear
+        tmats = (self._maturitySerials - valueSerial) / gDaysInYear
+        payTimes = (self._paySerials - valueSerial) / gDaysInYear
+        return teffs, tmats, payTimes
+
+###############################################################################
+
+    def _legs(self,
+              valuationDate,
+              issuerCurves,
+              contractRecovery,
+              numStepsPerYear,
+              useParallel):
+        ''' The full and the clean risky PV01 and the protection leg value per
+        unit notional of all of the contracts as columns of a matrix. '''
+
+        recoveries = self._recoveries(contractRecovery)
+
+        liborCurve, curveRows, curveOffsets, curveTimes, curveValues = \
+            self._curveArrays(issuerCurves)
+
+        teffs, tmats, payTimes = self._times(valuationDate, liborCurve)
+
+        if useParallel:
+            legsFn = _cdsBookLegsParallel
+        else:
+            legsFn = _cdsBookLegs
+
+        return legsFn(teffs, tmats, self._accruedToNow, self._payOffsets,
+                      payTimes, self._yearFracs, liborCurve._times,
+                      liborCurve._dfs, curveRows, curveOffsets, curveTimes,
+                      curveValues, recoveries, int(numStepsPerYear))
+
+###############################################################################
+
+    def riskyPV01(self,
+                  valuationDate: FinDate,
+                  issuerCurves,
+                  useParallel: bool = True):
+        ''' Return the arrays of the full and the clean risky PV01 of the
+        contracts in a dictionary with the keys of FinCDS.riskyPV01. '''
+
+        legs = self._legs(valuationDate, issuerCurves, standardRecovery, 25,
+                          useParallel)
+
+        return {'full_rpv01': legs[:, 0], 'clean_rpv01': legs[:, 1]}
+
+###############################################################################
+
+    def protectionLegPV(self,
+                        valuationDate: FinDate,
+                        issuerCurves,
+                        contractRecovery=standardRecovery,
+                        numStepsPerYear: int = 25,
+                        useParallel: bool = True):
+        ''' Return the array of the protection leg values of the contracts.
+        The contract recovery rate can be the same for all of the contracts
+        or be a vector. '''
+
+        legs = self._legs(valuationDate, issuerCurves, contractRecovery,
+                          numStepsPerYear, useParallel)
+
+        return legs[:, 2] * self._notionals
+
+###############################################################################
+
+    def value(self,
+              valuationDate: FinDate,
+              issuerCurves,
+              contractRecovery=standardRecovery,
+              numStepsPerYear: int = 25,
+              useParallel: bool = True):
+        ''' Return the arrays of the full and the clean values of the
+        contracts in a dictionary with the keys of FinCDS.value. The issuer
+        curves are a list of FinCDSCurve or a FinCDSCurveSet. '''
+
+        legs = self._legs(valuationDate, issuerCurves, contractRecovery,
+                          numStepsPerYear, useParallel)
+
+        protPV = legs[:, 2] * self._notionals
+        fullPV = self._signs * \
+            (protPV - self._coupons * legs[:, 0] * self._notionals)
+        cleanPV = self._signs * \
+            (protPV - self._coupons * legs[:, 1] * self._notionals)
+
+        return {'full_pv': fullPV, 'clean_pv': cleanPV}
+
+###############################################################################
+
+    def parSpread(self,
+                  valuationDate: FinDate,
+                  issuerCurves,
+                  contractRecovery=standardRecovery,
+                  numStepsPerYear: int = 25,
+                  useParallel: bool = True):
+        ''' Return the array of the breakeven coupons of the contracts which
+        are calculated using the clean risky PV01. '''
+
+        legs = self._legs(valuationDate, issuerCurves, contractRecovery,
+                          numStepsPerYear, useParallel)
+
+        return legs[:, 2] / legs[:, 1]
+
+###############################################################################
+
+    def valuation(self,
+                  valuationDate: FinDate,
+                  issuerCurves,
+                  contractRecovery=standardRecovery,
+                  numStepsPerYear: int = 25,
+                  useParallel: bool = True):
+        ''' Return the arrays of the full and clean values, the full and clean
+        risky PV01s, the protection leg values and the par spreads of the
+        contracts in one dictionary from a single valuation of the book. '''
+
+        legs = self._legs(valuationDate, issuerCurves, contractRecovery,
+                          numStepsPerYear, useParallel)
+
+        fullRPV01 = legs[:, 0]
+        cleanRPV01 = legs[:, 1]
+        protPV = legs[:, 2] * self._notionals
+
+        fullPV = self._signs * \
+            (protPV - self._coupons * fullRPV01 * self._notionals)
+        cleanPV = self._signs * \
+            (protPV - self._coupons * cleanRPV01 * self._notionals)
+
+        return {'full_pv': fullPV,
+                'clean_pv': cleanPV,
+                'full_rpv01': fullRPV01,
+                'clean_rpv01': cleanRPV01,
+                'prot_pv': protPV,
+                'par_spread': legs[:, 2] / cleanRPV01}
+
+###############################################################################
+
+    def _risk(self,
+              valuationDate,
+              issuerCurves,
+              contractRecovery,
+              numStepsPerYear,
+              useParallel):
+        ''' The derivatives of the full values of all of the contracts with
+        respect to the spreads of their issuer curves and to minus the log
+        discount factors of the Ibor curve with the issuer curves refitted.
+        All of the issuer curves must have the same number of nodes. '''
+
+        recoveries = self._recoveries(contractRecovery)
+
+        liborCurve, curveRows, _, _, _ = self._curveArrays(issuerCurves)
+
+        teffs, tmats, payTimes = self._times(valuationDate, liborCurve)
+
+        if isinstance(issuerCurves, FinCDSCurveSet):
+            numCurves = issuerCurves.numNames()
+            curveTimes = np.tile(issuerCurves._times, (numCurves, 1))
+            cumHazards = -np.log(issuerCurves._values)
+            dCds, dCdR = hazardJacobians(issuerCurves)
+        else:
+            numNodes = len(issuerCurves[0]._times)
+            for issuerCurve in issuerCurves[1:]:
+                if len(issuerCurve._times) != numNodes:
+                    raise FinError("Issuer curves must have the same number of nodes.")
+
+            curveTimes = np.array([c._times for c in issuerCurves],
+                                  dtype=np.float64)
+            cumHazards = -np.log(np.array([c._values for c in issuerCurves],
+                                          dtype=np.float64))
+            jacobians = [hazardJacobians(c) for c in issuerCurves]
+            dCds = np.array([jacobian[0] for jacobian in jacobians])
+            dCdR = np.array([jacobian[1] for jacobian in jacobians])
+
+        iborTimes, iborLogDfs = _iborArrays(liborCurve)
+
+        if useParallel:
+            riskFn = _cdsBookRiskParallel
+        else:
+            riskFn = _cdsBookRisk
+
+        creditRisk, interestRisk = \
+            riskFn(teffs, tmats, self._accruedToNow, self._payOffsets,
+                   payTimes, self._yearFracs, int(numStepsPerYear), iborTimes,
+                   iborLogDfs, curveRows, curveTimes, cumHazards,
+                   1.0 - recoveries, self._coupons,
+                   self._signs * self._notionals, dCds, dCdR)
+
+        return creditRisk, interestRisk, liborCurve
+
+###############################################################################
+
+    def bucketedCreditDV01(self,
+                           valuationDate: FinDate,
+                           issuerCurves,
+                           contractRecovery=standardRecovery,
+                           numStepsPerYear: int = 25,
+                           bumpSize: float = ONE_BP,
+                           useParallel: bool = True):
+        ''' Return the matrix of the changes in the full values of the
+        contracts for a one basis point rise in the spread of each CDS used to
+        build their issuer curves. There is a row for each contract and a
+        column for each issuer curve CDS. The curves are not rebuilt. '''
+
+        creditRisk, _, _ = self._risk(valuationDate, issuerCurves,
+                                      contractRecovery, numStepsPerYear,
+                                      useParallel)
+
+        return creditRisk * bumpSize
+
+###############################################################################
+
+    def parallelCreditDV01(self,
+                           valuationDate: FinDate,
+                           issuerCurves,
+                           contractRecovery=standardRecovery,
+                           numStepsPerYear: int = 25,
+                           bumpSize: float = ONE_BP,
+                           useParallel: bool = True):
+        ''' Return the array of the changes in the full values of the
+        contracts for a one basis point rise in all of the spreads of their
+        issuer curves. '''
+
+        return np.sum(self.bucketedCreditDV01(valuationDate, issuerCurves,
+                                              contractRecovery,
+                                              numStepsPerYear, bumpSize,
+                                              useParallel), axis=1)
+
+###############################################################################
+
+    def bucketedInterestDV01(self,
+                             valuationDate: FinDate,
+                             issuerCurves,
+                             contractRecovery=standardRecovery,
+                             numStepsPerYear: int = 25,
+                             bumpSize: float = ONE_BP,
+                             useParallel: bool = True):
+        ''' Return the matrix of the changes in the full values of the
+        contracts for a one basis point rise in the quote of each of the
+        deposits, FRAs and swaps used to build the Ibor curve with the issuer
+        curves refitted. There is a row for each contract. The curves are not
+        rebuilt. '''
+
+        _, interestRisk, liborCurve = self._risk(valuationDate, issuerCurves,
+                                                 contractRecovery,
+                                                 numStepsPerYear, useParallel)
+
+        dRdq = _iborQuoteJacobian(liborCurve)
+        return np.dot(interestRisk[:, 1:], dRdq) * bumpSize
+
+###############################################################################
+
+    def parallelInterestDV01(self,
+                             valuationDate: FinDate,
+                             issuerCurves,
+                             contractRecovery=standardRecovery,
+                             numStepsPerYear: int = 25,
+                             bumpSize: float = ONE_BP,
+                             useParallel: bool = True):
+        ''' Return the array of the changes in the full values of the
+        contracts for a one basis point rise in all of the Ibor curve quotes
+        with the issuer curves refitted. '''
+
+        return np.sum(self.bucketedInterestDV01(valuationDate, issuerCurves,
+                                                contractRecovery,
+                                                numStepsPerYear, bumpSize,
+                                                useParallel), axis=1)
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("NUM CONTRACTS", self.numContracts())
+        s += labelToString("NUM FLOWS", len(self._paySerials))
+        return s
+
+###############################################################################
+
+    def _print(self):
+        ''' Simple print function for backward compatibility. '''
+        print(self)
+
+###############################################################################
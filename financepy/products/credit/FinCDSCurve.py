@@ -3,7 +3,6 @@
 ##############################################################################
 
 import numpy as np
-import scipy.optimize as optimize
 
 from ...finutils.FinDate import FinDate
 from ...finutils.FinError import FinError
@@ -14,28 +13,12 @@ from ...finutils.FinDayCount import FinDayCount
 from ...finutils.FinFrequency import FinFrequency, FinFrequencyTypes
 from ...finutils.FinHelperFunctions import checkArgumentTypes, _funcName
 from ...finutils.FinHelperFunctions import labelToString
+from .FinCDSCurveBootstrap import FinCDSCurveBootstrap
 
 
 ###############################################################################
 
 
-def f(q, *args):
-    ''' Function that returns zero when the survival probability that gives a
-    zero value of the CDS has been determined. '''
-
-    self = args[0]
-    valueDate = args[1]
-    cds = args[2]
-    numPoints = len(self._times)
-    self._values[numPoints - 1] = q
-    # This is important - we calibrate a curve that makes the clean PV of the
-    # CDS equal to zero and so we select the second element of the value tuple
-    objFn = cds.value(valueDate, self)['clean_pv']
-    return objFn
-
-###############################################################################
-
-
 class FinCDSCurve():
     ''' Generate a survival probability curve implied by the value of CDS
     contracts given a Ibor curve and an assumed recovery rate. A scheme for
@@ -142,28 +125,20 @@ class FinCDSCurve():
 ###############################################################################
 
     def _buildCurve(self):
-        ''' Construct the CDS survival curve from a set of CDS contracts '''
+        ''' Construct the CDS survival curve from a set of CDS contracts. The
+        hazard rate between each pair of contract maturities is solved so that
+        the contract has a zero clean value at the curve recovery rate. '''
 
         self._validate(self._cdsContracts)
-        numTimes = len(self._cdsContracts)
-
-        # we size the vectors to include time zero
-        self._times = np.array([0.0])
-        self._values = np.array([1.0])
-
-        for i in range(0, numTimes):
-
-            maturityDate = self._cdsContracts[i]._maturityDate
 
-            argtuple = (self, self._valuationDate, self._cdsContracts[i])
-            tmat = (maturityDate - self._valuationDate) / gDaysInYear
-            q = self._values[i]
+        bootstrap = FinCDSCurveBootstrap(self._valuationDate,
+                                         self._cdsContracts,
+                                         self._liborCurve)
 
-            self._times = np.append(self._times, tmat)
-            self._values = np.append(self._values, q)
+        spreads = [cds._runningCoupon for cds in self._cdsContracts]
 
-            optimize.newton(f, x0=q, fprime=None, args=argtuple,
-                            tol=1e-7, maxiter=50, fprime2=None)
+        self._times = bootstrap._times.copy()
+        self._values = bootstrap.survProbs(spreads, self._recoveryRate)
 
 ###############################################################################
 
@@ -0,0 +1,556 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange
+from math import exp, log
+
+from ...finutils.FinDate import FinDate
+from ...finutils.FinError import FinError
+from ...finutils.FinDayCount import FinDayCount
+from ...finutils.FinGlobalVariables import gDaysInYear
+from ...finutils.FinHelperFunctions import labelToString
+from ...market.curves.FinInterpolator import FinInterpTypes, _vinterpolate
+
+###############################################################################
+# The survival curve of a FinCDSCurve is interpolated flat in the forward
+# hazard rate so the hazard rate is constant between the maturities of the
+# CDS contracts and the last hazard rate is used after the last maturity. When
+# the curve is bootstrapped the only unknown in the value of contract i is the
+# hazard rate h after maturity i - 1. Every survival probability used in its
+# valuation is then exp(-(H + h * a)) where the cumulative hazard H and the
+# time a spent after maturity i - 1 do not depend on h. These are found once
+# for the payment times and the protection leg integration times and then the
+# clean value of the CDS and its derivative with respect to h are closed form
+# sums. Each hazard rate is solved by a Newton method that is kept inside a
+# bracket on which the value changes sign.
+#
+# The schedules and the Ibor discount factors do not depend on the CDS spread
+# or the recovery rate so they are computed once and shared by all of the
+# issuer curves that are built on the same contracts. The values are those of
+# _riskyPV01_NUMBA and _protectionLegPV_NUMBA in FinCDS term by term so that
+# the curve reprices the contracts with FinCDS.value.
+###############################################################################
+
+# Only the accuracy of the hazard rate matters here. The Newton steps converge
+# quadratically so once a step is this small the hazard is at machine precision
+HAZARD_TOLERANCE = 1e-12
+MAX_ITERATIONS = 50
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _cumHazards(times, nodeTimes, nodeHazards, numKnown, base, slope):
+    ''' For each time find the cumulative hazard implied by the first numKnown
+    nodes of the curve and the time since the last of these nodes. The
+    survival probability to the time when the hazard rate after the last known
+    node is h is then exp(-(base + h * slope)). '''
+
+    tLast = nodeTimes[numKnown - 1]
+    tNext = nodeTimes[numKnown]
+
+    for k in range(0, len(times)):
+
+        t = times[k]
+
+        if t < 0.0:
+            # A step-in date before the valuation date is given the average
+            # hazard rate to the last node of the curve by _uinterpolate
+            base[k] = t * nodeHazards[numKnown - 1] / tNext
+            slope[k] = t * (tNext - tLast) / tNext
+        elif t >= tLast:
+            base[k] = nodeHazards[numKnown - 1]
+            slope[k] = t - tLast
+        else:
+            i = 1
+            while nodeTimes[i] < t:
+                i += 1
+
+            dt = nodeTimes[i] - nodeTimes[i - 1]
+            base[k] = ((nodeTimes[i] - t) * nodeHazards[i - 1] +
+                       (t - nodeTimes[i - 1]) * nodeHazards[i]) / dt
+            slope[k] = 0.0
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _cdsCleanValue(h,
+                   coupon,
+                   recovery,
+                   accruedToNow,
+                   teffBase,
+                   teffSlope,
+                   yearFracs,
+                   payDfs,
+                   payBase,
+                   paySlope,
+                   dt,
+                   gridDfs,
+                   gridBase,
+                   gridSlope):
+    ''' Clean value of a long protection CDS with a unit notional and its
+    derivative with respect to the hazard rate h after the last known node.
+    The first element of the payment arrays is the previous coupon date. '''
+
+    small = 1e-8
+
+    ###########################################################################
+    # Premium leg as in _riskyPV01_NUMBA
+    ###########################################################################
+
+    qeff = exp(-(teffBase + h * teffSlope))
+    dqeff = -teffSlope * qeff
+
+    q1 = exp(-(payBase[1] + h * paySlope[1]))
+    dq1 = -paySlope[1] * q1
+    z1 = payDfs[1]
+    yf1 = yearFracs[1]
+
+    fullRPV01 = q1 * z1 * yf1
+    dfullRPV01 = dq1 * z1 * yf1
+
+    fullRPV01 += z1 * (qeff - q1) * accruedToNow
+    dfullRPV01 += z1 * (dqeff - dq1) * accruedToNow
+
+    fullRPV01 += 0.5 * z1 * (qeff - q1) * (yf1 - accruedToNow)
+    dfullRPV01 += 0.5 * z1 * (dqeff - dq1) * (yf1 - accruedToNow)
+
+    for it in range(2, len(yearFracs)):
+
+        tau = yearFracs[it]
+        q2 = exp(-(payBase[it] + h * paySlope[it]))
+        dq2 = -paySlope[it] * q2
+        z2 = payDfs[it]
+
+        fullRPV01 += q2 * z2 * tau
+        dfullRPV01 += dq2 * z2 * tau
+
+        # The discount factor z1 is not rolled on in _riskyPV01_NUMBA
+        h12 = (payBase[it] - payBase[it - 1] +
+               h * (paySlope[it] - paySlope[it - 1])) / tau
+        dh12 = (paySlope[it] - paySlope[it - 1]) / tau
+        r12 = -log(z2 / z1) / tau
+        alpha = h12 + r12
+        expAlpha = exp(-alpha * tau)
+        expTerm = 1.0 - expAlpha - alpha * tau * expAlpha
+        dexpTerm = alpha * tau * tau * expAlpha * dh12
+        denom = abs(alpha * alpha + 1e-20)
+        ddenom = 2.0 * alpha * dh12
+
+        term = q1 * z1 * h12 * expTerm / denom
+        dterm = z1 * (dq1 * h12 * expTerm + q1 * dh12 * expTerm +
+                      q1 * h12 * dexpTerm) / denom - term * ddenom / denom
+
+        fullRPV01 += term
+        dfullRPV01 += dterm
+
+        q1 = q2
+        dq1 = dq2
+
+    cleanRPV01 = fullRPV01 - accruedToNow
+
+    ###########################################################################
+    # Protection leg as in _protectionLegPV_NUMBA
+    ###########################################################################
+
+    z1 = gridDfs[0]
+    q1 = exp(-(gridBase[0] + h * gridSlope[0]))
+    dq1 = -gridSlope[0] * q1
+
+    protPV = 0.0
+    dprotPV = 0.0
+
+    for k in range(1, len(gridDfs)):
+
+        z2 = gridDfs[k]
+        q2 = exp(-(gridBase[k] + h * gridSlope[k]))
+        dq2 = -gridSlope[k] * q2
+
+        h12 = (gridBase[k] - gridBase[k - 1] +
+               h * (gridSlope[k] - gridSlope[k - 1])) / dt
+        dh12 = (gridSlope[k] - gridSlope[k - 1]) / dt
+        r12 = -log(z2 / z1) / dt
+        expTerm = exp(-(r12 + h12) * dt)
+        denom = abs(h12 + r12) + small
+
+        if h12 + r12 >= 0.0:
+            ddenom = dh12
+        else:
+            ddenom = -dh12
+
+        term = h12 * (1.0 - expTerm) * q1 * z1 / denom
+        dterm = (dh12 * (1.0 - expTerm) * q1 * z1 +
+                 h12 * expTerm * dt * dh12 * q1 * z1 +
+                 h12 * (1.0 - expTerm) * dq1 * z1) / denom \
+            - term * ddenom / denom
+
+        protPV += term
+        dprotPV += dterm
+
+        q1 = q2
+        dq1 = dq2
+        z1 = z2
+
+    lgd = 1.0 - recovery
+    v = lgd * protPV - coupon * cleanRPV01
+    dv = lgd * dprotPV - coupon * dfullRPV01
+    return v, dv
+
+###############################################################################
+
+
+@njit(cache=True)
+def _bootstrapCumHazards(coupons,
+                         recovery,
+                         nodeTimes,
+                         teffs,
+                         accruedToNow,
+                         payOffsets,
+                         payTimes,
+                         yearFracs,
+                         payDfs,
+                         protDts,
+                         gridTimes,
+                         gridDfs):
+    ''' Bootstrap the cumulative hazards at the node times of the curve so
+    that each CDS contract has a zero clean value. The hazard rate of each
+    segment is found by a Newton method kept inside a bracket on which the
+    clean value changes sign. A segment which does not converge makes its
+    cumulative hazard and those of all later nodes NaN. '''
+
+    numContracts = len(teffs)
+    numSteps = gridTimes.shape[1]
+
+    nodeHazards = np.zeros(numContracts + 1)
+    lgd = 1.0 - recovery
+
+    teffTime = np.zeros(1)
+    teffBase = np.zeros(1)
+    teffSlope = np.zeros(1)
+    gridBase = np.zeros(numSteps)
+    gridSlope = np.zeros(numSteps)
+
+    # A first guess from the credit triangle
+    h = coupons[0] / max(lgd, 1e-6)
+
+    for i in range(0, numContracts):
+
+        start = payOffsets[i]
+        end = payOffsets[i + 1]
+        payBase = np.zeros(end - start)
+        paySlope = np.zeros(end - start)
+
+        teffTime[0] = teffs[i]
+        _cumHazards(teffTime, nodeTimes, nodeHazards, i + 1,
+                    teffBase, teffSlope)
+        _cumHazards(payTimes[start:end], nodeTimes, nodeHazards, i + 1,
+                    payBase, paySlope)
+        _cumHazards(gridTimes[i], nodeTimes, nodeHazards, i + 1,
+                    gridBase, gridSlope)
+
+        # The clean value rises with the hazard rate. Any h at which it is
+        # negative is a lower bound and any h at which it is positive is an
+        # upper bound.
+        hLow = 0.0
+        hHigh = 0.0
+        haveLow = False
+        haveHigh = False
+        converged = False
+
+        for _ in range(0, MAX_ITERATIONS):
+
+            v, dv = _cdsCleanValue(h, coupons[i], recovery, accruedToNow[i],
+                                   teffBase[0], teffSlope[0],
+                                   yearFracs[start:end], payDfs[start:end],
+                                   payBase, paySlope, protDts[i], gridDfs[i],
+                                   gridBase, gridSlope)
+
+            # The spreads may need a hazard rate so negative that there is no
+            # zero of the clean value
+            if not (np.isfinite(v) and np.isfinite(dv)):
+                break
+
+            if v == 0.0:
+                converged = True
+                break
+            elif v < 0.0:
+                hLow = h
+                haveLow = True
+            else:
+                hHigh = h
+                haveHigh = True
+
+            newtonOK = False
+            if dv > 0.0:
+                hNew = h - v / dv
+                newtonOK = (not haveLow or hNew > hLow) and \
+                    (not haveHigh or hNew < hHigh)
+
+            # Fall back to bisection or to widening the search when the Newton
+            # step leaves the bracket
+            if newtonOK is False:
+                if haveLow and haveHigh:
+                    hNew = 0.5 * (hLow + hHigh)
+                elif haveLow:
+                    hNew = hLow + max(abs(hLow), 0.01)
+                else:
+                    hNew = hHigh - max(abs(hHigh), 0.01)
+
+            step = hNew - h
+            h = hNew
+
+            if abs(step) < HAZARD_TOLERANCE:
+                converged = True
+                break
+
+        if converged is False:
+            for j in range(i + 1, numContracts + 1):
+                nodeHazards[j] = np.nan
+            return nodeHazards
+
+        nodeHazards[i + 1] = nodeHazards[i] + h * (nodeTimes[i + 1] -
+                                                   nodeTimes[i])
+
+    return nodeHazards
+
+###############################################################################
+
+
+@njit(cache=True)
+def _bootstrapCumHazardsBatch(coupons,
+                              recoveries,
+                              nodeTimes,
+                              teffs,
+                              accruedToNow,
+                              payOffsets,
+                              payTimes,
+                              yearFracs,
+                              payDfs,
+                              protDts,
+                              gridTimes,
+                              gridDfs):
+    ''' Bootstrap the cumulative hazards of many issuers which have a row of
+    contract spreads each and their own recovery rate. '''
+
+    numNames = coupons.shape[0]
+    nodeHazards = np.zeros((numNames, len(nodeTimes)))
+
+    for iName in range(0, numNames):
+        nodeHazards[iName] = \
+            _bootstrapCumHazards(coupons[iName], recoveries[iName], nodeTimes,
+                                 teffs, accruedToNow, payOffsets, payTimes,
+                                 yearFracs, payDfs, protDts, gridTimes,
+                                 gridDfs)
+
+    return nodeHazards
+
+###############################################################################
+
+
+@njit(cache=True, parallel=True)
+def _bootstrapCumHazardsParallel(coupons,
+                                 recoveries,
+                                 nodeTimes,
+                                 teffs,
+                                 accruedToNow,
+                                 payOffsets,
+                                 payTimes,
+                                 yearFracs,
+                                 payDfs,
+                                 protDts,
+                                 gridTimes,
+                                 gridDfs):
+    ''' Bootstrap the cumulative hazards of many issuers with the issuers
+    shared out between the threads. Each issuer is bootstrapped on its own so
+    the curves do not depend on the number of threads. '''
+
+    numNames = coupons.shape[0]
+    nodeHazards = np.zeros((numNames, len(nodeTimes)))
+
+    for iName in prange(0, numNames):
+        nodeHazards[iName] = \
+            _bootstrapCumHazards(coupons[iName], recoveries[iName], nodeTimes,
+                                 teffs, accruedToNow, payOffsets, payTimes,
+                                 yearFracs, payDfs, protDts, gridTimes,
+                                 gridDfs)
+
+    return nodeHazards
+
+###############################################################################
+
+
+class FinCDSCurveBootstrap():
+    ''' Class which holds the premium leg schedules, accrual factors and Ibor
+    discount factors of a maturity-ordered set of CDS contracts so that
+    survival curves can be bootstrapped from them for any set of contract
+    spreads and recovery rates. The curves are the same as those of a
+    FinCDSCurve built from the same contracts. '''
+
+    def __init__(self,
+                 valuationDate: FinDate,
+                 cdsContracts: list,
+                 liborCurve,
+                 numStepsPerYear: int = 25):
+        ''' Precompute the contract data from a list of CDS contracts in
+        increasing maturity order and a Ibor curve. The number of steps is the
+        number of points used in the integration of the protection leg as in
+        FinCDS.value. '''
+
+        if len(cdsContracts) == 0:
+            raise FinError("No CDS contracts have been supplied.")
+
+        if valuationDate != liborCurve._valuationDate:
+            raise FinError("Ibor curve does not have same valuation date as Issuer curve.")
+
+        for i in range(1, len(cdsContracts)):
+            if cdsContracts[i]._maturityDate <= \
+                    cdsContracts[i - 1]._maturityDate:
+                raise FinError("CDS contracts not in increasing maturity.")
+
+        if numStepsPerYear < 1:
+            raise FinError("Number of steps must be positive.")
+
+        numContracts = len(cdsContracts)
+        method = FinInterpTypes.FLAT_FWD_RATES.value
+
+        nodeTimes = np.zeros(numContracts + 1)
+        teffs = np.zeros(numContracts)
+        accruedToNow = np.zeros(numContracts)
+        payOffsets = np.zeros(numContracts + 1, dtype=np.int64)
+        protDts = np.zeros(numContracts)
+        gridTimes = np.zeros((numContracts, numStepsPerYear + 1))
+
+        payTimes = []
+        yearFracs = []
+
+        for i, cds in enumerate(cdsContracts):
+
+            dates = cds._adjustedDates
+            dayCount = FinDayCount(cds._dayCountType)
+
+            teff = (cds._stepInDate - valuationDate) / gDaysInYear
+            tmat = (cds._maturityDate - valuationDate) / gDaysInYear
+
+            nodeTimes[i + 1] = tmat
+            teffs[i] = teff
+            accruedToNow[i] = dayCount.yearFrac(dates[0], cds._stepInDate)[0]
+
+            payTimes += [(dt - valuationDate) / gDaysInYear for dt in dates]
+            yearFracs += cds._accrualFactors
+            payOffsets[i + 1] = len(payTimes)
+
+            # The integration times are stepped on as in the protection leg
+            dt = (tmat - teff) / numStepsPerYear
+            protDts[i] = dt
+            t = teff
+            gridTimes[i, 0] = t
+            for k in range(1, numStepsPerYear + 1):
+                t = t + dt
+                gridTimes[i, k] = t
+
+        payTimes = np.array(payTimes)
+
+        self._valuationDate = valuationDate
+        self._liborCurve = liborCurve
+        self._numStepsPerYear = numStepsPerYear
+        self._times = nodeTimes
+        self._teffs = teffs
+        self._accruedToNow = accruedToNow
+        self._payOffsets = payOffsets
+        self._payTimes = payTimes
+        self._yearFracs = np.array(yearFracs)
+        self._protDts = protDts
+        self._gridTimes = gridTimes
+
+        self._payDfs = _vinterpolate(payTimes, liborCurve._times,
+                                     liborCurve._dfs, method)
+
+        self._gridDfs = np.zeros(gridTimes.shape)
+        for i in range(0, numContracts):
+            self._gridDfs[i] = _vinterpolate(gridTimes[i], liborCurve._times,
+                                             liborCurve._dfs, method)
+
+###############################################################################
+
+    def numContracts(self):
+        ''' The number of CDS contracts and so of curve nodes after time zero.
+        '''
+        return len(self._teffs)
+
+###############################################################################
+
+    def survProbs(self,
+                  spreads: (list, np.ndarray),
+                  recoveryRates: (float, list, np.ndarray) = 0.40,
+                  useParallel: bool = False):
+        ''' Bootstrap the survival probabilities at the node times of the
+        curve, which start at time zero. A vector of contract spreads gives a
+        vector of survival probabilities. A matrix of spreads with a row for
+        each issuer gives a matrix with a row for each issuer and the recovery
+        rate can then be the same for all issuers or be a vector. The issuers
+        can be bootstrapped on all of the Numba threads. '''
+
+        spreads = np.array(spreads, dtype=np.float64)
+        numContracts = self.numContracts()
+
+        if spreads.ndim == 1:
+            coupons = spreads.reshape(1, -1)
+        elif spreads.ndim == 2:
+            coupons = spreads
+        else:
+            raise FinError("Spreads must be a vector or a matrix.")
+
+        if coupons.shape[1] != numContracts:
+            raise FinError("Need one spread for each CDS contract.")
+
+        numNames = coupons.shape[0]
+
+        recoveries = np.array(recoveryRates, dtype=np.float64)
+        if recoveries.ndim == 0:
+            recoveries = np.full(numNames, float(recoveries))
+        elif recoveries.shape != (numNames,):
+            raise FinError("Need one recovery rate for each issuer.")
+
+        if np.any(recoveries >= 1.0):
+            raise FinError("Recovery rates must be less than one.")
+
+        if useParallel:
+            bootstrapFn = _bootstrapCumHazardsParallel
+        else:
+            bootstrapFn = _bootstrapCumHazardsBatch
+
+        hazards = bootstrapFn(coupons, recoveries, self._times, self._teffs,
+                              self._accruedToNow, self._payOffsets,
+                              self._payTimes, self._yearFracs, self._payDfs,
+                              self._protDts, self._gridTimes, self._gridDfs)
+
+        if np.any(np.isnan(hazards)):
+            raise FinError("CDS curve bootstrap did not converge.")
+
+        qs = np.exp(-hazards)
+        qs[:, 0] = 1.0
+
+        if spreads.ndim == 1:
+            return qs[0]
+
+        return qs
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("VALUATION DATE", self._valuationDate)
+        s += labelToString("NUM CONTRACTS", self.numContracts())
+        s += labelToString("NUM STEPS", self._numStepsPerYear)
+        return s
+
+###############################################################################
+
+    def _print(self):
+        ''' Simple print function for backward compatibility. '''
+        print(self)
+
+###############################################################################
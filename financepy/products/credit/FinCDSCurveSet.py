@@ -0,0 +1,227 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+from ...finutils.FinDate import FinDate
+from ...finutils.FinError import FinError
+from ...finutils.FinCalendar import FinCalendarTypes
+from ...finutils.FinCalendar import FinBusDayAdjustTypes, FinDateGenRuleTypes
+from ...finutils.FinDayCount import FinDayCountTypes
+from ...finutils.FinFrequency import FinFrequencyTypes
+from ...finutils.FinGlobalVariables import gDaysInYear
+from ...finutils.FinHelperFunctions import checkArgumentTypes, labelToString
+
+from .FinCDS import FinCDS
+from .FinCDSCurve import FinCDSCurve
+from .FinCDSCurveBootstrap import FinCDSCurveBootstrap
+
+###############################################################################
+# The issuers of a credit universe are quoted on CDS contracts with the same
+# standard maturities. The contracts only differ in their coupons so the
+# premium leg schedules, the accrual factors and the Ibor discount factors are
+# computed once for all of the issuers. The issuer curves are then all fitted
+# in one call on the Numba threads and are held as a matrix of survival
+# probabilities with a row for each issuer at the shared node times.
+###############################################################################
+
+
+class FinCDSCurveSet():
+    ''' Class to build and hold the survival curves of many issuers which are
+    fitted to CDS contracts with the same maturities. The curves are given as
+    a matrix of CDS spreads with a row for each issuer and a column for each
+    maturity and a recovery rate for each issuer. Each curve is the same as
+    the FinCDSCurve built from the contracts of the issuer. '''
+
+    def __init__(self,
+                 valuationDate: FinDate,
+                 maturityDatesOrTenors: list,
+                 spreads: (list, np.ndarray),
+                 recoveryRates: (float, list, np.ndarray),
+                 liborCurve,
+                 names=None,
+                 stepInDate=None,
+                 useParallel: bool = True,
+                 freqType: FinFrequencyTypes = FinFrequencyTypes.QUARTERLY,
+                 dayCountType: FinDayCountTypes = FinDayCountTypes.ACT_360,
+                 calendarType: FinCalendarTypes = FinCalendarTypes.WEEKEND,
+                 busDayAdjustType: FinBusDayAdjustTypes = FinBusDayAdjustTypes.FOLLOWING,
+                 dateGenRuleType: FinDateGenRuleTypes = FinDateGenRuleTypes.BACKWARD):
+        ''' Create the issuer curves from the CDS maturities, given as dates or
+        as tenors which are rolled to the next CDS date, and the matrix of
+        spreads. The step-in date of the contracts is the day after the
+        valuation date unless it is given. The recovery rate can be the same
+        for all issuers or be a vector. An optional list of issuer names is
+        used to look up the curves. '''
+
+        checkArgumentTypes(self.__init__, locals())
+
+        if valuationDate != liborCurve._valuationDate:
+            raise FinError("Ibor curve does not have same valuation date as Issuer curve.")
+
+        spreads = np.array(spreads, dtype=np.float64)
+
+        if spreads.ndim != 2:
+            raise FinError("Spreads must be a matrix with a row per issuer.")
+
+        numNames, numMaturities = spreads.shape
+
+        if numMaturities != len(maturityDatesOrTenors):
+            raise FinError("Need one spread column for each maturity.")
+
+        recoveries = np.array(recoveryRates, dtype=np.float64)
+        if recoveries.ndim == 0:
+            recoveries = np.full(numNames, float(recoveries))
+        elif recoveries.shape != (numNames,):
+            raise FinError("Need one recovery rate for each issuer.")
+
+        if names is not None:
+            if len(names) != numNames:
+                raise FinError("Need one name for each issuer.")
+            names = list(names)
+            if len(set(names)) != numNames:
+                raise FinError("Issuer names must be unique.")
+
+        if stepInDate is None:
+            stepInDate = valuationDate.addDays(1)
+
+        # The coupons of these contracts are replaced by each issuer's spreads
+        cdsContracts = []
+        for maturityDateOrTenor in maturityDatesOrTenors:
+            cds = FinCDS(stepInDate, maturityDateOrTenor, 0.0, 1.0, True,
+                         freqType, dayCountType, calendarType,
+                         busDayAdjustType, dateGenRuleType)
+            cdsContracts.append(cds)
+
+        self._valuationDate = valuationDate
+        self._liborCurve = liborCurve
+        self._cdsContracts = cdsContracts
+        self._spreads = spreads
+        self._recoveryRates = recoveries
+        self._names = names
+
+        if names is not None:
+            self._nameIndex = {name: i for i, name in enumerate(names)}
+
+        self._bootstrap = FinCDSCurveBootstrap(valuationDate, cdsContracts,
+                                               liborCurve)
+
+        self._times = self._bootstrap._times
+        self._values = self._bootstrap.survProbs(spreads, recoveries,
+                                                 useParallel)
+
+###############################################################################
+
+    def numNames(self):
+        ''' The number of issuer curves. '''
+        return self._values.shape[0]
+
+###############################################################################
+
+    def _index(self, name):
+        ''' The row of an issuer given by its name or by its index. '''
+
+        if isinstance(name, (int, np.integer)):
+            if name < 0 or name >= self.numNames():
+                raise FinError("Issuer index out of range.")
+            return int(name)
+
+        if self._names is None or name not in self._nameIndex:
+            raise FinError("Unknown issuer " + str(name))
+
+        return self._nameIndex[name]
+
+###############################################################################
+
+    def hazardRates(self):
+        ''' Return the matrix of the flat hazard rates between the node times
+        with a row for each issuer. The last hazard rate of each issuer is
+        also used after the last maturity. '''
+
+        cumHazards = -np.log(self._values)
+        return np.diff(cumHazards, axis=1) / np.diff(self._times)
+
+###############################################################################
+
+    def survProbs(self,
+                  dt: (FinDate, list, float, np.ndarray)):
+        ''' Return the survival probabilities of all of the issuers to a date
+        or a time or to a list of them. A single date gives a vector with one
+        value for each issuer and a list gives a matrix with a row for each
+        issuer and a column for each date. '''
+
+        if isinstance(dt, FinDate):
+            times = np.array([(dt - self._valuationDate) / gDaysInYear])
+        elif isinstance(dt, list):
+            times = np.array([(d - self._valuationDate) / gDaysInYear
+                              if isinstance(d, FinDate) else d for d in dt])
+        else:
+            times = np.atleast_1d(np.array(dt, dtype=np.float64))
+
+        if np.any(times < 0.0):
+            raise FinError("Survival Date before curve anchor date")
+
+        # Linear interpolation of the cumulative hazard is flat hazard rates
+        cumHazards = -np.log(self._values)
+        qs = np.zeros((self.numNames(), len(times)))
+
+        for j, t in enumerate(times):
+            i = np.searchsorted(self._times, t)
+            if i == 0:
+                qs[:, j] = 1.0
+                continue
+            i = min(i, len(self._times) - 1)
+            t1 = self._times[i - 1]
+            t2 = self._times[i]
+            h = (cumHazards[:, i - 1] * (t2 - t) +
+                 cumHazards[:, i] * (t - t1)) / (t2 - t1)
+            qs[:, j] = np.exp(-h)
+
+        if isinstance(dt, (FinDate, float)):
+            return qs[:, 0]
+
+        return qs
+
+###############################################################################
+
+    def curve(self,
+              name):
+        ''' Return the FinCDSCurve of one issuer given by its name or its
+        index. The curve holds the fitted survival probabilities so it is not
+        bootstrapped again. '''
+
+        i = self._index(name)
+
+        cdsContracts = []
+        for j, cds in enumerate(self._cdsContracts):
+            issuerCDS = FinCDS(cds._stepInDate, cds._maturityDate,
+                               self._spreads[i, j], 1000000.0, True,
+                               cds._freqType, cds._dayCountType,
+                               cds._calendarType, cds._busDayAdjustType,
+                               cds._dateGenRuleType)
+            cdsContracts.append(issuerCDS)
+
+        issuerCurve = FinCDSCurve(self._valuationDate, [], self._liborCurve,
+                                  float(self._recoveryRates[i]))
+        issuerCurve._cdsContracts = cdsContracts
+        issuerCurve._times = self._times.copy()
+        issuerCurve._values = self._values[i].copy()
+        return issuerCurve
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("VALUATION DATE", self._valuationDate)
+        s += labelToString("NUM ISSUERS", self.numNames())
+        s += labelToString("NUM MATURITIES", len(self._cdsContracts))
+        return s
+
+###############################################################################
+
+    def _print(self):
+        ''' Simple print function for backward compatibility. '''
+        print(self)
+
+###############################################################################
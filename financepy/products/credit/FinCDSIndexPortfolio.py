@@ -3,7 +3,9 @@
 ##############################################################################
 
 
-from math import pow
+import numpy as np
+from numba import njit
+from copy import copy
 
 from ...finutils.FinCalendar import FinCalendarTypes
 from ...finutils.FinCalendar import FinBusDayAdjustTypes, FinDateGenRuleTypes
@@ -12,6 +14,10 @@ from ...finutils.FinFrequency import FinFrequencyTypes
 from ...finutils.FinError import FinError
 from ...products.credit.FinCDS import FinCDS
 from ...products.credit.FinCDSCurve import FinCDSCurve
+from ...products.credit.FinCDSCurveBootstrap import FinCDSCurveBootstrap
+from ...products.credit.FinCDSCurveBootstrap import _bootstrapCumHazards
+from ...products.credit.FinCDSRisk import _cdsArrays, _iborArrays
+from ...products.credit.FinCDSRisk import _cdsLegGradients, _hazardJacobians
 from ...finutils.FinHelperFunctions import checkArgumentTypes
 from ...finutils.FinHelperFunctions import labelToString
 
@@ -19,6 +25,318 @@ from ...finutils.FinHelperFunctions import labelToString
 # TODO: Move index spread details into class and then pass in issuer curves
 #       to the function when doing the adjustment
 ###############################################################################
+# The intrinsic adjustment finds one multiplier for each index maturity so
+# that the average over the issuers of the index protection leg less the index
+# coupon times the clean risky PV01 equals the index upfront. The index
+# maturities are solved in order and each index mostly depends on the curve
+# nodes up to the matching CDS maturity so each solve is one dimensional. The
+# issuer curves are held as arrays of cumulative hazards and the derivative of
+# the index value with respect to the multiplier comes from the adjoint of the
+# leg calculations in FinCDSRisk. A Newton method then converges in a few
+# iterations and no curve objects are made until the end.
+###############################################################################
+
+# The index legs are integrated as in FinCDS.protectionLegPV
+NUM_STEPS_PER_YEAR = 25
+
+###############################################################################
+
+
+def _indexArrays(valuationDate, indexMaturityDates):
+    ''' The leg arrays of the index contracts with one row for each index
+    maturity. The payment times and accrual factors are stored end to end and
+    payOffsets gives where each contract starts. '''
+
+    numIndex = len(indexMaturityDates)
+    teffs = np.zeros(numIndex)
+    tmats = np.zeros(numIndex)
+    accruedToNow = np.zeros(numIndex)
+    payOffsets = np.zeros(numIndex + 1, dtype=np.int64)
+    payTimes = []
+    yearFracs = []
+
+    for i, indexMaturityDate in enumerate(indexMaturityDates):
+        cdsIndex = FinCDS(valuationDate, indexMaturityDate, 0.0, 1.0)
+        teffs[i], tmats[i], accruedToNow[i], times, fracs = \
+            _cdsArrays(cdsIndex, valuationDate)
+        payTimes += list(times)
+        yearFracs += list(fracs)
+        payOffsets[i + 1] = len(payTimes)
+
+    return teffs, tmats, accruedToNow, payOffsets, np.array(payTimes), \
+        np.array(yearFracs)
+
+###############################################################################
+
+
+@njit(cache=True)
+def _indexValue(iMaturity,
+                curveTimes,
+                cumHazards,
+                teffs,
+                tmats,
+                accruedToNow,
+                payOffsets,
+                payTimes,
+                yearFracs,
+                iborTimes,
+                iborLogDfs,
+                lgd,
+                coupon,
+                gradC):
+    ''' The index protection leg and clean risky PV01 of one issuer with the
+    derivative of their difference at the index coupon with respect to the
+    cumulative hazards of the issuer curve put into gradC. '''
+
+    start = payOffsets[iMaturity]
+    end = payOffsets[iMaturity + 1]
+    gradR = np.zeros(len(iborTimes))
+    gradC[:] = 0.0
+
+    protPV, fullRPV01 = \
+        _cdsLegGradients(teffs[iMaturity], tmats[iMaturity],
+                         accruedToNow[iMaturity], payTimes[start:end],
+                         yearFracs[start:end], NUM_STEPS_PER_YEAR,
+                         curveTimes, cumHazards, iborTimes, iborLogDfs,
+                         lgd, coupon, gradC, gradR)
+
+    return lgd * protPV, fullRPV01 - accruedToNow[iMaturity]
+
+###############################################################################
+
+
+@njit(cache=True)
+def _newtonStep(x, v, dv, ratio, xLow, xHigh):
+    ''' The next multiplier from a Newton step on the index value v which is
+    kept inside the bracket (xLow, xHigh) on which v changes sign. If the step
+    leaves the bracket it is bisected or, with no upper bound yet, the
+    multiplier is scaled up by at least the ratio of the legs. '''
+
+    if dv > 0.0:
+        xNew = x - v / dv
+        if xNew > xLow and xNew < xHigh:
+            return xNew
+
+    if xHigh < np.inf:
+        return 0.5 * (xLow + xHigh)
+
+    return x * max(ratio, 2.0)
+
+###############################################################################
+
+
+@njit(cache=True)
+def _hazardRateAdjust(curveTimes,
+                      cumHazards,
+                      teffs,
+                      tmats,
+                      accruedToNow,
+                      payOffsets,
+                      payTimes,
+                      yearFracs,
+                      iborTimes,
+                      iborLogDfs,
+                      indexCoupons,
+                      indexUpfronts,
+                      indexRecoveryRate,
+                      tolerance,
+                      maxIterations):
+    ''' Multiply the cumulative hazard of each issuer between node i and node
+    i + 1 by the multiplier of index maturity i. The cumulative hazards are
+    changed in place. Return the multipliers and the index maturity which did
+    not converge or -1 if they all did. '''
+
+    numCredits, numNodes = cumHazards.shape
+    numIndex = len(indexCoupons)
+    lgd = 1.0 - indexRecoveryRate
+
+    multipliers = np.ones(numIndex)
+    segments = np.zeros(numCredits)
+    gradC = np.zeros(numNodes)
+
+    for iMaturity in range(0, numIndex):
+
+        for k in range(0, numCredits):
+            segments[k] = cumHazards[k, iMaturity + 1] - \
+                cumHazards[k, iMaturity]
+
+        coupon = indexCoupons[iMaturity]
+        alpha = 1.0
+        alphaLow = 0.0
+        alphaHigh = np.inf
+        converged = False
+
+        for _ in range(0, maxIterations):
+
+            sumProt = 0.0
+            sumRPV01 = 0.0
+            dv = 0.0
+
+            for k in range(0, numCredits):
+
+                cumHazards[k, iMaturity + 1] = cumHazards[k, iMaturity] + \
+                    alpha * segments[k]
+
+                protPV, cleanRPV01 = \
+                    _indexValue(iMaturity, curveTimes[k], cumHazards[k],
+                                teffs, tmats, accruedToNow, payOffsets,
+                                payTimes, yearFracs, iborTimes, iborLogDfs,
+                                lgd, coupon, gradC)
+
+                sumProt += protPV
+                sumRPV01 += cleanRPV01
+                dv += gradC[iMaturity + 1] * segments[k]
+
+            sumProt /= numCredits
+            sumRPV01 /= numCredits
+            dv /= numCredits
+
+            sumPrem = sumRPV01 * coupon
+            ratio = (indexUpfronts[iMaturity] + sumPrem) / sumProt
+
+            if abs(ratio - 1.0) <= tolerance:
+                converged = True
+                break
+
+            # The index value rises with the multiplier which stays positive
+            v = sumProt - sumPrem - indexUpfronts[iMaturity]
+
+            if v < 0.0:
+                alphaLow = alpha
+            else:
+                alphaHigh = alpha
+
+            alpha = _newtonStep(alpha, v, dv, ratio, alphaLow, alphaHigh)
+
+        if converged is False:
+            return multipliers, iMaturity
+
+        multipliers[iMaturity] = alpha
+
+    return multipliers, -1
+
+###############################################################################
+
+
+@njit(cache=True)
+def _spreadAdjust(spreads,
+                  recoveries,
+                  nodeTimes,
+                  curveTeffs,
+                  curveAccruedToNow,
+                  curvePayOffsets,
+                  curvePayTimes,
+                  curveYearFracs,
+                  curvePayDfs,
+                  curveProtDts,
+                  curveGridTimes,
+                  curveGridDfs,
+                  curveNumSteps,
+                  teffs,
+                  tmats,
+                  accruedToNow,
+                  payOffsets,
+                  payTimes,
+                  yearFracs,
+                  iborTimes,
+                  iborLogDfs,
+                  indexCoupons,
+                  indexUpfronts,
+                  indexRecoveryRate,
+                  tolerance,
+                  maxIterations):
+    ''' Multiply the spread of CDS contract i of every issuer by the multiplier
+    of index maturity i and bootstrap the cumulative hazards of the issuers
+    again. The derivative of the index value with respect to the multiplier
+    is found from the derivatives of the cumulative hazards with respect to
+    the contract spreads. Return the multipliers, the cumulative hazards and
+    the index maturity which did not converge or -1 if they all did. '''
+
+    numCredits, numContracts = spreads.shape
+    numIndex = len(indexCoupons)
+    lgd = 1.0 - indexRecoveryRate
+
+    multipliers = np.ones(numContracts)
+    cumHazards = np.zeros((numCredits, numContracts + 1))
+    coupons = np.zeros(numContracts)
+    gradC = np.zeros(numContracts + 1)
+
+    for iMaturity in range(0, numIndex):
+
+        coupon = indexCoupons[iMaturity]
+        mLow = 0.0
+        mHigh = np.inf
+        converged = False
+
+        for _ in range(0, maxIterations):
+
+            sumProt = 0.0
+            sumRPV01 = 0.0
+            dv = 0.0
+
+            for k in range(0, numCredits):
+
+                for j in range(0, numContracts):
+                    coupons[j] = spreads[k, j] * multipliers[j]
+
+                cumHazards[k] = \
+                    _bootstrapCumHazards(coupons, recoveries[k], nodeTimes,
+                                         curveTeffs, curveAccruedToNow,
+                                         curvePayOffsets, curvePayTimes,
+                                         curveYearFracs, curvePayDfs,
+                                         curveProtDts, curveGridTimes,
+                                         curveGridDfs)
+
+                if np.isnan(cumHazards[k, numContracts]):
+                    return multipliers, cumHazards, iMaturity
+
+                protPV, cleanRPV01 = \
+                    _indexValue(iMaturity, nodeTimes, cumHazards[k],
+                                teffs, tmats, accruedToNow, payOffsets,
+                                payTimes, yearFracs, iborTimes, iborLogDfs,
+                                lgd, coupon, gradC)
+
+                dCds, _ = \
+                    _hazardJacobians(coupons, recoveries[k], nodeTimes,
+                                     cumHazards[k], curveTeffs,
+                                     curveAccruedToNow, curvePayOffsets,
+                                     curvePayTimes, curveYearFracs,
+                                     curveNumSteps, iborTimes, iborLogDfs)
+
+                sumProt += protPV
+                sumRPV01 += cleanRPV01
+
+                dCdm = spreads[k, iMaturity]
+                for j in range(0, numContracts):
+                    dv += gradC[j + 1] * dCds[j, iMaturity] * dCdm
+
+            sumProt /= numCredits
+            sumRPV01 /= numCredits
+            dv /= numCredits
+
+            sumPrem = sumRPV01 * coupon
+            ratio = (indexUpfronts[iMaturity] + sumPrem) / sumProt
+
+            if abs(ratio - 1.0) <= tolerance:
+                converged = True
+                break
+
+            v = sumProt - sumPrem - indexUpfronts[iMaturity]
+            m = multipliers[iMaturity]
+
+            if v < 0.0:
+                mLow = m
+            else:
+                mHigh = m
+
+            multipliers[iMaturity] = _newtonStep(m, v, dv, ratio, mLow, mHigh)
+
+        if converged is False:
+            return multipliers, cumHazards, iMaturity
+
+    return multipliers, cumHazards, -1
+
+###############################################################################
 
 
 class FinCDSIndexPortfolio():
@@ -240,11 +558,15 @@ class FinCDSIndexPortfolio():
                               indexUpfronts,
                               indexMaturityDates,
                               indexRecoveryRate,
-                              tolerance=1e-6):
+                              tolerance=1e-6,
+                              maxIterations=20):
         ''' Adjust individual CDS curves to reprice CDS index prices.
-        This approach uses an iterative scheme but is slow as it has to use a
-        CDS curve bootstrap required when each trial spread adjustment is made
-        '''
+        The spreads of the CDS contracts of each issuer curve at the i-th
+        maturity are multiplied by the same multiplier so that the index with
+        the i-th index maturity is repriced. The multipliers are found by a
+        Newton method on arrays of the bootstrapped cumulative hazards using
+        the analytic derivatives of the index value with respect to the
+        multipliers. '''
 
         numCredits = len(issuerCurves)
 
@@ -267,11 +589,9 @@ class FinCDSIndexPortfolio():
                 raise FinError(
                     "All issuer curves must be built from same cds maturities")
 
-        cdsSpreadMultipliers = [1.0] * numCDSMaturityPoints
-
-#        spreadDifference = [0.0] * numCDSMaturityPoints
-
-        adjustedCDSSpreads = [0.0] * numCDSMaturityPoints
+        if numIndexMaturityPoints < 1 or \
+                numIndexMaturityPoints > numCDSMaturityPoints:
+            raise FinError("Need a CDS maturity for each index maturity.")
 
         #######################################################################
         # Set up CDS contracts used to build curve
@@ -289,70 +609,47 @@ class FinCDSIndexPortfolio():
 
             curveCDSContracts.append(cdsContract)
 
-        #######################################################################
-
-        # We calibrate the individual CDS curves to fit each index maturity
-        # point
-        for iMaturity in range(0, numIndexMaturityPoints):
-
-            alpha = 0.0
-            numIterations = 0
-
-            while abs(alpha - 1.0) > tolerance:
-
-                numIterations += 1
-
-                if numIterations > 20:
-                    raise FinError(
-                        "Num iterations > 20. Increase limit or reduce tolerance or check inputs.")
-
-                sumRPV01 = 0.0
-                sumProt = 0.0
-
-                # This is for the specific index maturity date
-                indexMaturityDate = indexMaturityDates[iMaturity]
-                cdsIndex = FinCDS(valuationDate, indexMaturityDate, 0.0, 1.0)
-
-                for iCredit in range(0, numCredits):
-
-                    cdsContracts = issuerCurves[iCredit]._cdsContracts
-                    recoveryRate = issuerCurves[iCredit]._recoveryRate
-                    adjustedCDSContracts = []
-
-                    for j in range(0, numCDSMaturityPoints):
+        bootstrap = FinCDSCurveBootstrap(valuationDate,
+                                         curveCDSContracts,
+                                         liborCurve)
 
-                        cdsSpread = cdsContracts[j]._runningCoupon
-                        adjustedCDSSpreads[j] = cdsSpread * \
-                            cdsSpreadMultipliers[j]
-                        curveCDSContracts[j]._runningCoupon = adjustedCDSSpreads[j]
+        spreads = np.array([[cds._runningCoupon
+                             for cds in issuerCurve._cdsContracts]
+                            for issuerCurve in issuerCurves])
 
-                    adjustedIssuerCurve = FinCDSCurve(valuationDate,
-                                                      curveCDSContracts,
-                                                      liborCurve,
-                                                      recoveryRate)
+        recoveryRates = np.array([issuerCurve._recoveryRate
+                                  for issuerCurve in issuerCurves],
+                                 dtype=np.float64)
 
-                    indexProtectionPV = cdsIndex.protectionLegPV(valuationDate,
-                                                                 adjustedIssuerCurve,
-                                                                 indexRecoveryRate)
+        teffs, tmats, accruedToNow, payOffsets, payTimes, yearFracs = \
+            _indexArrays(valuationDate, indexMaturityDates)
 
-                    cleanRPV01 = cdsIndex.riskyPV01(valuationDate,
-                                                    adjustedIssuerCurve)['clean_rpv01']
+        iborTimes, iborLogDfs = _iborArrays(liborCurve)
 
-                    sumRPV01 += cleanRPV01
-                    sumProt += indexProtectionPV
-
-                sumRPV01 /= numCredits
-                sumProt /= numCredits
-
-                sumPrem = sumRPV01 * indexCoupons[iMaturity]
-
-                numerator = indexUpfronts[iMaturity] + sumPrem
-                denominator = sumProt
-
-                alpha = numerator / denominator
-                cdsSpreadMultipliers[iMaturity] *= alpha
+        #######################################################################
 
-        # use spread multipliers to build and store adjusted curves
+        # We calibrate the individual CDS curves to fit each index maturity
+        # point
+        cdsSpreadMultipliers, cumHazards, failed = \
+            _spreadAdjust(spreads, recoveryRates, bootstrap._times,
+                          bootstrap._teffs, bootstrap._accruedToNow,
+                          bootstrap._payOffsets, bootstrap._payTimes,
+                          bootstrap._yearFracs, bootstrap._payDfs,
+                          bootstrap._protDts, bootstrap._gridTimes,
+                          bootstrap._gridDfs, bootstrap._numStepsPerYear,
+                          teffs, tmats, accruedToNow, payOffsets, payTimes,
+                          yearFracs, iborTimes, iborLogDfs,
+                          np.array(indexCoupons, dtype=np.float64),
+                          np.array(indexUpfronts, dtype=np.float64),
+                          float(indexRecoveryRate), float(tolerance),
+                          int(maxIterations))
+
+        if failed >= 0:
+            raise FinError(
+                "Num iterations > " + str(maxIterations) +
+                ". Increase limit or reduce tolerance or check inputs.")
+
+        # use spread multipliers to store adjusted curves without a rebuild
         adjustedIssuerCurves = []
 
         for iCredit in range(0, numCredits):
@@ -360,26 +657,30 @@ class FinCDSIndexPortfolio():
             recoveryRate = issuerCurves[iCredit]._recoveryRate
 
             adjustedCDSContracts = []
-            adjustedSpreads = []
 
             for j in range(0, numCDSMaturityPoints):
 
-                unadjustedSpread = issuerCurves[iCredit]._cdsContracts[j]._runningCoupon
+                adjustedSpread = spreads[iCredit, j] * cdsSpreadMultipliers[j]
 
-                adjustedSpread = unadjustedSpread * cdsSpreadMultipliers[j]
-
-                adjustedcdsContract = FinCDS(valuationDate,
-                                             cdsMaturityDates[j],
-                                             adjustedSpread)
+                # The schedule is the same for all issuers so the contract is
+                # copied and only its coupon and flows change
+                adjustedcdsContract = copy(curveCDSContracts[j])
+                adjustedcdsContract._runningCoupon = adjustedSpread
+                adjustedcdsContract._flows = \
+                    [flow * adjustedSpread
+                     for flow in curveCDSContracts[j]._flows]
 
                 adjustedCDSContracts.append(adjustedcdsContract)
-                adjustedSpreads.append(adjustedSpread)
 
-                adjustedIssuerCurve = FinCDSCurve(valuationDate,
-                                                  adjustedCDSContracts,
-                                                  liborCurve,
-                                                  recoveryRate)
+            adjustedIssuerCurve = FinCDSCurve(valuationDate,
+                                              [],
+                                              liborCurve,
+                                              recoveryRate)
 
+            adjustedIssuerCurve._cdsContracts = adjustedCDSContracts
+            adjustedIssuerCurve._times = bootstrap._times.copy()
+            adjustedIssuerCurve._values = np.exp(-cumHazards[iCredit])
+            adjustedIssuerCurve._values[0] = 1.0
             adjustedIssuerCurves.append(adjustedIssuerCurve)
 
         return adjustedIssuerCurves
@@ -396,8 +697,13 @@ class FinCDSIndexPortfolio():
                                   tolerance=1e-6,
                                   maxIterations=100):
         ''' Adjust individual CDS curves to reprice CDS index prices.
-        This approach adjusts the hazard rates and so avoids the slowish
-        CDS curve bootstrap required when a spread adjustment is made.'''
+        This approach adjusts the hazard rates and so avoids the CDS curve
+        bootstrap required when a spread adjustment is made. The hazard rate
+        of each issuer curve between the (i-1)-th and i-th CDS maturities is
+        multiplied by the same multiplier so that the index with the i-th
+        index maturity is repriced. The multipliers are found by a Newton
+        method on arrays of the cumulative hazards. '''
+
         numCredits = len(issuerCurves)
 
         if numCredits < 1:
@@ -405,74 +711,58 @@ class FinCDSIndexPortfolio():
 
         liborCurve = issuerCurves[0]._liborCurve
         numIndexMaturityPoints = len(indexCoupons)
-#        hazardRateMultipliers = [1.0] * numIndexMaturityPoints
-        adjustedIssuerCurves = []
-
-        # making a copy of the issuer curves
-        for issuerCurve in issuerCurves:
-
-            adjustedIssuerCurve = FinCDSCurve(valuationDate,
-                                              [],
-                                              liborCurve)
-
-            adjustedIssuerCurve._times = issuerCurve._times.copy()
-            adjustedIssuerCurve._values = issuerCurve._values.copy()
-            adjustedIssuerCurves.append(adjustedIssuerCurve)
-
-        # We solve for each maturity point
-        for iMaturity in range(0, numIndexMaturityPoints):
-
-            alpha = 1.0
-            ratio = 1.0 + 2.0 * tolerance
-            numIterations = 0
-
-            while abs(ratio - 1.0) > tolerance:
 
-                numIterations += 1
+        numNodes = len(issuerCurves[0]._times)
 
-                if numIterations == maxIterations:
-                    raise FinError("Max Iterations exceeded")
-
-                sumRPV01 = 0.0
-                sumProt = 0.0
-
-                for iCredit in range(0, numCredits):
-
-                    q1 = adjustedIssuerCurves[iCredit]._values[iMaturity]
-                    q2 = adjustedIssuerCurves[iCredit]._values[iMaturity + 1]
-                    q12 = q2 / q1
-                    q12NEW = pow(q12, ratio)
-                    q2NEW = q1 * q12NEW
+        for issuerCurve in issuerCurves:
+            if len(issuerCurve._times) != numNodes:
+                raise FinError(
+                    "All issuer curves must have the same number of nodes")
 
-                    adjustedIssuerCurves[iCredit]._values[iMaturity + 1] = q2NEW
+        if numIndexMaturityPoints < 1 or \
+                numIndexMaturityPoints > numNodes - 1:
+            raise FinError("Need a curve node for each index maturity.")
 
-                    indexMaturityDate = indexMaturityDates[iMaturity]
+        curveTimes = np.array([issuerCurve._times
+                               for issuerCurve in issuerCurves],
+                              dtype=np.float64)
 
-                    # the CDS spreads we extract here should be the index
-                    # maturity dates
-                    cdsIndex = FinCDS(valuationDate, indexMaturityDate, 0, 1.0)
+        cumHazards = -np.log(np.array([issuerCurve._values
+                                       for issuerCurve in issuerCurves],
+                                      dtype=np.float64))
 
-                    indexProtPV = cdsIndex.protectionLegPV(valuationDate,
-                                                           adjustedIssuerCurves[iCredit],
-                                                           indexRecoveryRate)
+        teffs, tmats, accruedToNow, payOffsets, payTimes, yearFracs = \
+            _indexArrays(valuationDate, indexMaturityDates)
 
-                    rpv01Ret = cdsIndex.riskyPV01(
-                        valuationDate, adjustedIssuerCurves[iCredit])
+        iborTimes, iborLogDfs = _iborArrays(liborCurve)
 
-                    cleanRPV01 = rpv01Ret['clean_rpv01']
+        # We solve for each maturity point
+        _, failed = _hazardRateAdjust(curveTimes, cumHazards, teffs, tmats,
+                                      accruedToNow, payOffsets, payTimes,
+                                      yearFracs, iborTimes, iborLogDfs,
+                                      np.array(indexCoupons,
+                                               dtype=np.float64),
+                                      np.array(indexUpfronts,
+                                               dtype=np.float64),
+                                      float(indexRecoveryRate),
+                                      float(tolerance), int(maxIterations))
+
+        if failed >= 0:
+            raise FinError("Max Iterations exceeded")
 
-                    sumRPV01 += cleanRPV01
-                    sumProt += indexProtPV
+        adjustedIssuerCurves = []
 
-                sumRPV01 /= numCredits
-                sumProt /= numCredits
-                sumPrem = sumRPV01 * indexCoupons[iMaturity]
+        # making a copy of the issuer curves
+        for iCredit, issuerCurve in enumerate(issuerCurves):
 
-                numerator = indexUpfronts[iMaturity] + sumPrem
-                denominator = sumProt
+            adjustedIssuerCurve = FinCDSCurve(valuationDate,
+                                              [],
+                                              liborCurve)
 
-                ratio = numerator / denominator
-                alpha *= ratio
+            adjustedIssuerCurve._times = issuerCurve._times.copy()
+            adjustedIssuerCurve._values = np.exp(-cumHazards[iCredit])
+            adjustedIssuerCurve._values[0] = issuerCurve._values[0]
+            adjustedIssuerCurves.append(adjustedIssuerCurve)
 
         return adjustedIssuerCurves
 
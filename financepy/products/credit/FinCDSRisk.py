@@ -0,0 +1,715 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange
+from math import exp
+
+from ...finutils.FinDate import FinDate
+from ...finutils.FinError import FinError
+from ...finutils.FinDayCount import FinDayCount
+from ...finutils.FinGlobalVariables import gDaysInYear
+
+from .FinCDS import standardRecovery, useFlatHazardRateIntegral
+from .FinCDSCurveSet import FinCDSCurveSet
+from .FinCDSCurveBootstrap import FinCDSCurveBootstrap
+
+###############################################################################
+# The credit and interest rate risk of a CDS is usually found by bumping the
+# CDS spreads or the Ibor quotes and bootstrapping the issuer curve again. Here
+# it is found from derivatives on the curve that has already been built.
+#
+# Both curves are interpolated flat in the forward rate so that minus the log
+# of any survival probability or discount factor used by FinCDS is a weighted
+# sum of the cumulative hazards C or minus the log discount factors R at two
+# nodes of the curve. The adjoint of the leg calculations of FinCDS gives the
+# derivative of the value of a CDS with respect to each of these nodes.
+#
+# Contract i of an issuer curve is repriced on the curve cut off at node i + 1
+# so its clean value g[i](C, s[i], R) = 0 only involves the nodes up to i + 1.
+# Differentiating this gives a lower triangular system for the derivatives of
+# the nodes with respect to the contract spreads s and the Ibor curve nodes R.
+# The derivatives of the Ibor nodes to the Ibor quotes come from the quote
+# Jacobian of the Ibor curve. All of these are linear in the bump size so they
+# agree with the bump and rebuild numbers up to the convexity of the value.
+###############################################################################
+
+ONE_BP = 0.0001
+
+###############################################################################
+
+
+@njit(cache=True)
+def _interpWeights(t, times):
+    ''' Return the two nodes and their weights such that minus the log of the
+    value at time t interpolated by _uinterpolate with flat forward rates is
+    w1 * Y[i1] + w2 * Y[i2] where Y is minus the log of the node values. This
+    includes the extrapolation before the first and after the last node. '''
+
+    numPoints = len(times)
+
+    if t == times[0]:
+        return 0, 0.0, 0, 0.0
+
+    i = 0
+    while times[i] < t and i < numPoints - 1:
+        i = i + 1
+
+    if t > times[i]:
+        i1 = numPoints - 2
+        i2 = numPoints - 1
+    else:
+        # Before the first node this is the last node as in _uinterpolate
+        i1 = i - 1
+        if i1 < 0:
+            i1 = numPoints - 1
+        i2 = i
+
+    dt = times[i2] - times[i1]
+    w1 = (times[i2] - t) / dt
+    w2 = (t - times[i1]) / dt
+    return i1, w1, i2, w2
+
+###############################################################################
+
+
+@njit(cache=True)
+def _logValue(t, times, logValues):
+    ''' Minus the log of the value interpolated at time t. '''
+
+    i1, w1, i2, w2 = _interpWeights(t, times)
+    return w1 * logValues[i1] + w2 * logValues[i2]
+
+###############################################################################
+
+
+@njit(cache=True)
+def _addGradient(t, times, g, grad):
+    ''' Add the derivative g with respect to minus the log of the value at
+    time t to the derivatives with respect to the nodes. '''
+
+    i1, w1, i2, w2 = _interpWeights(t, times)
+    grad[i1] += g * w1
+    grad[i2] += g * w2
+
+###############################################################################
+
+
+@njit(cache=True)
+def _cdsLegGradients(teff,
+                     tmat,
+                     accruedToNow,
+                     payTimes,
+                     yearFracs,
+                     numStepsPerYear,
+                     survTimes,
+                     cumHazards,
+                     iborTimes,
+                     iborLogDfs,
+                     protScale,
+                     premScale,
+                     gradC,
+                     gradR):
+    ''' Calculate the protection leg value without the loss given default and
+    the full risky PV01 of a CDS per unit notional as in _protectionLegPV_NUMBA
+    and _riskyPV01_NUMBA. The derivatives of protScale times the first less
+    premScale times the second with respect to the cumulative hazards and to
+    minus the log discount factors at the curve nodes are added to gradC and
+    gradR. '''
+
+    ###########################################################################
+    # Premium leg as in _riskyPV01_NUMBA
+    ###########################################################################
+
+    ceff = _logValue(teff, survTimes, cumHazards)
+    qeff = exp(-ceff)
+
+    t1 = payTimes[1]
+    c1 = _logValue(t1, survTimes, cumHazards)
+    r1 = _logValue(t1, iborTimes, iborLogDfs)
+    q1 = exp(-c1)
+    z1 = exp(-r1)
+    yf1 = yearFracs[1]
+
+    # The accrued to now and the half of the rest paid on default
+    m = accruedToNow + 0.5 * (yf1 - accruedToNow)
+
+    fullRPV01 = q1 * z1 * yf1 + z1 * (qeff - q1) * m
+
+    _addGradient(teff, survTimes, premScale * z1 * qeff * m, gradC)
+
+    # The derivatives at the previous payment and of the fixed z1
+    gcPrev = -q1 * z1 * yf1 + z1 * q1 * m
+    gr1 = -q1 * z1 * yf1 - z1 * (qeff - q1) * m
+
+    tPrev = t1
+    cPrev = c1
+    qPrev = q1
+
+    for it in range(2, len(payTimes)):
+
+        t2 = payTimes[it]
+        c2 = _logValue(t2, survTimes, cumHazards)
+        r2 = _logValue(t2, iborTimes, iborLogDfs)
+        q2 = exp(-c2)
+        z2 = exp(-r2)
+        tau = yearFracs[it]
+
+        fullRPV01 += q2 * z2 * tau
+        gc2 = -q2 * z2 * tau
+        gr2 = -q2 * z2 * tau
+
+        if useFlatHazardRateIntegral:
+
+            # The discount factor z1 is not rolled on in _riskyPV01_NUMBA
+            h12 = (c2 - cPrev) / tau
+            r12 = (r2 - r1) / tau
+            alpha = h12 + r12
+            expAlpha = exp(-alpha * tau)
+            expTerm = 1.0 - expAlpha - alpha * tau * expAlpha
+            dexpTerm = alpha * tau * tau * expAlpha
+            denom = abs(alpha * alpha + 1e-20)
+            ddenom = 2.0 * alpha
+
+            term = qPrev * z1 * h12 * expTerm / denom
+            fullRPV01 += term
+
+            dh = qPrev * z1 * expTerm / denom / tau
+            dalpha = qPrev * z1 * h12 * (dexpTerm / denom - expTerm *
+                                         ddenom / denom / denom) / tau
+
+            gc2 += dh + dalpha
+            gcPrev += -term - dh - dalpha
+            gr2 += dalpha
+            gr1 += -term - dalpha
+
+        else:
+
+            term = 0.50 * (qPrev - q2) * z2 * tau
+            fullRPV01 += term
+            gcPrev += -0.50 * qPrev * z2 * tau
+            gc2 += 0.50 * q2 * z2 * tau
+            gr2 += -term
+
+        _addGradient(tPrev, survTimes, -premScale * gcPrev, gradC)
+        _addGradient(t2, iborTimes, -premScale * gr2, gradR)
+
+        tPrev = t2
+        cPrev = c2
+        qPrev = q2
+        gcPrev = gc2
+
+    _addGradient(tPrev, survTimes, -premScale * gcPrev, gradC)
+    _addGradient(t1, iborTimes, -premScale * gr1, gradR)
+
+    ###########################################################################
+    # Protection leg as in _protectionLegPV_NUMBA
+    ###########################################################################
+
+    small = 1e-8
+    dt = (tmat - teff) / numStepsPerYear
+    t = teff
+
+    c1 = _logValue(t, survTimes, cumHazards)
+    r1 = _logValue(t, iborTimes, iborLogDfs)
+    q1 = exp(-c1)
+    z1 = exp(-r1)
+
+    gc1 = 0.0
+    gr1 = 0.0
+    tPrev = t
+    protPV = 0.0
+
+    for _ in range(0, numStepsPerYear):
+
+        t = t + dt
+        c2 = _logValue(t, survTimes, cumHazards)
+        r2 = _logValue(t, iborTimes, iborLogDfs)
+        q2 = exp(-c2)
+        z2 = exp(-r2)
+
+        if useFlatHazardRateIntegral:
+
+            h12 = (c2 - c1) / dt
+            r12 = (r2 - r1) / dt
+            expTerm = exp(-(r12 + h12) * dt)
+            denom = abs(h12 + r12) + small
+
+            if h12 + r12 >= 0.0:
+                sign = 1.0
+            else:
+                sign = -1.0
+
+            term = h12 * (1.0 - expTerm) * q1 * z1 / denom
+            protPV += term
+
+            dh = (1.0 - expTerm) * q1 * z1 / denom / dt
+            dexp = h12 * expTerm * q1 * z1 / denom
+            ddenom = term * sign / denom / dt
+
+            gc2 = dh + dexp - ddenom
+            gc1 += -dh - dexp - term + ddenom
+            gr2 = dexp - ddenom
+            gr1 += -dexp - term + ddenom
+
+        else:
+
+            term = 0.5 * (z1 + z2) * (q1 - q2)
+            protPV += term
+
+            gc2 = 0.5 * (z1 + z2) * q2
+            gc1 += -0.5 * (z1 + z2) * q1
+            gr2 = -0.5 * z2 * (q1 - q2)
+            gr1 += -0.5 * z1 * (q1 - q2)
+
+        _addGradient(tPrev, survTimes, protScale * gc1, gradC)
+        _addGradient(tPrev, iborTimes, protScale * gr1, gradR)
+
+        tPrev = t
+        c1 = c2
+        r1 = r2
+        q1 = q2
+        z1 = z2
+        gc1 = gc2
+        gr1 = gr2
+
+    _addGradient(tPrev, survTimes, protScale * gc1, gradC)
+    _addGradient(tPrev, iborTimes, protScale * gr1, gradR)
+
+    return protPV, fullRPV01
+
+###############################################################################
+
+
+@njit(cache=True)
+def _hazardJacobians(coupons,
+                     recovery,
+                     nodeTimes,
+                     cumHazards,
+                     teffs,
+                     accruedToNow,
+                     payOffsets,
+                     payTimes,
+                     yearFracs,
+                     numStepsPerYear,
+                     iborTimes,
+                     iborLogDfs):
+    ''' Return the derivatives of the cumulative hazards at the curve nodes
+    after time zero with respect to the contract spreads and to minus the log
+    of the Ibor discount factors at the Ibor curve nodes. Contract i is valued
+    on the curve cut off at node i + 1 as it is in the bootstrap. '''
+
+    numContracts = len(teffs)
+    numIbor = len(iborTimes)
+    lgd = 1.0 - recovery
+
+    dgdC = np.zeros((numContracts, numContracts + 1))
+    dgdR = np.zeros((numContracts, numIbor))
+    dgds = np.zeros(numContracts)
+
+    for i in range(0, numContracts):
+
+        start = payOffsets[i]
+        end = payOffsets[i + 1]
+
+        _, fullRPV01 = \
+            _cdsLegGradients(teffs[i], nodeTimes[i + 1], accruedToNow[i],
+                             payTimes[start:end], yearFracs[start:end],
+                             numStepsPerYear, nodeTimes[0:i + 2],
+                             cumHazards[0:i + 2], iborTimes, iborLogDfs,
+                             lgd, coupons[i], dgdC[i, 0:i + 2], dgdR[i])
+
+        # The clean value is lgd * prot - s * cleanRPV01
+        dgds[i] = -(fullRPV01 - accruedToNow[i])
+
+    # Solve dg/dC * dC/dx = - dg/dx by forward substitution. The first node
+    # is fixed at zero.
+    dCds = np.zeros((numContracts, numContracts))
+    dCdR = np.zeros((numContracts, numIbor))
+
+    for i in range(0, numContracts):
+
+        dCds[i, i] = -dgds[i]
+        for k in range(0, numIbor):
+            dCdR[i, k] = -dgdR[i, k]
+
+        for j in range(0, i):
+            a = dgdC[i, j + 1]
+            for k in range(0, numContracts):
+                dCds[i, k] -= a * dCds[j, k]
+            for k in range(0, numIbor):
+                dCdR[i, k] -= a * dCdR[j, k]
+
+        a = dgdC[i, i + 1]
+        for k in range(0, numContracts):
+            dCds[i, k] /= a
+        for k in range(0, numIbor):
+            dCdR[i, k] /= a
+
+    return dCds, dCdR
+
+###############################################################################
+
+
+@njit(cache=True, parallel=True)
+def _hazardJacobiansParallel(coupons,
+                             recoveries,
+                             nodeTimes,
+                             cumHazards,
+                             teffs,
+                             accruedToNow,
+                             payOffsets,
+                             payTimes,
+                             yearFracs,
+                             numStepsPerYear,
+                             iborTimes,
+                             iborLogDfs):
+    ''' The hazard Jacobians of many issuers that share the same contracts
+    with the issuers shared out between the threads. '''
+
+    numNames = coupons.shape[0]
+    numContracts = len(teffs)
+    numIbor = len(iborTimes)
+
+    dCds = np.zeros((numNames, numContracts, numContracts))
+    dCdR = np.zeros((numNames, numContracts, numIbor))
+
+    for iName in prange(0, numNames):
+        dCds[iName], dCdR[iName] = \
+            _hazardJacobians(coupons[iName], recoveries[iName], nodeTimes,
+                             cumHazards[iName], teffs, accruedToNow,
+                             payOffsets, payTimes, yearFracs, numStepsPerYear,
+                             iborTimes, iborLogDfs)
+
+    return dCds, dCdR
+
+###############################################################################
+
+
+def _iborArrays(liborCurve):
+    ''' The node times and minus the log discount factors of the Ibor curve
+    as they are interpolated by FinCDS. '''
+
+    iborTimes = np.array(liborCurve._times, dtype=np.float64)
+    iborLogDfs = -np.log(np.array(liborCurve._dfs, dtype=np.float64))
+    return iborTimes, iborLogDfs
+
+###############################################################################
+
+
+def hazardJacobians(issuerCurve):
+    ''' Return the matrices of the derivatives of the cumulative hazards at
+    the nodes of a FinCDSCurve after time zero with respect to the spreads of
+    its CDS contracts and with respect to minus the log of the discount
+    factors at the nodes of its Ibor curve. Element [i, j] is the derivative
+    at node i + 1. For a FinCDSCurveSet these are arrays with a first index
+    for each issuer. '''
+
+    if isinstance(issuerCurve, FinCDSCurveSet):
+        bootstrap = issuerCurve._bootstrap
+        coupons = issuerCurve._spreads
+        recoveries = issuerCurve._recoveryRates
+        cumHazards = -np.log(issuerCurve._values)
+    else:
+        bootstrap = FinCDSCurveBootstrap(issuerCurve._valuationDate,
+                                         issuerCurve._cdsContracts,
+                                         issuerCurve._liborCurve)
+        coupons = np.array([[cds._runningCoupon
+                             for cds in issuerCurve._cdsContracts]])
+        recoveries = np.array([issuerCurve._recoveryRate])
+        cumHazards = -np.log(np.array([issuerCurve._values],
+                                      dtype=np.float64))
+
+    iborTimes, iborLogDfs = _iborArrays(bootstrap._liborCurve)
+
+    dCds, dCdR = _hazardJacobiansParallel(coupons, recoveries,
+                                          bootstrap._times, cumHazards,
+                                          bootstrap._teffs,
+                                          bootstrap._accruedToNow,
+                                          bootstrap._payOffsets,
+                                          bootstrap._payTimes,
+                                          bootstrap._yearFracs,
+                                          bootstrap._numStepsPerYear,
+                                          iborTimes, iborLogDfs)
+
+    if isinstance(issuerCurve, FinCDSCurveSet):
+        return dCds, dCdR
+
+    return dCds[0], dCdR[0]
+
+###############################################################################
+
+
+def _iborQuoteJacobian(liborCurve):
+    ''' The derivatives of minus the log discount factors at the Ibor curve
+    nodes after time zero with respect to the Ibor curve quotes. '''
+
+    if hasattr(liborCurve, "quoteJacobian") is False:
+        raise FinError("Ibor curve has no quote Jacobian.")
+
+    jacobian = liborCurve.quoteJacobian()
+    dfs = np.array(liborCurve._dfs[1:], dtype=np.float64)
+    return -jacobian / dfs[:, np.newaxis]
+
+###############################################################################
+
+
+def _cdsArrays(cds, valuationDate):
+    ''' The step-in and maturity times, the accrued fraction at step-in, the
+    payment times and the accrual factors of a CDS as they are used by the
+    leg calculations of FinCDS. '''
+
+    if isinstance(valuationDate, FinDate) is False:
+        raise FinError("Valuation date must be a FinDate.")
+
+    dates = cds._adjustedDates
+    payTimes = np.array([(dt - valuationDate) / gDaysInYear for dt in dates])
+    yearFracs = np.array(cds._accrualFactors)
+    dayCount = FinDayCount(cds._dayCountType)
+    accruedToNow = dayCount.yearFrac(dates[0], cds._stepInDate)[0]
+    teff = (cds._stepInDate - valuationDate) / gDaysInYear
+    tmat = (cds._maturityDate - valuationDate) / gDaysInYear
+
+    return teff, tmat, accruedToNow, payTimes, yearFracs
+
+###############################################################################
+
+
+def _tradeGradients(cds,
+                    valuationDate,
+                    issuerCurve,
+                    contractRecovery,
+                    numStepsPerYear):
+    ''' The derivatives of the full value of a CDS with respect to the
+    cumulative hazards and to minus the log Ibor discount factors at the
+    curve nodes. '''
+
+    teff, tmat, accruedToNow, payTimes, yearFracs = \
+        _cdsArrays(cds, valuationDate)
+
+    iborTimes, iborLogDfs = _iborArrays(issuerCurve._liborCurve)
+    survTimes = np.array(issuerCurve._times, dtype=np.float64)
+    cumHazards = -np.log(np.array(issuerCurve._values, dtype=np.float64))
+
+    gradC = np.zeros(len(survTimes))
+    gradR = np.zeros(len(iborTimes))
+
+    _cdsLegGradients(teff, tmat, accruedToNow, payTimes, yearFracs,
+                     int(numStepsPerYear), survTimes, cumHazards, iborTimes,
+                     iborLogDfs, 1.0 - contractRecovery, cds._runningCoupon,
+                     gradC, gradR)
+
+    scale = cds._notional
+    if cds._longProtection is False:
+        scale = -scale
+
+    return gradC * scale, gradR * scale
+
+###############################################################################
+
+
+def bucketedCreditDV01(cds,
+                       valuationDate: FinDate,
+                       issuerCurve,
+                       contractRecovery: float = standardRecovery,
+                       numStepsPerYear: int = 25,
+                       bumpSize: float = ONE_BP):
+    ''' Return the change in the full value of the CDS for a one basis point
+    rise in the spread of each of the CDS contracts used to build the issuer
+    curve. This uses the derivatives of the curve so it is not rebuilt. '''
+
+    gradC, _ = _tradeGradients(cds, valuationDate, issuerCurve,
+                               contractRecovery, numStepsPerYear)
+
+    dCds, _ = hazardJacobians(issuerCurve)
+    return np.dot(gradC[1:], dCds) * bumpSize
+
+###############################################################################
+
+
+def parallelCreditDV01(cds,
+                       valuationDate: FinDate,
+                       issuerCurve,
+                       contractRecovery: float = standardRecovery,
+                       numStepsPerYear: int = 25,
+                       bumpSize: float = ONE_BP):
+    ''' Return the change in the full value of the CDS for a one basis point
+    rise in the spreads of all of the CDS contracts used to build the issuer
+    curve. This is the analytic version of FinCDS.creditDV01. '''
+
+    return np.sum(bucketedCreditDV01(cds, valuationDate, issuerCurve,
+                                     contractRecovery, numStepsPerYear,
+                                     bumpSize))
+
+###############################################################################
+
+
+def bucketedInterestDV01(cds,
+                         valuationDate: FinDate,
+                         issuerCurve,
+                         contractRecovery: float = standardRecovery,
+                         numStepsPerYear: int = 25,
+                         bumpSize: float = ONE_BP):
+    ''' Return the change in the full value of the CDS for a one basis point
+    rise in the quote of each of the deposits, FRAs and swaps used to build
+    the Ibor curve with the issuer curve refitted to its CDS spreads. Neither
+    curve is rebuilt. '''
+
+    gradC, gradR = _tradeGradients(cds, valuationDate, issuerCurve,
+                                   contractRecovery, numStepsPerYear)
+
+    _, dCdR = hazardJacobians(issuerCurve)
+    gradR = gradR + np.dot(gradC[1:], dCdR)
+
+    dRdq = _iborQuoteJacobian(issuerCurve._liborCurve)
+    return np.dot(gradR[1:], dRdq) * bumpSize
+
+###############################################################################
+
+
+def parallelInterestDV01(cds,
+                         valuationDate: FinDate,
+                         issuerCurve,
+                         contractRecovery: float = standardRecovery,
+                         numStepsPerYear: int = 25,
+                         bumpSize: float = ONE_BP):
+    ''' Return the change in the full value of the CDS for a one basis point
+    rise in all of the Ibor curve quotes with the issuer curve refitted. This
+    is the analytic version of FinCDS.interestDV01. '''
+
+    return np.sum(bucketedInterestDV01(cds, valuationDate, issuerCurve,
+                                       contractRecovery, numStepsPerYear,
+                                       bumpSize))
+
+###############################################################################
+
+
+@njit(cache=True)
+def _cdsBookRiskOne(iCDS,
+                    teffs,
+                    tmats,
+                    accruedToNow,
+                    payOffsets,
+                    payTimes,
+                    yearFracs,
+                    numStepsPerYear,
+                    iborTimes,
+                    iborLogDfs,
+                    curveRows,
+                    curveTimes,
+                    cumHazards,
+                    lgds,
+                    coupons,
+                    scales,
+                    dCds,
+                    dCdR,
+                    creditRisk,
+                    interestRisk):
+    ''' The derivatives of the full value of one contract of a book with
+    respect to the spreads of its issuer curve and to minus the log discount
+    factors of the Ibor curve with the issuer curve refitted. '''
+
+    start = payOffsets[iCDS]
+    end = payOffsets[iCDS + 1]
+    row = curveRows[iCDS]
+    numNodes = curveTimes.shape[1]
+
+    gradC = np.zeros(numNodes)
+    gradR = np.zeros(len(iborTimes))
+
+    _cdsLegGradients(teffs[iCDS], tmats[iCDS], accruedToNow[iCDS],
+                     payTimes[start:end], yearFracs[start:end],
+                     numStepsPerYear, curveTimes[row], cumHazards[row],
+                     iborTimes, iborLogDfs, lgds[iCDS], coupons[iCDS],
+                     gradC, gradR)
+
+    scale = scales[iCDS]
+
+    for k in range(0, numNodes - 1):
+        s = 0.0
+        for j in range(0, numNodes - 1):
+            s += gradC[j + 1] * dCds[row, j, k]
+        creditRisk[iCDS, k] = s * scale
+
+    for k in range(0, len(iborTimes)):
+        s = gradR[k]
+        for j in range(0, numNodes - 1):
+            s += gradC[j + 1] * dCdR[row, j, k]
+        interestRisk[iCDS, k] = s * scale
+
+###############################################################################
+
+
+@njit(cache=True)
+def _cdsBookRisk(teffs,
+                 tmats,
+                 accruedToNow,
+                 payOffsets,
+                 payTimes,
+                 yearFracs,
+                 numStepsPerYear,
+                 iborTimes,
+                 iborLogDfs,
+                 curveRows,
+                 curveTimes,
+                 cumHazards,
+                 lgds,
+                 coupons,
+                 scales,
+                 dCds,
+                 dCdR):
+    ''' The spread and Ibor derivatives of all of the contracts of a book on
+    one thread. '''
+
+    numCDS = len(teffs)
+    creditRisk = np.zeros((numCDS, curveTimes.shape[1] - 1))
+    interestRisk = np.zeros((numCDS, len(iborTimes)))
+
+    for iCDS in range(0, numCDS):
+        _cdsBookRiskOne(iCDS, teffs, tmats, accruedToNow, payOffsets,
+                        payTimes, yearFracs, numStepsPerYear, iborTimes,
+                        iborLogDfs, curveRows, curveTimes, cumHazards, lgds,
+                        coupons, scales, dCds, dCdR, creditRisk,
+                        interestRisk)
+
+    return creditRisk, interestRisk
+
+###############################################################################
+
+
+@njit(cache=True, parallel=True)
+def _cdsBookRiskParallel(teffs,
+                         tmats,
+                         accruedToNow,
+                         payOffsets,
+                         payTimes,
+                         yearFracs,
+                         numStepsPerYear,
+                         iborTimes,
+                         iborLogDfs,
+                         curveRows,
+                         curveTimes,
+                         cumHazards,
+                         lgds,
+                         coupons,
+                         scales,
+                         dCds,
+                         dCdR):
+    ''' The spread and Ibor derivatives of all of the contracts of a book with
+    the contracts shared out between the threads. '''
+
+    numCDS = len(teffs)
+    creditRisk = np.zeros((numCDS, curveTimes.shape[1] - 1))
+    interestRisk = np.zeros((numCDS, len(iborTimes)))
+
+    for iCDS in prange(0, numCDS):
+        _cdsBookRiskOne(iCDS, teffs, tmats, accruedToNow, payOffsets,
+                        payTimes, yearFracs, numStepsPerYear, iborTimes,
+                        iborLogDfs, curveRows, curveTimes, cumHazards, lgds,
+                        coupons, scales, dCds, dCdR, creditRisk,
+                        interestRisk)
+
+    return creditRisk, interestRisk
+
+###############################################################################
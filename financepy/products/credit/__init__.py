@@ -1,7 +1,14 @@
-from .FinCDS import *
-from .FinCDSCurve import *
-from .FinCDSBasket import *
-from .FinCDSIndexOption import *
-from .FinCDSIndexPortfolio import *
-from .FinCDSOption import *
-from .FinCDSTranche import *
+from ...finutils.FinLazyImport import makeLazyPackage
+
+# Modules are only imported when one of their names is first used
+makeLazyPackage(__name__, ["FinCDS",
+                           "FinCDSCurve",
+                           "FinCDSCurveBootstrap",
+                           "FinCDSCurveSet",
+                           "FinCDSBook",
+                           "FinCDSRisk",
+                           "FinCDSBasket",
+                           "FinCDSIndexOption",
+                           "FinCDSIndexPortfolio",
+                           "FinCDSOption",
+                           "FinCDSTranche"])
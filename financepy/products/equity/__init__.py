@@ -1,20 +1,22 @@
-from .FinEquityAsianOption import *
-from .FinEquityAmericanOption import *
-from .FinEquityBarrierOption import *
-from .FinEquityBasketOption import *
-from .FinEquityBinomialTree import *
-from .FinEquityChooserOption import *
-from .FinEquityCliquetOption import *
-from .FinEquityCompoundOption import *
-from .FinEquityDigitalOption import *
-from .FinEquityFixedLookbackOption import *
-from .FinEquityFloatLookbackOption import *
-from .FinEquityModelTypes import *
-from .FinEquityOption import *
-from .FinEquityRainbowOption import *
-from .FinEquityVanillaOption import *
-from .FinEquityVarianceSwap import *
-from .FinEquityOneTouchOption import *
+from ...finutils.FinLazyImport import makeLazyPackage
 
+# Modules are only imported when one of their names is first used
+makeLazyPackage(__name__, ["FinEquityAsianOption",
+                           "FinEquityAmericanOption",
+                           "FinEquityBarrierOption",
+                           "FinEquityBasketOption",
+                           "FinEquityBinomialTree",
+                           "FinEquityChooserOption",
+                           "FinEquityCliquetOption",
+                           "FinEquityCompoundOption",
+                           "FinEquityDigitalOption",
+                           "FinEquityFixedLookbackOption",
+                           "FinEquityFloatLookbackOption",
+                           "FinEquityModelTypes",
+                           "FinEquityOption",
+                           "FinEquityRainbowOption",
+                           "FinEquityVanillaOption",
+                           "FinEquityVarianceSwap",
+                           "FinEquityOneTouchOption"])
 
 # dividendCurve = FinDiscountCurveFlat(valueDate, dividendYield)
@@ -1,10 +1,13 @@
-from .FinFXBarrierOption import *
-from .FinFXDigitalOption import *
-from .FinFXFixedLookbackOption import *
-from .FinFXFloatLookbackOption import *
-from .FinFXForward import *
-from .FinFXMktConventions import *
-from .FinFXOption import *
-from .FinFXRainbowOption import *
-from .FinFXVanillaOption import *
-from .FinFXVarianceSwap import *
+from ...finutils.FinLazyImport import makeLazyPackage
+
+# Modules are only imported when one of their names is first used
+makeLazyPackage(__name__, ["FinFXBarrierOption",
+                           "FinFXDigitalOption",
+                           "FinFXFixedLookbackOption",
+                           "FinFXFloatLookbackOption",
+                           "FinFXForward",
+                           "FinFXMktConventions",
+                           "FinFXOption",
+                           "FinFXRainbowOption",
+                           "FinFXVanillaOption",
+                           "FinFXVarianceSwap"])
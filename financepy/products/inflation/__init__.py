@@ -1 +1,4 @@
-from .FinInflationBond import *
\ No newline at end of file
+from ...finutils.FinLazyImport import makeLazyPackage
+
+# Modules are only imported when one of their names is first used
+makeLazyPackage(__name__, ["FinInflationBond"])
@@ -0,0 +1,436 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+
+from ...finutils.FinError import FinError
+from ...finutils.FinDayCount import FinDayCount
+from ...finutils.FinGlobalVariables import gDaysInYear
+from ...finutils.FinGlobalTypes import FinSwapTypes
+from ...market.curves.FinDiscountCurve import _curveFromTimes
+from ...products.rates.FinIborDeposit import FinIborDeposit
+from ...products.rates.FinIborFRA import FinIborFRA
+
+###############################################################################
+# The calibration instruments of the bootstrapped curves are written as a sum
+# of terms coeffs[m] * df(t[iA[m]]) * df(t[iB[m]]) / df(t[iC[m]]) where df is
+# the curve being built and t holds the distinct flow times, the first being
+# zero so that index 0 gives a discount factor of one. The coefficients are
+# linear in the market quote and quoteCoeffs holds their derivatives. When a
+# separate discount curve is used its discount factors are put into the
+# coefficients. This lets us value the instruments and differentiate them
+# with respect to the curve grid and the quotes with a few array operations.
+###############################################################################
+
+
+def _excelDates(dates):
+    return np.array([dt._excelDate for dt in dates])
+
+###############################################################################
+
+
+def _termArrays(valuationDate, dates, coeffs, quoteCoeffs, indices):
+    ''' Convert lists of term dates and coefficients into the arrays used by
+    the term functions. The dates are a list of arrays of excel dates which
+    are concatenated and indices is a list of three lists of the positions
+    of the A, B and C dates in this concatenated array. Position 0 is the
+    valuation date. '''
+
+    valueExcelDate = valuationDate._excelDate
+    allDates = np.concatenate([np.full(1, valueExcelDate)] + dates)
+    times = (allDates - valueExcelDate) / gDaysInYear
+    flowTimes, inverse = np.unique(times, return_inverse=True)
+    inverse = inverse.astype(np.int64)
+
+    iA = inverse[np.concatenate(indices[0]).astype(np.int64)]
+    iB = inverse[np.concatenate(indices[1]).astype(np.int64)]
+    iC = inverse[np.concatenate(indices[2]).astype(np.int64)]
+
+    return (flowTimes, np.concatenate(coeffs), np.concatenate(quoteCoeffs),
+            iA, iB, iC)
+
+###############################################################################
+
+
+def _swapTerms(swap, valuationDate, discountCurve=None):
+    ''' Write the value of a FinIborSwap or FinOIS per unit of fixed leg
+    notional as a sum of terms. This reproduces the calculation of its value
+    method with no first fixing. If a discount curve is given then the swap
+    is valued on it and the terms are in the index curve only. The quote is
+    the fixed coupon. '''
+
+    fixedLeg = swap._fixedLeg
+    floatLeg = swap._floatLeg
+    valueExcelDate = valuationDate._excelDate
+
+    fixedSign = 1.0
+    if fixedLeg._legType == FinSwapTypes.PAY:
+        fixedSign = -1.0
+
+    floatSign = 1.0
+    if floatLeg._legType == FinSwapTypes.PAY:
+        floatSign = -1.0
+
+    scale = 1.0 / fixedLeg._notional
+    floatNotional = floatLeg._notional
+
+    fixedPay = _excelDates(fixedLeg._paymentDates)
+    fixedLive = fixedPay > valueExcelDate
+    fixedPay = fixedPay[fixedLive]
+    fixedPayments = np.array(fixedLeg._payments)[fixedLive]
+    fixedAlphas = np.array(fixedLeg._yearFracs)[fixedLive]
+
+    floatPay = _excelDates(floatLeg._paymentDates)
+    floatLive = floatPay > valueExcelDate
+    floatPay = floatPay[floatLive]
+    floatStart = _excelDates(floatLeg._startAccruedDates)[floatLive]
+    floatEnd = _excelDates(floatLeg._endAccruedDates)[floatLive]
+    floatAlphas = np.array(floatLeg._yearFracs)[floatLive]
+
+    numFixed = len(fixedPay)
+    numFloat = len(floatPay)
+
+    # Positions of the dates in the concatenated date array
+    fixedPos = np.arange(1, 1 + numFixed)
+    startPos = np.arange(1 + numFixed, 1 + numFixed + numFloat)
+    payPos = startPos + numFloat
+    endPos = payPos + numFloat
+    zeroFixed = np.zeros(numFixed, dtype=np.int64)
+    zeroFloat = np.zeros(numFloat, dtype=np.int64)
+
+    # With a separate discount curve the payment discount factors are fixed
+    if discountCurve is None:
+        fixedDfs = np.ones(numFixed)
+        floatDfs = np.ones(numFloat)
+        fixedPayPos = fixedPos
+        floatPayPos = payPos
+    else:
+        dfValue = discountCurve.df(valuationDate)
+        fixedDates = [dt for dt in fixedLeg._paymentDates
+                      if dt > valuationDate]
+        floatDates = [dt for dt in floatLeg._paymentDates
+                      if dt > valuationDate]
+        fixedDfs = np.zeros(0)
+        floatDfs = np.zeros(0)
+        if numFixed > 0:
+            fixedDfs = np.array(discountCurve.df(fixedDates)) / dfValue
+        if numFloat > 0:
+            floatDfs = np.array(discountCurve.df(floatDates)) / dfValue
+        fixedPayPos = zeroFixed
+        floatPayPos = zeroFloat
+
+    dates = [fixedPay, floatStart, floatPay, floatEnd]
+
+    # The forward rate term is dfStart / dfEnd * dfPay and the others are
+    # proportional to dfPay
+    coeffs = [fixedSign * scale * fixedPayments * fixedDfs,
+              floatSign * scale * floatNotional * floatDfs,
+              floatSign * scale * floatNotional *
+              (floatLeg._spread * floatAlphas - 1.0) * floatDfs]
+
+    quoteCoeffs = [fixedSign * scale * fixedLeg._notional * fixedAlphas *
+                   fixedDfs, np.zeros(numFloat), np.zeros(numFloat)]
+
+    indices = [[fixedPayPos, startPos, floatPayPos],
+               [zeroFixed, floatPayPos, zeroFloat],
+               [zeroFixed, endPos, zeroFloat]]
+
+    # The principals are paid on the last payment dates
+    if numFixed > 0 and fixedLeg._principal != 0.0:
+        coeffs.append(fixedSign * scale * fixedLeg._principal *
+                      fixedLeg._notional * fixedDfs[-1:])
+        quoteCoeffs.append(np.zeros(1))
+        indices[0].append(fixedPayPos[-1:])
+        indices[1].append(np.zeros(1, dtype=np.int64))
+        indices[2].append(np.zeros(1, dtype=np.int64))
+
+    if numFloat > 0 and floatLeg._principal != 0.0:
+        coeffs.append(floatSign * scale * floatLeg._principal *
+                      floatNotional * floatDfs[-1:])
+        quoteCoeffs.append(np.zeros(1))
+        indices[0].append(floatPayPos[-1:])
+        indices[1].append(np.zeros(1, dtype=np.int64))
+        indices[2].append(np.zeros(1, dtype=np.int64))
+
+    return _termArrays(valuationDate, dates, coeffs, quoteCoeffs, indices)
+
+###############################################################################
+
+
+def _depositTerms(depo, valuationDate):
+    ''' Write the value of a deposit per unit notional less one as a sum of
+    terms. The quote is the deposit rate. '''
+
+    dc = FinDayCount(depo._dayCountType)
+    accFactor = dc.yearFrac(depo._startDate, depo._maturityDate)[0]
+
+    dates = [_excelDates([depo._maturityDate, depo._startDate])]
+    coeffs = [np.array([1.0 + accFactor * depo._depositRate, -1.0])]
+    quoteCoeffs = [np.array([accFactor, 0.0])]
+    indices = [[np.array([1, 0])], [np.array([0, 0])], [np.array([2, 0])]]
+
+    return _termArrays(valuationDate, dates, coeffs, quoteCoeffs, indices)
+
+###############################################################################
+
+
+def _fraTerms(fra, valuationDate, discountCurve=None):
+    ''' Write the value of a FRA per unit notional as a sum of terms in the
+    index curve. If a discount curve is given then the FRA is discounted on
+    it. The quote is the FRA rate. '''
+
+    dc = FinDayCount(fra._dayCountType)
+    accFactor = dc.yearFrac(fra._startDate, fra._maturityDate)[0]
+
+    sign = 1.0
+    if fra._payFixedRate is True:
+        sign = -1.0
+
+    dates = [_excelDates([fra._startDate, fra._maturityDate])]
+
+    if discountCurve is None:
+        # dfStart - (1 + accFactor * fraRate) * dfMaturity
+        coeffs = [sign * np.array([1.0, -1.0 - accFactor * fra._fraRate])]
+        quoteCoeffs = [sign * np.array([0.0, -accFactor])]
+        indices = [[np.array([1, 2])], [np.array([0, 0])],
+                   [np.array([0, 0])]]
+    else:
+        dfMat = discountCurve.df(fra._maturityDate) / \
+            discountCurve.df(valuationDate)
+        # (dfStart / dfMaturity - 1 - accFactor * fraRate) * dfDiscount
+        coeffs = [sign * dfMat * np.array([1.0, -1.0 - accFactor *
+                                           fra._fraRate])]
+        quoteCoeffs = [sign * dfMat * np.array([0.0, -accFactor])]
+        indices = [[np.array([1, 0])], [np.array([0, 0])],
+                   [np.array([2, 0])]]
+
+    return _termArrays(valuationDate, dates, coeffs, quoteCoeffs, indices)
+
+###############################################################################
+
+
+def _instrumentTerms(instrument, valuationDate, discountCurve=None):
+    ''' Write an instrument as a sum of terms in the curve being built. '''
+
+    if isinstance(instrument, FinIborDeposit):
+        return _depositTerms(instrument, valuationDate)
+    elif isinstance(instrument, FinIborFRA):
+        return _fraTerms(instrument, valuationDate, discountCurve)
+    elif hasattr(instrument, "_fixedLeg") and hasattr(instrument, "_floatLeg"):
+        return _swapTerms(instrument, valuationDate, discountCurve)
+    else:
+        raise FinError("Cannot write instrument " +
+                       type(instrument).__name__ + " as curve terms.")
+
+###############################################################################
+
+
+def _instrumentQuote(instrument):
+    ''' Return the market quote of a calibration instrument. '''
+
+    if isinstance(instrument, FinIborDeposit):
+        return instrument._depositRate
+    elif isinstance(instrument, FinIborFRA):
+        return instrument._fraRate
+    else:
+        return instrument._fixedLeg._coupon
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _termsValue(coeffs, iA, iB, iC, flowDfs):
+    ''' Value the sum of terms set up by _instrumentTerms. '''
+
+    v = 0.0
+    for m in range(0, coeffs.size):
+        v += coeffs[m] * flowDfs[iA[m]] * flowDfs[iB[m]] / flowDfs[iC[m]]
+
+    return v
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _termsGradient(coeffs, iA, iB, iC, flowDfs, logDfSens):
+    ''' Return the derivative of the sum of terms with respect to the log of
+    each grid discount factor given the matrix of the sensitivities of the
+    log of the flow discount factors to the logs of the grid ones. '''
+
+    grad = np.zeros(logDfSens.shape[1])
+    for m in range(0, coeffs.size):
+        term = coeffs[m] * flowDfs[iA[m]] * flowDfs[iB[m]] / flowDfs[iC[m]]
+        grad += term * (logDfSens[iA[m]] + logDfSens[iB[m]] -
+                        logDfSens[iC[m]])
+
+    return grad
+
+###############################################################################
+
+
+def _logDfSensitivities(curve, times, numPoints):
+    ''' Calculate the discount factors at the times using the first numPoints
+    points of the curve grid and the sensitivity of their logs to the log of
+    each of these grid discount factors. These are exact for the schemes that
+    are linear in the log discount factors or zero rates. The bumps are made
+    to a private copy of the grid with its own interpolator so the curve is
+    not changed and may be shared. '''
+
+    bump = 1e-5
+
+    gridCurve = _curveFromTimes(curve, curve._dfs)
+    gridTimes = gridCurve._times[0:numPoints]
+    gridDfs = gridCurve._dfs[0:numPoints]
+    gridCurve._times = gridTimes
+    gridCurve._dfs = gridDfs
+    gridCurve._interpolator.fit(gridTimes, gridDfs)
+
+    dfs = np.empty(len(times))
+    dfsUp = np.empty(len(times))
+    dfsDown = np.empty(len(times))
+    logDfSens = np.zeros((len(times), numPoints))
+
+    gridCurve.dfTimes(times, dfs)
+
+    # The first grid point is always the valuation date
+    for j in range(1, numPoints):
+        df = gridDfs[j]
+        gridDfs[j] = df * np.exp(bump)
+        gridCurve._interpolator.fit(gridTimes, gridDfs)
+        gridCurve.dfTimes(times, dfsUp)
+        gridDfs[j] = df * np.exp(-bump)
+        gridCurve._interpolator.fit(gridTimes, gridDfs)
+        gridCurve.dfTimes(times, dfsDown)
+        gridDfs[j] = df
+        logDfSens[:, j] = np.log(dfsUp / dfsDown) / (2.0 * bump)
+
+    return dfs, logDfSens
+
+###############################################################################
+
+
+def quoteJacobian(curve,
+                  instruments: list,
+                  discountCurve=None):
+    ''' Calculate the matrix of the derivatives of the grid discount factors
+    of a bootstrapped curve with respect to the market quotes of the
+    instruments which were used to build it. Each instrument sets one grid
+    point and the bootstrap solves for it with the curve grid cut off at that
+    point. So we differentiate the instrument values on this cut off curve and
+    use the implicit function theorem, which gives a lower triangular system
+    to solve. Element [i, j] is the derivative of the discount factor at grid
+    point i + 1 with respect to the quote of instrument j. The first grid
+    point is the valuation date which does not move. '''
+
+    numInstruments = len(instruments)
+    numPoints = len(curve._times)
+
+    if numInstruments != numPoints - 1:
+        raise FinError("Number of instruments does not match curve grid.")
+
+    gridDfs = np.array(curve._dfs)
+    valuationDate = curve._valuationDate
+
+    dRdP = np.zeros((numInstruments, numInstruments))
+    dRdq = np.zeros(numInstruments)
+
+    for i in range(0, numInstruments):
+
+        flowTimes, coeffs, quoteCoeffs, iA, iB, iC = \
+            _instrumentTerms(instruments[i], valuationDate, discountCurve)
+
+        flowDfs, logDfSens = _logDfSensitivities(curve, flowTimes, i + 2)
+
+        grad = _termsGradient(coeffs, iA, iB, iC, flowDfs, logDfSens)
+        dRdP[i, 0:i + 1] = grad[1:] / gridDfs[1:i + 2]
+        dRdq[i] = _termsValue(quoteCoeffs, iA, iB, iC, flowDfs)
+
+    # Differentiate R(P(q), q) = 0 so that dR/dP * dP/dq = - dR/dq
+    jacobian = np.linalg.solve(dRdP, -np.diag(dRdq))
+
+    return jacobian
+
+###############################################################################
+
+
+def _tradeGridSensitivities(trade, curve, discountCurve=None):
+    ''' Return the derivative of the value of a trade with respect to each of
+    the grid discount factors of the curve except the first. Instruments that
+    can be written as terms are differentiated exactly. Other trades are
+    revalued with each grid discount factor bumped. '''
+
+    numPoints = len(curve._times)
+    valuationDate = curve._valuationDate
+
+    try:
+        flowTimes, coeffs, _, iA, iB, iC = \
+            _instrumentTerms(trade, valuationDate, discountCurve)
+        isTerms = True
+    except FinError:
+        isTerms = False
+
+    if isTerms is True:
+
+        if isinstance(trade, FinIborDeposit) or isinstance(trade, FinIborFRA):
+            notional = trade._notional
+        else:
+            notional = trade._fixedLeg._notional
+
+        flowDfs, logDfSens = _logDfSensitivities(curve, flowTimes, numPoints)
+        grad = _termsGradient(coeffs, iA, iB, iC, flowDfs, logDfSens)
+        return notional * grad[1:] / np.array(curve._dfs[1:])
+
+    # The bumps are made to a private copy of the curve which may be shared
+    gridCurve = _curveFromTimes(curve, curve._dfs)
+    gridTimes = gridCurve._times
+    gridDfs = gridCurve._dfs
+
+    def tradeValue():
+        if discountCurve is None:
+            return trade.value(valuationDate, gridCurve)
+        else:
+            return trade.value(valuationDate, discountCurve, gridCurve)
+
+    bump = 1e-6
+    sensitivities = np.zeros(numPoints - 1)
+
+    for j in range(1, numPoints):
+        df = gridDfs[j]
+        gridDfs[j] = df * (1.0 + bump)
+        gridCurve._interpolator.fit(gridTimes, gridDfs)
+        vUp = tradeValue()
+        gridDfs[j] = df * (1.0 - bump)
+        gridCurve._interpolator.fit(gridTimes, gridDfs)
+        vDown = tradeValue()
+        gridDfs[j] = df
+        sensitivities[j - 1] = (vUp - vDown) / (2.0 * bump * df)
+
+    return sensitivities
+
+###############################################################################
+
+
+def bucketedDV01(trade,
+                 curve,
+                 bumpSize: float = 0.0001):
+    ''' Calculate the change in value of a trade for a one basis point rise
+    in the quote of each of the instruments used to build a bootstrapped
+    curve such as a FinIborSingleCurve, FinOISCurve or FinIborDualCurve. The
+    trade is valued with its value method using the curve, or for a dual
+    curve using its discount curve and the curve as the index curve. This
+    uses the quote Jacobian of the curve and the sensitivity of the trade to
+    the curve grid so that the curve is only built once. The result is a
+    linear approximation and is returned as an array in the order of the
+    deposits, FRAs and swaps of the curve. '''
+
+    discountCurve = getattr(curve, "_discountCurve", None)
+
+    jacobian = curve.quoteJacobian()
+    gridSensitivities = _tradeGridSensitivities(trade, curve, discountCurve)
+
+    dv01 = np.dot(gridSensitivities, jacobian) * bumpSize
+    return dv01
+
+###############################################################################
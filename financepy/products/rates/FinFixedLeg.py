@@ -2,8 +2,11 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...finutils.FinError import FinError
 from ...finutils.FinDate import FinDate
+from ...finutils.FinDateArray import FinDateArray
 from ...finutils.FinMath import ONE_MILLION
 from ...finutils.FinDayCount import FinDayCount, FinDayCountTypes
 from ...finutils.FinFrequency import FinFrequencyTypes
@@ -13,6 +16,7 @@ from ...finutils.FinSchedule import FinSchedule
 from ...finutils.FinHelperFunctions import labelToString, checkArgumentTypes
 from ...finutils.FinGlobalTypes import FinSwapTypes
 from ...market.curves.FinDiscountCurve import FinDiscountCurve
+from ...market.curves.FinDiscountCurve import _dfSerials
 
 ##########################################################################
 
@@ -21,6 +25,13 @@ class FinFixedLeg(object):
     a sequence of flows calculated according to an ISDA schedule and with a 
     coupon that is fixed over the life of the swap. '''
     
+    # These are generated from the contract terms or by valuations
+    _derivedAttributes = ("_startAccruedDates", "_endAccruedDates",
+                          "_paymentDates", "_payments", "_yearFracs",
+                          "_accruedDays", "_rates", "_paymentDfs",
+                          "_paymentPVs", "_cumulativePVs", "_paymentSerials",
+                          "_paymentAmounts", "_valuationInputs")
+
     def __init__(self,
                  effectiveDate: FinDate,  # Date interest starts to accrue
                  endDate: (FinDate, str),  # Date contract ends
@@ -74,6 +85,7 @@ class FinFixedLeg(object):
         self._yearFracs = []
         self._accruedDays = []
         self._rates = []
+        self._valuationInputs = None
 
         self.generatePayments()
 
@@ -102,6 +114,7 @@ class FinFixedLeg(object):
         self._startAccruedDates = []
         self._endAccruedDates = []
         self._paymentDates = []
+        self._payments = []
         self._yearFracs = []
         self._accruedDays = []
         self._rates = []
@@ -111,7 +124,14 @@ class FinFixedLeg(object):
         dayCounter = FinDayCount(self._dayCountType)
         calendar = FinCalendar(self._calendarType)
 
-        for nextDt in scheduleDates[1:]:
+        # The accrual factors of all of the periods are found in one call
+        excelDates = FinDateArray(scheduleDates)._excelDate
+        yearFracs, accruedDays, _ = dayCounter.yearFracSerials(excelDates[:-1],
+                                                               excelDates[1:])
+        yearFracs = yearFracs.tolist()
+        accruedDays = accruedDays.tolist()
+
+        for iFlow, nextDt in enumerate(scheduleDates[1:]):
 
             self._startAccruedDates.append(prevDt)
             self._endAccruedDates.append(nextDt)
@@ -124,8 +144,8 @@ class FinFixedLeg(object):
 
             self._paymentDates.append(paymentDate)
 
-            (yearFrac, num, den) = dayCounter.yearFrac(prevDt,
-                                                       nextDt)
+            yearFrac = yearFracs[iFlow]
+            num = accruedDays[iFlow]
 
             self._rates.append(self._coupon)
 
@@ -137,54 +157,78 @@ class FinFixedLeg(object):
 
             prevDt = nextDt
 
+        # The flows as arrays so that they can be valued in one call
+        self._paymentSerials = FinDateArray(self._paymentDates)._excelDate
+        self._paymentAmounts = np.array(self._payments)
+
 ###############################################################################
 
     def value(self, 
               valuationDate: FinDate,
               discountCurve: FinDiscountCurve):
+        ''' Value the fixed leg on the valuation date. The discount factors of
+        all of the future payments are found in one call to the curve. The
+        values of the individual flows are only found by printValuation. '''
+
+        self._valuationInputs = (valuationDate, discountCurve)
 
-        self._paymentDfs = []
-        self._paymentPVs = []
-        self._cumulativePVs = []
-                
         notional = self._notional
         dfValue = discountCurve.df(valuationDate)
+        numPayments = len(self._paymentSerials)
+
+        # The payment dates are increasing so the future ones are at the end
+        iStart = np.searchsorted(self._paymentSerials,
+                                 valuationDate._excelDate, side='right')
+
         legPV = 0.0
-        numPayments = len(self._paymentDates)
 
-        dfPmnt = 0.0
+        if iStart < numPayments:
 
-        for iPmnt in range(0, numPayments):
- 
-            pmntDate = self._paymentDates[iPmnt]
-            pmntAmount= self._payments[iPmnt]
+            dfPmnts = _dfSerials(discountCurve, self._paymentSerials[iStart:])
+            dfPmnts = dfPmnts / dfValue
+            pmntPVs = self._paymentAmounts[iStart:] * dfPmnts
+            legPV = np.cumsum(pmntPVs)[-1]
+            legPV += self._principal * dfPmnts[-1] * notional
 
-            if pmntDate > valuationDate:
+        if self._legType == FinSwapTypes.PAY:
+            legPV = legPV * (-1.0)
 
-                dfPmnt = discountCurve.df(pmntDate) / dfValue
-                pmntPV = pmntAmount * dfPmnt
-                legPV += pmntPV
-                
-                self._paymentDfs.append(dfPmnt)            
-                self._paymentPVs.append(pmntAmount*dfPmnt)
-                self._cumulativePVs.append(legPV)
+        return legPV
 
-            else:
+###############################################################################
 
-                self._paymentDfs.append(0.0)            
-                self._paymentPVs.append(0.0)
-                self._cumulativePVs.append(0.0)
+    def _flowValues(self,
+                    valuationDate: FinDate,
+                    discountCurve: FinDiscountCurve):
+        ''' Calculate the discount factors, present values and cumulative
+        present values of all of the flows as they are in value. Past flows
+        have zero values. '''
 
-        if pmntDate > valuationDate:
-            paymentPV = self._principal * dfPmnt * notional
-            self._paymentPVs[-1] += paymentPV
-            legPV += paymentPV
-            self._cumulativePVs[-1] = legPV
+        notional = self._notional
+        dfValue = discountCurve.df(valuationDate)
+        numPayments = len(self._paymentSerials)
 
-        if self._legType == FinSwapTypes.PAY:
-            legPV = legPV * (-1.0)
+        iStart = np.searchsorted(self._paymentSerials,
+                                 valuationDate._excelDate, side='right')
 
-        return legPV
+        self._paymentDfs = np.zeros(numPayments)
+        self._paymentPVs = np.zeros(numPayments)
+        self._cumulativePVs = np.zeros(numPayments)
+
+        if iStart < numPayments:
+
+            dfPmnts = _dfSerials(discountCurve, self._paymentSerials[iStart:])
+            dfPmnts = dfPmnts / dfValue
+            pmntPVs = self._paymentAmounts[iStart:] * dfPmnts
+            cumulativePVs = np.cumsum(pmntPVs)
+
+            paymentPV = self._principal * dfPmnts[-1] * notional
+            pmntPVs[-1] += paymentPV
+            cumulativePVs[-1] += paymentPV
+
+            self._paymentDfs[iStart:] = dfPmnts
+            self._paymentPVs[iStart:] = pmntPVs
+            self._cumulativePVs[iStart:] = cumulativePVs
 
 ##########################################################################
 
@@ -232,10 +276,12 @@ class FinFixedLeg(object):
         print("FREQUENCY:", str(self._freqType))
         print("DAY COUNT:", str(self._dayCountType))
 
-        if len(self._payments) == 0:
+        if self._valuationInputs is None:
             print("Payments not calculated.")
             return
 
+        self._flowValues(*self._valuationInputs)
+
         header = "PAY_DATE     ACCR_START   ACCR_END     DAYS  YEARFRAC"
         header += "    RATE      PAYMENT       DF          PV        CUM PV"
         print(header)
@@ -2,8 +2,11 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...finutils.FinError import FinError
 from ...finutils.FinDate import FinDate
+from ...finutils.FinDateArray import FinDateArray
 from ...finutils.FinMath import ONE_MILLION
 from ...finutils.FinDayCount import FinDayCount, FinDayCountTypes
 from ...finutils.FinFrequency import FinFrequencyTypes
@@ -13,6 +16,7 @@ from ...finutils.FinSchedule import FinSchedule
 from ...finutils.FinHelperFunctions import labelToString, checkArgumentTypes
 from ...finutils.FinGlobalTypes import FinSwapTypes
 from ...market.curves.FinDiscountCurve import FinDiscountCurve
+from ...market.curves.FinDiscountCurve import _dfSerials
 
 ##########################################################################
 
@@ -21,6 +25,14 @@ class FinFloatLeg(object):
     a sequence of flows calculated according to an ISDA schedule and with a 
     coupon determined by an index curve which changes over life of the swap.'''
     
+    # These are generated from the contract terms or by valuations
+    _derivedAttributes = ("_startAccruedDates", "_endAccruedDates",
+                          "_paymentDates", "_payments", "_yearFracs",
+                          "_accruedDays", "_rates", "_paymentDfs",
+                          "_paymentPVs", "_cumulativePVs", "_paymentSerials",
+                          "_startAccruedSerials", "_endAccruedSerials",
+                          "_accrualFactors", "_valuationInputs")
+
     def __init__(self,
                  effectiveDate: FinDate,  # Date interest starts to accrue
                  endDate: (FinDate, str),  # Date contract ends
@@ -72,6 +84,7 @@ class FinFloatLeg(object):
         self._payments = []
         self._yearFracs = []
         self._accruedDays = []
+        self._valuationInputs = None
 
         self.generatePaymentDates()
 
@@ -102,8 +115,15 @@ class FinFloatLeg(object):
         dayCounter = FinDayCount(self._dayCountType)
         calendar = FinCalendar(self._calendarType)
 
+        # The accrual factors of all of the periods are found in one call
+        excelDates = FinDateArray(scheduleDates)._excelDate
+        yearFracs, accruedDays, _ = dayCounter.yearFracSerials(excelDates[:-1],
+                                                               excelDates[1:])
+        yearFracs = yearFracs.tolist()
+        accruedDays = accruedDays.tolist()
+
         # All of the lists end up with the same length
-        for nextDt in scheduleDates[1:]:
+        for iFlow, nextDt in enumerate(scheduleDates[1:]):
 
             self._startAccruedDates.append(prevDt)
             self._endAccruedDates.append(nextDt)
@@ -116,14 +136,20 @@ class FinFloatLeg(object):
 
             self._paymentDates.append(paymentDate)
 
-            (yearFrac, num, _) = dayCounter.yearFrac(prevDt, 
-                                                     nextDt)        
-            
+            yearFrac = yearFracs[iFlow]
+            num = accruedDays[iFlow]
+
             self._yearFracs.append(yearFrac)
             self._accruedDays.append(num)
 
             prevDt = nextDt
 
+        # The periods as arrays so that they can be valued in one call
+        self._paymentSerials = FinDateArray(self._paymentDates)._excelDate
+        self._startAccruedSerials = excelDates[:-1]
+        self._endAccruedSerials = excelDates[1:]
+        self._accrualFactors = np.array(yearFracs)
+
 ###############################################################################
 
     def value(self,
@@ -134,7 +160,8 @@ class FinFloatLeg(object):
         ''' Value the floating leg with payments from an index curve and
         discounting based on a supplied discount curve as of the valuation date
         supplied. For an existing swap, the user must enter the next fixing
-        coupon. '''
+        coupon. The values of the individual flows are only found by
+        printValuation. '''
 
         if discountCurve is None:
             raise FinError("Discount curve is None")
@@ -142,69 +169,103 @@ class FinFloatLeg(object):
         if indexCurve is None:
             indexCurve = discountCurve
 
-        self._rates = []
-        self._payments = []        
-        self._paymentDfs = []
-        self._paymentPVs = []
-        self._cumulativePVs = []
+        self._valuationInputs = (valuationDate, discountCurve, indexCurve,
+                                 firstFixingRate)
 
         notional = self._notional
         dfValue = discountCurve.df(valuationDate)
+        numPayments = len(self._paymentSerials)
+
+        # The payment dates are increasing so the future ones are at the end
+        iStart = np.searchsorted(self._paymentSerials,
+                                 valuationDate._excelDate, side='right')
+
         legPV = 0.0
-        numPayments = len(self._paymentDates)
-        firstPayment = False
 
-        for iPmnt in range(0, numPayments):
+        if iStart < numPayments:
 
-            pmntDate = self._paymentDates[iPmnt]
-            
-            if pmntDate > valuationDate:
+            pmntAmounts = self._pmntAmounts(iStart, indexCurve,
+                                            firstFixingRate)[1]
 
-                startAccruedDt = self._startAccruedDates[iPmnt]
-                endAccruedDt = self._endAccruedDates[iPmnt]
-                alpha = self._yearFracs[iPmnt]
+            dfPmnts = _dfSerials(discountCurve, self._paymentSerials[iStart:])
+            dfPmnts = dfPmnts / dfValue
+            pmntPVs = pmntAmounts * dfPmnts
+            legPV = np.cumsum(pmntPVs)[-1]
+            legPV += self._principal * dfPmnts[-1] * notional
 
-                if firstPayment is False and firstFixingRate is not None:
+        if self._legType == FinSwapTypes.PAY:
+            legPV = legPV * (-1.0)
 
-                    fwdRate = firstFixingRate
-                    firstPayment = True
+        return legPV
 
-                else:
-                    
-                    dfStart = indexCurve.df(startAccruedDt)
-                    dfEnd = indexCurve.df(endAccruedDt)
-                    fwdRate = (dfStart / dfEnd - 1.0) / alpha
+###############################################################################
 
-                pmntAmount = (fwdRate + self._spread) * alpha * notional
+    def _pmntAmounts(self, iStart, indexCurve, firstFixingRate):
+        ''' Return the forward rates and the payment amounts of the flows from
+        index iStart using the index curve and the first fixing rate if set. '''
 
-                dfPmnt = discountCurve.df(pmntDate) / dfValue
-                pmntPV = pmntAmount * dfPmnt
-                legPV += pmntPV
+        alphas = self._accrualFactors[iStart:]
+        startSerials = self._startAccruedSerials[iStart:]
+        endSerials = self._endAccruedSerials[iStart:]
 
-                self._rates.append(fwdRate)
-                self._payments.append(pmntAmount)
-                self._paymentDfs.append(dfPmnt)
-                self._paymentPVs.append(pmntPV)
-                self._cumulativePVs.append(legPV)
+        # The first floating rate may have been set already
+        k = 0
+        fwdRates = np.empty(len(alphas))
 
-            else:
+        if firstFixingRate is not None:
+            fwdRates[0] = firstFixingRate
+            k = 1
 
-                self._rates.append(0.0)
-                self._payments.append(0.0)
-                self._paymentDfs.append(0.0)
-                self._paymentPVs.append(0.0)
-                self._cumulativePVs.append(legPV)
+        dfStarts = _dfSerials(indexCurve, startSerials[k:])
+        dfEnds = _dfSerials(indexCurve, endSerials[k:])
+        fwdRates[k:] = (dfStarts / dfEnds - 1.0) / alphas[k:]
 
-        if pmntDate > valuationDate:
-            paymentPV = self._principal * dfPmnt * notional
-            self._paymentPVs[-1] += paymentPV
-            legPV += paymentPV
-            self._cumulativePVs[-1] = legPV
+        pmntAmounts = (fwdRates + self._spread) * alphas * self._notional
+        return fwdRates, pmntAmounts
 
-        if self._legType == FinSwapTypes.PAY:
-            legPV = legPV * (-1.0)
+###############################################################################
 
-        return legPV
+    def _flowValues(self,
+                    valuationDate: FinDate,
+                    discountCurve: FinDiscountCurve,
+                    indexCurve: FinDiscountCurve,
+                    firstFixingRate: float):
+        ''' Calculate the rates, payments, discount factors, present values
+        and cumulative present values of all of the flows as they are in value.
+        Past flows have zero values. '''
+
+        notional = self._notional
+        dfValue = discountCurve.df(valuationDate)
+        numPayments = len(self._paymentSerials)
+
+        iStart = np.searchsorted(self._paymentSerials,
+                                 valuationDate._excelDate, side='right')
+
+        self._rates = np.zeros(numPayments)
+        self._payments = np.zeros(numPayments)
+        self._paymentDfs = np.zeros(numPayments)
+        self._paymentPVs = np.zeros(numPayments)
+        self._cumulativePVs = np.zeros(numPayments)
+
+        if iStart < numPayments:
+
+            fwdRates, pmntAmounts = self._pmntAmounts(iStart, indexCurve,
+                                                      firstFixingRate)
+
+            dfPmnts = _dfSerials(discountCurve, self._paymentSerials[iStart:])
+            dfPmnts = dfPmnts / dfValue
+            pmntPVs = pmntAmounts * dfPmnts
+            cumulativePVs = np.cumsum(pmntPVs)
+
+            paymentPV = self._principal * dfPmnts[-1] * notional
+            pmntPVs[-1] += paymentPV
+            cumulativePVs[-1] += paymentPV
+
+            self._rates[iStart:] = fwdRates
+            self._payments[iStart:] = pmntAmounts
+            self._paymentDfs[iStart:] = dfPmnts
+            self._paymentPVs[iStart:] = pmntPVs
+            self._cumulativePVs[iStart:] = cumulativePVs
 
 ##########################################################################
 
@@ -249,10 +310,12 @@ class FinFloatLeg(object):
         print("FREQUENCY:", str(self._freqType))
         print("DAY COUNT:", str(self._dayCountType))
 
-        if len(self._payments) == 0:
+        if self._valuationInputs is None:
             print("Payments not calculated.")
             return
 
+        self._flowValues(*self._valuationInputs)
+
         header = "PAY_DATE     ACCR_START   ACCR_END     DAYS  YEARFRAC"
         header += "    IBOR      PAYMENT       DF          PV        CUM PV"
         print(header)
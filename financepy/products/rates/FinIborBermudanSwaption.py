@@ -89,13 +89,11 @@ class FinIborBermudanSwaption(object):
         
 ###############################################################################
 
-    def value(self,
-              valuationDate,
-              discountCurve,
-              model):
-        ''' Value the Bermudan swaption using the specified model and a
-        discount curve. The choices of model are the Hull-White model, the 
-        Black-Karasinski model and the Black-Derman-Toy model. '''
+    def _treeCoupons(self,
+                     valuationDate,
+                     discountCurve):
+        ''' Generate the times of the expiry and of the fixed coupons after it
+        and the fixed coupon flows per unit notional for the tree models. '''
 
         floatSpread = 0.0
 
@@ -151,6 +149,21 @@ class FinIborBermudanSwaption(object):
         # Allow exercise on coupon dates but control this later for europeans
         self._callTimes = cpnTimes
 
+        return texp, tmat, cpnTimes, cpnFlows
+
+###############################################################################
+
+    def value(self,
+              valuationDate,
+              discountCurve,
+              model):
+        ''' Value the Bermudan swaption using the specified model and a
+        discount curve. The choices of model are the Hull-White model, the 
+        Black-Karasinski model and the Black-Derman-Toy model. '''
+
+        texp, tmat, cpnTimes, cpnFlows = self._treeCoupons(valuationDate,
+                                                           discountCurve)
+
         dfTimes = discountCurve._times
         dfValues = discountCurve._dfs
 
@@ -164,7 +177,8 @@ class FinIborBermudanSwaption(object):
 
         if isinstance(model, FinModelRatesBDT) or isinstance(model, FinModelRatesBK) or isinstance(model, FinModelRatesHW):
 
-            model.buildTree(tmat, dfTimes, dfValues)
+            eventTimes = np.append(cpnTimes, texp)
+            model.buildTree(tmat, dfTimes, dfValues, eventTimes)
 
             v = model.bermudanSwaption(texp,
                                        tmat,
@@ -184,6 +198,74 @@ class FinIborBermudanSwaption(object):
 
         return v
 
+###############################################################################
+
+    @staticmethod
+    def valueMany(swaptions,
+                  valuationDate,
+                  discountCurve,
+                  model):
+        ''' Value a list of Bermudan swaptions such as a strike ladder or a
+        book of trades on the same discount curve using the specified model.
+        One tree is built out to the last swap maturity and all of the
+        swaptions are valued together in one backward sweep of it. This is
+        much faster than calling value on each swaption. Co-terminal
+        swaptions have the same values as when they are valued one by one.
+        Returns a numpy array with the value of each swaption. '''
+
+        if isinstance(model, FinModelRatesBDT) is False and \
+           isinstance(model, FinModelRatesBK) is False and \
+           isinstance(model, FinModelRatesHW) is False:
+            raise FinError("Invalid model choice for Bermudan Swaption")
+
+        numTrades = len(swaptions)
+
+        if numTrades == 0:
+            return np.zeros(0)
+
+        texps = np.zeros(numTrades)
+        tmats = np.zeros(numTrades)
+        cpnTimesList = []
+        cpnFlowsList = []
+        exerciseTypes = []
+
+        for j, swaption in enumerate(swaptions):
+
+            texp, tmat, cpnTimes, cpnFlows \
+                = swaption._treeCoupons(valuationDate, discountCurve)
+
+            texps[j] = texp
+            tmats[j] = tmat
+            cpnTimesList.append(cpnTimes)
+            cpnFlowsList.append(cpnFlows)
+            exerciseTypes.append(swaption._exerciseType)
+
+        dfTimes = discountCurve._times
+        dfValues = discountCurve._dfs
+
+        faceAmount = 1.0
+        strikePrices = np.ones(numTrades)  # Floating legs price at par
+
+        # The tree needs to extend out to the last swap maturity
+        model.buildTree(np.max(tmats), dfTimes, dfValues)
+
+        v = model.bermudanSwaptionMany(texps,
+                                       strikePrices,
+                                       faceAmount,
+                                       cpnTimesList,
+                                       cpnFlowsList,
+                                       exerciseTypes)
+
+        values = np.zeros(numTrades)
+
+        for j, swaption in enumerate(swaptions):
+            if swaption._fixedLegType == FinSwapTypes.RECEIVE:
+                values[j] = swaption._notional * v['rec'][j]
+            elif swaption._fixedLegType == FinSwapTypes.PAY:
+                values[j] = swaption._notional * v['pay'][j]
+
+        return values
+
 ###############################################################################
 
     def printSwaptionValue(self):
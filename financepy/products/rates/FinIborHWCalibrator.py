@@ -0,0 +1,274 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from scipy import optimize
+
+from ...finutils.FinError import FinError
+from ...finutils.FinDate import FinDate
+from ...finutils.FinGlobalVariables import gDaysInYear
+from ...finutils.FinGlobalTypes import FinSwapTypes
+from ...finutils.FinHelperFunctions import labelToString
+from ...market.curves.FinInterpolator import FinInterpTypes, _uinterpolate
+from ...products.rates.FinIborSwap import FinIborSwap
+from ...models.FinModelRatesHW import FinModelRatesHW
+from ...models.FinModelRatesHW import europeanSwaptionsJamshidian_Fast
+
+interp = FinInterpTypes.FLAT_FWD_RATES.value
+
+###############################################################################
+# Calibrating the Hull-White model to a grid of European swaptions with the
+# value method of each swaption in a generic optimiser is slow as each value
+# builds the underlying swap and solves for the critical short rate. Here the
+# coupons of all of the swaptions are put into arrays once and the whole grid
+# is valued in one call to a Numba function along with the derivatives of the
+# values with respect to the model parameters. These are used as the exact
+# Jacobian in a least squares fit. The volatility can be piecewise constant
+# between a set of dates, for example the swaption expiry dates.
+###############################################################################
+
+
+class FinIborHWCalibrator():
+    ''' Class to calibrate the mean reversion and the volatility of the
+    Hull-White model to the market values of a set of European swaptions. The
+    volatility is constant or piecewise constant with changes on the dates in
+    sigmaDates. '''
+
+    def __init__(self,
+                 valuationDate: FinDate,
+                 discountCurve,
+                 swaptions: list,
+                 marketValues: (list, np.ndarray),
+                 sigmaDates: list = None):
+        ''' Create the calibrator from a list of FinIborSwaptions and their
+        market values, which have the same units as the swaption value
+        method, on a discount curve. '''
+
+        numSwaptions = len(swaptions)
+
+        if numSwaptions == 0:
+            raise FinError("No swaptions to calibrate to.")
+
+        if len(marketValues) != numSwaptions:
+            raise FinError("Number of market values and swaptions differ.")
+
+        if sigmaDates is None:
+            sigmaDates = []
+
+        sigmaTimes = [(dt - valuationDate) / gDaysInYear for dt in sigmaDates]
+        sigmaTimes = np.array(sigmaTimes, dtype=np.float64)
+
+        if np.any(sigmaTimes <= 0.0):
+            raise FinError("Sigma dates must be after the valuation date.")
+
+        if np.any(np.diff(sigmaTimes) <= 0.0):
+            raise FinError("Sigma dates must be increasing.")
+
+        self._valuationDate = valuationDate
+        self._discountCurve = discountCurve
+        self._swaptions = swaptions
+        self._marketValues = np.array(marketValues, dtype=np.float64)
+        self._sigmaDates = sigmaDates
+        self._sigmaTimes = sigmaTimes
+
+        dfTimes = discountCurve._times
+        dfValues = discountCurve._dfs
+
+        couponsList = []
+
+        for swaption in swaptions:
+
+            # The same swap as the one built in the swaption value method
+            swap = FinIborSwap(swaption._exerciseDate,
+                               swaption._maturityDate,
+                               swaption._fixedLegType,
+                               swaption._fixedCoupon,
+                               swaption._fixedFrequencyType,
+                               swaption._fixedDayCountType,
+                               swaption._notional,
+                               0.0,
+                               swaption._floatFrequencyType,
+                               swaption._floatDayCountType,
+                               swaption._calendarType,
+                               swaption._busDayAdjustType,
+                               swaption._dateGenRuleType)
+
+            texp, cpnTimes, cpnFlows = swaption._treeCoupons(valuationDate,
+                                                             swap)
+
+            if texp <= 0.0:
+                raise FinError("Swaption expiry must be after value date.")
+
+            # The first time is the expiry date which has no coupon
+            couponsList.append((texp, cpnTimes[1:], cpnFlows[1:]))
+
+        maxCpns = max([len(c[1]) for c in couponsList])
+
+        self._texps = np.zeros(numSwaptions)
+        self._ptexps = np.zeros(numSwaptions)
+        self._cpnTimes = np.zeros(shape=(numSwaptions, maxCpns))
+        self._cpnFlows = np.zeros(shape=(numSwaptions, maxCpns))
+        self._ptcpns = np.zeros(shape=(numSwaptions, maxCpns))
+        self._numCpns = np.zeros(numSwaptions, dtype=np.int64)
+        self._isPayer = np.zeros(numSwaptions, dtype=np.bool_)
+        self._scales = np.zeros(numSwaptions)
+
+        for j, swaption in enumerate(swaptions):
+
+            texp, cpnTimes, cpnFlows = couponsList[j]
+            n = len(cpnTimes)
+
+            if n == 0:
+                raise FinError("Swaption has no coupons after expiry.")
+
+            self._texps[j] = texp
+            self._ptexps[j] = _uinterpolate(texp, dfTimes, dfValues, interp)
+            self._cpnTimes[j, 0:n] = cpnTimes
+            self._cpnFlows[j, 0:n] = cpnFlows
+            self._numCpns[j] = n
+
+            for i in range(0, n):
+                self._ptcpns[j, i] = _uinterpolate(cpnTimes[i], dfTimes,
+                                                   dfValues, interp)
+
+            self._isPayer[j] = swaption._fixedLegType == FinSwapTypes.PAY
+
+            # This is how the swaption value method scales a unit bond option
+            dfSettlement = discountCurve.df(swaption._settlementDate)
+            self._scales[j] = swaption._notional / dfSettlement
+
+        self._a = None
+        self._sigmas = None
+
+###############################################################################
+
+    def valuesAndGradients(self, a: float, sigmas: (list, np.ndarray)):
+        ''' Return the values of all of the swaptions in the Hull-White model
+        with mean reversion a and volatilities sigmas, one for each period
+        between the sigma dates. Also returns the matrix of the derivatives of
+        the values with respect to the sigmas and the vector of derivatives
+        with respect to a. '''
+
+        sigmas = np.array(sigmas, dtype=np.float64).reshape(-1)
+
+        if len(sigmas) != len(self._sigmaTimes) + 1:
+            raise FinError("There must be one more sigma than sigma dates.")
+
+        if np.any(sigmas < 0.0):
+            raise FinError("Negative volatility not allowed.")
+
+        if a < 0.0:
+            raise FinError("Mean reversion speed parameter should be >= 0.")
+
+        payValues, recValues, dValuedSigma, dValueda \
+            = europeanSwaptionsJamshidian_Fast(a, self._sigmaTimes, sigmas,
+                                               self._texps, self._ptexps,
+                                               self._cpnTimes,
+                                               self._cpnFlows,
+                                               self._ptcpns, self._numCpns)
+
+        values = np.where(self._isPayer, payValues, recValues)
+        values = values * self._scales
+        dValuedSigma = dValuedSigma * self._scales[:, np.newaxis]
+        dValueda = dValueda * self._scales
+
+        return values, dValuedSigma, dValueda
+
+###############################################################################
+
+    def values(self, a: float, sigmas: (list, np.ndarray)):
+        ''' Return the values of all of the swaptions in the Hull-White model
+        with mean reversion a and volatilities sigmas. '''
+
+        values, _, _ = self.valuesAndGradients(a, sigmas)
+        return values
+
+###############################################################################
+
+    def calibrate(self,
+                  a: float = None,
+                  sigmaGuess: float = 0.01,
+                  aGuess: float = 0.05,
+                  tol: float = 1e-12):
+        ''' Find the volatilities, and the mean reversion unless it is given,
+        that minimise the sum of the squared differences between the model
+        and market values per unit notional. The fit uses the exact Jacobian
+        of the values. Returns the mean reversion and the array of sigmas. '''
+
+        numSigmas = len(self._sigmaTimes) + 1
+        fitMeanReversion = a is None
+
+        notionals = np.array([s._notional for s in self._swaptions])
+
+        def unpack(params):
+            sigmas = params[0:numSigmas]
+            if fitMeanReversion is True:
+                return params[numSigmas], sigmas
+            return a, sigmas
+
+        def residuals(params):
+            pa, sigmas = unpack(params)
+            values = self.values(pa, sigmas)
+            return (values - self._marketValues) / notionals
+
+        def jacobian(params):
+            pa, sigmas = unpack(params)
+            _, dValuedSigma, dValueda = self.valuesAndGradients(pa, sigmas)
+            if fitMeanReversion is True:
+                jac = np.column_stack((dValuedSigma, dValueda))
+            else:
+                jac = dValuedSigma
+            return jac / notionals[:, np.newaxis]
+
+        x0 = [sigmaGuess] * numSigmas
+        lower = [1e-8] * numSigmas
+        upper = [np.inf] * numSigmas
+
+        if fitMeanReversion is True:
+            x0.append(aGuess)
+            lower.append(0.0)
+            upper.append(np.inf)
+
+        result = optimize.least_squares(residuals, np.array(x0),
+                                        jac=jacobian,
+                                        bounds=(lower, upper),
+                                        x_scale='jac',
+                                        xtol=tol, ftol=tol, gtol=tol)
+
+        self._a, self._sigmas = unpack(result.x)
+        self._sigmas = np.array(self._sigmas)
+
+        return self._a, self._sigmas
+
+###############################################################################
+
+    def model(self, numTimeSteps: int = 100):
+        ''' Return a FinModelRatesHW with the calibrated parameters. This is
+        only possible when the volatility is constant. '''
+
+        if self._sigmas is None:
+            raise FinError("Calibrator has not been calibrated.")
+
+        if len(self._sigmas) > 1:
+            raise FinError("FinModelRatesHW needs a constant volatility.")
+
+        return FinModelRatesHW(self._sigmas[0], self._a, numTimeSteps)
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("VALUATION DATE", self._valuationDate)
+        s += labelToString("NUM SWAPTIONS", len(self._swaptions))
+        s += labelToString("SIGMA DATES", self._sigmaDates)
+        s += labelToString("MEAN REVERSION", self._a)
+        s += labelToString("SIGMAS", self._sigmas)
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
@@ -28,8 +28,15 @@ from ...finutils.FinDate import FinDate
 from ...models.FinModelRatesLMM import LMMSimulateFwds1F
 from ...models.FinModelRatesLMM import LMMSimulateFwdsMF
 from ...models.FinModelRatesLMM import LMMSimulateFwdsNF
+from ...models.FinModelRatesLMM import LMMSimulateFwds1F_Parallel
+from ...models.FinModelRatesLMM import LMMSimulateFwdsMF_Parallel
+from ...models.FinModelRatesLMM import LMMSimulateFwdsNF_Parallel
 from ...models.FinModelRatesLMM import FinRateModelLMMModelTypes
+from ...models.FinModelRatesLMMStreaming import LMMStreamFwds1F
+from ...models.FinModelRatesLMMStreaming import LMMStreamFwdsMF
+from ...models.FinModelRatesLMMStreaming import LMMStreamFwdsNF
 from ...models.FinModelRatesLMM import LMMCapFlrPricer
+from ...models.FinModelRatesLMM import LMMCapFlrPricer_Parallel
 
 from ...finutils.FinGlobalVariables import gDaysInYear
 from ...finutils.FinMath import ONE_MILLION
@@ -94,6 +101,7 @@ class FinIborLMMProducts():
         self._accrualFactors = np.array(self._accrualFactors)
         self._numForwards = len(self._accrualFactors)
         self._fwds = None
+        self._useParallel = False
 
 #        print("Num FORWARDS", self._numForwards)
 
@@ -105,9 +113,17 @@ class FinIborLMMProducts():
                    numPaths: int = 1000,
                    numeraireIndex: int = 0,
                    useSobol: bool = True,
-                   seed: int = 42):
+                   seed: int = 42,
+                   useParallel: bool = False,
+                   accumulators: list = None,
+                   chunkSize: int = 10000):
         ''' Run the one-factor simulation of the evolution of the forward
-        Ibors to generate and store all of the Ibor forward rate paths. '''
+        Ibors to generate and store all of the Ibor forward rate paths. If
+        useParallel is True the paths are simulated on all of the threads set
+        by numba.set_num_threads and the results do not depend on the number
+        of threads. If a list of FinLMMPayoffAccumulators is given the paths
+        of the parallel simulation are instead generated chunkSize at a time
+        and only the payoff sums of the accumulators are kept. '''
 
         if numPaths < 2 or numPaths > 1000000:
             raise FinError("NumPaths must be between 2 and 1 million")
@@ -139,14 +155,28 @@ class FinIborLMMProducts():
             dt = self._gridDates[ix]
             gammas[ix] = volCurve.capletVol(dt)
 
-        self._fwds = LMMSimulateFwds1F(self._numForwards,
-                                       numPaths,
-                                       numeraireIndex,
-                                       self._forwardCurve,
-                                       gammas,
-                                       self._accrualFactors,
-                                       useSobol,
-                                       seed)
+        self._useParallel = useParallel
+
+        if accumulators is not None:
+            self._fwds = None
+            LMMStreamFwds1F(accumulators, self._numForwards, numPaths,
+                            self._forwardCurve, gammas, self._accrualFactors,
+                            useSobol, seed, chunkSize)
+            return
+
+        if useParallel:
+            simulateFwds = LMMSimulateFwds1F_Parallel
+        else:
+            simulateFwds = LMMSimulateFwds1F
+
+        self._fwds = simulateFwds(self._numForwards,
+                                  numPaths,
+                                  numeraireIndex,
+                                  self._forwardCurve,
+                                  gammas,
+                                  self._accrualFactors,
+                                  useSobol,
+                                  seed)
 
 ###############################################################################
 
@@ -157,12 +187,17 @@ class FinIborLMMProducts():
                    numPaths: int = 10000,
                    numeraireIndex: int = 0,
                    useSobol: bool = True,
-                   seed: int = 42):
+                   seed: int = 42,
+                   useParallel: bool = False,
+                   accumulators: list = None,
+                   chunkSize: int = 10000):
         ''' Run the simulation to generate and store all of the Ibor forward
         rate paths. This is a multi-factorial version so the user must input
         a numpy array consisting of a column for each factor and the number of
         rows must equal the number of grid times on the underlying simulation
-        grid. CHECK THIS. '''
+        grid. CHECK THIS. The paths are simulated on all threads if
+        useParallel is True. If a list of FinLMMPayoffAccumulators is given
+        the paths are streamed to them chunkSize at a time. '''
 
 #        checkArgumentTypes(self.__init__, locals())
 
@@ -198,15 +233,29 @@ class FinIborLMMProducts():
 
         self._forwardCurve = np.array(self._forwardCurve)
 
-        self._fwds = LMMSimulateFwdsMF(self._numForwards,
-                                       numFactors,
-                                       numPaths,
-                                       numeraireIndex,
-                                       self._forwardCurve,
-                                       lambdas,
-                                       self._accrualFactors,
-                                       useSobol,
-                                       seed)
+        self._useParallel = useParallel
+
+        if accumulators is not None:
+            self._fwds = None
+            LMMStreamFwdsMF(accumulators, self._numForwards, numFactors,
+                            numPaths, self._forwardCurve, lambdas,
+                            self._accrualFactors, useSobol, seed, chunkSize)
+            return
+
+        if useParallel:
+            simulateFwds = LMMSimulateFwdsMF_Parallel
+        else:
+            simulateFwds = LMMSimulateFwdsMF
+
+        self._fwds = simulateFwds(self._numForwards,
+                                  numFactors,
+                                  numPaths,
+                                  numeraireIndex,
+                                  self._forwardCurve,
+                                  lambdas,
+                                  self._accrualFactors,
+                                  useSobol,
+                                  seed)
 
 ###############################################################################
 
@@ -218,10 +267,15 @@ class FinIborLMMProducts():
                    numPaths: int = 1000,
                    numeraireIndex: int = 0,
                    useSobol: bool = True,
-                   seed: int = 42):
+                   seed: int = 42,
+                   useParallel: bool = False,
+                   accumulators: list = None,
+                   chunkSize: int = 10000):
         ''' Run the simulation to generate and store all of the Ibor forward
         rate paths using a full factor reduction of the fwd-fwd correlation
-        matrix using Cholesky decomposition.'''
+        matrix using Cholesky decomposition. The paths are simulated on all
+        threads if useParallel is True. If a list of FinLMMPayoffAccumulators
+        is given the paths are streamed to them chunkSize at a time.'''
 
         checkArgumentTypes(self.__init__, locals())
 
@@ -261,14 +315,28 @@ class FinIborLMMProducts():
             dt = self._gridDates[ix]
             zetas[ix] = volCurve.capletVol(dt)
 
+        self._useParallel = useParallel
+
+        if accumulators is not None:
+            self._fwds = None
+            LMMStreamFwdsNF(accumulators, self._numForwards, numPaths,
+                            self._forwardCurve, zetas, correlationMatrix,
+                            self._accrualFactors, seed, chunkSize)
+            return
+
+        if useParallel:
+            simulateFwds = LMMSimulateFwdsNF_Parallel
+        else:
+            simulateFwds = LMMSimulateFwdsNF
+
         # This function does not use Sobol - TODO
-        self._fwds = LMMSimulateFwdsNF(self._numForwards,
-                                       numPaths,
-                                       self._forwardCurve,
-                                       zetas,
-                                       correlationMatrix,
-                                       self._accrualFactors,
-                                       seed)
+        self._fwds = simulateFwds(self._numForwards,
+                                  numPaths,
+                                  self._forwardCurve,
+                                  zetas,
+                                  correlationMatrix,
+                                  self._accrualFactors,
+                                  seed)
 
 ###############################################################################
 
@@ -386,6 +454,9 @@ class FinIborLMMProducts():
             if foundDt is False:
                 raise FinError("CapFloor date not on grid.")
 
+        if self._fwds is None:
+            raise FinError("No forwards stored. Simulate without accumulators.")
+
         numFowards = len(capFloorDates)
         numPaths = self._numPaths
         K = capFloorRate
@@ -397,7 +468,12 @@ class FinIborLMMProducts():
         fwds = self._fwds
         taus = self._accrualFactors
 
-        v = LMMCapFlrPricer(numFowards, numPaths, K, fwd0, fwds, taus, isCap)
+        if self._useParallel:
+            v = LMMCapFlrPricer_Parallel(numFowards, numPaths, K, fwd0, fwds,
+                                         taus, isCap)
+        else:
+            v = LMMCapFlrPricer(numFowards, numPaths, K, fwd0, fwds, taus,
+                                isCap)
 
         # Sum the cap/floorlets to get cap/floor value
         v_capFloor = 0.0
@@ -3,6 +3,7 @@
 ##############################################################################
 
 import numpy as np
+from numba import njit
 from scipy import optimize
 
 from scipy.interpolate import CubicSpline
@@ -16,10 +17,13 @@ from ...finutils.FinHelperFunctions import labelToString
 from ...finutils.FinHelperFunctions import checkArgumentTypes, _funcName
 from ...finutils.FinGlobalVariables import gDaysInYear
 from ...market.curves.FinInterpolator import FinInterpTypes, FinInterpolator
+from ...market.curves.FinInterpolator import _uinterpolate
 from ...market.curves.FinDiscountCurve import FinDiscountCurve
 from ...products.rates.FinIborDeposit import FinIborDeposit
 from ...products.rates.FinIborFRA import FinIborFRA
 from ...products.rates.FinIborSwap import FinIborSwap
+from ...products.rates.FinCurveRisk import _swapTerms, _termsValue
+from ...products.rates.FinCurveRisk import quoteJacobian
 
 swaptol = 1e-10
 
@@ -64,6 +68,79 @@ def _g(df, *args):
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def _solveLastDf(dfGuess, gridTimes, gridDfs, method, flowTimes, flowDfs,
+                 depIndices, coeffs, iA, iB, iC, tol, maxIter):
+    ''' Newton solver for the discount factor at the last grid point which
+    sets the sum of terms from _swapTerms to zero. Only the discount factors
+    at the flow times given by depIndices depend on the last grid point and
+    the others are already in flowDfs. For the local interpolation schemes
+    the log of each of these is linear in the log of the last grid discount
+    factor and so we calculate its slope once and use it to get the exact
+    derivative. Returns the discount factor and the number of iterations,
+    which is -1 if the solver did not converge. '''
+
+    last = gridDfs.size - 1
+    slopes = np.zeros(flowTimes.size)
+
+    bump = 1e-4
+    gridDfs[last] = dfGuess
+    for j in depIndices:
+        slopes[j] = -np.log(_uinterpolate(flowTimes[j], gridTimes, gridDfs,
+                                          method))
+
+    gridDfs[last] = dfGuess * np.exp(bump)
+    for j in depIndices:
+        slopes[j] += np.log(_uinterpolate(flowTimes[j], gridTimes, gridDfs,
+                                          method))
+        slopes[j] /= bump
+
+    x = dfGuess
+
+    for numIter in range(1, maxIter + 1):
+
+        gridDfs[last] = x
+        for j in depIndices:
+            flowDfs[j] = _uinterpolate(flowTimes[j], gridTimes, gridDfs,
+                                       method)
+
+        v = 0.0
+        dvdlogx = 0.0
+        for m in range(0, coeffs.size):
+            term = coeffs[m] * flowDfs[iA[m]] * flowDfs[iB[m]] / flowDfs[iC[m]]
+            v += term
+            dvdlogx += term * (slopes[iA[m]] + slopes[iB[m]] - slopes[iC[m]])
+
+        if dvdlogx == 0.0:
+            return x, -1
+
+        step = v * x / dvdlogx
+        x = x - step
+
+        if abs(step) < tol:
+            gridDfs[last] = x
+            return x, numIter
+
+    return x, -1
+
+###############################################################################
+
+
+def _h(df, *args):
+    ''' Root search objective function for swaps which are valued using the
+    terms from _swapTerms. This is used for the non-local interpolations. '''
+
+    curve, flowTimes, flowDfs, coeffs, iA, iB, iC = args
+    curve._dfs[-1] = df
+
+    # For curves that need a fit function, we fit it now
+    curve._interpolator.fit(curve._times, curve._dfs)
+    curve.dfTimes(flowTimes, flowDfs)
+    return _termsValue(coeffs, iA, iB, iC, flowDfs)
+
+###############################################################################
+
+
 def _costFunction(dfs, *args):
     ''' Root search objective function for swaps '''
 
@@ -174,7 +251,7 @@ class FinIborSingleCurve(FinDiscountCurve):
     def _buildCurve(self):
         ''' Build curve based on interpolation. '''
 
-        self._buildCurveUsing1DSolver()
+        self._buildCurveIncremental()
 
 ###############################################################################
 
@@ -417,6 +494,122 @@ class FinIborSingleCurve(FinDiscountCurve):
         if self._checkRefit is True:
             self._checkRefits(1e-10, swaptol, 1e-5)
 
+###############################################################################
+
+    def _addGridPoint(self,
+                      tmat: float,
+                      dfMat: float):
+        ''' Add a point to the preallocated grid by extending the views of the
+        grid times and discount factors. '''
+
+        numPoints = len(self._times) + 1
+        self._gridTimes[numPoints - 1] = tmat
+        self._gridDfs[numPoints - 1] = dfMat
+        self._times = self._gridTimes[0:numPoints]
+        self._dfs = self._gridDfs[0:numPoints]
+
+###############################################################################
+
+    def _buildCurveIncremental(self):
+        ''' Construct the discount curve using the same bootstrap as the 1D
+        solver but without rebuilding the curve for each instrument. The grid
+        arrays are preallocated and each swap is reduced once to arrays of
+        flow times and coefficients. When solving for a swap we only update
+        the flows after the previous grid point as the others are unaffected
+        by the new point for the local interpolation schemes. These use a
+        compiled Newton solver with an exact derivative. The other schemes
+        refit the interpolator and use the secant method as before. '''
+
+        self._interpolator = FinInterpolator(self._interpType)
+
+        numPoints = 1 + len(self._usedDeposits) + len(self._usedFRAs) + \
+            len(self._usedSwaps)
+
+        self._gridTimes = np.zeros(numPoints)
+        self._gridDfs = np.zeros(numPoints)
+        self._times = self._gridTimes[0:0]
+        self._dfs = self._gridDfs[0:0]
+
+        # time zero is now.
+        tmat = 0.0
+        dfMat = 1.0
+        self._addGridPoint(tmat, dfMat)
+        self._interpolator.fit(self._times, self._dfs)
+
+        for depo in self._usedDeposits:
+            dfSettle = self.df(depo._startDate)
+            dfMat = depo._maturityDf() * dfSettle
+            tmat = (depo._maturityDate - self._valuationDate) / gDaysInYear
+            self._addGridPoint(tmat, dfMat)
+            self._interpolator.fit(self._times, self._dfs)
+
+        oldtmat = tmat
+
+        for fra in self._usedFRAs:
+
+            tset = (fra._startDate - self._valuationDate) / gDaysInYear
+            tmat = (fra._maturityDate - self._valuationDate) / gDaysInYear
+
+            # if both dates are after the previous FRA/FUT then need to
+            # solve for 2 discount factors simultaneously using root search
+
+            if tset < oldtmat and tmat > oldtmat:
+                dfMat = fra.maturityDf(self)
+                self._addGridPoint(tmat, dfMat)
+            else:
+                self._addGridPoint(tmat, dfMat)
+                argtuple = (self, self._valuationDate, fra)
+                dfMat = optimize.newton(_g, x0=dfMat, fprime=None,
+                                        args=argtuple, tol=swaptol,
+                                        maxiter=50, fprime2=None)
+
+        isLocal = self._interpType == FinInterpTypes.FLAT_FWD_RATES or \
+            self._interpType == FinInterpTypes.LINEAR_ZERO_RATES or \
+            self._interpType == FinInterpTypes.LINEAR_FWD_RATES
+
+        for swap in self._usedSwaps:
+            # I use the lastPaymentDate in case a date has been adjusted fwd
+            # over a holiday as the maturity date is usually not adjusted CHECK
+            maturityDate = swap._fixedLeg._paymentDates[-1]
+            tmat = (maturityDate - self._valuationDate) / gDaysInYear
+
+            flowTimes, coeffs, _, iA, iB, iC = \
+                _swapTerms(swap, self._valuationDate)
+            flowDfs = np.empty(len(flowTimes))
+
+            if isLocal is True:
+
+                # The flows up to the last grid point are already known. The
+                # new grid point is added first as the curve may only have
+                # the valuation date on it.
+                tprev = self._times[-1]
+                self._addGridPoint(tmat, dfMat)
+                self.dfTimes(flowTimes, flowDfs)
+                depIndices = np.nonzero(flowTimes > tprev)[0]
+
+                dfMat, numIter = _solveLastDf(dfMat, self._times, self._dfs,
+                                              self._interpType.value,
+                                              flowTimes, flowDfs, depIndices,
+                                              coeffs, iA, iB, iC, swaptol, 50)
+
+                if numIter < 0:
+                    raise FinError("Swap bootstrap failed to converge.")
+
+            else:
+
+                self._addGridPoint(tmat, dfMat)
+
+                argtuple = (self, flowTimes, flowDfs, coeffs, iA, iB, iC)
+                dfMat = optimize.newton(_h, x0=dfMat, fprime=None,
+                                        args=argtuple, tol=swaptol,
+                                        maxiter=50, fprime2=None)
+                self._dfs[-1] = dfMat
+
+            self._interpolator.fit(self._times, self._dfs)
+
+        if self._checkRefit is True:
+            self._checkRefits(1e-10, swaptol, 1e-5)
+
 ###############################################################################
 
     def _buildCurveUsingQuadraticMinimiser(self):
@@ -600,6 +793,20 @@ class FinIborSingleCurve(FinDiscountCurve):
         if self._checkRefit is True:
             self._checkRefits(1e-10, swaptol, 1e-5)
 
+###############################################################################
+
+    def quoteJacobian(self):
+        ''' Return the matrix of the derivatives of the curve discount
+        factors at the grid times after the valuation date with respect to
+        the quotes of the deposits, FRAs and swaps used to build the curve.
+        Row i is for grid time i + 1 and the columns are in the order of
+        the deposits, FRAs and swaps. '''
+
+        instruments = list(self._usedDeposits) + list(self._usedFRAs) + \
+            list(self._usedSwaps)
+
+        return quoteJacobian(self, instruments)
+
 ###############################################################################
 
     def _checkRefits(self, depoTol, fraTol, swapTol):
@@ -133,7 +133,6 @@ class FinIborSwaption():
         # date that makes the forward swap worth par including principal
         s = swap.swapRate(valuationDate, discountCurve)
 
-        texp = (self._exerciseDate - self._settlementDate) / gDaysInYear
         tmat = (self._maturityDate - self._settlementDate) / gDaysInYear
 
         # Discounting is done via the PV01 annuity so no discounting in Black
@@ -143,26 +142,7 @@ class FinIborSwaption():
         # For the tree models we need to generate a vector of the coupons
         #######################################################################
 
-        cpnTimes = [texp]
-        cpnFlows = [0.0]
-
-        # The first flow is on the day after the expiry date
-        numFlows = len(swap._fixedLeg._paymentDates)
-
-        for iFlow in range(0, numFlows):
-            
-            flowDate = swap._fixedLeg._paymentDates[iFlow]
-
-            # Only flows occurring after option expiry are counted. 
-            # Flows on the expiry date are not included
-            if flowDate > self._exerciseDate:
-                cpnTime = (flowDate - valuationDate) / gDaysInYear
-                cpnFlow = swap._fixedLeg._payments[iFlow] / self._notional
-                cpnTimes.append(cpnTime)
-                cpnFlows.append(cpnFlow)
-
-        cpnTimes = np.array(cpnTimes)
-        cpnFlows = np.array(cpnFlows)
+        texp, cpnTimes, cpnFlows = self._treeCoupons(valuationDate, swap)
 
         dfTimes = discountCurve._times
         dfValues = discountCurve._dfs
@@ -234,7 +214,7 @@ class FinIborSwaption():
 
         elif isinstance(model, FinModelRatesBK):
 
-            model.buildTree(tmat, dfTimes, dfValues)
+            model.buildTree(tmat, dfTimes, dfValues, cpnTimes)
             swaptionPx = model.bermudanSwaption(texp,
                                                 tmat,
                                                 strikePrice,
@@ -252,7 +232,7 @@ class FinIborSwaption():
 
         elif isinstance(model, FinModelRatesBDT):
 
-            model.buildTree(tmat, dfTimes, dfValues)
+            model.buildTree(tmat, dfTimes, dfValues, cpnTimes)
             swaptionPx = model.bermudanSwaption(texp,
                                                 tmat,
                                                 strikePrice,
@@ -282,6 +262,39 @@ class FinIborSwaption():
         swaptionPrice = swaptionPrice * pv01 * self._notional / dfSettlement
         return swaptionPrice
 
+###############################################################################
+
+    def _treeCoupons(self, valuationDate, swap):
+        ''' The times and the amounts per unit notional of the fixed coupons
+        of the underlying swap that are paid after the exercise date. The
+        first time is the exercise date which has no coupon. This is the bond
+        whose option is valued by the short rate models. '''
+
+        texp = (self._exerciseDate - self._settlementDate) / gDaysInYear
+
+        cpnTimes = [texp]
+        cpnFlows = [0.0]
+
+        # The first flow is on the day after the expiry date
+        numFlows = len(swap._fixedLeg._paymentDates)
+
+        for iFlow in range(0, numFlows):
+            
+            flowDate = swap._fixedLeg._paymentDates[iFlow]
+
+            # Only flows occurring after option expiry are counted. 
+            # Flows on the expiry date are not included
+            if flowDate > self._exerciseDate:
+                cpnTime = (flowDate - valuationDate) / gDaysInYear
+                cpnFlow = swap._fixedLeg._payments[iFlow] / self._notional
+                cpnTimes.append(cpnTime)
+                cpnFlows.append(cpnFlow)
+
+        cpnTimes = np.array(cpnTimes)
+        cpnFlows = np.array(cpnFlows)
+
+        return texp, cpnTimes, cpnFlows
+
 ###############################################################################
 
     def cashSettledValue(self,
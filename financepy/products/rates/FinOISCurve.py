@@ -16,6 +16,7 @@ from ...market.curves.FinDiscountCurve import FinDiscountCurve
 
 from ...products.rates.FinIborDeposit import FinIborDeposit
 from ...products.rates.FinOIS import FinOIS
+from ...products.rates.FinCurveRisk import quoteJacobian
 
 swaptol = 1e-10
 
@@ -512,6 +513,20 @@ class FinOISCurve(FinDiscountCurve):
         if self._checkRefit is True:
             self._checkRefits(1e-10, swaptol, 1e-5)
 
+###############################################################################
+
+    def quoteJacobian(self):
+        ''' Return the matrix of the derivatives of the curve discount
+        factors at the grid times after the valuation date with respect to
+        the quotes of the deposits, FRAs and swaps used to build the curve.
+        Row i is for grid time i + 1 and the columns are in the order of
+        the deposits, FRAs and swaps. '''
+
+        instruments = list(self._usedDeposits) + list(self._usedFRAs) + \
+            list(self._usedSwaps)
+
+        return quoteJacobian(self, instruments)
+
 ###############################################################################
 
     def _checkRefits(self, depoTol, fraTol, swapTol):
@@ -0,0 +1,427 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+
+from ...finutils.FinError import FinError
+from ...finutils.FinDate import FinDate
+from ...finutils.FinGlobalTypes import FinSwapTypes
+from ...finutils.FinHelperFunctions import labelToString
+from ...market.curves.FinDiscountCurve import _dfSerials
+from ...market.curves.FinDiscountCurveScenarios import \
+    FinDiscountCurveScenarios
+
+###############################################################################
+# Valuing a large book of swaps one swap at a time is dominated by the Python
+# overhead of the leg value methods. Here the flows of all of the legs are put
+# once into flat arrays with the flows of each swap held contiguously and an
+# offset array marking where each swap starts. The distinct dates of the book
+# are found once so that a valuation makes one call to each curve for all of
+# the discount factors and then one call to a Numba function that sums the
+# flows. The sums are done in the same order as in the leg value methods and
+# without fastmath so that the values are the same as those of swap.value.
+###############################################################################
+
+
+@njit(cache=True)
+def _swapBookValues_Fast(valueSerial,
+                         dfValue,
+                         fixedOffsets,
+                         fixedPaySerials,
+                         fixedAmounts,
+                         fixedPayIndex,
+                         fixedPrincipals,
+                         fixedNotionals,
+                         fixedSigns,
+                         floatOffsets,
+                         floatPaySerials,
+                         floatAlphas,
+                         floatPayIndex,
+                         floatStartIndex,
+                         floatEndIndex,
+                         payDfs,
+                         indexDfs,
+                         floatNotionals,
+                         floatSpreads,
+                         floatSigns,
+                         firstFixingRates):
+    ''' Value the fixed and the floating legs of all of the swaps in the book
+    given the discount factors at the distinct dates of the book and the
+    position of the dates of each flow in them. Flows paid on or before the
+    valuation date are ignored. A first fixing rate which is not a NaN sets
+    the rate of the first floating period paid after the valuation date. '''
+
+    numSwaps = len(fixedOffsets) - 1
+
+    fixedValues = np.zeros(numSwaps)
+    floatValues = np.zeros(numSwaps)
+
+    for iSwap in range(0, numSwaps):
+
+        #######################################################################
+        # Fixed leg
+        #######################################################################
+
+        legPV = 0.0
+        dfPmnt = 0.0
+        live = False
+
+        for i in range(fixedOffsets[iSwap], fixedOffsets[iSwap + 1]):
+            if fixedPaySerials[i] > valueSerial:
+                dfPmnt = payDfs[fixedPayIndex[i]] / dfValue
+                legPV += fixedAmounts[i] * dfPmnt
+                live = True
+
+        if live:
+            legPV += fixedPrincipals[iSwap] * dfPmnt * fixedNotionals[iSwap]
+
+        fixedValues[iSwap] = legPV * fixedSigns[iSwap]
+
+        #######################################################################
+        # Floating leg
+        #######################################################################
+
+        legPV = 0.0
+        firstPeriod = True
+        notional = floatNotionals[iSwap]
+        spread = floatSpreads[iSwap]
+        firstFixingRate = firstFixingRates[iSwap]
+
+        for i in range(floatOffsets[iSwap], floatOffsets[iSwap + 1]):
+
+            if floatPaySerials[i] > valueSerial:
+
+                alpha = floatAlphas[i]
+
+                if firstPeriod and not np.isnan(firstFixingRate):
+                    fwdRate = firstFixingRate
+                else:
+                    dfStart = indexDfs[floatStartIndex[i]]
+                    dfEnd = indexDfs[floatEndIndex[i]]
+                    fwdRate = (dfStart / dfEnd - 1.0) / alpha
+
+                firstPeriod = False
+
+                pmntAmount = (fwdRate + spread) * alpha * notional
+                legPV += pmntAmount * (payDfs[floatPayIndex[i]] / dfValue)
+
+        floatValues[iSwap] = legPV * floatSigns[iSwap]
+
+    return fixedValues, floatValues
+
+###############################################################################
+
+
+def _legSign(legType):
+    if legType == FinSwapTypes.PAY:
+        return -1.0
+    return 1.0
+
+###############################################################################
+
+
+def _curveDfs(curve, serials, firstSerial):
+    ''' Discount factors on a curve at an increasing array of distinct excel
+    dates. Only the dates from the first serial onwards are valued as the
+    curves do not allow dates before the valuation date. The rest are set to
+    one and are not used. Scenario curves give a matrix with a row for each
+    scenario. '''
+
+    if isinstance(curve, FinDiscountCurveScenarios):
+        dfs = np.ones((curve.numScenarios(), len(serials)))
+    else:
+        dfs = np.ones(len(serials))
+
+    iStart = np.searchsorted(serials, firstSerial)
+
+    if iStart < len(serials):
+        dfs[..., iStart:] = _dfSerials(curve, serials[iStart:])
+
+    return dfs
+
+###############################################################################
+
+
+class FinSwapBook():
+    ''' Class for valuing a book of swaps in one batched call. Each swap can
+    be any swap with a _fixedLeg and a _floatLeg, such as a FinIborSwap or a
+    FinOIS. The flows of the legs are compiled into arrays once when the book
+    is created and each valuation then needs one call to each curve and one
+    call to a Numba function for the whole book. The values are the same as
+    those of the value method of each swap. '''
+
+    def __init__(self,
+                 swaps: list):
+        ''' Create the book from a list of swaps. The swaps should not be
+        changed after they are added to the book. '''
+
+        numSwaps = len(swaps)
+
+        if numSwaps == 0:
+            raise FinError("No swaps in the book.")
+
+        fixedOffsets = np.zeros(numSwaps + 1, dtype=np.int64)
+        floatOffsets = np.zeros(numSwaps + 1, dtype=np.int64)
+
+        self._fixedPrincipals = np.zeros(numSwaps)
+        self._fixedNotionals = np.zeros(numSwaps)
+        self._fixedSigns = np.zeros(numSwaps)
+        self._floatNotionals = np.zeros(numSwaps)
+        self._floatSpreads = np.zeros(numSwaps)
+        self._floatSigns = np.zeros(numSwaps)
+
+        fixedPaySerials = []
+        fixedAmounts = []
+        floatPaySerials = []
+        floatStartSerials = []
+        floatEndSerials = []
+        floatAlphas = []
+
+        for iSwap, swap in enumerate(swaps):
+
+            fixedLeg = swap._fixedLeg
+            floatLeg = swap._floatLeg
+
+            fixedPaySerials.append(fixedLeg._paymentSerials)
+            fixedAmounts.append(fixedLeg._paymentAmounts)
+            fixedOffsets[iSwap + 1] = fixedOffsets[iSwap] + \
+                len(fixedLeg._paymentSerials)
+
+            floatPaySerials.append(floatLeg._paymentSerials)
+            floatStartSerials.append(floatLeg._startAccruedSerials)
+            floatEndSerials.append(floatLeg._endAccruedSerials)
+            floatAlphas.append(floatLeg._accrualFactors)
+            floatOffsets[iSwap + 1] = floatOffsets[iSwap] + \
+                len(floatLeg._paymentSerials)
+
+            self._fixedPrincipals[iSwap] = fixedLeg._principal
+            self._fixedNotionals[iSwap] = fixedLeg._notional
+            self._fixedSigns[iSwap] = _legSign(fixedLeg._legType)
+
+            self._floatNotionals[iSwap] = floatLeg._notional
+            self._floatSpreads[iSwap] = floatLeg._spread
+            self._floatSigns[iSwap] = _legSign(floatLeg._legType)
+
+        self._swaps = swaps
+        self._fixedOffsets = fixedOffsets
+        self._floatOffsets = floatOffsets
+
+        self._fixedPaySerials = np.concatenate(fixedPaySerials)
+        self._fixedAmounts = np.concatenate(fixedAmounts)
+        self._floatPaySerials = np.concatenate(floatPaySerials)
+        self._floatStartSerials = np.concatenate(floatStartSerials)
+        self._floatEndSerials = np.concatenate(floatEndSerials)
+        self._floatAlphas = np.concatenate(floatAlphas)
+
+        # The swaps share most of their dates so each distinct date is only
+        # valued once on each curve
+        paySerials = np.concatenate((self._fixedPaySerials,
+                                     self._floatPaySerials))
+        self._paySerials, payInverse = np.unique(paySerials,
+                                                 return_inverse=True)
+        numFixed = len(self._fixedPaySerials)
+        payInverse = payInverse.astype(np.int64)
+        self._fixedPayIndex = payInverse[0:numFixed]
+        self._floatPayIndex = payInverse[numFixed:]
+
+        indexSerials = np.concatenate((self._floatStartSerials,
+                                       self._floatEndSerials))
+        self._indexSerials, indexInverse = np.unique(indexSerials,
+                                                     return_inverse=True)
+        numFloat = len(self._floatStartSerials)
+        indexInverse = indexInverse.astype(np.int64)
+        self._floatStartIndex = indexInverse[0:numFloat]
+        self._floatEndIndex = indexInverse[numFloat:]
+
+###############################################################################
+
+    def _checkFirstFixingRates(self, firstFixingRates):
+        ''' Return the first fixing rates as an array with a NaN for each swap
+        that has no first fixing rate. '''
+
+        numSwaps = len(self._swaps)
+
+        if firstFixingRates is None:
+            return np.full(numSwaps, np.nan)
+
+        firstFixingRates = np.array(firstFixingRates, dtype=np.float64)
+
+        if len(firstFixingRates) != numSwaps:
+            raise FinError("Need one first fixing rate for each swap.")
+
+        return firstFixingRates
+
+###############################################################################
+
+    def _firstIndexSerial(self, valueSerial, firstFixingRates):
+        ''' Return the first date at which the index curve is needed. This is
+        the earliest start of the periods paid after the valuation date whose
+        rate is not given by a first fixing rate. '''
+
+        projected = self._floatPaySerials > valueSerial
+
+        for iSwap in np.nonzero(~np.isnan(firstFixingRates))[0]:
+            start = self._floatOffsets[iSwap]
+            end = self._floatOffsets[iSwap + 1]
+            iFirst = start + np.searchsorted(self._floatPaySerials[start:end],
+                                             valueSerial, side='right')
+            if iFirst < end:
+                projected[iFirst] = False
+
+        if not np.any(projected):
+            return self._indexSerials[-1] + 1
+
+        firstSerial = np.min(self._floatStartSerials[projected])
+
+        if firstSerial < valueSerial:
+            raise FinError("Rate of a period that has started is needed.")
+
+        return firstSerial
+
+###############################################################################
+
+    def _legValues(self, valueSerial, dfValue, payDfs, indexDfs,
+                   firstFixingRates):
+        ''' Value the legs given the discount factors at the distinct dates
+        of the book. '''
+
+        return _swapBookValues_Fast(valueSerial,
+                                    dfValue,
+                                    self._fixedOffsets,
+                                    self._fixedPaySerials,
+                                    self._fixedAmounts,
+                                    self._fixedPayIndex,
+                                    self._fixedPrincipals,
+                                    self._fixedNotionals,
+                                    self._fixedSigns,
+                                    self._floatOffsets,
+                                    self._floatPaySerials,
+                                    self._floatAlphas,
+                                    self._floatPayIndex,
+                                    self._floatStartIndex,
+                                    self._floatEndIndex,
+                                    payDfs,
+                                    indexDfs,
+                                    self._floatNotionals,
+                                    self._floatSpreads,
+                                    self._floatSigns,
+                                    firstFixingRates)
+
+###############################################################################
+
+    def legValues(self,
+                  valuationDate: FinDate,
+                  discountCurve,
+                  indexCurve=None,
+                  firstFixingRates: (list, np.ndarray) = None):
+        ''' Return the arrays of the fixed leg values and the floating leg
+        values of the swaps in the book. The first fixing rates, if given,
+        has one rate for each swap with a NaN for a swap whose first floating
+        rate is to be projected from the index curve. '''
+
+        if indexCurve is None:
+            indexCurve = discountCurve
+
+        firstFixingRates = self._checkFirstFixingRates(firstFixingRates)
+        valueSerial = valuationDate._excelDate
+
+        # Some curves return an array holding the one discount factor
+        dfValue = np.ravel(discountCurve.df(valuationDate))[0]
+
+        # Only dates after the valuation date are paid
+        payDfs = _curveDfs(discountCurve, self._paySerials, valueSerial + 1)
+
+        firstSerial = self._firstIndexSerial(valueSerial, firstFixingRates)
+        indexDfs = _curveDfs(indexCurve, self._indexSerials, firstSerial)
+
+        return self._legValues(valueSerial, dfValue, payDfs, indexDfs,
+                               firstFixingRates)
+
+###############################################################################
+
+    def value(self,
+              valuationDate: FinDate,
+              discountCurve,
+              indexCurve=None,
+              firstFixingRates: (list, np.ndarray) = None):
+        ''' Return the array of the values of the swaps in the book on the
+        valuation date. The per-flow details are not calculated. Call value
+        on the swap itself and then print its legs to see them. '''
+
+        fixedValues, floatValues = self.legValues(valuationDate,
+                                                  discountCurve,
+                                                  indexCurve,
+                                                  firstFixingRates)
+
+        return fixedValues + floatValues
+
+###############################################################################
+
+    def valueScenarios(self,
+                       valuationDate: FinDate,
+                       discountCurves: FinDiscountCurveScenarios,
+                       indexCurves=None,
+                       firstFixingRates: (list, np.ndarray) = None):
+        ''' Return the matrix of the values of the swaps in the book with a
+        row for each scenario of a FinDiscountCurveScenarios. The index
+        curves can be scenarios with the same number of scenarios or a single
+        curve used in all of them. All of the discount factors are found in
+        one call for each set of curves. '''
+
+        if isinstance(discountCurves, FinDiscountCurveScenarios) is False:
+            raise FinError("Discount curves must be scenario curves.")
+
+        if indexCurves is None:
+            indexCurves = discountCurves
+
+        numScenarios = discountCurves.numScenarios()
+
+        if isinstance(indexCurves, FinDiscountCurveScenarios):
+            if indexCurves.numScenarios() != numScenarios:
+                raise FinError("Number of index curve scenarios differs.")
+
+        firstFixingRates = self._checkFirstFixingRates(firstFixingRates)
+        valueSerial = valuationDate._excelDate
+
+        dfValues = discountCurves.df(valuationDate)
+        payDfs = _curveDfs(discountCurves, self._paySerials, valueSerial + 1)
+
+        firstSerial = self._firstIndexSerial(valueSerial, firstFixingRates)
+        indexDfs = _curveDfs(indexCurves, self._indexSerials, firstSerial)
+
+        values = np.zeros((numScenarios, len(self._swaps)))
+
+        for iScenario in range(0, numScenarios):
+
+            if indexDfs.ndim == 2:
+                scenarioIndexDfs = indexDfs[iScenario]
+            else:
+                scenarioIndexDfs = indexDfs
+
+            fixedValues, floatValues = \
+                self._legValues(valueSerial, dfValues[iScenario],
+                                payDfs[iScenario], scenarioIndexDfs,
+                                firstFixingRates)
+
+            values[iScenario] = fixedValues + floatValues
+
+        return values
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("NUM SWAPS", len(self._swaps))
+        s += labelToString("NUM FIXED FLOWS", len(self._fixedPaySerials))
+        s += labelToString("NUM FLOAT FLOWS", len(self._floatPaySerials))
+        s += labelToString("NUM DATES", len(self._paySerials))
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
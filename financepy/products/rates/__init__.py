@@ -1,15 +1,21 @@
-from .FinIborBermudanSwaption import *
-from .FinIborCallableSwap import *
-from .FinIborCapFloor import *
-from .FinIborDeposit import *
-from .FinIborFRA import *
-from .FinIborFuture import *
-from .FinIborConventions import *
-from .FinIborSwap import *
-from .FinIborSwaption import *
-from .FinOISCurve import *
-from .FinOIS import *
-from .FinIborSingleCurve import *
-from .FinIborDualCurve import *
-from .FinFixedLeg import *
-from .FinFloatLeg import *
+from ...finutils.FinLazyImport import makeLazyPackage
+
+# Modules are only imported when one of their names is first used
+makeLazyPackage(__name__, ["FinIborBermudanSwaption",
+                           "FinIborCallableSwap",
+                           "FinIborCapFloor",
+                           "FinIborDeposit",
+                           "FinIborFRA",
+                           "FinIborFuture",
+                           "FinIborConventions",
+                           "FinIborSwap",
+                           "FinIborSwaption",
+                           "FinOISCurve",
+                           "FinOIS",
+                           "FinIborSingleCurve",
+                           "FinIborDualCurve",
+                           "FinFixedLeg",
+                           "FinFloatLeg",
+                           "FinCurveRisk",
+                           "FinSwapBook",
+                           "FinIborHWCalibrator"])
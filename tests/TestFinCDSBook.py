@@ -0,0 +1,251 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinError import FinError
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.products.rates.FinIborSingleCurve import FinIborSingleCurve
+from financepy.products.credit.FinCDS import FinCDS
+from financepy.products.credit.FinCDSCurveSet import FinCDSCurveSet
+from financepy.products.credit.FinCDSBook import FinCDSBook
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+valuationDate = FinDate(20, 12, 2018)
+stepInDate = valuationDate.addDays(1)
+tenors = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]
+spreads = np.array([0.0050, 0.0062, 0.0075, 0.0098, 0.0110, 0.0121])
+names = ["AAA", "BBB", "CCC"]
+
+###############################################################################
+
+
+def buildIborCurve():
+
+    swaps = []
+    for i in range(1, 11):
+        maturityDate = valuationDate.addMonths(12 * i)
+        swap = FinIborSwap(valuationDate,
+                           maturityDate,
+                           FinSwapTypes.PAY,
+                           0.03 + 0.002 * i,
+                           FinFrequencyTypes.SEMI_ANNUAL,
+                           FinDayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    return FinIborSingleCurve(valuationDate, [], [], swaps)
+
+###############################################################################
+
+
+def buildBook(numContracts, seed):
+    ''' A book of contracts on the issuers with a mix of maturities, coupons,
+    notionals and directions. '''
+
+    np.random.seed(seed)
+
+    cdsContracts = []
+    issuers = []
+
+    for i in range(0, numContracts):
+        numMonths = int(np.random.randint(3, 130))
+        maturityDate = valuationDate.addMonths(numMonths).nextCDSDate()
+        coupon = [0.01, 0.05][np.random.randint(0, 2)]
+        notional = 1000000.0 * np.random.randint(1, 10)
+        longProtection = bool(np.random.rand() < 0.5)
+        cds = FinCDS(stepInDate, maturityDate, coupon, notional,
+                     longProtection)
+        cdsContracts.append(cds)
+        issuers.append(names[np.random.randint(0, len(names))])
+
+    return cdsContracts, issuers
+
+###############################################################################
+
+
+def test_FinCDSBook():
+
+    liborCurve = buildIborCurve()
+    recoveryRates = np.array([0.40, 0.35, 0.25])
+
+    curveSet = FinCDSCurveSet(valuationDate, tenors,
+                              np.outer([0.5, 1.0, 3.0], spreads),
+                              recoveryRates, liborCurve, names)
+
+    issuerCurves = [curveSet.curve(name) for name in names]
+
+    cdsContracts, issuers = buildBook(200, 1919)
+    book = FinCDSBook(cdsContracts, issuers)
+
+    results = book.valuation(valuationDate, curveSet)
+
+    ###########################################################################
+    # The book gives the values of the FinCDS methods of each contract
+    ###########################################################################
+
+    fullPV = np.zeros(200)
+    cleanPV = np.zeros(200)
+    fullRPV01 = np.zeros(200)
+    cleanRPV01 = np.zeros(200)
+    protPV = np.zeros(200)
+    parSpread = np.zeros(200)
+
+    for i, cds in enumerate(cdsContracts):
+        issuerCurve = issuerCurves[names.index(issuers[i])]
+        v = cds.value(valuationDate, issuerCurve)
+        rpv01 = cds.riskyPV01(valuationDate, issuerCurve)
+        fullPV[i] = v['full_pv']
+        cleanPV[i] = v['clean_pv']
+        fullRPV01[i] = rpv01['full_rpv01']
+        cleanRPV01[i] = rpv01['clean_rpv01']
+        protPV[i] = cds.protectionLegPV(valuationDate, issuerCurve)
+        parSpread[i] = cds.parSpread(valuationDate, issuerCurve)
+
+    # The totals are only given to six significant figures as sums over 200
+    # contracts can differ in their last bits between runs
+    testCases.header("OUTPUT", "BOOK TOTAL", "SAME")
+
+    for key, values, scale in [('full_pv', fullPV, 1e-6),
+                               ('clean_pv', cleanPV, 1e-6),
+                               ('full_rpv01', fullRPV01, 1e-12),
+                               ('clean_rpv01', cleanRPV01, 1e-12),
+                               ('prot_pv', protPV, 1e-6),
+                               ('par_spread', parSpread, 1e-14)]:
+        bookValues = results[key]
+        testCases.print(key, float("%.6g" % np.sum(bookValues)),
+                        np.max(np.abs(bookValues - values)) < scale)
+
+    ###########################################################################
+    # The separate methods, a list of curves and one thread all agree
+    ###########################################################################
+
+    serialResults = book.valuation(valuationDate, curveSet,
+                                   useParallel=False)
+
+    listBook = FinCDSBook(cdsContracts,
+                          [names.index(issuer) for issuer in issuers])
+    listValues = listBook.value(valuationDate, issuerCurves)
+
+    testCases.header("LABEL", "SAME")
+    testCases.print("VALUE METHOD",
+                    np.array_equal(book.value(valuationDate,
+                                              curveSet)['full_pv'],
+                                   results['full_pv']))
+    testCases.print("PAR SPREAD METHOD",
+                    np.array_equal(book.parSpread(valuationDate, curveSet),
+                                   results['par_spread']))
+    testCases.print("LIST OF CURVES",
+                    np.max(np.abs(listValues['full_pv'] -
+                                  results['full_pv'])) < 1e-6)
+    testCases.print("ONE THREAD",
+                    np.max(np.abs(serialResults['full_pv'] -
+                                  results['full_pv'])) < 1e-6)
+
+    ###########################################################################
+    # A recovery rate for each contract
+    ###########################################################################
+
+    contractRecoveries = np.where(np.arange(0, 200) % 2 == 0, 0.40, 0.20)
+    prot = book.protectionLegPV(valuationDate, curveSet, contractRecoveries)
+
+    same = True
+    for i in range(0, 200, 25):
+        cds = cdsContracts[i]
+        issuerCurve = issuerCurves[names.index(issuers[i])]
+        v = cds.protectionLegPV(valuationDate, issuerCurve,
+                                contractRecoveries[i])
+        same = same and abs(v - prot[i]) < 1e-6
+
+    testCases.header("LABEL", "SAME")
+    testCases.print("CONTRACT RECOVERY RATES", same)
+
+    ###########################################################################
+    # Issuers that are not in the curves
+    ###########################################################################
+
+    testCases.header("LABEL", "RAISES")
+
+    try:
+        FinCDSBook(cdsContracts, issuers[:10])
+        testCases.print("TOO FEW ISSUERS", False)
+    except FinError:
+        testCases.print("TOO FEW ISSUERS", True)
+
+    try:
+        FinCDSBook(cdsContracts[:2], ["AAA", "ZZZ"]).value(valuationDate,
+                                                           curveSet)
+        testCases.print("UNKNOWN ISSUER", False)
+    except FinError:
+        testCases.print("UNKNOWN ISSUER", True)
+
+    try:
+        FinCDSBook(cdsContracts[:2], [0, 5]).value(valuationDate,
+                                                   issuerCurves)
+        testCases.print("ISSUER INDEX", False)
+    except FinError:
+        testCases.print("ISSUER INDEX", True)
+
+###############################################################################
+
+
+def test_FinCDSBookTiming():
+
+    liborCurve = buildIborCurve()
+
+    curveSet = FinCDSCurveSet(valuationDate, tenors,
+                              np.outer([0.5, 1.0, 3.0], spreads),
+                              0.40, liborCurve, names)
+
+    issuerCurves = [curveSet.curve(name) for name in names]
+
+    numContracts = 10000
+    cdsContracts, issuers = buildBook(numContracts, 1919)
+
+    # Compile first
+    FinCDSBook(cdsContracts[0:2], issuers[0:2]).valuation(valuationDate,
+                                                         curveSet)
+
+    numTrades = 200
+    start = time.time()
+    for i in range(0, numTrades):
+        issuerCurve = issuerCurves[names.index(issuers[i])]
+        cdsContracts[i].value(valuationDate, issuerCurve)
+        cdsContracts[i].parSpread(valuationDate, issuerCurve)
+    end = time.time()
+    tradeTime = (end - start) / numTrades
+
+    start = time.time()
+    book = FinCDSBook(cdsContracts, issuers)
+    end = time.time()
+    setupTime = (end - start) / numContracts
+
+    start = time.time()
+    book.valuation(valuationDate, curveSet)
+    end = time.time()
+    bookTime = (end - start) / numContracts
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("FINCDS VALUE AND PAR SPREAD PER TRADE", tradeTime)
+    testCases.print("BOOK OF 10000 SETUP PER TRADE", setupTime)
+    testCases.print("BOOK OF 10000 VALUATION PER TRADE", bookTime)
+
+###############################################################################
+
+
+test_FinCDSBook()
+test_FinCDSBookTiming()
+testCases.compareTestCases()
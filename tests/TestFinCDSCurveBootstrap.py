@@ -0,0 +1,212 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+import scipy.optimize as optimize
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinError import FinError
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinGlobalVariables import gDaysInYear
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.products.rates.FinIborSingleCurve import FinIborSingleCurve
+from financepy.products.credit.FinCDS import FinCDS
+from financepy.products.credit.FinCDSCurve import FinCDSCurve
+from financepy.products.credit.FinCDSCurveBootstrap import FinCDSCurveBootstrap
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+valuationDate = FinDate(20, 12, 2018)
+stepInDate = valuationDate.addDays(1)
+tenors = [1, 2, 3, 5, 7, 10]
+
+###############################################################################
+
+
+def buildIborCurve():
+
+    swaps = []
+    for i in range(1, 11):
+        maturityDate = valuationDate.addMonths(12 * i)
+        swap = FinIborSwap(valuationDate,
+                           maturityDate,
+                           FinSwapTypes.PAY,
+                           0.03 + 0.002 * i,
+                           FinFrequencyTypes.SEMI_ANNUAL,
+                           FinDayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    return FinIborSingleCurve(valuationDate, [], [], swaps)
+
+###############################################################################
+
+
+def buildContracts(spreads):
+
+    cdsContracts = []
+    for tenor, spread in zip(tenors, spreads):
+        maturityDate = valuationDate.addMonths(12 * tenor).nextCDSDate()
+        cdsContracts.append(FinCDS(stepInDate, maturityDate, spread))
+
+    return cdsContracts
+
+###############################################################################
+
+
+def newtonBootstrap(issuerCurve):
+    ''' The bootstrap which solves for each survival probability by a secant
+    search on the value of the CDS with FinCDS.value. '''
+
+    def f(q, cds):
+        issuerCurve._values[-1] = q
+        return cds.value(valuationDate, issuerCurve,
+                         issuerCurve._recoveryRate)['clean_pv']
+
+    issuerCurve._times = np.array([0.0])
+    issuerCurve._values = np.array([1.0])
+
+    for cds in issuerCurve._cdsContracts:
+        tmat = (cds._maturityDate - valuationDate) / gDaysInYear
+        q = issuerCurve._values[-1]
+        issuerCurve._times = np.append(issuerCurve._times, tmat)
+        issuerCurve._values = np.append(issuerCurve._values, q)
+        optimize.newton(f, x0=q, args=(cds,), tol=1e-7, maxiter=50)
+
+    return issuerCurve._values
+
+###############################################################################
+
+
+def test_FinCDSCurveBootstrap():
+
+    liborCurve = buildIborCurve()
+
+    spreads = np.array([0.0050, 0.0062, 0.0075, 0.0098, 0.0110, 0.0121])
+    cdsContracts = buildContracts(spreads)
+
+    ###########################################################################
+    # The curve is the same as that of the search on the CDS value up to the
+    # tolerance of the search
+    ###########################################################################
+
+    testCases.header("RECOVERY", "T", "Q", "CLOSE TO SEARCH")
+
+    for recoveryRate in [0.20, 0.40]:
+
+        issuerCurve = FinCDSCurve(valuationDate, cdsContracts, liborCurve,
+                                  recoveryRate)
+        qs = issuerCurve._values.copy()
+        qsSearch = newtonBootstrap(issuerCurve)
+
+        for t, q, qSearch in zip(issuerCurve._times, qs, qsSearch):
+            testCases.print(recoveryRate, round(t, 8), round(q, 10),
+                            abs(q - qSearch) < 1e-7)
+
+    ###########################################################################
+    # Each contract has a zero clean value on the curve built up to it
+    ###########################################################################
+
+    testCases.header("MATURITY", "ZERO CLEAN VALUE")
+
+    for i, cds in enumerate(cdsContracts):
+        issuerCurve = FinCDSCurve(valuationDate, cdsContracts[:i + 1],
+                                  liborCurve, 0.40)
+        v = cds.value(valuationDate, issuerCurve, 0.40)['clean_pv']
+        testCases.print(str(cds._maturityDate), abs(v) < 1e-6)
+
+    ###########################################################################
+    # Many issuers in one call give the curves of each issuer
+    ###########################################################################
+
+    bootstrap = FinCDSCurveBootstrap(valuationDate, cdsContracts, liborCurve)
+
+    levels = np.array([0.2, 0.5, 1.0, 2.0, 5.0])
+    recoveryRates = np.array([0.40, 0.40, 0.35, 0.25, 0.20])
+    spreadMatrix = np.outer(levels, spreads)
+
+    qsBatch = bootstrap.survProbs(spreadMatrix, recoveryRates)
+
+    testCases.header("LEVEL", "RECOVERY", "5Y Q", "SAME AS CURVE")
+
+    for i in range(0, len(levels)):
+        issuerCurve = FinCDSCurve(valuationDate,
+                                  buildContracts(spreadMatrix[i]),
+                                  liborCurve, recoveryRates[i])
+        testCases.print(levels[i], recoveryRates[i],
+                        round(qsBatch[i, 4], 10),
+                        np.array_equal(qsBatch[i], issuerCurve._values))
+
+    ###########################################################################
+    # Spreads which need a large negative hazard rate cannot be fitted
+    ###########################################################################
+
+    testCases.header("LABEL", "RAISES")
+
+    try:
+        bootstrap.survProbs([0.05, 0.05, 0.05, 0.001, 0.001, 0.001])
+        testCases.print("INVERTED SPREADS", False)
+    except FinError:
+        testCases.print("INVERTED SPREADS", True)
+
+###############################################################################
+
+
+def test_FinCDSCurveBootstrapTiming():
+
+    liborCurve = buildIborCurve()
+
+    spreads = np.array([0.0050, 0.0062, 0.0075, 0.0098, 0.0110, 0.0121])
+    cdsContracts = buildContracts(spreads)
+
+    numNames = 2000
+    np.random.seed(1919)
+    spreadMatrix = np.outer(0.2 + 5.0 * np.random.rand(numNames), spreads)
+
+    bootstrap = FinCDSCurveBootstrap(valuationDate, cdsContracts, liborCurve)
+    bootstrap.survProbs(spreadMatrix[0:2])
+
+    numSearches = 20
+    start = time.time()
+    for i in range(0, numSearches):
+        issuerCurve = FinCDSCurve(valuationDate,
+                                  buildContracts(spreadMatrix[i]),
+                                  liborCurve, 0.40)
+        newtonBootstrap(issuerCurve)
+    end = time.time()
+    searchTime = (end - start) / numSearches
+
+    start = time.time()
+    for i in range(0, numSearches):
+        FinCDSCurve(valuationDate, buildContracts(spreadMatrix[i]),
+                    liborCurve, 0.40)
+    end = time.time()
+    curveTime = (end - start) / numSearches
+
+    start = time.time()
+    bootstrap = FinCDSCurveBootstrap(valuationDate, cdsContracts, liborCurve)
+    bootstrap.survProbs(spreadMatrix, 0.40)
+    end = time.time()
+    batchTime = (end - start) / numNames
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("SEARCH ON CDS VALUE PER CURVE", searchTime)
+    testCases.print("FINCDSCURVE PER CURVE", curveTime)
+    testCases.print("BATCH OF 2000 PER CURVE", batchTime)
+
+###############################################################################
+
+
+test_FinCDSCurveBootstrap()
+test_FinCDSCurveBootstrapTiming()
+testCases.compareTestCases()
@@ -0,0 +1,201 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinError import FinError
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.products.rates.FinIborSingleCurve import FinIborSingleCurve
+from financepy.products.credit.FinCDS import FinCDS
+from financepy.products.credit.FinCDSCurve import FinCDSCurve
+from financepy.products.credit.FinCDSCurveSet import FinCDSCurveSet
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+valuationDate = FinDate(20, 12, 2018)
+stepInDate = valuationDate.addDays(1)
+tenors = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]
+spreads = np.array([0.0050, 0.0062, 0.0075, 0.0098, 0.0110, 0.0121])
+
+###############################################################################
+
+
+def buildIborCurve():
+
+    swaps = []
+    for i in range(1, 11):
+        maturityDate = valuationDate.addMonths(12 * i)
+        swap = FinIborSwap(valuationDate,
+                           maturityDate,
+                           FinSwapTypes.PAY,
+                           0.03 + 0.002 * i,
+                           FinFrequencyTypes.SEMI_ANNUAL,
+                           FinDayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    return FinIborSingleCurve(valuationDate, [], [], swaps)
+
+###############################################################################
+
+
+def buildIssuerCurve(liborCurve, issuerSpreads, recoveryRate):
+
+    cdsContracts = []
+    for tenor, spread in zip(tenors, issuerSpreads):
+        cdsContracts.append(FinCDS(stepInDate, tenor, spread))
+
+    return FinCDSCurve(valuationDate, cdsContracts, liborCurve, recoveryRate)
+
+###############################################################################
+
+
+def test_FinCDSCurveSet():
+
+    liborCurve = buildIborCurve()
+
+    names = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+    levels = np.array([0.2, 0.5, 1.0, 2.0, 5.0])
+    recoveryRates = np.array([0.40, 0.40, 0.35, 0.25, 0.20])
+    spreadMatrix = np.outer(levels, spreads)
+
+    curveSet = FinCDSCurveSet(valuationDate, tenors, spreadMatrix,
+                              recoveryRates, liborCurve, names,
+                              useParallel=False)
+
+    curveSetParallel = FinCDSCurveSet(valuationDate, tenors, spreadMatrix,
+                                      recoveryRates, liborCurve, names)
+
+    ###########################################################################
+    # Each issuer has the curve that FinCDSCurve fits to its contracts
+    ###########################################################################
+
+    testCases.header("NAME", "RECOVERY", "5Y Q", "SAME AS CURVE",
+                     "PARALLEL CLOSE")
+
+    for i, name in enumerate(names):
+        issuerCurve = buildIssuerCurve(liborCurve, spreadMatrix[i],
+                                       recoveryRates[i])
+        qs = curveSet._values[i]
+        qsParallel = curveSetParallel._values[i]
+        testCases.print(name, recoveryRates[i], round(qs[4], 10),
+                        np.array_equal(qs, issuerCurve._values),
+                        np.max(np.abs(qsParallel - qs)) < 1e-14)
+
+    ###########################################################################
+    # The curve of one issuer reprices its contracts without a rebuild
+    ###########################################################################
+
+    testCases.header("NAME", "MATURITY", "CLEAN PV", "PAR SPREAD")
+
+    issuerCurve = curveSet.curve("DDD")
+    for cds in issuerCurve._cdsContracts:
+        v = cds.value(valuationDate, issuerCurve, 0.25)['clean_pv']
+        s = cds.parSpread(valuationDate, issuerCurve, 0.25)
+        testCases.print("DDD", str(cds._maturityDate), round(v, 6),
+                        round(s * 10000.0, 6))
+
+    ###########################################################################
+    # Survival probabilities and hazard rates of all issuers as arrays
+    ###########################################################################
+
+    dates = [valuationDate.addMonths(6), valuationDate.addYears(4),
+             valuationDate.addYears(12)]
+    qs = curveSet.survProbs(dates)
+    hazards = curveSet.hazardRates()
+
+    testCases.header("NAME", "Q 6M", "Q 4Y", "Q 12Y", "Q CLOSE", "H 1Y",
+                     "H 10Y")
+
+    for i, name in enumerate(names):
+        issuerCurve = curveSet.curve(i)
+        qCurve = np.array([issuerCurve.survProb(dt) for dt in dates])
+        testCases.print(name, round(qs[i, 0], 10), round(qs[i, 1], 10),
+                        round(qs[i, 2], 10),
+                        np.max(np.abs(qs[i] - qCurve)) < 1e-14,
+                        round(hazards[i, 0], 10), round(hazards[i, -1], 10))
+
+    ###########################################################################
+    # Inputs that do not fit the universe
+    ###########################################################################
+
+    testCases.header("LABEL", "RAISES")
+
+    try:
+        FinCDSCurveSet(valuationDate, tenors, spreadMatrix[:, :4],
+                       recoveryRates, liborCurve)
+        testCases.print("TOO FEW SPREADS", False)
+    except FinError:
+        testCases.print("TOO FEW SPREADS", True)
+
+    try:
+        FinCDSCurveSet(valuationDate, tenors, spreadMatrix,
+                       recoveryRates[:3], liborCurve)
+        testCases.print("TOO FEW RECOVERIES", False)
+    except FinError:
+        testCases.print("TOO FEW RECOVERIES", True)
+
+    try:
+        curveSet.curve("ZZZ")
+        testCases.print("UNKNOWN NAME", False)
+    except FinError:
+        testCases.print("UNKNOWN NAME", True)
+
+###############################################################################
+
+
+def test_FinCDSCurveSetTiming():
+
+    liborCurve = buildIborCurve()
+
+    numNames = 10000
+    np.random.seed(1919)
+    spreadMatrix = np.outer(0.2 + 5.0 * np.random.rand(numNames), spreads)
+    recoveryRates = 0.20 + 0.20 * np.random.rand(numNames)
+
+    # Compile first
+    FinCDSCurveSet(valuationDate, tenors, spreadMatrix[0:2],
+                   recoveryRates[0:2], liborCurve)
+
+    numCurves = 20
+    start = time.time()
+    for i in range(0, numCurves):
+        buildIssuerCurve(liborCurve, spreadMatrix[i], recoveryRates[i])
+    end = time.time()
+    curveTime = (end - start) / numCurves
+
+    start = time.time()
+    FinCDSCurveSet(valuationDate, tenors, spreadMatrix, recoveryRates,
+                   liborCurve, useParallel=False)
+    end = time.time()
+    serialTime = (end - start) / numNames
+
+    start = time.time()
+    FinCDSCurveSet(valuationDate, tenors, spreadMatrix, recoveryRates,
+                   liborCurve)
+    end = time.time()
+    parallelTime = (end - start) / numNames
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("FINCDSCURVE PER CURVE", curveTime)
+    testCases.print("SERIAL SET OF 10000 PER CURVE", serialTime)
+    testCases.print("PARALLEL SET OF 10000 PER CURVE", parallelTime)
+
+###############################################################################
+
+
+test_FinCDSCurveSet()
+test_FinCDSCurveSetTiming()
+testCases.compareTestCases()
@@ -0,0 +1,282 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+from copy import deepcopy
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.products.rates.FinIborDeposit import FinIborDeposit
+from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.products.rates.FinIborSingleCurve import FinIborSingleCurve
+from financepy.products.credit.FinCDS import FinCDS
+from financepy.products.credit.FinCDSCurve import FinCDSCurve
+from financepy.products.credit.FinCDSCurveSet import FinCDSCurveSet
+from financepy.products.credit.FinCDSBook import FinCDSBook
+from financepy.products.credit.FinCDSRisk import bucketedCreditDV01
+from financepy.products.credit.FinCDSRisk import parallelCreditDV01
+from financepy.products.credit.FinCDSRisk import bucketedInterestDV01
+from financepy.products.credit.FinCDSRisk import parallelInterestDV01
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+valuationDate = FinDate(20, 12, 2018)
+stepInDate = valuationDate.addDays(1)
+tenors = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]
+spreads = [0.0050, 0.0062, 0.0075, 0.0098, 0.0110, 0.0121]
+bump = 0.0001
+
+###############################################################################
+
+
+def buildIborCurve():
+
+    spotDate = valuationDate.addWeekDays(2)
+
+    depos = [FinIborDeposit(spotDate, "6M", 0.025, FinDayCountTypes.ACT_360)]
+
+    swaps = []
+    for i in [1, 2, 3, 5, 7, 10]:
+        maturityDate = spotDate.addMonths(12 * i)
+        swap = FinIborSwap(spotDate,
+                           maturityDate,
+                           FinSwapTypes.PAY,
+                           0.03 + 0.002 * i,
+                           FinFrequencyTypes.SEMI_ANNUAL,
+                           FinDayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    return FinIborSingleCurve(valuationDate, depos, [], swaps)
+
+###############################################################################
+
+
+def buildIssuerCurve(liborCurve):
+
+    cdsContracts = []
+    for tenor, spread in zip(tenors, spreads):
+        cdsContracts.append(FinCDS(stepInDate, tenor, spread))
+
+    return FinCDSCurve(valuationDate, cdsContracts, liborCurve, 0.35)
+
+###############################################################################
+
+
+def bumpedCreditDV01s(cds, issuerCurve):
+    ''' Bump the spread of each curve CDS and rebuild the curve. '''
+
+    v0 = cds.value(valuationDate, issuerCurve)['full_pv']
+
+    dv01s = []
+    for i in range(0, len(issuerCurve._cdsContracts)):
+        bumpedCurve = deepcopy(issuerCurve)
+        bumpedCurve._cdsContracts[i]._runningCoupon += bump
+        bumpedCurve._buildCurve()
+        v1 = cds.value(valuationDate, bumpedCurve)['full_pv']
+        dv01s.append(v1 - v0)
+
+    return np.array(dv01s)
+
+###############################################################################
+
+
+def bumpedInterestDV01s(cds, issuerCurve):
+    ''' Bump the quote of each Ibor instrument and rebuild both curves. '''
+
+    v0 = cds.value(valuationDate, issuerCurve)['full_pv']
+
+    liborCurve = issuerCurve._liborCurve
+    numInstruments = len(liborCurve._usedDeposits) + \
+        len(liborCurve._usedSwaps)
+
+    dv01s = []
+    for i in range(0, numInstruments):
+        bumpedCurve = deepcopy(issuerCurve)
+        bumpedLibor = bumpedCurve._liborCurve
+        instruments = list(bumpedLibor._usedDeposits) + \
+            list(bumpedLibor._usedSwaps)
+        instrument = instruments[i]
+
+        if isinstance(instrument, FinIborDeposit):
+            instrument._depositRate += bump
+        else:
+            instrument._fixedLeg._coupon += bump
+            instrument._fixedLeg.generatePayments()
+
+        bumpedLibor._buildCurve()
+        bumpedCurve._buildCurve()
+        v1 = cds.value(valuationDate, bumpedCurve)['full_pv']
+        dv01s.append(v1 - v0)
+
+    return np.array(dv01s)
+
+###############################################################################
+
+
+def test_FinCDSRisk():
+
+    liborCurve = buildIborCurve()
+    issuerCurve = buildIssuerCurve(liborCurve)
+
+    trades = [("LONG 5Y 100", FinCDS(stepInDate, FinDate(20, 6, 2024),
+                                      0.01)),
+              ("SHORT 12Y 500", FinCDS(stepInDate, FinDate(20, 3, 2031),
+                                       0.05, 5000000.0, False))]
+
+    ###########################################################################
+    # The bucketed DV01s are those of bumping each quote and rebuilding the
+    # curves up to the convexity of the value
+    ###########################################################################
+
+    testCases.header("TRADE", "BUCKET", "ANALYTIC", "BUMPED", "CLOSE")
+
+    for name, cds in trades:
+
+        analytic = bucketedCreditDV01(cds, valuationDate, issuerCurve)
+        bumped = bumpedCreditDV01s(cds, issuerCurve)
+
+        for tenor, a, b in zip(tenors, analytic, bumped):
+            testCases.print(name, "CDS " + tenor, round(a, 6), round(b, 6),
+                            abs(a - b) < 0.01 * abs(b) + 0.01)
+
+        analytic = bucketedInterestDV01(cds, valuationDate, issuerCurve)
+        bumped = bumpedInterestDV01s(cds, issuerCurve)
+
+        for i, (a, b) in enumerate(zip(analytic, bumped)):
+            testCases.print(name, "IBOR " + str(i), round(a, 6), round(b, 6),
+                            abs(a - b) < 0.01 * abs(b) + 0.01)
+
+    ###########################################################################
+    # The parallel DV01s are close to the bump and rebuild methods of FinCDS
+    ###########################################################################
+
+    testCases.header("TRADE", "RISK", "ANALYTIC", "FINCDS", "CLOSE")
+
+    for name, cds in trades:
+
+        a = parallelCreditDV01(cds, valuationDate, issuerCurve)
+        b = cds.creditDV01(valuationDate, issuerCurve)
+        testCases.print(name, "CREDIT DV01", round(a, 6), round(b, 6),
+                        abs(a - b) < 0.01 * abs(b))
+
+        a = parallelInterestDV01(cds, valuationDate, issuerCurve)
+        b = cds.interestDV01(valuationDate, issuerCurve)
+        testCases.print(name, "INTEREST DV01", round(a, 6), round(b, 6),
+                        abs(a - b) < 0.01 * abs(b))
+
+    ###########################################################################
+    # A book gives the DV01s of each of its contracts
+    ###########################################################################
+
+    names = ["AAA", "BBB", "CCC"]
+    curveSet = FinCDSCurveSet(valuationDate, tenors,
+                              np.outer([0.5, 1.0, 3.0], spreads),
+                              [0.40, 0.35, 0.25], liborCurve, names)
+
+    np.random.seed(1919)
+    cdsContracts = []
+    issuers = []
+    for i in range(0, 50):
+        numMonths = int(np.random.randint(3, 130))
+        maturityDate = valuationDate.addMonths(numMonths).nextCDSDate()
+        coupon = [0.01, 0.05][np.random.randint(0, 2)]
+        cdsContracts.append(FinCDS(stepInDate, maturityDate, coupon))
+        issuers.append(names[np.random.randint(0, 3)])
+
+    book = FinCDSBook(cdsContracts, issuers)
+    bookCredit = book.bucketedCreditDV01(valuationDate, curveSet)
+    bookInterest = book.bucketedInterestDV01(valuationDate, curveSet)
+
+    maxCredit = 0.0
+    maxInterest = 0.0
+    for i, cds in enumerate(cdsContracts):
+        curve = curveSet.curve(issuers[i])
+        credit = bucketedCreditDV01(cds, valuationDate, curve)
+        interest = bucketedInterestDV01(cds, valuationDate, curve)
+        maxCredit = max(maxCredit, np.max(np.abs(bookCredit[i] - credit)))
+        maxInterest = max(maxInterest,
+                          np.max(np.abs(bookInterest[i] - interest)))
+
+    testCases.header("LABEL", "TOTAL", "SAME AS TRADES")
+    testCases.print("BOOK CREDIT DV01",
+                    round(np.sum(book.parallelCreditDV01(valuationDate,
+                                                         curveSet)), 6),
+                    maxCredit < 1e-8)
+    testCases.print("BOOK INTEREST DV01",
+                    round(np.sum(book.parallelInterestDV01(valuationDate,
+                                                           curveSet)), 6),
+                    maxInterest < 1e-8)
+
+###############################################################################
+
+
+def test_FinCDSRiskTiming():
+
+    liborCurve = buildIborCurve()
+    issuerCurve = buildIssuerCurve(liborCurve)
+
+    names = ["AAA", "BBB", "CCC"]
+    curveSet = FinCDSCurveSet(valuationDate, tenors,
+                              np.outer([0.5, 1.0, 3.0], spreads),
+                              0.40, liborCurve, names)
+
+    numContracts = 10000
+    np.random.seed(1919)
+    cdsContracts = []
+    issuers = []
+    for i in range(0, numContracts):
+        numMonths = int(np.random.randint(3, 130))
+        maturityDate = valuationDate.addMonths(numMonths).nextCDSDate()
+        cdsContracts.append(FinCDS(stepInDate, maturityDate, 0.01))
+        issuers.append(names[np.random.randint(0, 3)])
+
+    book = FinCDSBook(cdsContracts, issuers)
+
+    # Compile first
+    FinCDSBook(cdsContracts[0:2],
+               issuers[0:2]).bucketedCreditDV01(valuationDate, curveSet)
+    parallelCreditDV01(cdsContracts[0], valuationDate, issuerCurve)
+
+    numTrades = 5
+    start = time.time()
+    for cds in cdsContracts[0:numTrades]:
+        cds.creditDV01(valuationDate, issuerCurve)
+        cds.interestDV01(valuationDate, issuerCurve)
+    end = time.time()
+    bumpTime = (end - start) / numTrades
+
+    start = time.time()
+    for cds in cdsContracts[0:numTrades]:
+        parallelCreditDV01(cds, valuationDate, issuerCurve)
+        parallelInterestDV01(cds, valuationDate, issuerCurve)
+    end = time.time()
+    analyticTime = (end - start) / numTrades
+
+    start = time.time()
+    book.bucketedCreditDV01(valuationDate, curveSet)
+    book.bucketedInterestDV01(valuationDate, curveSet)
+    end = time.time()
+    bookTime = (end - start) / numContracts
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("BUMP AND REBUILD PER TRADE", bumpTime)
+    testCases.print("ANALYTIC PER TRADE", analyticTime)
+    testCases.print("BOOK OF 10000 BUCKETED PER TRADE", bookTime)
+
+###############################################################################
+
+
+test_FinCDSRisk()
+test_FinCDSRiskTiming()
+testCases.compareTestCases()
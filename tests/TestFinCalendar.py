@@ -2,12 +2,16 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+import time
+
 import sys
 sys.path.append("..")
 
 from financepy.finutils.FinDate import FinDate
 from financepy.finutils.FinDate import setDateFormatType, FinDateFormatTypes
+from financepy.finutils.FinDateArray import FinDateArray
 from financepy.finutils.FinCalendar import FinCalendar, FinCalendarTypes
+from financepy.finutils.FinCalendar import FinBusDayAdjustTypes
 
 from FinTestCases import FinTestCases, globalTestCaseMode
 testCases = FinTestCases(__file__, globalTestCaseMode)
@@ -47,6 +51,58 @@ def test_FinCalendar():
 
 ###############################################################################
 
+def test_FinCalendarBusinessDayArrays():
+
+    setDateFormatType(FinDateFormatTypes.UK_LONG)
+
+    startDate = FinDate(20, 12, 2020)
+    dateList = [startDate.addDays(i) for i in range(0, 20)]
+    dates = FinDateArray(dateList)
+
+    jointCal = FinCalendar([FinCalendarTypes.TARGET,
+                            FinCalendarTypes.UNITED_KINGDOM])
+
+    testCases.header("DATE", "BUSDAY", "MODFOLL", "MODPREC", "PLUS2BD")
+
+    isBusDay = jointCal.isBusinessDay(dates)
+    modFoll = jointCal.adjust(dates, FinBusDayAdjustTypes.MODIFIED_FOLLOWING)
+    modPrec = jointCal.adjust(dates, FinBusDayAdjustTypes.MODIFIED_PRECEDING)
+    plus2BD = jointCal.addBusinessDays(dates, 2)
+
+    for i in range(0, len(dates)):
+        testCases.print(dates[i], bool(isBusDay[i]), modFoll[i], modPrec[i],
+                        plus2BD[i])
+
+    # The vectorised results must agree with the scalar ones
+    for i in range(0, len(dates)):
+        assert jointCal.isBusinessDay(dateList[i]) == isBusDay[i]
+        assert jointCal.addBusinessDays(dateList[i], 2) == plus2BD[i]
+
+    cal = FinCalendar(FinCalendarTypes.UNITED_STATES)
+    dateList = [FinDate(1, 1, 2020).addDays(i) for i in range(0, 10000)]
+    dates = FinDateArray(dateList)
+
+    # The business day arrays are built on first use so exclude this
+    cal.isBusinessDay(dateList[0])
+
+    start = time.time()
+    for dt in dateList:
+        cal.adjust(dt, FinBusDayAdjustTypes.MODIFIED_FOLLOWING)
+    end = time.time()
+    elapsedScalar = end - start
+
+    start = time.time()
+    cal.adjust(dates, FinBusDayAdjustTypes.MODIFIED_FOLLOWING)
+    end = time.time()
+    elapsedArray = end - start
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("ADJUST FINDATES", elapsedScalar)
+    testCases.print("ADJUST FINDATEARRAY", elapsedArray)
+
+###############################################################################
+
 
 test_FinCalendar()
+test_FinCalendarBusinessDayArrays()
 testCases.compareTestCases()
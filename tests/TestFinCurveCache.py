@@ -0,0 +1,214 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.products.rates.FinIborDeposit import FinIborDeposit
+from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.products.rates.FinIborSingleCurve import FinIborSingleCurve
+from financepy.products.credit.FinCDS import FinCDS
+from financepy.products.credit.FinCDSCurve import FinCDSCurve
+from financepy.market.curves.FinInterpolator import FinInterpTypes
+from financepy.market.curves.FinCurveCache import cachedCurve, curveHash
+from financepy.market.curves.FinCurveCache import clearCurveCache
+from financepy.market.curves.FinCurveCache import setCurveCacheSize
+from financepy.market.curves.FinCurveCache import curveCacheStats
+from financepy.market.curves.FinCurveCache import invalidateCurve
+from financepy.market.curves.FinCurveCache import invalidateCurves
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def buildInstruments(valuationDate, shift=0.0):
+    ''' Build a fresh set of deposits and swaps each time as separate pricing
+    tasks would. '''
+
+    settlementDate = valuationDate.addWeekDays(2)
+
+    depos = [FinIborDeposit(settlementDate, "6M", 0.0200 + shift,
+                            FinDayCountTypes.ACT_360)]
+
+    swaps = []
+    for i in range(1, 11):
+        swap = FinIborSwap(settlementDate, str(i) + "Y", FinSwapTypes.PAY,
+                           0.0210 + 0.0010 * i + shift,
+                           FinFrequencyTypes.SEMI_ANNUAL,
+                           FinDayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    return depos, [], swaps
+
+###############################################################################
+
+
+def test_FinCurveCache():
+
+    valuationDate = FinDate(15, 6, 2020)
+    clearCurveCache()
+
+    testCases.header("REQUEST", "SAME CURVE", "HITS", "MISSES", "CACHED")
+
+    depos, fras, swaps = buildInstruments(valuationDate)
+    curve1 = cachedCurve(FinIborSingleCurve, valuationDate, depos, fras,
+                         swaps, FinInterpTypes.FLAT_FWD_RATES)
+    stats = curveCacheStats()
+    testCases.print("FIRST", True, stats[0], stats[1], stats[2])
+
+    # Valuing the swaps changes their leg flows but not the curve inputs
+    for swap in swaps:
+        swap.value(valuationDate, curve1, curve1, None)
+
+    depos, fras, swaps = buildInstruments(valuationDate)
+    curve2 = cachedCurve(FinIborSingleCurve, valuationDate, depos, fras,
+                         swaps, FinInterpTypes.FLAT_FWD_RATES)
+    stats = curveCacheStats()
+    testCases.print("SAME INPUTS", curve2 is curve1, stats[0], stats[1],
+                    stats[2])
+
+    depos, fras, swaps = buildInstruments(valuationDate)
+    curve3 = cachedCurve(FinIborSingleCurve, valuationDate, depos, fras,
+                         swaps, FinInterpTypes.LINEAR_ZERO_RATES)
+    stats = curveCacheStats()
+    testCases.print("OTHER INTERP", curve3 is curve1, stats[0], stats[1],
+                    stats[2])
+
+    depos, fras, swaps = buildInstruments(valuationDate, 0.0001)
+    curve4 = cachedCurve(FinIborSingleCurve, valuationDate, depos, fras,
+                         swaps, FinInterpTypes.FLAT_FWD_RATES)
+    stats = curveCacheStats()
+    testCases.print("QUOTE TICK", curve4 is curve1, stats[0], stats[1],
+                    stats[2])
+
+    invalidateCurve(curve1)
+    depos, fras, swaps = buildInstruments(valuationDate)
+    curve5 = cachedCurve(FinIborSingleCurve, valuationDate, depos, fras,
+                         swaps, FinInterpTypes.FLAT_FWD_RATES)
+    stats = curveCacheStats()
+    testCases.print("INVALIDATED", curve5 is curve1, stats[0], stats[1],
+                    stats[2])
+
+    # A user who changes a shared curve does not pass it on to others
+    curve5._dfs[3] *= 1.01
+    depos, fras, swaps = buildInstruments(valuationDate)
+    curve6 = cachedCurve(FinIborSingleCurve, valuationDate, depos, fras,
+                         swaps, FinInterpTypes.FLAT_FWD_RATES)
+    stats = curveCacheStats()
+    testCases.print("CHANGED", curve6 is curve5, stats[0], stats[1],
+                    stats[2])
+
+    # A cached curve used to build another curve is keyed by its hash
+    cdsContracts = []
+    for i in range(1, 6):
+        cds = FinCDS(valuationDate, valuationDate.addYears(i), 0.01)
+        cdsContracts.append(cds)
+
+    issuerCurve1 = cachedCurve(FinCDSCurve, valuationDate, cdsContracts,
+                               curve6, recoveryRate=0.40)
+    issuerCurve2 = cachedCurve(FinCDSCurve, valuationDate, cdsContracts,
+                               curve6, recoveryRate=0.40)
+    issuerCurve3 = cachedCurve(FinCDSCurve, valuationDate, cdsContracts,
+                               curve6, recoveryRate=0.30)
+    stats = curveCacheStats()
+    testCases.print("CDS CURVE", issuerCurve2 is issuerCurve1, stats[0],
+                    stats[1], stats[2])
+    testCases.print("CDS RECOVERY", issuerCurve3 is issuerCurve1, stats[0],
+                    stats[1], stats[2])
+
+    # A bumped cached curve is a new curve and is not keyed as the original
+    bumpedCurve = curve6.bump(0.01)
+    issuerCurve4 = cachedCurve(FinCDSCurve, valuationDate, cdsContracts,
+                               bumpedCurve, recoveryRate=0.40)
+    rebuiltCurve = FinCDSCurve(valuationDate, cdsContracts, bumpedCurve,
+                               recoveryRate=0.40)
+    maturityDate = valuationDate.addYears(5)
+    stats = curveCacheStats()
+    testCases.print("BUMPED LIBOR", issuerCurve4 is issuerCurve1, stats[0],
+                    stats[1], stats[2])
+    testCases.print("BUMPED SAME AS REBUILT",
+                    issuerCurve4.survProb(maturityDate) ==
+                    rebuiltCurve.survProb(maturityDate), stats[0], stats[1],
+                    stats[2])
+
+    numRemoved = invalidateCurves(FinCDSCurve)
+    stats = curveCacheStats()
+    testCases.print("REMOVE CDS", numRemoved, stats[0], stats[1], stats[2])
+
+    # The least recently used curves are evicted first
+    setCurveCacheSize(2)
+    stats = curveCacheStats()
+    testCases.print("SIZE 2", True, stats[0], stats[1], stats[2])
+
+    depos, fras, swaps = buildInstruments(valuationDate)
+    curve7 = cachedCurve(FinIborSingleCurve, valuationDate, depos, fras,
+                         swaps, FinInterpTypes.FLAT_FWD_RATES)
+    stats = curveCacheStats()
+    testCases.print("MOST RECENT", curve7 is curve6, stats[0], stats[1],
+                    stats[2])
+
+    testCases.header("INPUTS", "SAME HASH")
+
+    depos, fras, swaps = buildInstruments(valuationDate)
+    key1 = curveHash(FinIborSingleCurve, valuationDate, depos, fras, swaps)
+    depos, fras, swaps = buildInstruments(valuationDate)
+    key2 = curveHash(FinIborSingleCurve, valuationDate, depos, fras, swaps)
+    key3 = curveHash(FinIborSingleCurve, valuationDate.addDays(1), depos,
+                     fras, swaps)
+    testCases.print("REBUILT", key1 == key2)
+    testCases.print("DATE", key1 == key3)
+
+    setCurveCacheSize(100)
+    clearCurveCache()
+
+###############################################################################
+
+
+def test_FinCurveCacheTimings():
+
+    valuationDate = FinDate(15, 6, 2020)
+    numTasks = 50
+
+    clearCurveCache()
+
+    start = time.time()
+    for _ in range(0, numTasks):
+        depos, fras, swaps = buildInstruments(valuationDate)
+        FinIborSingleCurve(valuationDate, depos, fras, swaps)
+    end = time.time()
+    elapsedBuild = end - start
+
+    start = time.time()
+    for _ in range(0, numTasks):
+        depos, fras, swaps = buildInstruments(valuationDate)
+        cachedCurve(FinIborSingleCurve, valuationDate, depos, fras, swaps)
+    end = time.time()
+    elapsedCached = end - start
+
+    hits, misses, numCached, timeSaved = curveCacheStats()
+
+    testCases.header("HITS", "MISSES", "CACHED")
+    testCases.print(hits, misses, numCached)
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("BUILD EVERY TIME", elapsedBuild)
+    testCases.print("CURVE CACHE", elapsedCached)
+    testCases.print("BUILD TIME SAVED", timeSaved)
+
+    clearCurveCache()
+
+###############################################################################
+
+
+test_FinCurveCache()
+test_FinCurveCacheTimings()
+testCases.compareTestCases()
@@ -0,0 +1,118 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import time
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDateArray import FinDateArray
+from financepy.finutils.FinDayCount import FinDayCount, FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinHelperFunctions import timesFromDates
+from financepy.market.curves.FinDiscountCurveFlat import FinDiscountCurveFlat
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_FinDateArray():
+
+    startDate = FinDate(29, 1, 2019)
+    dateList = [startDate.addDays(i * 11) for i in range(0, 40)]
+    dates = FinDateArray(dateList)
+
+    testCases.header("DATE", "ADD3M", "ADD1Y", "EOM", "WEEKDAY", "ISEOM")
+
+    add3M = dates.addTenor("3M")
+    add1Y = dates.addTenor("1Y")
+    eom = dates.EOM()
+    weekdays = dates.weekday()
+    isEOM = dates.isEOM()
+
+    for i in range(0, len(dates)):
+        testCases.print(dates[i], add3M[i], add1Y[i], eom[i],
+                        int(weekdays[i]), bool(isEOM[i]))
+
+    # Check the vectorised results agree with the FinDate versions
+    for i in range(0, len(dates)):
+        assert add3M[i] == dateList[i].addTenor("3M")
+        assert add1Y[i] == dateList[i].addTenor("1Y")
+        assert eom[i] == dateList[i].EOM()
+        assert weekdays[i] == dateList[i]._weekday
+
+    testCases.header("DATE", "DAYS FROM START", "AFTER 1 MAR 2019")
+
+    diffs = dates - startDate
+    after = dates > FinDate(1, 3, 2019)
+
+    for i in range(0, len(dates)):
+        testCases.print(dates[i], int(diffs[i]), bool(after[i]))
+
+###############################################################################
+
+
+def test_FinDateArrayYearFrac():
+
+    startDate = FinDate(31, 12, 2018)
+    startList = [startDate.addDays(i * 17) for i in range(0, 30)]
+    starts = FinDateArray(startList)
+    ends = starts.addMonths(6)
+    endList = ends.toDates()
+
+    testCases.header("DAY_COUNT_METHOD", "START", "END", "ALPHA", "DIFF")
+
+    for dayCountMethod in FinDayCountTypes:
+
+        dayCount = FinDayCount(dayCountMethod)
+        alphas = dayCount.yearFrac(starts, ends, ends,
+                                   FinFrequencyTypes.SEMI_ANNUAL)[0]
+
+        for i in range(0, len(starts)):
+            alpha = dayCount.yearFrac(startList[i], endList[i], endList[i],
+                                      FinFrequencyTypes.SEMI_ANNUAL)[0]
+            testCases.print(str(dayCountMethod), startList[i], endList[i],
+                            alphas[i], alphas[i] - alpha)
+
+###############################################################################
+
+
+def test_FinDateArrayTimings():
+
+    valuationDate = FinDate(1, 6, 2020)
+    curve = FinDiscountCurveFlat(valuationDate, 0.02)
+    dateList = [valuationDate.addDays(i) for i in range(0, 10000)]
+    dates = FinDateArray(dateList)
+
+    start = time.time()
+    times1 = timesFromDates(dateList, valuationDate)
+    dfs1 = curve.df(dateList)
+    end = time.time()
+    elapsedList = end - start
+
+    start = time.time()
+    times2 = timesFromDates(dates, valuationDate)
+    dfs2 = curve.df(dates)
+    end = time.time()
+    elapsedArray = end - start
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("FINDATE LIST", elapsedList)
+    testCases.print("FINDATEARRAY", elapsedArray)
+
+    testCases.header("MAX TIME DIFF", "MAX DF DIFF")
+    testCases.print(np.max(np.abs(times1 - times2)),
+                    np.max(np.abs(dfs1 - dfs2)))
+
+###############################################################################
+
+
+test_FinDateArray()
+test_FinDateArrayYearFrac()
+test_FinDateArrayTimings()
+testCases.compareTestCases()
@@ -2,10 +2,14 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+import numpy as np
+import time
+
 import sys
 sys.path.append("..")
 
 from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDateArray import FinDateArray
 from financepy.finutils.FinDayCount import FinDayCount, FinDayCountTypes
 from financepy.finutils.FinFrequency import FinFrequencyTypes
 
@@ -38,5 +42,78 @@ def test_FinDayCount():
                 dcf[0])
 
 
+###############################################################################
+
+
+def test_FinDayCountSerials():
+
+    freqTypes = [FinFrequencyTypes.ANNUAL, FinFrequencyTypes.SEMI_ANNUAL,
+                 FinFrequencyTypes.QUARTERLY, FinFrequencyTypes.MONTHLY]
+
+    # Period ends include month ends and the end of February
+    startDate = FinDate(29, 12, 2015)
+    startDates = [startDate.addDays(i * 13) for i in range(0, 400)]
+    endDates = [startDates[i].addMonths(1 + i % 14) for i in range(0, 400)]
+    endDates = [dt.EOM() if i % 3 == 0 else dt
+                for i, dt in enumerate(endDates)]
+    nextDates = [endDates[i].addDays(1 + i % 90) for i in range(0, 400)]
+    freqs = np.array([[1, 2, 4, 12][i % 4] for i in range(0, 400)])
+
+    starts = FinDateArray(startDates)._excelDate
+    ends = FinDateArray(endDates)._excelDate
+    nexts = FinDateArray(nextDates)._excelDate
+
+    testCases.header("DAY_COUNT_METHOD", "TERMINATION", "NUM DIFFS",
+                     "MAX DIFF")
+
+    for dayCountMethod in FinDayCountTypes:
+
+        dayCount = FinDayCount(dayCountMethod)
+
+        for isTerminationDate in [False, True]:
+
+            alphas = dayCount.yearFracSerials(starts, ends, nexts, freqs,
+                                              isTerminationDate)[0]
+
+            numDiffs = 0
+            maxDiff = 0.0
+
+            for i in range(0, len(startDates)):
+
+                alpha = dayCount.yearFrac(startDates[i],
+                                          endDates[i],
+                                          nextDates[i],
+                                          freqTypes[i % 4],
+                                          isTerminationDate)[0]
+
+                if alphas[i] != alpha:
+                    numDiffs += 1
+                    maxDiff = max(maxDiff, abs(alphas[i] - alpha))
+
+            testCases.print(str(dayCountMethod), isTerminationDate,
+                            numDiffs, maxDiff)
+
+    # Time the compiled loop against the scalar calls
+    dayCount = FinDayCount(FinDayCountTypes.ACT_ACT_ISDA)
+
+    start = time.time()
+    for i in range(0, len(startDates)):
+        dayCount.yearFrac(startDates[i], endDates[i])
+    end = time.time()
+    elapsedScalar = end - start
+
+    start = time.time()
+    dayCount.yearFracSerials(starts, ends)
+    end = time.time()
+    elapsedSerials = end - start
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("SCALAR", elapsedScalar)
+    testCases.print("SERIALS", elapsedSerials)
+
+###############################################################################
+
+
 test_FinDayCount()
+test_FinDayCountSerials()
 testCases.compareTestCases()
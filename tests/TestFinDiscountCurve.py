@@ -4,15 +4,21 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
+import time
 
 import sys
 sys.path.append("..")
 
 from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDateArray import FinDateArray
 from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinDayCount import FinDayCountTypes
 from financepy.market.curves.FinInterpolator import FinInterpTypes
 from financepy.market.curves.FinDiscountCurve import FinDiscountCurve
+from financepy.market.curves.FinDiscountCurveFlat import FinDiscountCurveFlat
 from financepy.finutils.FinMath import scale
+from financepy.products.bonds.FinBond import FinBond
+from financepy.products.bonds.FinBondZeroCurve import FinBondZeroCurve
 
 from FinTestCases import FinTestCases, globalTestCaseMode
 testCases = FinTestCases(__file__, globalTestCaseMode)
@@ -85,5 +91,89 @@ def test_FinDiscountCurve():
 ###############################################################################
 
 
+def test_FinDiscountCurveFastDfs():
+
+    startDate = FinDate(1, 1, 2018)
+    years = np.linspace(0, 10, 21)
+    rate = 0.05 + 0.005*years - 0.0003*years*years
+    dfs = np.exp(-rate * years)
+    dates = startDate.addYears(years)
+
+    times = np.linspace(0.0, 12.0, 1001)
+    dateArray = FinDateArray([startDate.addDays(i) for i in range(0, 4000, 3)])
+
+    testCases.header("INTERP", "DFTIMES MATCH", "DFSERIALS MATCH")
+
+    for interp in FinInterpTypes:
+
+        curve = FinDiscountCurve(startDate, dates, dfs, interp)
+
+        # Write the discount factors over the times to check aliasing
+        buffer = times.copy()
+        curve.dfTimes(buffer, buffer)
+        dfs1 = curve._df(times)
+        dfs2 = curve.df(dateArray)
+        dfs3 = curve.dfSerials(dateArray._excelDate)
+
+        testCases.print(str(interp),
+                        np.max(np.abs(buffer / dfs1 - 1.0)) < 1e-12,
+                        np.max(np.abs(dfs3 / dfs2 - 1.0)) < 1e-12)
+
+    # Curves with their own df fall back to it
+    curve = FinDiscountCurveFlat(startDate, 0.05)
+    testCases.print("FLAT CURVE", True,
+                    np.max(np.abs(curve.dfSerials(dateArray._excelDate) -
+                                  curve.df(dateArray))) < 1e-12)
+
+    # Including curves whose df only takes a single FinDate
+    bonds = []
+    for i, coupon in enumerate([0.03, 0.035, 0.04, 0.045, 0.05, 0.05]):
+        maturityDate = startDate.addYears(2 * i + 2)
+        bonds.append(FinBond(FinDate(1, 7, 2015), maturityDate, coupon,
+                             FinFrequencyTypes.SEMI_ANNUAL,
+                             FinDayCountTypes.ACT_ACT_ICMA))
+
+    curve = FinBondZeroCurve(startDate, bonds,
+                             [99.0, 98.5, 98.0, 97.0, 96.0, 95.0])
+    bondDfs = np.array([curve.df(dt) for dt in dateArray.toDates()])
+    testCases.print("BOND ZERO CURVE", True,
+                    np.max(np.abs(curve.dfSerials(dateArray._excelDate) -
+                                  bondDfs)) < 1e-12)
+
+    # Price 20 cashflows many times with each approach
+    numRepeats = 2000
+    flowTimes = np.linspace(0.5, 10.0, 20)
+    out = np.empty(len(flowTimes))
+
+    testCases.header("INTERP", "LABEL", "TIME")
+
+    for interp in [FinInterpTypes.FLAT_FWD_RATES,
+                   FinInterpTypes.NATCUBIC_ZERO_RATES]:
+
+        curve = FinDiscountCurve(startDate, dates, dfs, interp)
+
+        start = time.time()
+        for _ in range(0, numRepeats):
+            for t in flowTimes:
+                curve._df(t)
+        end = time.time()
+        testCases.print(str(interp), "SCALAR LOOP", end - start)
+
+        start = time.time()
+        for _ in range(0, numRepeats):
+            curve._df(flowTimes)
+        end = time.time()
+        testCases.print(str(interp), "VECTOR", end - start)
+
+        start = time.time()
+        for _ in range(0, numRepeats):
+            curve.dfTimes(flowTimes, out)
+        end = time.time()
+        testCases.print(str(interp), "BUFFER", end - start)
+
+###############################################################################
+
+
 test_FinDiscountCurve()
+test_FinDiscountCurveFastDfs()
 testCases.compareTestCases()
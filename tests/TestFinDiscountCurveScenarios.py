@@ -0,0 +1,192 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinError import FinError
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.products.rates.FinSwapBook import FinSwapBook
+from financepy.market.curves.FinInterpolator import FinInterpTypes
+from financepy.market.curves.FinDiscountCurve import FinDiscountCurve
+from financepy.market.curves.FinDiscountCurveScenarios import \
+    FinDiscountCurveScenarios
+from financepy.market.curves.FinDiscountCurveScenarios import keyRateShifts
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def buildCurve(valuationDate, interpType):
+    ''' An upward sloping discount curve. '''
+
+    years = np.array([0.0, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 40.0])
+    zeroRates = np.array([0.010, 0.011, 0.012, 0.015, 0.022, 0.028, 0.030,
+                          0.031])
+    dfDates = [valuationDate.addYears(t) for t in years]
+    dfValues = np.exp(-zeroRates * years)
+    return FinDiscountCurve(valuationDate, dfDates, dfValues, interpType)
+
+###############################################################################
+
+
+def test_FinDiscountCurveScenarios():
+
+    valuationDate = FinDate(15, 6, 2020)
+
+    dates = [valuationDate.addMonths(7 * i) for i in range(0, 80)]
+    shifts = np.linspace(-0.01, 0.01, 21)
+
+    ###########################################################################
+    # Each parallel shift scenario is the same as the bumped curve up to
+    # rounding
+    ###########################################################################
+
+    def same(x, y, rtol):
+        return all([np.allclose(x[i], y[i], rtol=rtol, atol=0.0)
+                    for i in range(0, len(shifts))])
+
+    testCases.header("INTERP", "FUNCTION", "SAME AS BUMPED CURVES")
+
+    for interpType in [FinInterpTypes.FLAT_FWD_RATES,
+                       FinInterpTypes.LINEAR_ZERO_RATES,
+                       FinInterpTypes.LINEAR_FWD_RATES]:
+
+        baseCurve = buildCurve(valuationDate, interpType)
+        scenarios = FinDiscountCurveScenarios(baseCurve, shifts)
+        curves = [baseCurve.bump(shift) for shift in shifts]
+
+        testCases.print(interpType, "DF",
+                        same(scenarios.df(dates),
+                             [c.df(dates) for c in curves], 1e-14))
+
+        testCases.print(interpType, "DF ONE DATE",
+                        same(scenarios.df(dates[5]),
+                             [c.df(dates[5]) for c in curves], 1e-14))
+
+        testCases.print(interpType, "ZERO RATE",
+                        same(scenarios.zeroRate(dates[1:],
+                                                FinFrequencyTypes.ANNUAL),
+                             [c.zeroRate(dates[1:], FinFrequencyTypes.ANNUAL)
+                              for c in curves], 1e-12))
+
+        # The forwards over one day lose digits to cancellation
+        testCases.print(interpType, "FWD",
+                        same(scenarios.fwd(dates),
+                             [c.fwd(dates) for c in curves], 1e-9))
+
+        testCases.print(interpType, "FWD RATE",
+                        same(scenarios.fwdRate(dates, "3M"),
+                             [c.fwdRate(dates, "3M") for c in curves], 1e-10))
+
+    ###########################################################################
+    # Key rate scenarios move one point of the curve
+    ###########################################################################
+
+    baseCurve = buildCurve(valuationDate, FinInterpTypes.FLAT_FWD_RATES)
+    bumpSize = 0.0001
+    scenarios = FinDiscountCurveScenarios(baseCurve,
+                                          keyRateShifts(baseCurve, bumpSize))
+
+    testCases.header("SCENARIO", "TIME", "ZERO RATE CHANGE (BP)")
+
+    for i in range(0, scenarios.numScenarios()):
+        t = baseCurve._times[i + 1]
+        dfBase = baseCurve._df(t)
+        dfBumped = scenarios._df(t)[i]
+        testCases.print(i, t, np.log(dfBase / dfBumped) / t * 10000)
+
+    testCases.header("LABEL", "RAISES")
+
+    try:
+        FinDiscountCurveScenarios(buildCurve(valuationDate,
+                                             FinInterpTypes.NATCUBIC_ZERO_RATES),
+                                  shifts)
+        testCases.print("SPLINE CURVE", False)
+    except FinError:
+        testCases.print("SPLINE CURVE", True)
+
+    ###########################################################################
+    # A scenario can be turned into a curve
+    ###########################################################################
+
+    testCases.header("LABEL", "SAME")
+    curve = scenarios.curve(3)
+    testCases.print("SCENARIO CURVE", np.allclose(curve.df(dates),
+                                                  scenarios.df(dates)[3],
+                                                  rtol=1e-14, atol=0.0))
+
+###############################################################################
+
+
+def test_FinDiscountCurveScenariosSwapBook():
+
+    valuationDate = FinDate(15, 6, 2020)
+
+    baseCurve = buildCurve(valuationDate, FinInterpTypes.FLAT_FWD_RATES)
+
+    swaps = []
+    for i in range(0, 500):
+        startDate = valuationDate.addDays(3 * i + 2)
+        swapType = FinSwapTypes.PAY if i % 2 == 0 else FinSwapTypes.RECEIVE
+        swap = FinIborSwap(startDate, str(1 + i % 30) + "Y", swapType,
+                           0.01 + 0.0001 * (i % 37),
+                           FinFrequencyTypes.SEMI_ANNUAL,
+                           FinDayCountTypes.THIRTY_E_360)
+        swaps.append(swap)
+
+    book = FinSwapBook(swaps)
+
+    shifts = np.linspace(-0.02, 0.02, 201)
+    scenarios = FinDiscountCurveScenarios(baseCurve, shifts)
+
+    ###########################################################################
+    # The scenario values of the book are the values on the bumped curves
+    ###########################################################################
+
+    start = time.time()
+    values = np.array([book.value(valuationDate, baseCurve.bump(shift))
+                       for shift in shifts])
+    end = time.time()
+    elapsedBump = end - start
+
+    book.valueScenarios(valuationDate, scenarios)
+
+    start = time.time()
+    scenarioValues = book.valueScenarios(valuationDate, scenarios)
+    end = time.time()
+    elapsedScenarios = end - start
+
+    # The values are the same to a small fraction of the notional
+    testCases.header("LABEL", "BOOK VALUE", "SAME AS BUMPED CURVES")
+    testCases.print("PARALLEL SHIFTS", round(np.sum(scenarioValues[100]), 4),
+                    np.max(np.abs(values - scenarioValues)) < 1e-6)
+
+    # The index curve can stay fixed while the discount curve moves
+    values = np.array([book.value(valuationDate, baseCurve.bump(shift),
+                                  baseCurve) for shift in shifts])
+    scenarioValues = book.valueScenarios(valuationDate, scenarios, baseCurve)
+    testCases.print("DISCOUNT SHIFTS", round(np.sum(scenarioValues[100]), 4),
+                    np.max(np.abs(values - scenarioValues)) < 1e-6)
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("BUMP 201 CURVES AND VALUE BOOK", elapsedBump)
+    testCases.print("VALUE BOOK ON 201 SCENARIOS", elapsedScenarios)
+
+###############################################################################
+
+
+test_FinDiscountCurveScenarios()
+test_FinDiscountCurveScenariosSwapBook()
+testCases.compareTestCases()
@@ -0,0 +1,112 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import time
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.finutils.FinError import FinError
+from financepy.finutils.FinHelperFunctions import setArgumentTypeChecking
+from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.products.bonds.FinBond import FinBond
+from financepy.market.curves.FinDiscountCurve import FinDiscountCurve
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def buildObjects(numObjects):
+    ''' Time the construction of swaps, bonds and discount curves. '''
+
+    valuationDate = FinDate(15, 6, 2020)
+    dfDates = [valuationDate.addYears(i) for i in range(1, 11)]
+    dfValues = np.exp(-0.02 * np.arange(1, 11))
+
+    start = time.time()
+    for _ in range(0, numObjects):
+        FinIborSwap(valuationDate, "5Y", FinSwapTypes.PAY, 0.02,
+                    FinFrequencyTypes.SEMI_ANNUAL,
+                    FinDayCountTypes.THIRTY_E_360)
+    end = time.time()
+    elapsedSwap = end - start
+
+    start = time.time()
+    for _ in range(0, numObjects):
+        FinBond(valuationDate, dfDates[-1], 0.03,
+                FinFrequencyTypes.SEMI_ANNUAL,
+                FinDayCountTypes.ACT_ACT_ICMA)
+    end = time.time()
+    elapsedBond = end - start
+
+    start = time.time()
+    for _ in range(0, numObjects):
+        FinDiscountCurve(valuationDate, dfDates, dfValues)
+    end = time.time()
+    elapsedCurve = end - start
+
+    return elapsedSwap, elapsedBond, elapsedCurve
+
+###############################################################################
+
+
+def test_FinCheckArgumentTypes():
+
+    valuationDate = FinDate(15, 6, 2020)
+
+    testCases.header("CHECKING", "RAISED")
+
+    for checking in [True, False]:
+
+        setArgumentTypeChecking(checking)
+
+        # A float32 coupon is not one of the allowed float types
+        raised = False
+        try:
+            FinBond(valuationDate, valuationDate.addYears(5),
+                    np.float32(0.03), FinFrequencyTypes.SEMI_ANNUAL,
+                    FinDayCountTypes.ACT_ACT_ICMA)
+        except FinError:
+            raised = True
+
+        testCases.print(checking, raised)
+
+    setArgumentTypeChecking(True)
+
+###############################################################################
+
+
+def test_FinCheckArgumentTypesTimings():
+
+    numObjects = 2000
+
+    setArgumentTypeChecking(True)
+    buildObjects(10)
+    elapsedChecked = buildObjects(numObjects)
+
+    setArgumentTypeChecking(False)
+    elapsedUnchecked = buildObjects(numObjects)
+
+    setArgumentTypeChecking(True)
+
+    testCases.header("OBJECT", "CHECKING", "TIME")
+
+    labels = ["FinIborSwap", "FinBond", "FinDiscountCurve"]
+    for i in range(0, len(labels)):
+        testCases.print(labels[i], True, elapsedChecked[i])
+        testCases.print(labels[i], False, elapsedUnchecked[i])
+
+###############################################################################
+
+
+test_FinCheckArgumentTypes()
+test_FinCheckArgumentTypesTimings()
+testCases.compareTestCases()
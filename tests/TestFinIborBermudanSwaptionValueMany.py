@@ -0,0 +1,135 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.finutils.FinGlobalTypes import FinExerciseTypes
+from financepy.products.rates.FinIborBermudanSwaption import FinIborBermudanSwaption
+from financepy.models.FinModelRatesBK import FinModelRatesBK
+from financepy.models.FinModelRatesHW import FinModelRatesHW
+from financepy.models.FinModelRatesBDT import FinModelRatesBDT
+from financepy.market.curves.FinDiscountCurveFlat import FinDiscountCurveFlat
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_FinIborBermudanSwaptionValueMany():
+    ''' Value a strike ladder and a book of Bermudan swaptions in one sweep
+    of the tree and compare with valuing them one at a time. '''
+
+    valuationDate = FinDate(1, 1, 2011)
+
+    liborCurve = FinDiscountCurveFlat(valuationDate,
+                                      0.0625,
+                                      FinFrequencyTypes.SEMI_ANNUAL,
+                                      FinDayCountTypes.ACT_365F)
+
+    numTimeSteps = 100
+
+    models = [("HW", FinModelRatesHW(0.01, 0.01, numTimeSteps)),
+              ("BK", FinModelRatesBK(0.20, 0.10, numTimeSteps)),
+              ("BDT", FinModelRatesBDT(0.20, numTimeSteps))]
+
+    # A ladder of co-terminal swaptions with the same exercise dates
+    exerciseDate = valuationDate.addYears(1)
+    swapMaturityDate = valuationDate.addYears(5)
+
+    ladder = []
+    for i in range(0, 11):
+
+        if i % 2 == 0:
+            fixedLegType = FinSwapTypes.PAY
+        else:
+            fixedLegType = FinSwapTypes.RECEIVE
+
+        if i % 3 == 0:
+            exerciseType = FinExerciseTypes.EUROPEAN
+        else:
+            exerciseType = FinExerciseTypes.BERMUDAN
+
+        swaption = FinIborBermudanSwaption(valuationDate,
+                                           exerciseDate,
+                                           swapMaturityDate,
+                                           fixedLegType,
+                                           exerciseType,
+                                           0.050 + 0.0025 * i,
+                                           FinFrequencyTypes.SEMI_ANNUAL,
+                                           FinDayCountTypes.ACT_365F)
+        ladder.append(swaption)
+
+    testCases.header("MODEL", "COUPON", "VALUE", "VALUE MANY", "SAME")
+
+    for name, model in models:
+
+        values = FinIborBermudanSwaption.valueMany(ladder, valuationDate,
+                                                   liborCurve, model)
+
+        for swaption, valueMany in zip(ladder, values):
+            value = swaption.value(valuationDate, liborCurve, model)
+            testCases.print(name, swaption._fixedCoupon, value, valueMany,
+                            abs(value - valueMany) < 1e-6)
+
+    # A book with different exercise and maturity dates
+    numTrades = 200
+
+    book = []
+    for i in range(0, numTrades):
+
+        if i % 2 == 0:
+            fixedLegType = FinSwapTypes.PAY
+        else:
+            fixedLegType = FinSwapTypes.RECEIVE
+
+        exerciseDate = valuationDate.addYears(1 + i % 5)
+        swapMaturityDate = exerciseDate.addYears(1 + i % 6)
+
+        swaption = FinIborBermudanSwaption(valuationDate,
+                                           exerciseDate,
+                                           swapMaturityDate,
+                                           fixedLegType,
+                                           FinExerciseTypes.BERMUDAN,
+                                           0.050 + 0.001 * (i % 20),
+                                           FinFrequencyTypes.SEMI_ANNUAL,
+                                           FinDayCountTypes.ACT_365F)
+        book.append(swaption)
+
+    timings = []
+
+    for name, model in models:
+
+        start = time.time()
+        for swaption in book:
+            swaption.value(valuationDate, liborCurve, model)
+        end = time.time()
+        elapsedLoop = end - start
+
+        start = time.time()
+        FinIborBermudanSwaption.valueMany(book, valuationDate, liborCurve,
+                                          model)
+        end = time.time()
+        elapsedMany = end - start
+
+        timings.append((name, elapsedLoop, elapsedMany))
+
+    testCases.header("METHOD", "TIME")
+
+    for name, elapsedLoop, elapsedMany in timings:
+        testCases.print(name + " VALUE EACH TRADE", elapsedLoop)
+        testCases.print(name + " VALUE MANY", elapsedMany)
+
+###############################################################################
+
+
+test_FinIborBermudanSwaptionValueMany()
+testCases.compareTestCases()
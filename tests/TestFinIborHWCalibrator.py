@@ -0,0 +1,224 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.products.rates.FinIborSwaption import FinIborSwaption
+from financepy.products.rates.FinIborHWCalibrator import FinIborHWCalibrator
+from financepy.models.FinModelRatesHW import FinModelRatesHW
+from financepy.models.FinModelRatesHW import FinHWEuropeanCalcType
+from financepy.market.curves.FinDiscountCurveFlat import FinDiscountCurveFlat
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def buildSwaptionGrid(valuationDate):
+    ''' A grid of payer and receiver swaptions with a range of expiries and
+    swap tenors. '''
+
+    swaptions = []
+
+    for expiryYears in [1, 2, 3, 5, 7]:
+        for tenorYears in [1, 2, 5, 10]:
+
+            exerciseDate = valuationDate.addYears(expiryYears)
+            maturityDate = exerciseDate.addYears(tenorYears)
+
+            for fixedLegType, strike in [(FinSwapTypes.PAY, 0.025),
+                                         (FinSwapTypes.RECEIVE, 0.035)]:
+
+                swaption = FinIborSwaption(valuationDate,
+                                           exerciseDate,
+                                           maturityDate,
+                                           fixedLegType,
+                                           strike,
+                                           FinFrequencyTypes.ANNUAL,
+                                           FinDayCountTypes.ACT_365F)
+
+                swaptions.append(swaption)
+
+    return swaptions
+
+###############################################################################
+
+
+def test_FinIborHWCalibrator():
+
+    valuationDate = FinDate(1, 1, 2020)
+
+    discountCurve = FinDiscountCurveFlat(valuationDate, 0.03,
+                                         FinFrequencyTypes.ANNUAL,
+                                         FinDayCountTypes.ACT_365F)
+
+    swaptions = buildSwaptionGrid(valuationDate)
+
+    sigma = 0.01
+    a = 0.05
+
+    model = FinModelRatesHW(sigma, a,
+                            europeanCalcType=FinHWEuropeanCalcType.JAMSHIDIAN)
+
+    start = time.time()
+    marketValues = [s.value(valuationDate, discountCurve, model)
+                    for s in swaptions]
+    end = time.time()
+    elapsedLoop = end - start
+
+    calibrator = FinIborHWCalibrator(valuationDate, discountCurve,
+                                     swaptions, marketValues)
+
+    ###########################################################################
+    # The grid values agree with the Jamshidian value of each swaption. The
+    # swaption value uses a small time step to relate the short rate to the
+    # bond prices so they are not identical.
+    ###########################################################################
+
+    values = calibrator.values(a, [sigma])
+
+    start = time.time()
+    values = calibrator.values(a, [sigma])
+    end = time.time()
+    elapsedGrid = end - start
+
+    testCases.header("SWAPTION", "EXPIRY", "VALUE", "GRID VALUE", "SAME")
+
+    for j, swaption in enumerate(swaptions):
+        diff = abs(values[j] / marketValues[j] - 1.0)
+        testCases.print(j, swaption._exerciseDate, marketValues[j],
+                        values[j], diff < 1e-4)
+
+    ###########################################################################
+    # The analytic derivatives agree with finite differences
+    ###########################################################################
+
+    _, dValuedSigma, dValueda = calibrator.valuesAndGradients(a, [sigma])
+
+    bump = 1e-6
+    fdSigma = (calibrator.values(a, [sigma + bump])
+               - calibrator.values(a, [sigma - bump])) / (2.0 * bump)
+    fdA = (calibrator.values(a + bump, [sigma])
+           - calibrator.values(a - bump, [sigma])) / (2.0 * bump)
+
+    errSigma = np.max(np.abs(fdSigma - dValuedSigma[:, 0]))
+    errA = np.max(np.abs(fdA - dValueda))
+
+    testCases.header("LABEL", "MAX DERIV", "SAME AS BUMPED")
+    testCases.print("DVALUE/DSIGMA", np.max(np.abs(dValuedSigma)),
+                    errSigma < 1e-5 * np.max(np.abs(dValuedSigma)))
+    testCases.print("DVALUE/DA", np.max(np.abs(dValueda)),
+                    errA < 1e-5 * np.max(np.abs(dValueda)))
+
+    ###########################################################################
+    # Calibrate a and sigma and then sigma with a fixed a
+    ###########################################################################
+
+    start = time.time()
+    aFit, sigmasFit = calibrator.calibrate()
+    end = time.time()
+    elapsedCalibrate = end - start
+
+    testCases.header("LABEL", "A", "SIGMA")
+    testCases.print("CALIBRATED", round(aFit, 5), round(sigmasFit[0], 6))
+
+    aFit, sigmasFit = calibrator.calibrate(a=0.05)
+    testCases.print("FIXED A", aFit, round(sigmasFit[0], 6))
+
+    model = calibrator.model()
+    testCases.header("LABEL", "MODEL SIGMA", "MODEL A")
+    testCases.print("MODEL", round(model._sigma, 6), model._a)
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("VALUE EACH SWAPTION", elapsedLoop)
+    testCases.print("VALUE GRID", elapsedGrid)
+    testCases.print("CALIBRATE A AND SIGMA", elapsedCalibrate)
+
+###############################################################################
+
+
+def test_FinIborHWCalibratorPiecewise():
+
+    valuationDate = FinDate(1, 1, 2020)
+
+    discountCurve = FinDiscountCurveFlat(valuationDate, 0.03,
+                                         FinFrequencyTypes.ANNUAL,
+                                         FinDayCountTypes.ACT_365F)
+
+    swaptions = buildSwaptionGrid(valuationDate)
+
+    # The volatility changes after 2 and 4 years
+    sigmaDates = [valuationDate.addYears(2), valuationDate.addYears(4)]
+    sigmas = np.array([0.012, 0.009, 0.007])
+    a = 0.03
+
+    calibrator = FinIborHWCalibrator(valuationDate, discountCurve,
+                                     swaptions, np.zeros(len(swaptions)),
+                                     sigmaDates)
+
+    marketValues = calibrator.values(a, sigmas)
+
+    calibrator = FinIborHWCalibrator(valuationDate, discountCurve,
+                                     swaptions, marketValues, sigmaDates)
+
+    ###########################################################################
+    # The analytic derivatives agree with finite differences
+    ###########################################################################
+
+    _, dValuedSigma, dValueda = calibrator.valuesAndGradients(a, sigmas)
+
+    bump = 1e-6
+
+    testCases.header("PARAMETER", "MAX DERIV", "SAME AS BUMPED")
+
+    for k in range(0, len(sigmas)):
+        sigmasUp = sigmas.copy()
+        sigmasDown = sigmas.copy()
+        sigmasUp[k] += bump
+        sigmasDown[k] -= bump
+        fd = (calibrator.values(a, sigmasUp)
+              - calibrator.values(a, sigmasDown)) / (2.0 * bump)
+        scale = np.max(np.abs(dValuedSigma[:, k]))
+        err = np.max(np.abs(fd - dValuedSigma[:, k]))
+        testCases.print("SIGMA " + str(k), scale, err < 1e-5 * scale)
+
+    fd = (calibrator.values(a + bump, sigmas)
+          - calibrator.values(a - bump, sigmas)) / (2.0 * bump)
+    scale = np.max(np.abs(dValueda))
+    err = np.max(np.abs(fd - dValueda))
+    testCases.print("A", scale, err < 1e-5 * scale)
+
+    ###########################################################################
+    # The calibration recovers the parameters
+    ###########################################################################
+
+    start = time.time()
+    aFit, sigmasFit = calibrator.calibrate()
+    end = time.time()
+    elapsedCalibrate = end - start
+
+    testCases.header("LABEL", "A", "SIGMA 1", "SIGMA 2", "SIGMA 3")
+    testCases.print("TRUE", a, sigmas[0], sigmas[1], sigmas[2])
+    testCases.print("CALIBRATED", round(aFit, 6), round(sigmasFit[0], 7),
+                    round(sigmasFit[1], 7), round(sigmasFit[2], 7))
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("CALIBRATE A AND 3 SIGMAS", elapsedCalibrate)
+
+###############################################################################
+
+
+test_FinIborHWCalibrator()
+test_FinIborHWCalibratorPiecewise()
+testCases.compareTestCases()
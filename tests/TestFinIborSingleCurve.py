@@ -18,6 +18,7 @@ from financepy.products.rates.FinIborFRA import FinIborFRA
 from financepy.products.rates.FinIborFuture import FinIborFuture
 from financepy.products.rates.FinIborDeposit import FinIborDeposit
 from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.products.rates.FinCurveRisk import bucketedDV01
 from financepy.finutils.FinCalendar import FinBusDayAdjustTypes
 from financepy.market.curves.FinInterpolator import FinInterpTypes
 from financepy.finutils.FinMath import ONE_MILLION
@@ -723,6 +724,245 @@ def test_bloombergPricingExample(interpType):
     
 ###############################################################################
 
+
+def buildIborInstruments(currency, quoteBumps=None):
+    ''' Realistic sets of calibration instruments for the bootstrap
+    comparison. USD uses deposits, futures and semi-annual swaps while EUR
+    uses deposits, FRAs and annual swaps against a six month index. The
+    optional quoteBumps are added to the quotes in the order deposits, FRAs
+    and swaps. '''
+
+    valuationDate = FinDate(6, 6, 2018)
+    settlementDate = valuationDate.addWeekDays(2)
+    tenors = ["2Y", "3Y", "4Y", "5Y", "6Y", "7Y", "8Y", "9Y", "10Y", "11Y",
+              "12Y", "15Y", "20Y", "25Y", "30Y", "40Y", "50Y"]
+
+    depos = []
+    fras = []
+    swaps = []
+
+    if quoteBumps is None:
+        quoteBumps = np.zeros(30)
+
+    if currency == "USD":
+
+        depos.append(FinIborDeposit(valuationDate, "3M",
+                                    0.0231381 + quoteBumps[0],
+                                    FinDayCountTypes.ACT_360))
+
+        prices = [97.6675, 97.5200, 97.3550, 97.2450, 97.1450, 97.0750]
+        convexities = [-0.00005, -0.00060, -0.00146, -0.00263, -0.00411,
+                       -0.00589]
+
+        for i in range(0, len(prices)):
+            fut = FinIborFuture(valuationDate, i + 1)
+            fra = fut.toFRA(prices[i], convexities[i])
+            fra._fraRate += quoteBumps[1 + i]
+            fras.append(fra)
+
+        rates = [2.776, 2.863, 2.904, 2.929, 2.942, 2.956, 2.971, 2.986,
+                 3.000, 3.015, 3.025, 3.043, 3.048, 3.034, 3.012, 2.971,
+                 2.926]
+
+        for i in range(0, len(tenors)):
+            swap = FinIborSwap(settlementDate, tenors[i], FinSwapTypes.PAY,
+                               rates[i] / 100.0 + quoteBumps[7 + i],
+                               FinFrequencyTypes.SEMI_ANNUAL,
+                               FinDayCountTypes.THIRTY_E_360)
+            swaps.append(swap)
+
+    else:
+
+        for tenor, rate in [("1M", -0.0037), ("3M", -0.0032),
+                            ("6M", -0.0027)]:
+            rate += quoteBumps[len(depos)]
+            depos.append(FinIborDeposit(settlementDate, tenor, rate,
+                                        FinDayCountTypes.ACT_360))
+
+        for startTenor, rate in [("3M", -0.0024), ("6M", -0.0021),
+                                 ("12M", -0.0012)]:
+            rate += quoteBumps[3 + len(fras)]
+            fraStartDate = settlementDate.addTenor(startTenor)
+            fras.append(FinIborFRA(fraStartDate, "6M", rate,
+                                   FinDayCountTypes.ACT_360))
+
+        rates = [-0.05, 0.03, 0.12, 0.22, 0.33, 0.44, 0.55, 0.65, 0.74,
+                 0.82, 0.89, 1.04, 1.15, 1.18, 1.18, 1.12, 1.05]
+
+        for i in range(0, len(tenors)):
+            swap = FinIborSwap(settlementDate, tenors[i], FinSwapTypes.PAY,
+                               rates[i] / 100.0 + quoteBumps[6 + i],
+                               FinFrequencyTypes.ANNUAL,
+                               FinDayCountTypes.THIRTY_E_360_ISDA,
+                               floatFreqType=FinFrequencyTypes.SEMI_ANNUAL,
+                               floatDayCountType=FinDayCountTypes.ACT_360)
+            swaps.append(swap)
+
+    return valuationDate, depos, fras, swaps
+
+###############################################################################
+
+
+def test_FinIborIncrementalBootstrap():
+
+    numRepeats = 5
+
+    testCases.header("CURRENCY", "INTERP", "MAX DF DIFF < 1E-9",
+                     "MAX SWAP VALUE < 1E-12")
+
+    for currency in ["USD", "EUR"]:
+
+        valuationDate, depos, fras, swaps = buildIborInstruments(currency)
+
+        for interpType in [FinInterpTypes.FLAT_FWD_RATES,
+                           FinInterpTypes.LINEAR_ZERO_RATES,
+                           FinInterpTypes.LINEAR_FWD_RATES,
+                           FinInterpTypes.NATCUBIC_LOG_DISCOUNT]:
+
+            curve = FinIborSingleCurve(valuationDate, depos, fras, swaps,
+                                       interpType)
+            dfsIncremental = curve._dfs.copy()
+
+            maxSwapValue = 0.0
+            for swap in swaps:
+                v = swap.value(valuationDate, curve, curve, None)
+                v = abs(v / swap._fixedLeg._notional)
+                maxSwapValue = max(maxSwapValue, v)
+
+            curve._buildCurveUsing1DSolver()
+            maxDiff = np.max(np.abs(curve._dfs - dfsIncremental))
+
+            # The spline curves do not reprice the FRAs exactly so the swaps
+            # are not repriced to machine precision with either builder
+            if interpType == FinInterpTypes.NATCUBIC_LOG_DISCOUNT:
+                testCases.print(currency, str(interpType), maxDiff < 1e-9,
+                                "-")
+            else:
+                testCases.print(currency, str(interpType), maxDiff < 1e-9,
+                                maxSwapValue < 1e-12)
+
+    testCases.header("CURRENCY", "METHOD", "TIME")
+
+    for currency in ["USD", "EUR"]:
+
+        valuationDate, depos, fras, swaps = buildIborInstruments(currency)
+        curve = FinIborSingleCurve(valuationDate, depos, fras, swaps)
+
+        start = time.time()
+        for _ in range(0, numRepeats):
+            curve._buildCurveUsing1DSolver()
+        end = time.time()
+        testCases.print(currency, "1D SOLVER", (end - start) / numRepeats)
+
+        start = time.time()
+        for _ in range(0, numRepeats):
+            curve._buildCurveIncremental()
+        end = time.time()
+        testCases.print(currency, "INCREMENTAL", (end - start) / numRepeats)
+
+###############################################################################
+
+
+def test_FinIborBucketedDV01():
+
+    testCases.header("CURRENCY", "INTERP", "MAX DV01 DIFF < 1E-3")
+    timings = []
+
+    for currency in ["USD", "EUR"]:
+
+        for interpType in [FinInterpTypes.FLAT_FWD_RATES,
+                           FinInterpTypes.LINEAR_ZERO_RATES,
+                           FinInterpTypes.LINEAR_FWD_RATES]:
+
+            valuationDate, depos, fras, swaps = \
+                buildIborInstruments(currency)
+            numQuotes = len(depos) + len(fras) + len(swaps)
+
+            curve = FinIborSingleCurve(valuationDate, depos, fras, swaps,
+                                       interpType)
+
+            swap = FinIborSwap(valuationDate.addWeekDays(2), "7Y",
+                               FinSwapTypes.RECEIVE, 0.025,
+                               FinFrequencyTypes.SEMI_ANNUAL,
+                               FinDayCountTypes.THIRTY_E_360,
+                               notional=10 * ONE_MILLION)
+
+            start = time.time()
+            dv01 = bucketedDV01(swap, curve)
+            end = time.time()
+            elapsedAnalytic = end - start
+
+            # The curve adds a synthetic deposit to the spot date that is a
+            # copy of the first deposit so both move with its quote
+            if len(dv01) > numQuotes:
+                dv01 = np.concatenate([[dv01[0] + dv01[1]], dv01[2:]])
+
+            start = time.time()
+            dv01Rebuild = np.zeros(numQuotes)
+            for i in range(0, numQuotes):
+                values = []
+                for bump in [0.0001, -0.0001]:
+                    quoteBumps = np.zeros(30)
+                    quoteBumps[i] = bump
+                    _, depos, fras, swaps = \
+                        buildIborInstruments(currency, quoteBumps)
+                    bumpedCurve = FinIborSingleCurve(valuationDate, depos,
+                                                     fras, swaps, interpType)
+                    values.append(swap.value(valuationDate, bumpedCurve,
+                                             bumpedCurve, None))
+                dv01Rebuild[i] = (values[0] - values[1]) / 2.0
+            end = time.time()
+            elapsedRebuild = end - start
+
+            maxDiff = np.max(np.abs(dv01 - dv01Rebuild))
+            testCases.print(currency, str(interpType), maxDiff < 1e-3)
+            timings.append((currency, str(interpType), elapsedAnalytic,
+                            elapsedRebuild))
+
+    testCases.header("CURRENCY", "INTERP", "METHOD", "TIME")
+
+    for currency, interpType, elapsedAnalytic, elapsedRebuild in timings:
+        testCases.print(currency, interpType, "JACOBIAN", elapsedAnalytic)
+        testCases.print(currency, interpType, "REBUILD", elapsedRebuild)
+
+
+class ZeroCouponTrade():
+    ''' A trade which cannot be written as curve terms so its DV01 is found by
+    revaluing it. Each valuation also reads a curve that is shared. '''
+
+    def __init__(self, paymentDate, sharedCurve):
+        self._paymentDate = paymentDate
+        self._sharedCurve = sharedCurve
+        self._sharedDfs = []
+
+    def value(self, valuationDate, curve):
+        self._sharedDfs.append(self._sharedCurve.df(self._paymentDate))
+        return ONE_MILLION * curve.df(self._paymentDate)
+
+###############################################################################
+
+
+def test_FinIborSharedCurveRisk():
+    ''' The risk functions do not change the curve as it may be shared. '''
+
+    valuationDate, depos, fras, swaps = buildIborInstruments("USD")
+    curve = FinIborSingleCurve(valuationDate, depos, fras, swaps)
+    savedDfs = np.array(curve._dfs)
+
+    trade = ZeroCouponTrade(valuationDate.addYears(7), curve)
+    dfBefore = curve.df(trade._paymentDate)
+    dv01 = bucketedDV01(trade, curve)
+
+    testCases.header("LABEL", "VALUE")
+    testCases.print("SUM DV01", round(np.sum(dv01), 6))
+    testCases.print("UNCHANGED WHILE VALUED",
+                    all(df == dfBefore for df in trade._sharedDfs))
+    testCases.print("UNCHANGED AFTER",
+                    np.array_equal(curve._dfs, savedDfs) and
+                    curve.df(trade._paymentDate) == dfBefore)
+
+###############################################################################
+
 if 1==0:
     for interpType in FinInterpTypes:
         start = time.time()
@@ -736,5 +976,8 @@ test_FinIborDepositsOnly()
 test_FinIborFRAsOnly()
 test_FinIborDepositsFRAsSwaps()
 test_FinIborDepositsFuturesSwaps()
+test_FinIborIncrementalBootstrap()
+test_FinIborBucketedDV01()
+test_FinIborSharedCurveRisk()
 
 testCases.compareTestCases()
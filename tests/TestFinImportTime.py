@@ -0,0 +1,125 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import os
+import subprocess
+import tempfile
+import time
+
+import sys
+sys.path.append("..")
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+packageDir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Each import is done in a new process so that nothing is already loaded
+importStatements = {
+    "financepy": "import financepy",
+    "FinDate": "from financepy.finutils import FinDate",
+    "FinIborSwap": "from financepy.products.rates import FinIborSwap",
+    "FinCDS": "from financepy.products.credit import FinCDS",
+    "FinModelRatesHW": "import financepy.models.FinModelRatesHW"}
+
+warmUpStatement = '''
+from financepy.finutils.FinWarmUp import warmUp
+warmUp(["financepy.finutils.FinMath", "financepy.models.FinModelRatesHW"])
+'''
+
+###############################################################################
+
+
+def timeStatement(statement, cacheDir):
+    ''' Time a statement run in a new python process with its own numba cache
+    directory. The python start up time is removed. '''
+
+    env = dict(os.environ)
+    env["NUMBA_CACHE_DIR"] = cacheDir
+    env["PYTHONPATH"] = packageDir
+
+    code = "import time; t = time.time(); " + statement.strip() + \
+           "\nprint(time.time() - t)"
+
+    result = subprocess.run([sys.executable, "-c", code], env=env,
+                            capture_output=True, text=True, check=True)
+
+    return float(result.stdout.split()[-1])
+
+###############################################################################
+
+
+def countModules(statement, packageName):
+    ''' Count the modules of a package that a statement run in a new python
+    process has imported. '''
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = packageDir
+
+    code = statement.strip() + "\nimport sys\nprint(len([m for m in " + \
+        "sys.modules if m.startswith('" + packageName + ".')]))"
+
+    result = subprocess.run([sys.executable, "-c", code], env=env,
+                            capture_output=True, text=True, check=True)
+
+    return int(result.stdout.split()[-1])
+
+###############################################################################
+
+
+def test_FinLazyModules():
+    ''' Importing a name from a package only imports the module that defines
+    it and the modules that this module needs. '''
+
+    packageName = "financepy.products.rates"
+
+    statements = {
+        "MODULE NAME": "from " + packageName + " import FinIborDualCurve",
+        "FUNCTION NAME": "from " + packageName + " import quoteJacobian",
+        "WHOLE PACKAGE": "from " + packageName + " import *"}
+
+    testCases.header("IMPORT", "RATES MODULES")
+
+    for label, statement in statements.items():
+        testCases.print(label, countModules(statement, packageName))
+
+###############################################################################
+
+
+def test_FinImportTime():
+
+    testCases.header("IMPORT", "START", "TIME")
+
+    with tempfile.TemporaryDirectory() as cacheDir:
+
+        # The first import compiles the kernels into the empty numba cache
+        for label, statement in importStatements.items():
+            elapsed = timeStatement(statement, cacheDir)
+            testCases.print(label, "COLD", elapsed)
+
+        for label, statement in importStatements.items():
+            elapsed = timeStatement(statement, cacheDir)
+            testCases.print(label, "WARM", elapsed)
+
+    testCases.header("WARM UP", "TIME")
+
+    with tempfile.TemporaryDirectory() as cacheDir:
+
+        start = time.time()
+        timeStatement(warmUpStatement, cacheDir)
+        end = time.time()
+        testCases.print("COMPILE", end - start)
+
+        elapsed = timeStatement(importStatements["FinModelRatesHW"],
+                                cacheDir)
+        testCases.print("IMPORT AFTER WARM UP", elapsed)
+
+###############################################################################
+
+
+test_FinLazyModules()
+test_FinImportTime()
+testCases.compareTestCases()
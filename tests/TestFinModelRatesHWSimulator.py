@@ -0,0 +1,172 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.models.FinModelRatesHWSimulator import FinModelRatesHWSimulator
+from financepy.market.curves.FinDiscountCurve import FinDiscountCurve
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def buildCurve(valuationDate):
+    ''' An upward sloping discount curve. '''
+
+    years = np.array([0.0, 1.0, 2.0, 5.0, 10.0, 30.0])
+    zeroRates = np.array([0.010, 0.010, 0.015, 0.022, 0.028, 0.031])
+    dfDates = [valuationDate.addYears(t) for t in years]
+    dfValues = np.exp(-zeroRates * years)
+    return FinDiscountCurve(valuationDate, dfDates, dfValues)
+
+###############################################################################
+
+
+def test_FinModelRatesHWSimulatorCurve():
+
+    valuationDate = FinDate(1, 1, 2020)
+    discountCurve = buildCurve(valuationDate)
+
+    # The dates are far apart as the transitions are exact
+    simDates = [valuationDate.addYears(i) for i in [0, 1, 2, 5, 10, 20]]
+    dfs = discountCurve.df(simDates)
+
+    ###########################################################################
+    # The bank account discount factors average to the curve
+    ###########################################################################
+
+    testCases.header("GENERATOR", "DATE", "CURVE DF", "MC DF", "DIFF")
+
+    for useSobol in [False, True]:
+
+        simulator = FinModelRatesHWSimulator(0.01, 0.05, 20000,
+                                             useSobol=useSobol)
+
+        _, rt, mcDfs = simulator.simulate(valuationDate, discountCurve,
+                                          simDates)
+
+        name = "SOBOL" if useSobol else "PSEUDO"
+
+        for i, dt in enumerate(simDates):
+            mcDf = np.mean(mcDfs[:, i])
+            testCases.print(name, dt, dfs[i], mcDf, mcDf - dfs[i])
+
+    ###########################################################################
+    # The paths do not depend on the chunk size
+    ###########################################################################
+
+    testCases.header("GENERATOR", "CHUNK SIZE", "SAME PATHS")
+
+    for useSobol in [False, True]:
+
+        simulator = FinModelRatesHWSimulator(0.01, 0.05, 1000,
+                                             useSobol=useSobol)
+        _, rt1, dfs1 = simulator.simulate(valuationDate, discountCurve,
+                                          simDates)
+
+        simulator = FinModelRatesHWSimulator(0.01, 0.05, 1000,
+                                             useSobol=useSobol, chunkSize=128)
+        _, rt2, dfs2 = simulator.simulate(valuationDate, discountCurve,
+                                          simDates)
+
+        name = "SOBOL" if useSobol else "PSEUDO"
+        testCases.print(name, 128, np.array_equal(rt1, rt2)
+                        and np.array_equal(dfs1, dfs2))
+
+###############################################################################
+
+
+def test_FinModelRatesHWSimulatorSwap():
+
+    valuationDate = FinDate(1, 1, 2020)
+    discountCurve = buildCurve(valuationDate)
+
+    simulator = FinModelRatesHWSimulator(0.01, 0.05, 20000, useSobol=True,
+                                         chunkSize=5000)
+
+    ###########################################################################
+    # The discounted value of a forward starting swap is a martingale up to
+    # its start date
+    ###########################################################################
+
+    startDate = valuationDate.addYears(2)
+
+    swap = FinIborSwap(startDate, "5Y", FinSwapTypes.PAY, 0.03,
+                       FinFrequencyTypes.ANNUAL,
+                       FinDayCountTypes.ACT_360)
+
+    simDates = [valuationDate.addMonths(6 * i) for i in range(0, 5)]
+
+    exposures = simulator.swapExposures(swap, valuationDate, discountCurve,
+                                        simDates)
+
+    v0 = swap.value(valuationDate, discountCurve)
+
+    testCases.header("DATE", "SWAP VALUE", "DISCOUNTED EE", "DIFF")
+
+    for i, dt in enumerate(simDates):
+        v = exposures['discountedEE'][i]
+        testCases.print(dt, v0, v, v - v0)
+
+    start = time.time()
+    values = simulator.swapValues(swap, valuationDate, discountCurve,
+                                  simDates)
+    end = time.time()
+    elapsed = end - start
+
+    testCases.header("LABEL", "SAME AS EE")
+    testCases.print("MEAN PATH VALUES",
+                    np.allclose(np.mean(values, axis=0), exposures['ee']))
+
+    ###########################################################################
+    # The exposure profile of a seasoned swap whose floating rates fix on the
+    # paths. The first fixing was set before the valuation date.
+    ###########################################################################
+
+    swap = FinIborSwap(valuationDate.addMonths(-2), "5Y", FinSwapTypes.PAY,
+                       0.02, FinFrequencyTypes.ANNUAL,
+                       FinDayCountTypes.ACT_360)
+
+    firstFixingRate = 0.015
+    simDates = [valuationDate.addMonths(3 * i) for i in range(0, 21)]
+
+    start = time.time()
+    exposures = simulator.swapExposures(swap, valuationDate, discountCurve,
+                                        simDates, firstFixingRate)
+    end = time.time()
+    elapsedExposures = end - start
+
+    v0 = swap.value(valuationDate, discountCurve, None, firstFixingRate)
+
+    testCases.header("LABEL", "SWAP VALUE", "MC VALUE AT TIME ZERO")
+    testCases.print("SEASONED SWAP", v0, exposures['ee'][0])
+
+    testCases.header("DATE", "EE", "EPE", "ENE", "DISCOUNTED EPE")
+
+    for i, dt in enumerate(simDates):
+        testCases.print(dt, exposures['ee'][i], exposures['epe'][i],
+                        exposures['ene'][i], exposures['discountedEPE'][i])
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("SWAP VALUES 20000 PATHS 5 DATES", elapsed)
+    testCases.print("EXPOSURES 20000 PATHS 21 DATES", elapsedExposures)
+
+###############################################################################
+
+
+test_FinModelRatesHWSimulatorCurve()
+test_FinModelRatesHWSimulatorSwap()
+testCases.compareTestCases()
@@ -0,0 +1,142 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import numba
+
+import sys
+sys.path.append("..")
+
+from financepy.models.FinModelRatesLMM import LMMSimulateFwds1F
+from financepy.models.FinModelRatesLMM import LMMSimulateFwdsMF
+from financepy.models.FinModelRatesLMM import LMMSimulateFwds1F_Parallel
+from financepy.models.FinModelRatesLMM import LMMSimulateFwdsMF_Parallel
+from financepy.models.FinModelRatesLMM import LMMSimulateFwdsNF_Parallel
+from financepy.models.FinModelRatesLMM import LMMSwaptionPricer
+from financepy.models.FinModelRatesLMM import LMMSwaptionPricer_Parallel
+from financepy.models.FinModelRatesLMM import LMMCapFlrPricer
+from financepy.models.FinModelRatesLMM import LMMCapFlrPricer_Parallel
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+# The Hull book example of an 11 forward annual curve
+
+numFwds = 11
+taus = np.ones(numFwds)
+fwd0 = np.full(numFwds, 0.05127)
+
+gammas1F = np.array([0.00, 0.1550, 0.2063674, 0.1720986, 0.1721993,
+                     0.1524579, 0.1414779, 0.1297711, 0.1381053, 0.135955,
+                     0.1339842])
+
+lambdas2F = np.array([[0.00, 0.1410, 0.1952, 0.1678, 0.1711, 0.1525,
+                       0.1406, 0.1265, 0.1306, 0.1236, 0.1163],
+                      [0.00, -0.0645, -0.0670, -0.0384, -0.0196, 0.00,
+                       0.0161, 0.0289, 0.0448, 0.0565, 0.0665]])
+
+correl = np.array([[np.exp(-0.1 * abs(i - j)) for j in range(numFwds)]
+                   for i in range(numFwds)])
+
+# Entries of the forward matrix that are set by the one and multi-factor
+# simulations. Forward k is not evolved after it fixes at time k.
+simulated = np.array([[t == 0 or k >= t - 1 for k in range(numFwds)]
+                      for t in range(numFwds)])
+
+###############################################################################
+
+
+def parallelPrices(numPaths, useSobol, seed):
+    ''' Simulate and price on the threads that have been set. '''
+
+    fwds1F = LMMSimulateFwds1F_Parallel(numFwds, numPaths, 0, fwd0, gammas1F,
+                                        taus, useSobol, seed)
+
+    fwdsMF = LMMSimulateFwdsMF_Parallel(numFwds, 2, numPaths, 0, fwd0,
+                                        lambdas2F, taus, useSobol, seed)
+
+    fwdsNF = LMMSimulateFwdsNF_Parallel(numFwds, numPaths, fwd0, gammas1F,
+                                        correl, taus, seed)
+
+    prices = []
+    for fwds in [fwds1F, fwdsMF, fwdsNF]:
+        prices.append(LMMSwaptionPricer_Parallel(0.05, 3, 8, numPaths, fwd0,
+                                                 fwds, taus, 1))
+        prices.extend(LMMCapFlrPricer_Parallel(numFwds, numPaths, 0.05, fwd0,
+                                               fwds, taus, 1))
+
+    return fwds1F[:, simulated], np.array(prices)
+
+###############################################################################
+
+
+def test_LMMParallelDeterminism():
+
+    numPaths = 10000
+    seed = 42
+    maxThreads = numba.config.NUMBA_NUM_THREADS
+
+    testCases.header("GENERATOR", "SAME FOR ALL THREADS")
+
+    for useSobol in [0, 1]:
+
+        numba.set_num_threads(1)
+        fwds1, prices1 = parallelPrices(numPaths, useSobol, seed)
+
+        same = True
+        for numThreads in range(2, maxThreads + 1):
+            numba.set_num_threads(numThreads)
+            fwds, prices = parallelPrices(numPaths, useSobol, seed)
+            same = same and np.array_equal(fwds, fwds1) \
+                and np.array_equal(prices, prices1)
+
+        numba.set_num_threads(maxThreads)
+        name = "SOBOL" if useSobol else "PSEUDO"
+        testCases.print(name, same)
+
+    ###########################################################################
+    # With Sobol numbers the parallel simulations give the serial paths
+    ###########################################################################
+
+    fwdsA = LMMSimulateFwds1F(numFwds, numPaths, 0, fwd0, gammas1F, taus,
+                              1, seed)
+    fwdsB = LMMSimulateFwds1F_Parallel(numFwds, numPaths, 0, fwd0, gammas1F,
+                                       taus, 1, seed)
+
+    fwdsC = LMMSimulateFwdsMF(numFwds, 2, numPaths, 0, fwd0, lambdas2F,
+                              taus, 1, seed)
+    fwdsD = LMMSimulateFwdsMF_Parallel(numFwds, 2, numPaths, 0, fwd0,
+                                       lambdas2F, taus, 1, seed)
+
+    # Numba may round the compiled kernels differently in the last bit
+    diffAB = np.max(np.abs(fwdsA[:, simulated] - fwdsB[:, simulated]))
+    diffCD = np.max(np.abs(fwdsC[:, simulated] - fwdsD[:, simulated]))
+
+    testCases.header("MODEL", "SAME AS SERIAL")
+    testCases.print("ONE FACTOR", diffAB < 1e-14)
+    testCases.print("TWO FACTOR", diffCD < 1e-14)
+
+    ###########################################################################
+    # The parallel pricers only change the order of the sum over paths
+    ###########################################################################
+
+    v1 = LMMSwaptionPricer(0.05, 3, 8, numPaths, fwd0, fwdsA, taus, 1)
+    v2 = LMMSwaptionPricer_Parallel(0.05, 3, 8, numPaths, fwd0, fwdsA, taus, 1)
+
+    c1 = LMMCapFlrPricer(numFwds, numPaths, 0.05, fwd0, fwdsA, taus, 1)
+    c2 = LMMCapFlrPricer_Parallel(numFwds, numPaths, 0.05, fwd0, fwdsA,
+                                  taus, 1)
+
+    testCases.header("PRODUCT", "SERIAL", "PARALLEL", "CLOSE")
+    testCases.print("PAYER SWAPTION", round(v1, 10), round(v2, 10),
+                    abs(v1 - v2) < 1e-14)
+    testCases.print("CAP", round(np.sum(c1), 10), round(np.sum(c2), 10),
+                    np.max(np.abs(c1 - c2)) < 1e-14)
+
+###############################################################################
+
+
+test_LMMParallelDeterminism()
+testCases.compareTestCases()
@@ -0,0 +1,216 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinError import FinError
+from financepy.models.FinModelRatesLMM import LMMSimulateFwds1F_Parallel
+from financepy.models.FinModelRatesLMM import LMMSimulateFwdsNF_Parallel
+from financepy.models.FinModelRatesLMM import LMMSwaptionPricer
+from financepy.models.FinModelRatesLMM import LMMCapFlrPricer
+from financepy.models.FinModelRatesLMM import LMMRatchetCapletPricer
+from financepy.models.FinModelRatesLMM import LMMStickyCapletPricer
+from financepy.models.FinModelRatesLMM import LMMFlexiCapPricer
+from financepy.models.FinModelRatesLMMStreaming import LMMStreamFwds1F
+from financepy.models.FinModelRatesLMMStreaming import LMMStreamFwdsNF
+from financepy.models.FinModelRatesLMMStreaming import FinLMMSwaptionAccumulator
+from financepy.models.FinModelRatesLMMStreaming import FinLMMCapFloorAccumulator
+from financepy.models.FinModelRatesLMMStreaming import FinLMMRatchetAccumulator
+from financepy.models.FinModelRatesLMMStreaming import FinLMMStickyAccumulator
+from financepy.models.FinModelRatesLMMStreaming import FinLMMFlexiCapAccumulator
+from financepy.models.FinModelRatesLMMStreaming import _swaptionPayoffs
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+# The Hull book example of an 11 forward annual curve
+
+numFwds = 11
+taus = np.ones(numFwds)
+fwd0 = np.full(numFwds, 0.05127)
+
+gammas1F = np.array([0.00, 0.1550, 0.2063674, 0.1720986, 0.1721993,
+                     0.1524579, 0.1414779, 0.1297711, 0.1381053, 0.135955,
+                     0.1339842])
+
+correl = np.array([[np.exp(-0.1 * abs(i - j)) for j in range(numFwds)]
+                   for i in range(numFwds)])
+
+spread = 0.0025
+
+###############################################################################
+
+
+def makeAccumulators():
+    ''' One of each product on the same simulation. '''
+
+    return {"PAYER SWAPTION": FinLMMSwaptionAccumulator(0.05, 3, 8, 1),
+            "CAP": FinLMMCapFloorAccumulator(numFwds, 0.05, 1),
+            "FLOOR": FinLMMCapFloorAccumulator(numFwds, 0.05, 0),
+            "RATCHET": FinLMMRatchetAccumulator(numFwds, spread),
+            "STICKY": FinLMMStickyAccumulator(numFwds, spread),
+            "FLEXICAP": FinLMMFlexiCapAccumulator(4, 0.05, numFwds)}
+
+###############################################################################
+
+
+def fullTensorValues(fwds, numPaths):
+    ''' The values of the same products from the matrix of all of the paths.
+    '''
+
+    return {"PAYER SWAPTION": LMMSwaptionPricer(0.05, 3, 8, numPaths, fwd0,
+                                                fwds, taus, 1),
+            "CAP": np.sum(LMMCapFlrPricer(numFwds, numPaths, 0.05, fwd0,
+                                          fwds, taus, 1)),
+            "FLOOR": np.sum(LMMCapFlrPricer(numFwds, numPaths, 0.05, fwd0,
+                                            fwds, taus, 0)),
+            "RATCHET": np.sum(LMMRatchetCapletPricer(spread, numFwds,
+                                                     numPaths, fwd0, fwds,
+                                                     taus)),
+            "STICKY": np.sum(LMMStickyCapletPricer(spread, numFwds, numPaths,
+                                                   fwd0, fwds, taus)),
+            "FLEXICAP": LMMFlexiCapPricer(4, 0.05, numFwds, numPaths, fwd0,
+                                          fwds, taus)}
+
+###############################################################################
+
+
+def test_LMMStreaming():
+
+    numPaths = 20000
+    seed = 42
+
+    ###########################################################################
+    # Streaming the paths in chunks gives the prices of the full matrix of
+    # the same paths up to the order of the sums
+    ###########################################################################
+
+    testCases.header("MODEL", "PRODUCT", "FULL", "STREAMED", "STD ERROR",
+                     "CLOSE")
+
+    for useSobol in [0, 1]:
+
+        fwds = LMMSimulateFwds1F_Parallel(numFwds, numPaths, 0, fwd0,
+                                          gammas1F, taus, useSobol, seed)
+        fullValues = fullTensorValues(fwds, numPaths)
+
+        accumulators = makeAccumulators()
+        LMMStreamFwds1F(list(accumulators.values()), numFwds, numPaths, fwd0,
+                        gammas1F, taus, useSobol, seed, chunkSize=3000)
+
+        name = "1F SOBOL" if useSobol else "1F PSEUDO"
+
+        for product, accumulator in accumulators.items():
+            v1 = fullValues[product]
+            v2 = accumulator.value()
+            testCases.print(name, product, round(v1, 10), round(v2, 10),
+                            round(accumulator.standardError(), 8),
+                            abs(v1 - v2) < 1e-13)
+
+    fwds = LMMSimulateFwdsNF_Parallel(numFwds, numPaths, fwd0, gammas1F,
+                                      correl, taus, seed)
+    fullValues = fullTensorValues(fwds, numPaths)
+
+    accumulators = makeAccumulators()
+    LMMStreamFwdsNF(list(accumulators.values()), numFwds, numPaths, fwd0,
+                    gammas1F, correl, taus, seed, chunkSize=3000)
+
+    for product, accumulator in accumulators.items():
+        v1 = fullValues[product]
+        v2 = accumulator.value()
+        testCases.print("NF PSEUDO", product, round(v1, 10), round(v2, 10),
+                        round(accumulator.standardError(), 8),
+                        abs(v1 - v2) < 1e-13)
+
+    ###########################################################################
+    # The caplet values of a strip are kept as well as the total
+    ###########################################################################
+
+    cap = accumulators["CAP"]
+    capletValues = LMMCapFlrPricer(numFwds, numPaths, 0.05, fwd0, fwds,
+                                   taus, 1)
+
+    testCases.header("LABEL", "CAPLETS CLOSE", "NUM PATHS")
+    testCases.print("NF CAP", np.max(np.abs(cap.values()
+                                            - capletValues)) < 1e-14,
+                    cap.numPaths())
+
+    ###########################################################################
+    # Each path and its antithetic path are one sample of the standard error
+    # and not two. Path i of the full matrix is paired with path i + n / 2.
+    ###########################################################################
+
+    payoffs = _swaptionPayoffs(fwds, 0.05, 3, 8, taus, 1)[:, 0]
+    halfNumPaths = len(payoffs) // 2
+    pairs = (payoffs[:halfNumPaths] + payoffs[halfNumPaths:]) / 2.0
+    pairsError = np.std(pairs) / np.sqrt(halfNumPaths)
+    pathsError = np.std(payoffs) / np.sqrt(len(payoffs))
+    streamedError = accumulators["PAYER SWAPTION"].standardError()
+
+    testCases.header("PRODUCT", "STREAMED", "PAIRS", "PATHS", "SAME AS PAIRS")
+    testCases.print("NF PAYER SWAPTION", round(streamedError, 8),
+                    round(pairsError, 8), round(pathsError, 8),
+                    abs(streamedError - pairsError) < 1e-12 * pairsError)
+
+    ###########################################################################
+    # The product must fit on the simulated forwards
+    ###########################################################################
+
+    testCases.header("LABEL", "RAISES")
+
+    try:
+        swaption = FinLMMSwaptionAccumulator(0.05, 3, numFwds + 5, 1)
+        LMMStreamFwds1F([swaption], numFwds, 1000, fwd0, gammas1F, taus)
+        testCases.print("SWAP BEYOND GRID", False)
+    except FinError:
+        testCases.print("SWAP BEYOND GRID", True)
+
+###############################################################################
+
+
+def test_LMMStreamingMemory():
+
+    numPaths = 100000
+    seed = 42
+    chunkSize = 10000
+
+    # The memory of the forwards for 40 quarterly forwards
+    fullMB = numPaths * 40 * 40 * 8 / 1e6
+    chunkMB = chunkSize * 40 * 40 * 8 / 1e6
+
+    testCases.header("LABEL", "FULL MB", "STREAMED MB")
+    testCases.print("100000 PATHS 40 FORWARDS", fullMB, chunkMB)
+
+    LMMStreamFwds1F(list(makeAccumulators().values()), numFwds, 1000, fwd0,
+                    gammas1F, taus, 0, seed, chunkSize)
+
+    start = time.time()
+    fwds = LMMSimulateFwds1F_Parallel(numFwds, numPaths, 0, fwd0, gammas1F,
+                                      taus, 0, seed)
+    fullTensorValues(fwds, numPaths)
+    end = time.time()
+    fullTime = end - start
+
+    start = time.time()
+    LMMStreamFwds1F(list(makeAccumulators().values()), numFwds, numPaths,
+                    fwd0, gammas1F, taus, 0, seed, chunkSize)
+    end = time.time()
+    streamTime = end - start
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("FULL TENSOR 6 PRODUCTS 100000 PATHS", fullTime)
+    testCases.print("STREAMED 6 PRODUCTS 100000 PATHS", streamTime)
+
+###############################################################################
+
+
+test_LMMStreaming()
+test_LMMStreamingMemory()
+testCases.compareTestCases()
@@ -0,0 +1,197 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.finutils.FinGlobalTypes import FinExerciseTypes
+from financepy.products.rates.FinIborBermudanSwaption import FinIborBermudanSwaption
+from financepy.models.FinModelRatesBK import FinModelRatesBK
+from financepy.models.FinModelRatesHW import FinModelRatesHW
+from financepy.models.FinModelRatesBDT import FinModelRatesBDT
+from financepy.models.FinModelRatesTreeCache import clearTreeCache
+from financepy.models.FinModelRatesTreeCache import treeCacheStats
+from financepy.market.curves.FinDiscountCurveFlat import FinDiscountCurveFlat
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def buildBermudanBook(valuationDate, numTrades):
+    ''' A book of Bermudan swaptions with a range of expiries, swap tenors,
+    strikes and directions that all mature within 11 years. '''
+
+    book = []
+
+    for i in range(0, numTrades):
+
+        exerciseDate = valuationDate.addYears(1 + i % 5)
+        maturityDate = exerciseDate.addYears(1 + i % 6)
+
+        if i % 2 == 0:
+            fixedLegType = FinSwapTypes.PAY
+        else:
+            fixedLegType = FinSwapTypes.RECEIVE
+
+        swaption = FinIborBermudanSwaption(valuationDate,
+                                           exerciseDate,
+                                           maturityDate,
+                                           fixedLegType,
+                                           FinExerciseTypes.BERMUDAN,
+                                           0.050 + 0.001 * (i % 20),
+                                           FinFrequencyTypes.SEMI_ANNUAL,
+                                           FinDayCountTypes.ACT_365F)
+        book.append(swaption)
+
+    return book
+
+###############################################################################
+
+
+def test_FinModelRatesTreeCache():
+
+    valuationDate = FinDate(1, 1, 2011)
+
+    liborCurve = FinDiscountCurveFlat(valuationDate,
+                                      0.0625,
+                                      FinFrequencyTypes.SEMI_ANNUAL,
+                                      FinDayCountTypes.ACT_365F)
+
+    numTimeSteps = 100
+    treeHorizon = 12.0
+
+    models = {"HW": lambda horizon:
+              FinModelRatesHW(0.01, 0.01, numTimeSteps,
+                              treeHorizon=horizon),
+              "BK": lambda horizon:
+              FinModelRatesBK(0.20, 0.10, numTimeSteps,
+                              treeHorizon=horizon),
+              "BDT": lambda horizon:
+              FinModelRatesBDT(0.20, numTimeSteps,
+                               treeHorizon=horizon)}
+
+    ###########################################################################
+    # A price from the shared tree is the price from a tree built out to the
+    # tree horizon
+    ###########################################################################
+
+    book = buildBermudanBook(valuationDate, 12)
+
+    testCases.header("MODEL", "TRADE", "CACHED", "SAME AS HORIZON TREE")
+
+    for name, makeModel in models.items():
+
+        clearTreeCache()
+
+        cachedModel = makeModel(treeHorizon)
+        horizonModel = makeModel(None)
+        buildTree = horizonModel.buildTree
+
+        for i, swaption in enumerate(book):
+
+            v1 = swaption.value(valuationDate, liborCurve, cachedModel)
+
+            horizonModel.buildTree = \
+                lambda tmat, dfTimes, dfValues, eventTimes=None: \
+                buildTree(treeHorizon, dfTimes, dfValues)
+            v2 = swaption.value(valuationDate, liborCurve, horizonModel)
+            horizonModel.buildTree = buildTree
+
+            testCases.print(name, i, v1, abs(v1 - v2) < 1e-8)
+
+    ###########################################################################
+    # Trades that mature after the tree horizon build their own tree. This
+    # one matures after 7 years
+    ###########################################################################
+
+    clearTreeCache()
+
+    model = FinModelRatesHW(0.01, 0.01, numTimeSteps, treeHorizon=3.0)
+    v1 = book[5].value(valuationDate, liborCurve, model)
+    v2 = book[5].value(valuationDate, liborCurve,
+                       FinModelRatesHW(0.01, 0.01, numTimeSteps))
+    hits, misses, numCached = treeCacheStats()
+
+    testCases.header("LABEL", "SAME AS NO HORIZON", "HITS", "MISSES",
+                     "CACHED")
+    testCases.print("BEYOND HORIZON", abs(v1 - v2) < 1e-8, hits, misses,
+                    numCached)
+
+    clearTreeCache()
+
+###############################################################################
+
+
+def test_FinModelRatesTreeCacheBook():
+
+    valuationDate = FinDate(1, 1, 2011)
+
+    liborCurve = FinDiscountCurveFlat(valuationDate,
+                                      0.0625,
+                                      FinFrequencyTypes.SEMI_ANNUAL,
+                                      FinDayCountTypes.ACT_365F)
+
+    numTrades = 1000
+    numTimeSteps = 100
+    treeHorizon = 12.0
+
+    book = buildBermudanBook(valuationDate, numTrades)
+
+    models = [("HW", FinModelRatesHW(0.01, 0.01, numTimeSteps),
+               FinModelRatesHW(0.01, 0.01, numTimeSteps,
+                               treeHorizon=treeHorizon)),
+              ("BK", FinModelRatesBK(0.20, 0.10, numTimeSteps),
+               FinModelRatesBK(0.20, 0.10, numTimeSteps,
+                               treeHorizon=treeHorizon)),
+              ("BDT", FinModelRatesBDT(0.20, numTimeSteps),
+               FinModelRatesBDT(0.20, numTimeSteps,
+                                treeHorizon=treeHorizon))]
+
+    testCases.header("MODEL", "TRADES", "HITS", "MISSES", "CACHED")
+
+    timings = []
+
+    for name, model, cachedModel in models:
+
+        clearTreeCache()
+
+        start = time.time()
+        for swaption in book:
+            swaption.value(valuationDate, liborCurve, model)
+        end = time.time()
+        elapsedTree = end - start
+
+        start = time.time()
+        for swaption in book:
+            swaption.value(valuationDate, liborCurve, cachedModel)
+        end = time.time()
+        elapsedCached = end - start
+
+        hits, misses, numCached = treeCacheStats()
+        testCases.print(name, numTrades, hits, misses, numCached)
+
+        timings.append((name, elapsedTree, elapsedCached))
+
+    testCases.header("METHOD", "TIME")
+
+    for name, elapsedTree, elapsedCached in timings:
+        testCases.print(name + " TREE PER TRADE", elapsedTree)
+        testCases.print(name + " SHARED TREE", elapsedCached)
+
+    clearTreeCache()
+
+###############################################################################
+
+
+test_FinModelRatesTreeCache()
+test_FinModelRatesTreeCacheBook()
+testCases.compareTestCases()
@@ -0,0 +1,224 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.finutils.FinGlobalTypes import FinExerciseTypes
+from financepy.products.rates.FinIborBermudanSwaption import FinIborBermudanSwaption
+from financepy.products.bonds.FinBondEmbeddedOption import FinBondEmbeddedOption
+from financepy.models.FinModelRatesBK import FinModelRatesBK
+from financepy.models.FinModelRatesHW import FinModelRatesHW
+from financepy.models.FinModelRatesBDT import FinModelRatesBDT
+from financepy.models.FinModelRatesTreeGrid import FinTreeGridTypes
+from financepy.market.curves.FinDiscountCurveFlat import FinDiscountCurveFlat
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+UNIFORM = FinTreeGridTypes.UNIFORM
+EVENT_ALIGNED = FinTreeGridTypes.EVENT_ALIGNED
+
+###############################################################################
+
+
+def stepsForAccuracy(timeSteps, errors, tolerance):
+    ''' The smallest number of time steps after which all of the errors are
+    within the tolerance. '''
+
+    numSteps = None
+    for steps, error in zip(timeSteps, errors):
+        if abs(error) > tolerance:
+            numSteps = None
+        elif numSteps is None:
+            numSteps = steps
+
+    return numSteps
+
+###############################################################################
+
+
+def convergenceTable(name, valueFn, makeModel, timeSteps, refSteps,
+                     tolerance):
+    ''' Compare the convergence of a uniform and an event aligned tree to a
+    reference price from an event aligned tree with many time steps. '''
+
+    vref = valueFn(makeModel(refSteps, EVENT_ALIGNED))
+
+    testCases.header("CASE", "STEPS", "UNIFORM", "EVENT", "UNIFORM ERR",
+                     "EVENT ERR")
+
+    uniformErrors = []
+    eventErrors = []
+
+    for numTimeSteps in timeSteps:
+        vu = valueFn(makeModel(numTimeSteps, UNIFORM))
+        ve = valueFn(makeModel(numTimeSteps, EVENT_ALIGNED))
+        uniformErrors.append(vu - vref)
+        eventErrors.append(ve - vref)
+        testCases.print(name, numTimeSteps, vu, ve, vu - vref, ve - vref)
+
+    testCases.header("CASE", "REFERENCE", "TOLERANCE", "UNIFORM STEPS",
+                     "EVENT STEPS")
+
+    testCases.print(name, vref, tolerance,
+                    stepsForAccuracy(timeSteps, uniformErrors, tolerance),
+                    stepsForAccuracy(timeSteps, eventErrors, tolerance))
+
+###############################################################################
+
+
+def test_FinModelRatesTreeGridBermudanSwaption():
+
+    valuationDate = FinDate(1, 1, 2011)
+
+    liborCurve = FinDiscountCurveFlat(valuationDate,
+                                      0.0625,
+                                      FinFrequencyTypes.SEMI_ANNUAL,
+                                      FinDayCountTypes.ACT_365F)
+
+    # The exercise date is not on a whole number of uniform time steps
+    exerciseDate = valuationDate.addMonths(19)
+    maturityDate = exerciseDate.addYears(5)
+
+    swaption = FinIborBermudanSwaption(valuationDate,
+                                       exerciseDate,
+                                       maturityDate,
+                                       FinSwapTypes.PAY,
+                                       FinExerciseTypes.BERMUDAN,
+                                       0.065,
+                                       FinFrequencyTypes.SEMI_ANNUAL,
+                                       FinDayCountTypes.ACT_365F)
+
+    def valueFn(model):
+        return swaption.value(valuationDate, liborCurve, model)
+
+    timeSteps = [25, 50, 100, 200, 400]
+    refSteps = 2000
+
+    convergenceTable("HW SWAPTION",
+                     valueFn,
+                     lambda n, g: FinModelRatesHW(0.01, 0.05, n,
+                                                  treeGridType=g),
+                     timeSteps, refSteps, 100.0)
+
+    convergenceTable("BK SWAPTION",
+                     valueFn,
+                     lambda n, g: FinModelRatesBK(0.20, 0.10, n,
+                                                  treeGridType=g),
+                     timeSteps, refSteps, 100.0)
+
+    convergenceTable("BDT SWAPTION",
+                     valueFn,
+                     lambda n, g: FinModelRatesBDT(0.20, n, treeGridType=g),
+                     timeSteps, refSteps, 100.0)
+
+###############################################################################
+
+
+def test_FinModelRatesTreeGridCallableBond():
+
+    valuationDate = FinDate(16, 8, 2016)
+    settlementDate = valuationDate.addWeekDays(3)
+
+    discountCurve = FinDiscountCurveFlat(valuationDate, 0.035,
+                                         FinFrequencyTypes.SEMI_ANNUAL)
+
+    issueDate = FinDate(15, 9, 2010)
+    maturityDate = FinDate(15, 9, 2022)
+    coupon = 0.025
+    freqType = FinFrequencyTypes.QUARTERLY
+    accrualType = FinDayCountTypes.ACT_ACT_ICMA
+
+    nextCallDate = FinDate(15, 9, 2016)
+    callDates = [nextCallDate]
+    callPrices = [100.0]
+
+    for _ in range(1, 24):
+        nextCallDate = nextCallDate.addMonths(3)
+        callDates.append(nextCallDate)
+        callPrices.append(100.0)
+
+    callableBond = FinBondEmbeddedOption(issueDate,
+                                         maturityDate, coupon,
+                                         freqType, accrualType,
+                                         callDates, callPrices,
+                                         [], [])
+
+    def valueFn(model):
+        v = callableBond.value(settlementDate, discountCurve, model)
+        return v['bondwithoption']
+
+    timeSteps = [25, 50, 100, 200, 400]
+    refSteps = 2000
+
+    convergenceTable("HW CALLABLE",
+                     valueFn,
+                     lambda n, g: FinModelRatesHW(0.01, 0.03, n,
+                                                  treeGridType=g),
+                     timeSteps, refSteps, 0.005)
+
+    convergenceTable("BK CALLABLE",
+                     valueFn,
+                     lambda n, g: FinModelRatesBK(0.20, 0.10, n,
+                                                  treeGridType=g),
+                     timeSteps, refSteps, 0.005)
+
+###############################################################################
+
+
+def test_FinModelRatesTreeGridTimings():
+
+    valuationDate = FinDate(1, 1, 2011)
+
+    liborCurve = FinDiscountCurveFlat(valuationDate,
+                                      0.0625,
+                                      FinFrequencyTypes.SEMI_ANNUAL,
+                                      FinDayCountTypes.ACT_365F)
+
+    exerciseDate = valuationDate.addMonths(19)
+    maturityDate = exerciseDate.addYears(5)
+
+    swaption = FinIborBermudanSwaption(valuationDate,
+                                       exerciseDate,
+                                       maturityDate,
+                                       FinSwapTypes.PAY,
+                                       FinExerciseTypes.BERMUDAN,
+                                       0.065,
+                                       FinFrequencyTypes.SEMI_ANNUAL,
+                                       FinDayCountTypes.ACT_365F)
+
+    testCases.header("METHOD", "TIME")
+
+    numRepeats = 20
+
+    for numTimeSteps in [50, 100, 200, 400]:
+        for gridType in [UNIFORM, EVENT_ALIGNED]:
+
+            model = FinModelRatesHW(0.01, 0.05, numTimeSteps,
+                                    treeGridType=gridType)
+
+            swaption.value(valuationDate, liborCurve, model)
+
+            start = time.time()
+            for _ in range(0, numRepeats):
+                swaption.value(valuationDate, liborCurve, model)
+            end = time.time()
+
+            testCases.print("HW " + gridType.name + " " + str(numTimeSteps),
+                            (end - start) / numRepeats)
+
+###############################################################################
+
+
+test_FinModelRatesTreeGridBermudanSwaption()
+test_FinModelRatesTreeGridCallableBond()
+test_FinModelRatesTreeGridTimings()
+testCases.compareTestCases()
@@ -0,0 +1,147 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinError import FinError
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.models.FinModelRatesBK import FinModelRatesBK
+from financepy.models.FinModelRatesBDT import FinModelRatesBDT
+from financepy.market.curves.FinDiscountCurveFlat import FinDiscountCurveFlat
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def test_FinModelRatesTreeRefit():
+
+    valuationDate = FinDate(1, 1, 2011)
+
+    # The curve moves by a fraction of a basis point as it does intraday
+    curves = []
+    for i in range(0, 10):
+        curve = FinDiscountCurveFlat(valuationDate,
+                                     0.0625 + 0.00001 * i,
+                                     FinFrequencyTypes.SEMI_ANNUAL,
+                                     FinDayCountTypes.ACT_365F)
+        curves.append(curve)
+
+    tmat = 7.0
+
+    models = {"BK": lambda: FinModelRatesBK(0.20, 0.10, 200),
+              "BDT": lambda: FinModelRatesBDT(0.20, 200)}
+
+    ###########################################################################
+    # A tree that is refitted to the new curve is the same as a tree that is
+    # built on it to the tolerance of the search for the drift. The sum of
+    # the Arrow-Debreu prices at a time step is the discount factor.
+    ###########################################################################
+
+    for name, makeModel in models.items():
+
+        builtModel = makeModel()
+        refitModel = makeModel()
+        refitModel.buildTree(tmat, curves[0]._times, curves[0]._dfs)
+        Q0 = refitModel._Q
+
+        testCases.header("MODEL", "CURVE", "BUILD DF", "REFIT DF", "SAME")
+
+        for i, curve in enumerate(curves[1:]):
+
+            builtModel.buildTree(tmat, curve._times, curve._dfs)
+            refitModel.refitTree(curve._times, curve._dfs)
+
+            diffQ = np.max(np.abs(refitModel._Q - builtModel._Q))
+            nonZero = builtModel._rt > 0.0
+            diffR = np.max(np.abs(refitModel._rt[nonZero]
+                                  / builtModel._rt[nonZero] - 1.0))
+
+            n = len(builtModel._treeTimes) - 2
+            df1 = np.sum(builtModel._Q[n])
+            df2 = np.sum(refitModel._Q[n])
+
+            testCases.print(name, i + 1, round(df1, 7), round(df2, 7),
+                            diffQ < 1e-8 and diffR < 1e-5)
+
+        testCases.header("MODEL", "REUSES ARRAYS")
+        testCases.print(name, refitModel._Q is Q0)
+
+    ###########################################################################
+    # A tree from the tree cache is shared and cannot be refitted
+    ###########################################################################
+
+    model = FinModelRatesBK(0.20, 0.10, 200, treeHorizon=10.0)
+    model.buildTree(tmat, curves[0]._times, curves[0]._dfs)
+
+    testCases.header("LABEL", "RAISES")
+
+    try:
+        model.refitTree(curves[1]._times, curves[1]._dfs)
+        testCases.print("REFIT CACHED TREE", False)
+    except FinError:
+        testCases.print("REFIT CACHED TREE", True)
+
+###############################################################################
+
+
+def test_FinModelRatesTreeRefitTimings():
+
+    valuationDate = FinDate(1, 1, 2011)
+
+    curves = []
+    for i in range(0, 20):
+        curve = FinDiscountCurveFlat(valuationDate,
+                                     0.0625 + 0.00001 * i,
+                                     FinFrequencyTypes.SEMI_ANNUAL,
+                                     FinDayCountTypes.ACT_365F)
+        curves.append(curve)
+
+    tmat = 10.0
+
+    models = {"BK": lambda: FinModelRatesBK(0.20, 0.10, 500),
+              "BDT": lambda: FinModelRatesBDT(0.20, 500)}
+
+    testCases.header("METHOD", "TIME")
+
+    for name, makeModel in models.items():
+
+        model = makeModel()
+        model.buildTree(tmat, curves[0]._times, curves[0]._dfs)
+
+        # A new model allocates its arrays for every tree
+        start = time.time()
+        for curve in curves:
+            makeModel().buildTree(tmat, curve._times, curve._dfs)
+        end = time.time()
+        testCases.print(name + " NEW MODEL", (end - start) / len(curves))
+
+        # The model reuses its arrays and fits the drift from scratch
+        start = time.time()
+        for curve in curves:
+            model.buildTree(tmat, curve._times, curve._dfs)
+        end = time.time()
+        testCases.print(name + " BUILD TREE", (end - start) / len(curves))
+
+        # The search for the drift starts at the last fit
+        start = time.time()
+        for curve in curves:
+            model.refitTree(curve._times, curve._dfs)
+        end = time.time()
+        testCases.print(name + " REFIT TREE", (end - start) / len(curves))
+
+###############################################################################
+
+
+test_FinModelRatesTreeRefit()
+test_FinModelRatesTreeRefitTimings()
+testCases.compareTestCases()
@@ -2,12 +2,17 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ###############################################################################
 
+import time
+
 import sys
 sys.path.append("..")
 
 from financepy.finutils.FinCalendar import FinBusDayAdjustTypes
 from financepy.finutils.FinCalendar import FinDateGenRuleTypes
 from financepy.finutils.FinSchedule import FinSchedule
+from financepy.finutils.FinSchedule import generateSchedules
+from financepy.finutils.FinSchedule import clearScheduleCache
+from financepy.finutils.FinSchedule import scheduleCacheStats
 from financepy.finutils.FinFrequency import FinFrequencyTypes
 from financepy.finutils.FinCalendar import FinCalendarTypes, FinCalendar
 from financepy.finutils.FinDate import FinDate, setDateFormatType, FinDateFormatTypes
@@ -478,6 +483,108 @@ def test_FinScheduleAlignmentEff31():
 
 ###############################################################################
 
+
+def test_FinScheduleBulk():
+
+    calendarType = FinCalendarTypes.TARGET
+    busDayAdjustType = FinBusDayAdjustTypes.MODIFIED_FOLLOWING
+    freqType = FinFrequencyTypes.QUARTERLY
+    adjustTerminationDate = True
+    eomFlag = False
+
+    effDates = [FinDate(15, 3, 2019).addMonths(i) for i in range(0, 200)]
+    termDates = [effDates[i].addTenor(str(1 + i % 30) + "Y")
+                 for i in range(0, 200)]
+
+    testCases.header("DATE GEN RULE", "NUM SCHEDULES", "NUM DATES", "SAME")
+
+    for dateGenRuleType in FinDateGenRuleTypes:
+
+        dates, offsets = generateSchedules(effDates,
+                                           termDates,
+                                           freqType,
+                                           calendarType,
+                                           busDayAdjustType,
+                                           dateGenRuleType,
+                                           adjustTerminationDate,
+                                           eomFlag)
+
+        same = True
+        for i in range(0, len(effDates)):
+
+            schedule = FinSchedule(effDates[i],
+                                   termDates[i],
+                                   freqType,
+                                   calendarType,
+                                   busDayAdjustType,
+                                   dateGenRuleType,
+                                   adjustTerminationDate,
+                                   eomFlag)
+
+            bulkDates = dates[offsets[i]:offsets[i+1]].toDates()
+            same = same and bulkDates == schedule._adjustedDates
+
+        testCases.print(str(dateGenRuleType), len(effDates), len(dates), same)
+
+    testCases.header("SCHEDULE", "DATE")
+    dates, offsets = generateSchedules(effDates[0:3],
+                                       termDates[0:3],
+                                       freqType,
+                                       calendarType,
+                                       busDayAdjustType)
+
+    for i in range(0, 3):
+        for dt in dates[offsets[i]:offsets[i+1]].toDates():
+            testCases.print(i, dt)
+
+###############################################################################
+
+
+def test_FinScheduleTimings():
+
+    calendarType = FinCalendarTypes.TARGET
+    busDayAdjustType = FinBusDayAdjustTypes.MODIFIED_FOLLOWING
+    freqType = FinFrequencyTypes.QUARTERLY
+    dateGenRuleType = FinDateGenRuleTypes.BACKWARD
+
+    effDates = [FinDate(2, 1, 2020).addDays(i % 250) for i in range(0, 2000)]
+    termDates = [effDates[i].addTenor(str(1 + i % 20) + "Y")
+                 for i in range(0, 2000)]
+
+    clearScheduleCache()
+
+    start = time.time()
+    for i in range(0, len(effDates)):
+        FinSchedule(effDates[i], termDates[i], freqType, calendarType,
+                    busDayAdjustType, dateGenRuleType)
+    end = time.time()
+    elapsedNew = end - start
+
+    start = time.time()
+    for i in range(0, len(effDates)):
+        FinSchedule(effDates[i], termDates[i], freqType, calendarType,
+                    busDayAdjustType, dateGenRuleType)
+    end = time.time()
+    elapsedCached = end - start
+
+    start = time.time()
+    generateSchedules(effDates, termDates, freqType, calendarType,
+                      busDayAdjustType, dateGenRuleType)
+    end = time.time()
+    elapsedBulk = end - start
+
+    hits, misses, size = scheduleCacheStats()
+
+    testCases.header("LABEL", "TIME")
+    testCases.print("SCHEDULES", elapsedNew)
+    testCases.print("CACHED SCHEDULES", elapsedCached)
+    testCases.print("BULK SCHEDULES", elapsedBulk)
+
+    testCases.header("HITS", "MISSES", "CACHE SIZE")
+    testCases.print(hits, misses, size)
+
+###############################################################################
+
 test_FinSchedule()
 test_FinScheduleAlignment(True)
 test_FinScheduleAlignment(False)
@@ -487,6 +594,9 @@ test_FinScheduleAlignmentLeapYearNotEOM()
 
 test_FinScheduleAlignmentEff31()
 
+test_FinScheduleBulk()
+test_FinScheduleTimings()
+
 testCases.compareTestCases()
 
 setDateFormatType(FinDateFormatTypes.UK_LONGEST)
@@ -0,0 +1,250 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+
+import numpy as np
+
+import sys
+sys.path.append("..")
+
+from financepy.finutils.FinDate import FinDate
+from financepy.finutils.FinError import FinError
+from financepy.finutils.FinDayCount import FinDayCountTypes
+from financepy.finutils.FinFrequency import FinFrequencyTypes
+from financepy.finutils.FinGlobalTypes import FinSwapTypes
+from financepy.products.rates.FinIborSwap import FinIborSwap
+from financepy.products.rates.FinSwapBook import FinSwapBook
+from financepy.products.bonds.FinBond import FinBond
+from financepy.products.bonds.FinBondZeroCurve import FinBondZeroCurve
+from financepy.market.curves.FinDiscountCurve import FinDiscountCurve
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+testCases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+
+def buildCurve(valuationDate, shift):
+    ''' An upward sloping discount curve. '''
+
+    years = np.array([0.0, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 40.0])
+    zeroRates = np.array([0.010, 0.011, 0.012, 0.015, 0.022, 0.028, 0.030,
+                          0.031]) + shift
+    dfDates = [valuationDate.addYears(t) for t in years]
+    dfValues = np.exp(-zeroRates * years)
+    return FinDiscountCurve(valuationDate, dfDates, dfValues)
+
+###############################################################################
+
+
+class DfOnlyCurve():
+    ''' A curve which only has a df method taking one date at a time. '''
+
+    def __init__(self, curve):
+        self._valuationDate = curve._valuationDate
+        self._curve = curve
+
+    def df(self, dt):
+        return self._curve.df(dt)
+
+###############################################################################
+
+
+def buildBook(valuationDate, numSwaps):
+    ''' A book of new, seasoned and forward starting swaps with a mix of
+    frequencies and day counts. '''
+
+    freqTypes = [FinFrequencyTypes.ANNUAL,
+                 FinFrequencyTypes.SEMI_ANNUAL,
+                 FinFrequencyTypes.QUARTERLY]
+
+    dayCountTypes = [FinDayCountTypes.ACT_360,
+                     FinDayCountTypes.ACT_365F,
+                     FinDayCountTypes.THIRTY_E_360]
+
+    tenors = ["2Y", "5Y", "7Y", "10Y", "30Y"]
+
+    swaps = []
+
+    for i in range(0, numSwaps):
+
+        startDate = valuationDate.addDays(7 * (i % 300) - 1050)
+        swapType = FinSwapTypes.PAY if i % 2 == 0 else FinSwapTypes.RECEIVE
+        coupon = 0.01 + 0.0001 * (i % 37)
+
+        swap = FinIborSwap(startDate,
+                           tenors[i % len(tenors)],
+                           swapType,
+                           coupon,
+                           freqTypes[i % 3],
+                           dayCountTypes[(i // 3) % 3],
+                           1000000.0 * (1 + i % 10),
+                           0.0001 * (i % 7),
+                           freqTypes[(i + 1) % 3],
+                           dayCountTypes[i % 3])
+
+        swaps.append(swap)
+
+    return swaps
+
+###############################################################################
+
+
+def test_FinSwapBook():
+
+    valuationDate = FinDate(15, 6, 2020)
+
+    discountCurve = buildCurve(valuationDate, 0.0)
+    indexCurve = buildCurve(valuationDate, 0.002)
+
+    swaps = buildBook(valuationDate, 1000)
+
+    start = time.time()
+    book = FinSwapBook(swaps)
+    end = time.time()
+    elapsedBuild = end - start
+
+    ###########################################################################
+    # The swaps that have started need the rate that was fixed at the start
+    # of their current period
+    ###########################################################################
+
+    firstFixingRates = np.full(len(swaps), np.nan)
+
+    for i, swap in enumerate(swaps):
+        if swap._effectiveDate <= valuationDate:
+            firstFixingRates[i] = 0.005 + 0.0001 * (i % 11)
+
+    def swapValues(indexCurve):
+        values = []
+        for i, swap in enumerate(swaps):
+            firstFixingRate = None
+            if not np.isnan(firstFixingRates[i]):
+                firstFixingRate = firstFixingRates[i]
+            values.append(swap.value(valuationDate, discountCurve,
+                                     indexCurve, firstFixingRate))
+        return np.array(values)
+
+    ###########################################################################
+    # The book values are the same as the values of the swaps
+    ###########################################################################
+
+    testCases.header("CURVES", "NUM SWAPS", "BOOK VALUE", "SAME")
+
+    start = time.time()
+    values = swapValues(None)
+    end = time.time()
+    elapsedLoop = end - start
+
+    bookValues = book.value(valuationDate, discountCurve, None,
+                            firstFixingRates)
+
+    start = time.time()
+    bookValues = book.value(valuationDate, discountCurve, None,
+                            firstFixingRates)
+    end = time.time()
+    elapsedBook = end - start
+
+    testCases.print("SINGLE", len(swaps), np.sum(bookValues),
+                    np.array_equal(values, bookValues))
+
+    values = swapValues(indexCurve)
+    bookValues = book.value(valuationDate, discountCurve, indexCurve,
+                            firstFixingRates)
+
+    testCases.print("DUAL", len(swaps), np.sum(bookValues),
+                    np.array_equal(values, bookValues))
+
+    testCases.header("LABEL", "RAISES")
+
+    try:
+        book.value(valuationDate, discountCurve)
+        testCases.print("NO FIRST FIXINGS", False)
+    except FinError:
+        testCases.print("NO FIRST FIXINGS", True)
+
+    ###########################################################################
+    # The legs are the same as the values of the legs
+    ###########################################################################
+
+    fixedValues, floatValues = book.legValues(valuationDate, discountCurve,
+                                              None, firstFixingRates)
+
+    # This swap starts after the valuation date
+    swap = swaps[299]
+
+    testCases.header("LEG", "LEG VALUE", "BOOK LEG VALUE")
+    testCases.print("FIXED", swap._fixedLeg.value(valuationDate,
+                                                  discountCurve),
+                    fixedValues[299])
+    testCases.print("FLOAT", swap._floatLeg.value(valuationDate,
+                                                  discountCurve,
+                                                  discountCurve),
+                    floatValues[299])
+
+    ###########################################################################
+    # Curves without fast discount factors at excel dates are valued one
+    # date at a time
+    ###########################################################################
+
+    bonds = []
+    for i, coupon in enumerate([0.01, 0.012, 0.015, 0.018, 0.02, 0.022]):
+        bonds.append(FinBond(FinDate(15, 6, 2019),
+                             valuationDate.addYears(2 * i + 2), coupon,
+                             FinFrequencyTypes.SEMI_ANNUAL,
+                             FinDayCountTypes.ACT_ACT_ICMA))
+
+    bondCurve = FinBondZeroCurve(valuationDate, bonds,
+                                 [100.5, 100.8, 101.0, 100.7, 100.2, 99.5])
+
+    newSwaps = [FinIborSwap(valuationDate, tenor, FinSwapTypes.PAY, 0.015,
+                            FinFrequencyTypes.SEMI_ANNUAL,
+                            FinDayCountTypes.THIRTY_E_360)
+                for tenor in ["2Y", "5Y", "10Y"]]
+
+    newBook = FinSwapBook(newSwaps)
+    noFixings = np.full(len(newSwaps), np.nan)
+
+    testCases.header("CURVE", "BOOK VALUE", "SAME")
+
+    values = [swap.value(valuationDate, bondCurve, bondCurve)
+              for swap in newSwaps]
+    bookValues = newBook.value(valuationDate, bondCurve, None, noFixings)
+    testCases.print("BOND ZERO CURVE", np.round(np.sum(bookValues), 4),
+                    np.max(np.abs(values - bookValues)) < 1e-6)
+
+    dfOnlyCurve = DfOnlyCurve(discountCurve)
+    values = [swap.value(valuationDate, discountCurve, discountCurve)
+              for swap in newSwaps]
+    dfOnlyValues = [swap.value(valuationDate, dfOnlyCurve, dfOnlyCurve)
+                    for swap in newSwaps]
+    bookValues = newBook.value(valuationDate, dfOnlyCurve, None, noFixings)
+    testCases.print("DF ONLY CURVE", np.round(np.sum(bookValues), 4),
+                    np.max(np.abs(values - bookValues)) < 1e-6 and
+                    np.max(np.abs(np.array(values) - dfOnlyValues)) < 1e-6)
+
+    ###########################################################################
+    # The book can be revalued many times on moved curves
+    ###########################################################################
+
+    curves = [buildCurve(valuationDate, 0.0001 * i) for i in range(0, 20)]
+
+    start = time.time()
+    for curve in curves:
+        book.value(valuationDate, curve, None, firstFixingRates)
+    end = time.time()
+    elapsedScenarios = (end - start) / len(curves)
+
+    testCases.header("METHOD", "TIME")
+    testCases.print("BUILD BOOK OF 1000 SWAPS", elapsedBuild)
+    testCases.print("VALUE 1000 SWAPS ONE BY ONE", elapsedLoop)
+    testCases.print("VALUE BOOK OF 1000 SWAPS", elapsedBook)
+    testCases.print("VALUE BOOK PER SCENARIO CURVE", elapsedScenarios)
+
+###############################################################################
+
+
+test_FinSwapBook()
+testCases.compareTestCases()